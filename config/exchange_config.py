@@ -0,0 +1,72 @@
+"""
+Exchange client configuration (real Binance or in-process fake)
+"""
+
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# 'binance' for the real (testnet) API, 'fake' for utils.fake_binance_client
+EXCHANGE_MODE = os.getenv('EXCHANGE_MODE', 'binance')
+
+# Fake client settings
+FAKE_LATENCY_DISTRIBUTION = os.getenv('FAKE_LATENCY_DISTRIBUTION', 'lognormal')  # none/constant/uniform/normal/lognormal/pareto
+FAKE_LATENCY_MS = float(os.getenv('FAKE_LATENCY_MS', 50))
+FAKE_LATENCY_SIGMA = float(os.getenv('FAKE_LATENCY_SIGMA', 0.5))
+FAKE_WEIGHT_LIMIT = int(os.getenv('FAKE_WEIGHT_LIMIT', 6000))  # Request weight per minute
+FAKE_ERROR_RATE = float(os.getenv('FAKE_ERROR_RATE', 0.0))  # Probability of an injected 429
+FAKE_ORDER_TIMEOUT_RATE = float(os.getenv('FAKE_ORDER_TIMEOUT_RATE', 0.0))  # Probability an accepted order times out
+FAKE_CANDLE_DIR = os.getenv('FAKE_CANDLE_DIR', '')  # Serve candles from this CandleStore (synthetic if empty)
+FAKE_SEED = int(os.getenv('FAKE_SEED', 42))
+FAKE_BALANCE_USDT = float(os.getenv('FAKE_BALANCE_USDT', 10000))
+
+# Kline WebSocket streams for MonitorBot/ProfitStreakBot (evaluate on candle close instead of polling REST)
+KLINE_STREAM_ENABLED = os.getenv('KLINE_STREAM_ENABLED', 'false').lower() == 'true'
+KLINE_STREAM_URL = os.getenv('KLINE_STREAM_URL', '')  # Defaults to the (testnet) Binance stream URL
+KLINE_STREAM_HISTORY = int(os.getenv('KLINE_STREAM_HISTORY', 200))  # Closed candles kept per market
+
+# Concurrent live cycles (utils/async_market_data.py): fetch all markets at once, signals in a thread pool
+ASYNC_CYCLE_ENABLED = os.getenv('ASYNC_CYCLE_ENABLED', 'false').lower() == 'true'
+ASYNC_CONCURRENCY = int(os.getenv('ASYNC_CONCURRENCY', 10))  # Kline requests in flight
+ASYNC_WORKERS = int(os.getenv('ASYNC_WORKERS', 4))  # Threads for sync requests, indicators and signals
+
+# Candle-close scheduling of the polling loops (utils/candle_scheduler.py)
+CANDLE_SETTLE_DELAY = float(os.getenv('CANDLE_SETTLE_DELAY', 1.0))  # Seconds after a close before fetching
+CLOCK_RESYNC_INTERVAL = float(os.getenv('CLOCK_RESYNC_INTERVAL', 1800))  # Seconds between exchange time syncs
+
+# Candles fetched per market (utils/lookback_planner.py): just enough for each strategy's declared warm-up
+LOOKBACK_DEFAULT_LIMIT = int(os.getenv('LOOKBACK_DEFAULT_LIMIT', 100))  # For strategies that depend on the whole history
+LOOKBACK_MAX_LIMIT = int(os.getenv('LOOKBACK_MAX_LIMIT', 999))  # Binance serves at most 1000 klines (incl. the open one)
+
+# Process-wide exchange info cache (utils/exchange_info_cache.py), shared by every TradeExecutor
+EXCHANGE_INFO_TTL = float(os.getenv('EXCHANGE_INFO_TTL', 6 * 3600))  # Seconds before symbol filters are re-downloaded
+EXCHANGE_INFO_CACHE_DIR = os.getenv('EXCHANGE_INFO_CACHE_DIR', 'data/cache')  # On-disk copy ('' disables it)
+
+# Account state from the user data stream (utils/account_state.py): balances for sizing read from memory
+ACCOUNT_STREAM_ENABLED = os.getenv('ACCOUNT_STREAM_ENABLED', 'false').lower() == 'true'
+ACCOUNT_RECONCILE_INTERVAL = float(os.getenv('ACCOUNT_RECONCILE_INTERVAL', 300))  # Seconds between REST get_account reconciles
+USER_STREAM_URL = os.getenv('USER_STREAM_URL', '')  # Defaults to the (testnet) Binance stream URL
+
+# Position exits: 'poll' checks stop loss/take profit each cycle, 'oco' places an exchange-side OCO after each entry
+EXIT_MODE = os.getenv('EXIT_MODE', 'poll').lower()
+OCO_STOP_LIMIT_BUFFER = float(os.getenv('OCO_STOP_LIMIT_BUFFER', 0.005))  # Stop-limit price this far beyond the stop
+
+# Order submission queue (utils/order_pipeline.py): orders sent by a worker pool with deterministic client order IDs
+ORDER_PIPELINE_ENABLED = os.getenv('ORDER_PIPELINE_ENABLED', 'false').lower() == 'true'
+ORDER_WORKERS = int(os.getenv('ORDER_WORKERS', 4))  # Orders in flight
+ORDER_MAX_RETRIES = int(os.getenv('ORDER_MAX_RETRIES', 3))  # Resends after timeouts/throttling
+ORDER_RETRY_DELAY = float(os.getenv('ORDER_RETRY_DELAY', 0.5))  # First retry delay in seconds (doubles per retry)
+ORDER_CYCLE_TIMEOUT = float(os.getenv('ORDER_CYCLE_TIMEOUT', 60))  # Seconds a cycle waits for its queued orders
+
+# Host-wide request-weight limiter (utils/rate_limiter.py) shared by every bot process on the API key's IP
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'false').lower() == 'true'
+RATE_LIMIT_WEIGHT = int(os.getenv('RATE_LIMIT_WEIGHT', 6000))  # Exchange request weight limit per minute
+RATE_LIMIT_HEADROOM = float(os.getenv('RATE_LIMIT_HEADROOM', 0.8))  # Fraction of the limit the bots may use
+RATE_LIMIT_DIR = os.getenv('RATE_LIMIT_DIR', '')  # Directory of the shared state file (default /dev/shm or temp)
+
+# Shared market-data service (utils/market_data_service.py): one process streams candles and computes indicators for every bot
+MARKET_DATA_SERVICE_ENABLED = os.getenv('MARKET_DATA_SERVICE_ENABLED', 'false').lower() == 'true'
+MARKET_DATA_SOCKET = os.getenv('MARKET_DATA_SOCKET', '')  # Unix socket path (default tradingbot_market_data.sock in the temp dir)
+MARKET_DATA_HISTORY = int(os.getenv('MARKET_DATA_HISTORY', 500))  # Closed candles (and feature rows) the service keeps per market
@@ -0,0 +1,40 @@
+"""
+Trade storage backend configuration
+"""
+
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# 'bigquery' (default) or 'local' (embedded SQLite, no credentials or network needed)
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'bigquery')
+
+# Local backend settings
+LOCAL_DB_PATH = os.getenv('LOCAL_DB_PATH', 'data/local/trading.db')
+
+# Append-only trade journal (utils/trade_journal.py): each trade written once, full history only in periodic snapshots
+TRADE_JOURNAL_ENABLED = os.getenv('TRADE_JOURNAL_ENABLED', 'false').lower() == 'true'
+TRADE_JOURNAL_FSYNC_INTERVAL = float(os.getenv('TRADE_JOURNAL_FSYNC_INTERVAL', 1.0))  # Seconds between fsyncs (0: every event)
+TRADE_JOURNAL_SNAPSHOT_EVERY = int(os.getenv('TRADE_JOURNAL_SNAPSHOT_EVERY', 500))  # Events between full snapshots
+
+# Trade history backups (utils/history_backup.py): a gzipped base plus deltas per save instead of a full copy per save
+HISTORY_BACKUP_DIR = os.getenv('HISTORY_BACKUP_DIR', 'data/history/backups')
+HISTORY_BACKUP_KEEP = int(os.getenv('HISTORY_BACKUP_KEEP', 7))  # Bases (each with its deltas) kept
+HISTORY_BACKUP_MAX_AGE_DAYS = float(os.getenv('HISTORY_BACKUP_MAX_AGE_DAYS', 30))  # Older bases are dropped (the newest is always kept)
+HISTORY_BACKUP_BASE_EVERY = int(os.getenv('HISTORY_BACKUP_BASE_EVERY', 500))  # Deltas before a new base is written
+
+# Write-behind persistence queue (utils/persistence_queue.py): BotCore's trade and summary writes batched on a background thread
+PERSISTENCE_QUEUE_ENABLED = os.getenv('PERSISTENCE_QUEUE_ENABLED', 'false').lower() == 'true'
+PERSISTENCE_BATCH_SIZE = int(os.getenv('PERSISTENCE_BATCH_SIZE', 500))  # Records per write at most
+PERSISTENCE_MAX_DELAY = float(os.getenv('PERSISTENCE_MAX_DELAY', 5.0))  # Seconds a record waits for its batch to fill
+PERSISTENCE_QUEUE_SIZE = int(os.getenv('PERSISTENCE_QUEUE_SIZE', 10000))  # Queued records at most (the rest spill to disk)
+PERSISTENCE_MAX_RETRIES = int(os.getenv('PERSISTENCE_MAX_RETRIES', 3))  # Retries of a failed batch before it is spilled
+PERSISTENCE_RETRY_DELAY = float(os.getenv('PERSISTENCE_RETRY_DELAY', 1.0))  # First retry delay in seconds (doubles per retry)
+PERSISTENCE_SPILL_PATH = os.getenv('PERSISTENCE_SPILL_PATH', 'data/local/persistence_spill.jsonl')  # Records the database could not be reached for
+PERSISTENCE_DEAD_LETTER_PATH = os.getenv('PERSISTENCE_DEAD_LETTER_PATH', 'data/local/persistence_dead_letter.jsonl')  # Records the database rejected (not retried)
+
+# BigQuery writes of up to this many rows use streaming inserts (live bots), larger ones load jobs (backtests); 0 disables streaming
+# Streamed rows stay in the streaming buffer for a while, where DELETE (clear_trades) cannot remove them
+BIGQUERY_STREAMING_MAX_ROWS = int(os.getenv('BIGQUERY_STREAMING_MAX_ROWS', 500))
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Live Order Path Checker
+
+Runs the live-trading order paths against the local stand-ins
+(FakeBinanceClient and utils/fake_streams.py) and asserts their behavior,
+so changes to them can be checked without an exchange connection. Exits
+with status 1 if any check fails.
+
+Checks:
+    account: AccountState on the fake user data stream - sized orders make no
+             account/ticker requests, stream balances match the exchange, a
+             dropped event is corrected by a reconcile, a dropped connection
+             reconnects and reconciles
+    oco:     OcoExitTracker on exchange-side OCO exits - the filled leg expires its
+             sibling and releases the locked quantity, the exit is recorded from
+             the stream (or a REST reconcile while it is down), a cancel closes
+             the list
+    orders:  OrderPipeline with injected order timeouts and 429s - every signal
+             becomes exactly one exchange order, resubmitted signals (also from
+             a restarted pipeline) place nothing new
+
+Usage:
+    python scripts/benchmarks/check_live_paths.py
+    python scripts/benchmarks/check_live_paths.py --checks account oco --orders 10
+    python scripts/benchmarks/check_live_paths.py --checks orders --signals 100 --timeout-rate 0.5
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, List, Any, Callable
+
+# Add the root directory to Python path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+
+from trading.execution import TradeExecutor
+from utils.exchange_client import create_account_state
+from utils.oco_exits import OcoExitTracker, STOP_LOSS_TYPES
+from utils.order_pipeline import OrderPipeline
+from utils.fake_binance_client import FakeBinanceClient
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_RESULTS_FILE = 'output/benchmarks/live_paths.json'
+
+
+class SimulatedClock:
+    """Clock for the fake client that only moves when advanced (the synthetic price moves with it)"""
+
+    def __init__(self, start: float = None):
+        self.now = time.time() if start is None else start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def wait_until(condition: Callable[[], bool], timeout: float, interval: float = 0.05) -> bool:
+    """Poll condition until it holds or timeout seconds pass (stream events arrive asynchronously)"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+    return True
+
+
+def record(reports: List[Dict[str, Any]], check: str, name: str, passed: bool, details=None):
+    reports.append({'check': check, 'name': name, 'match': bool(passed), 'details': details})
+    status = '✓' if passed else '✗'
+    logger.info(f"{status} {check:<10} {name}")
+    if not passed and details is not None:
+        logger.info(f"    {details}")
+
+
+def request_delta(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+    """Requests per endpoint made between two FakeBinanceClient.get_stats()['requests'] snapshots"""
+    return {endpoint: count - before.get(endpoint, 0) for endpoint, count in after.items()
+            if count != before.get(endpoint, 0)}
+
+
+def balance_mismatches(state, client) -> Dict[str, Any]:
+    """Assets whose AccountState balance differs from the fake exchange's"""
+    known = state.get_balances()
+    mismatches = {}
+    for balance in client.get_account()['balances']:
+        exchange = (float(balance['free']), float(balance['locked']))
+        local = known.get(balance['asset'], {})
+        stream = (local.get('free', 0.0), local.get('locked', 0.0))
+        if abs(exchange[0] - stream[0]) > 1e-8 or abs(exchange[1] - stream[1]) > 1e-8:
+            mismatches[balance['asset']] = {'exchange': exchange, 'stream': stream}
+    return mismatches
+
+
+def place_with_oco(executor, quantity: float, args) -> Dict[str, Any]:
+    # A stop limit far below the stop: a triggered stop always fills instead of resting after a gap
+    return executor.place_market_order_with_oco('BUY', quantity, stop_loss_pct=args.exit_pct,
+                                                take_profit_pct=args.exit_pct, stop_limit_buffer=0.05,
+                                                strategy='check')
+
+
+def run_until_done(client, clock: SimulatedClock, oco: Dict[str, Any], max_steps: int,
+                   step: float = 15 * 60) -> List[Dict[str, Any]]:
+    """Advance the clock candle by candle until no leg of an OCO is working, returns the legs"""
+    for _ in range(max_steps):
+        legs = [client.get_order(symbol=oco['symbol'], orderId=order['orderId']) for order in oco['orders']]
+        if all(leg['status'] not in ('NEW', 'PARTIALLY_FILLED') for leg in legs):
+            return legs
+        clock.advance(step)
+        client.match_orders()
+    return legs
+
+
+def exit_matches(position: Dict[str, Any], legs: List[Dict[str, Any]]) -> bool:
+    """The closed position's reason and price are those of the OCO's filled leg"""
+    filled = [leg for leg in legs if leg['status'] == 'FILLED']
+    if len(filled) != 1 or position is None:
+        return False
+    leg = filled[0]
+    reason = 'stop_loss' if leg['type'] in STOP_LOSS_TYPES else 'take_profit'
+    price = float(leg['cummulativeQuoteQty']) / float(leg['executedQty'])
+    return position['exit_reason'] == reason and abs(position['exit_price'] - price) <= 1e-9 * price
+
+
+def locked(client, asset: str) -> float:
+    for balance in client.get_account()['balances']:
+        if balance['asset'] == asset:
+            return float(balance['locked'])
+    return 0.0
+
+
+# ----------------------------------------------------------------------
+# Checks
+# ----------------------------------------------------------------------
+
+def check_account(args) -> List[Dict[str, Any]]:
+    """AccountState kept current from the fake user data stream"""
+    reports = []
+    client = FakeBinanceClient(seed=args.seed, sleep=False)
+    state = create_account_state(client)
+    state.start(wait=args.timeout)
+    try:
+        record(reports, 'account', 'user data stream connects', state.connected)
+
+        executor = TradeExecutor(client, args.symbol, test_mode=False, account_state=state)
+        price = float(client.get_symbol_ticker(symbol=args.symbol)['price'])
+
+        # Sizing reads the balance from the stream, the fill's quote amount replaces a ticker request
+        updates = state.stats['balance_updates']
+        before = client.get_stats()['requests']
+        for _ in range(args.orders):
+            quantity = executor.calculate_position_size(price, risk_percent=0.1)
+            executor.place_market_order('BUY', quantity)
+        requests = request_delta(before, client.get_stats()['requests'])
+        record(reports, 'account', f"{args.orders} sized orders make only their order requests",
+               requests == {'order': args.orders}, requests)
+
+        # Each fill is followed by the account position it leaves
+        fills = wait_until(lambda: state.stats['fills'] >= args.orders and
+                           state.stats['balance_updates'] >= updates + args.orders, args.timeout)
+        mismatches = balance_mismatches(state, client)
+        record(reports, 'account', 'stream fills and balances match the exchange', fills and not mismatches,
+               {'fills': state.stats['fills'], 'mismatches': mismatches})
+
+        # Every event of this order is lost on the way
+        state.fake_server.drop_rate = 1.0
+        executor.place_market_order('BUY', quantity)
+        state.fake_server.drop_rate = 0.0
+        stale = balance_mismatches(state, client)
+        corrections = state.stats['reconcile_corrections']
+        state.reconcile()
+        mismatches = balance_mismatches(state, client)
+        record(reports, 'account', 'a dropped event is corrected by the next reconcile',
+               bool(stale) and not mismatches and state.stats['reconcile_corrections'] > corrections,
+               {'before_reconcile': stale, 'after_reconcile': mismatches})
+
+        reconnects, reconciles = state.stats['reconnects'], state.stats['reconciles']
+        state.fake_server.drop_connections()
+        reconnected = wait_until(lambda: state.stats['reconnects'] > reconnects and state.connected
+                                 and state.stats['reconciles'] > reconciles, args.timeout)
+        fills, updates = state.stats['fills'], state.stats['balance_updates']
+        executor.place_market_order('BUY', quantity)
+        streaming = wait_until(lambda: state.stats['fills'] > fills and state.stats['balance_updates'] > updates,
+                               args.timeout)
+        mismatches = balance_mismatches(state, client)
+        record(reports, 'account', 'a dropped connection reconnects, reconciles and streams again',
+               reconnected and streaming and not mismatches,
+               {'reconnects': state.stats['reconnects'], 'reconciles': state.stats['reconciles'],
+                'mismatches': mismatches})
+    finally:
+        state.stop()
+        state.fake_server.stop()
+    return reports
+
+
+def check_oco(args) -> List[Dict[str, Any]]:
+    """Exchange-side OCO exits tracked from the fake user data stream and over REST"""
+    reports = []
+    clock = SimulatedClock()
+    client = FakeBinanceClient(seed=args.seed, sleep=False, clock=clock)
+    state = create_account_state(client)
+    state.start(wait=args.timeout)
+    base_asset = client.get_symbol_info(args.symbol)['baseAsset']
+    try:
+        tracker = OcoExitTracker(client, account_state=state)
+        executor = TradeExecutor(client, args.symbol, test_mode=False, account_state=state, exit_tracker=tracker)
+        price = float(client.get_symbol_ticker(symbol=args.symbol)['price'])
+        quantity = executor.calculate_position_size(price, risk_percent=0.1)
+
+        # Exits from the stream: one leg fills, the other expires
+        for i in range(args.orders):
+            order = place_with_oco(executor, quantity, args)
+            oco = (order or {}).get('oco')
+            if oco is None:
+                record(reports, 'oco', f"entry {i + 1} places an OCO exit", False, order)
+                continue
+            closes = tracker.stats['take_profits'] + tracker.stats['stop_losses']
+            legs = run_until_done(client, clock, oco, args.max_steps)
+            statuses = sorted(leg['status'] for leg in legs)
+            seen = wait_until(lambda: tracker.stats['take_profits'] + tracker.stats['stop_losses'] > closes,
+                              args.timeout)
+            closed = tracker.pop_closed()
+            position = closed[0] if len(closed) == 1 else None
+            record(reports, 'oco', f"exit {i + 1}: filled leg expires its sibling and is recorded from the stream",
+                   statuses == ['EXPIRED', 'FILLED'] and seen and exit_matches(position, legs)
+                   and not tracker.open_exits(),
+                   {'legs': statuses, 'closed': closed})
+        record(reports, 'oco', 'filled exits release the locked quantity', locked(client, base_asset) < 1e-8,
+               {'locked': locked(client, base_asset)})
+
+        # Stream down: the tracker only learns of the exit from a REST reconcile
+        offline = OcoExitTracker(client)
+        executor.exit_tracker = offline
+        order = place_with_oco(executor, quantity, args)
+        legs = run_until_done(client, clock, order['oco'], args.max_steps)
+        still_open = len(offline.open_exits())
+        found = offline.reconcile()
+        closed = offline.pop_closed()
+        record(reports, 'oco', 'a REST reconcile records the exit while the stream is down',
+               still_open == 1 and found == 1 and len(closed) == 1 and exit_matches(closed[0], legs),
+               {'open_before': still_open, 'found': found, 'closed': closed})
+
+        # Signal exit: canceling one leg cancels the list and closes the position as canceled
+        executor.exit_tracker = tracker
+        order = place_with_oco(executor, quantity, args)
+        canceled = tracker.cancel(args.symbol, 'check')
+        legs = [client.get_order(symbol=args.symbol, orderId=o['orderId']) for o in order['oco']['orders']]
+        closed = tracker.pop_closed()
+        record(reports, 'oco', 'a cancel closes the whole list and releases its quantity',
+               canceled == 1 and all(leg['status'] == 'CANCELED' for leg in legs) and len(closed) == 1
+               and closed[0]['exit_reason'] == 'canceled' and locked(client, base_asset) < 1e-8,
+               {'canceled': canceled, 'legs': [leg['status'] for leg in legs], 'closed': closed})
+    finally:
+        state.stop()
+        state.fake_server.stop()
+    return reports
+
+
+def check_orders(args) -> List[Dict[str, Any]]:
+    """OrderPipeline recovering timed-out and throttled sends without placing orders twice"""
+    reports = []
+    client = FakeBinanceClient(seed=args.seed, sleep=False, order_timeout_rate=args.timeout_rate,
+                               error_rate=args.error_rate)
+    placed = []
+    client.add_listener(lambda event: placed.append(event['c'])
+                        if event.get('e') == 'executionReport' and event['x'] == 'NEW' else None)
+
+    start = int(time.time() // 900 * 900)
+    signals = [(args.symbol, 'BUY', '0.001', 'check', start + i * 900) for i in range(args.signals)]
+
+    pipeline = OrderPipeline(client, 'check', max_retries=args.max_retries, retry_delay=0.01)
+    futures = [pipeline.submit(*signal) for signal in signals]
+    resubmitted = [pipeline.submit(*signal) for signal in signals]
+    results = [future.result(args.timeout) for future in futures]
+    pipeline.stop(args.timeout)
+
+    failed = [result for result in results if result['order'] is None]
+    record(reports, 'orders', f"{args.signals} signals are all acked", not failed,
+           {'failed': [result['error'] for result in failed]})
+    record(reports, 'orders', 'each signal is exactly one exchange order',
+           sorted(placed) == sorted(result['client_order_id'] for result in results),
+           {'exchange_orders': len(placed), 'distinct': len(set(placed))})
+    timeouts = client.get_stats()['timeouts']
+    record(reports, 'orders', 'timed-out sends are found by their client order ID, not resent',
+           timeouts > 0 and pipeline.stats['recovered'] == timeouts,
+           {'timeouts': timeouts, 'recovered': pipeline.stats['recovered'], 'throttled': client.get_stats()['throttled']})
+    record(reports, 'orders', 'a resubmitted signal returns the first order',
+           all(a is b for a, b in zip(futures, resubmitted)) and pipeline.stats['duplicates'] == args.signals,
+           {'duplicates': pipeline.stats['duplicates']})
+
+    # A restarted bot has no memory of its orders: the exchange rejects the IDs as duplicates
+    restarted = OrderPipeline(client, 'check', max_retries=args.max_retries, retry_delay=0.01)
+    again = [future.result(args.timeout) for future in [restarted.submit(*signal) for signal in signals]]
+    restarted.stop(args.timeout)
+    record(reports, 'orders', 'a restarted pipeline picks up the existing orders instead of placing new ones',
+           len(placed) == args.signals and
+           [result['order'] and result['order']['orderId'] for result in again] ==
+           [result['order']['orderId'] for result in results],
+           {'exchange_orders': len(placed), 'failed': [result['error'] for result in again if result['order'] is None]})
+    return reports
+
+
+CHECKS = {
+    'account': check_account,
+    'oco': check_oco,
+    'orders': check_orders
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Live Order Path Checker')
+    parser.add_argument('--checks', nargs='+', choices=list(CHECKS), help='Checks to run (default: all)')
+    parser.add_argument('--symbol', default='BTCUSDT', help='Symbol traded (default: BTCUSDT)')
+    parser.add_argument('--orders', type=int, default=5, help='Orders placed per check (default: 5)')
+    parser.add_argument('--seed', type=int, default=42, help='Fake client seed (default: 42)')
+    parser.add_argument('--exit-pct', type=float, default=0.01, help='OCO stop-loss and take-profit distance (default: 0.01)')
+    parser.add_argument('--max-steps', type=int, default=500, help='Candles an OCO may take to exit (default: 500)')
+    parser.add_argument('--signals', type=int, default=30, help='Signals sent through the order pipeline (default: 30)')
+    parser.add_argument('--timeout-rate', type=float, default=0.3,
+                        help='Probability an accepted order times out (default: 0.3)')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='Probability of an injected 429 (default: 0.05)')
+    parser.add_argument('--max-retries', type=int, default=5, help='Order pipeline resends (default: 5)')
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help='Seconds to wait for stream events and reconnects (default: 10)')
+    parser.add_argument('--output', default=DEFAULT_RESULTS_FILE, help=f'Report file (default: {DEFAULT_RESULTS_FILE})')
+
+    args = parser.parse_args()
+
+    # Order- and stream-level info logging is noise here
+    logging.getLogger().setLevel(logging.WARNING)
+
+    reports = []
+    for name in args.checks or list(CHECKS):
+        try:
+            reports.extend(CHECKS[name](args))
+        except Exception as e:
+            logger.exception(f"Check {name} raised")
+            record(reports, name, 'runs without errors', False, str(e))
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'generated_at': datetime.now().isoformat(),
+            'reports': reports
+        }, f, indent=2, default=str)
+    logger.info(f"Live path report saved to {args.output}")
+
+    failures = [r for r in reports if not r['match']]
+    if failures:
+        print(f"\n✗ {len(failures)} of {len(reports)} checks failed")
+        sys.exit(1)
+    print(f"\n✓ All {len(reports)} checks passed")
+
+
+if __name__ == "__main__":
+    main()
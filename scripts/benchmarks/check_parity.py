@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Strategy / Simulator Parity Checker
+
+Runs a legacy and a candidate (e.g. vectorized) implementation side by side
+on recorded and synthetic data, diffs the signal/position arrays and the
+simulated trade ledgers within tolerances, and reports the first divergent
+bar. Exits with status 1 on any divergence.
+
+Usage:
+    # Compare one strategy pair
+    python scripts/benchmarks/check_parity.py --legacy trading.strategies:RSIStrategy \\
+        --candidate trading.fast_strategies:RSIStrategy
+
+    # Pair every strategy with the same-named class in another module
+    python scripts/benchmarks/check_parity.py --candidate-module trading.fast_strategies
+
+    # Compare simulators on recorded candles
+    python scripts/benchmarks/check_parity.py --candidate-backtester mypkg.fast_backtest:Backtester \\
+        --data data/history/BTCUSDT_1h.csv
+
+    # Check each strategy's latest-bar evaluation against its batch signals
+    python scripts/benchmarks/check_parity.py --latest --latest-bars 300
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import importlib
+from datetime import datetime
+from typing import Dict, List, Any, Tuple
+
+import pandas as pd
+
+# Add the root directory to Python path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+
+from scripts.helpers.backtest_utils import prepare_data
+from scripts.benchmarks.run_benchmarks import STRATEGIES
+from utils.parity import load_object, compare_signals, compare_ledgers, compare_latest, simulate_ledger
+from utils.synthetic_data import generate_ohlcv, symbol_seed
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_RESULTS_FILE = 'output/benchmarks/parity.json'
+
+
+def load_recorded_data(path: str) -> pd.DataFrame:
+    """Load recorded candles from CSV and add indicators if they are missing"""
+    df = pd.read_csv(path)
+    time_column = 'timestamp' if 'timestamp' in df.columns else df.columns[0]
+    df[time_column] = pd.to_datetime(df[time_column])
+    df = df.set_index(time_column)
+    df.index.name = 'timestamp'
+    df = df.sort_index()
+    df = df[~df.index.duplicated(keep='first')]
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    if 'rsi' not in df.columns:
+        df = prepare_data(df)
+    return df
+
+
+def build_datasets(args) -> Dict[str, Tuple[str, str, pd.DataFrame]]:
+    """Recorded and synthetic datasets keyed by label -> (symbol, timeframe, data)"""
+    datasets = {}
+    for path in args.data or []:
+        name = os.path.splitext(os.path.basename(path))[0]
+        parts = name.split('_')
+        symbol = parts[0]
+        timeframe = parts[1] if len(parts) > 1 else args.timeframe
+        datasets[name] = (symbol, timeframe, load_recorded_data(path))
+    for size in args.sizes:
+        for seed in range(args.seed, args.seed + args.datasets):
+            label = f"synthetic_{size}_seed{seed}"
+            data = prepare_data(generate_ohlcv(size, timeframe=args.timeframe, seed=symbol_seed(args.symbol, seed)))
+            datasets[label] = (args.symbol, args.timeframe, data)
+    return datasets
+
+
+def build_pairs(args) -> List[Tuple[str, Any, Any]]:
+    """(name, legacy_class, candidate_class) pairs to compare"""
+    if args.legacy or args.candidate:
+        if len(args.legacy or []) != len(args.candidate or []):
+            raise ValueError("--legacy and --candidate must be given the same number of times")
+        return [(spec.split(':')[-1], load_object(spec), load_object(candidate))
+                for spec, candidate in zip(args.legacy, args.candidate)]
+
+    names = args.strategies or list(STRATEGIES)
+    if args.candidate_module:
+        module = importlib.import_module(args.candidate_module)
+        pairs = []
+        for name in names:
+            if hasattr(module, name):
+                pairs.append((name, STRATEGIES[name], getattr(module, name)))
+            else:
+                logger.warning(f"{args.candidate_module} has no {name}, skipping")
+        return pairs
+
+    # No candidate given: legacy against itself (checks the harness and determinism)
+    return [(name, STRATEGIES[name], STRATEGIES[name]) for name in names]
+
+
+def check_pair(name: str, legacy_class, candidate_class, datasets, args) -> List[Dict[str, Any]]:
+    """Compare signals and ledgers of one strategy pair on every dataset"""
+    legacy_backtester = load_object(args.legacy_backtester) if args.legacy_backtester else None
+    candidate_backtester = load_object(args.candidate_backtester) if args.candidate_backtester else None
+
+    reports = []
+    for label, (symbol, timeframe, data) in datasets.items():
+        legacy_signals = legacy_class().generate_signals(data.copy())
+        candidate_signals = candidate_class().generate_signals(data.copy())
+        report = {
+            'strategy': name,
+            'dataset': label,
+            'bars': len(data),
+            'signals': compare_signals(legacy_signals, candidate_signals, atol=args.atol, rtol=args.rtol)
+        }
+
+        if not args.skip_ledger:
+            legacy_trades = simulate_ledger(legacy_class(), data, symbol, timeframe,
+                                            backtester_class=legacy_backtester, strategy_name=name)
+            candidate_trades = simulate_ledger(candidate_class(), data, symbol, timeframe,
+                                               backtester_class=candidate_backtester, strategy_name=name)
+            report['ledger'] = compare_ledgers(legacy_trades, candidate_trades, atol=args.atol, rtol=args.rtol)
+
+        report['match'] = report['signals']['match'] and report.get('ledger', {}).get('match', True)
+        reports.append(report)
+
+        status = '✓' if report['match'] else '✗'
+        logger.info(f"{status} {name:<28} {label:<28} {len(data):>8} bars")
+        if not report['match']:
+            for column, column_report in report['signals']['columns'].items():
+                if not column_report['match']:
+                    logger.info(f"    {column}: {column_report.get('mismatches', 0)} mismatching bars, "
+                                f"first divergence {column_report.get('first_divergence') or column_report.get('error')}")
+            ledger = report.get('ledger')
+            if ledger and not ledger['match']:
+                logger.info(f"    ledger: {ledger['legacy_trades']} vs {ledger['candidate_trades']} trades, "
+                            f"first divergence {ledger['first_divergence']}")
+    return reports
+
+
+def check_latest(name: str, strategy_class, datasets, args) -> List[Dict[str, Any]]:
+    """Compare generate_latest_signal with the last batch row on the newest bars of every dataset"""
+    reports = []
+    for label, (symbol, timeframe, data) in datasets.items():
+        report = compare_latest(strategy_class(), data, bars=args.latest_bars, atol=args.atol, rtol=args.rtol)
+        report.update({'strategy': name, 'dataset': label, 'mode': 'latest'})
+        reports.append(report)
+
+        status = '✓' if report['match'] else '✗'
+        logger.info(f"{status} {name:<28} {label:<28} {report['bars']:>8} latest bars")
+        if not report['match']:
+            logger.info(f"    {report['mismatches']} mismatching bars, first divergence {report['first_divergence']}")
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Strategy / Simulator Parity Checker')
+    parser.add_argument('--legacy', action='append', help="Legacy strategy class as 'module:Class' (repeatable)")
+    parser.add_argument('--candidate', action='append', help="Candidate strategy class as 'module:Class' (repeatable)")
+    parser.add_argument('--candidate-module', help='Module whose same-named classes are compared to trading.strategies')
+    parser.add_argument('--strategies', nargs='+', choices=list(STRATEGIES), help='Strategies to check (default: all)')
+    parser.add_argument('--legacy-backtester', help="Legacy simulator as 'module:Class' (default: backTestBot.Backtester)")
+    parser.add_argument('--candidate-backtester', help="Candidate simulator as 'module:Class' (default: backTestBot.Backtester)")
+    parser.add_argument('--skip-ledger', action='store_true', help='Only compare signal/position arrays')
+    parser.add_argument('--latest', action='store_true',
+                        help='Check generate_latest_signal against the last row of generate_signals instead')
+    parser.add_argument('--latest-bars', type=int, default=200, help='Newest bars checked per dataset with --latest (default: 200)')
+    parser.add_argument('--data', nargs='+', help='Recorded candle CSVs named SYMBOL_TIMEFRAME*.csv')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[2_000], help='Synthetic dataset sizes (default: 2000)')
+    parser.add_argument('--datasets', type=int, default=3, help='Synthetic datasets (seeds) per size (default: 3)')
+    parser.add_argument('--symbol', default='BTCUSDT', help='Symbol for synthetic data (default: BTCUSDT)')
+    parser.add_argument('--timeframe', default='1h', help='Timeframe for synthetic data (default: 1h)')
+    parser.add_argument('--seed', type=int, default=42, help='First synthetic seed (default: 42)')
+    parser.add_argument('--atol', type=float, default=1e-9, help='Absolute tolerance (default: 1e-9)')
+    parser.add_argument('--rtol', type=float, default=1e-9, help='Relative tolerance (default: 1e-9)')
+    parser.add_argument('--output', default=DEFAULT_RESULTS_FILE, help=f'Report file (default: {DEFAULT_RESULTS_FILE})')
+
+    args = parser.parse_args()
+
+    # Signal- and trade-level info logging is noise here
+    logging.getLogger().setLevel(logging.WARNING)
+
+    datasets = build_datasets(args)
+    if not datasets:
+        logger.error("No datasets to check, pass --data or --sizes")
+        sys.exit(2)
+    pairs = build_pairs(args)
+
+    reports = []
+    for name, legacy_class, candidate_class in pairs:
+        if args.latest:
+            reports.extend(check_latest(name, candidate_class, datasets, args))
+        else:
+            reports.extend(check_pair(name, legacy_class, candidate_class, datasets, args))
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'generated_at': datetime.now().isoformat(),
+            'atol': args.atol,
+            'rtol': args.rtol,
+            'reports': reports
+        }, f, indent=2, default=str)
+    logger.info(f"Parity report saved to {args.output}")
+
+    failures = [r for r in reports if not r['match']]
+    if failures:
+        print(f"\n✗ {len(failures)} of {len(reports)} checks diverged")
+        sys.exit(1)
+    print(f"\n✓ All {len(reports)} checks match")
+
+
+if __name__ == "__main__":
+    main()
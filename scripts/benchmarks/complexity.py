@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Strategy Complexity Microbenchmarks
+
+Times each strategy's generate_signals at growing input sizes, fits the
+scaling exponent k in time ~ n^k on a log-log scale and flags strategies
+whose cost grows super-linearly (e.g. rolling windows recomputed inside a
+per-row loop). Per-call allocations are measured with tracemalloc.
+
+Usage:
+    python scripts/benchmarks/complexity.py                          # All strategies
+    python scripts/benchmarks/complexity.py --strategies RSIStrategy --sizes 500 1000 2000 4000
+    python scripts/benchmarks/complexity.py --strict                 # Exit 1 if any strategy is flagged
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Any
+
+import numpy as np
+
+# Add the root directory to Python path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+
+from scripts.helpers.backtest_utils import prepare_data
+from scripts.benchmarks.run_benchmarks import STRATEGIES
+from utils.synthetic_data import generate_ohlcv
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_SIZES = [500, 1_000, 2_000, 4_000, 8_000]
+DEFAULT_THRESHOLD = 1.3  # Exponents above this are treated as super-linear
+DEFAULT_RESULTS_FILE = 'output/benchmarks/complexity.json'
+
+
+def fit_exponent(sizes: List[int], seconds: List[float]) -> float:
+    """Least-squares slope of log(time) against log(size)"""
+    if len(sizes) < 2:
+        return float('nan')
+    slope, _ = np.polyfit(np.log(sizes), np.log(np.maximum(seconds, 1e-9)), 1)
+    return float(slope)
+
+
+def time_call(strategy_class, data, repeat: int) -> float:
+    """Best wall time of generate_signals on a fresh copy of data"""
+    best = float('inf')
+    for _ in range(max(1, repeat)):
+        df = data.copy()
+        strategy = strategy_class()
+        start = time.perf_counter()
+        strategy.generate_signals(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_allocations(strategy_class, data) -> Dict[str, float]:
+    """Peak and net traced memory of a single generate_signals call"""
+    df = data.copy()
+    strategy = strategy_class()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        strategy.generate_signals(df)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    allocated = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    allocations = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    return {
+        'peak_kb': peak / 1024,
+        'retained_kb': allocated / 1024,
+        'retained_blocks': allocations
+    }
+
+
+def analyze_strategy(name: str, frames: Dict[int, Any], repeat: int, time_budget: float,
+                     threshold: float) -> Dict[str, Any]:
+    """Time one strategy across sizes and fit its scaling exponent"""
+    strategy_class = STRATEGIES[name]
+    sizes = []
+    seconds = []
+    for size, data in frames.items():
+        elapsed = time_call(strategy_class, data, repeat)
+        sizes.append(size)
+        seconds.append(elapsed)
+        logger.info(f"{name:<28} n={size:>7}: {elapsed * 1000:10.2f} ms ({elapsed / size * 1e6:8.2f} us/bar)")
+        if elapsed > time_budget:
+            logger.warning(f"{name} exceeded the {time_budget}s budget at n={size}, stopping")
+            break
+
+    exponent = fit_exponent(sizes, seconds)
+    # Fixed per-call overhead flattens the curve at small sizes, so also fit the largest sizes
+    tail_exponent = fit_exponent(sizes[-3:], seconds[-3:])
+    # Measure allocations at the largest size that was timed
+    allocations = measure_allocations(strategy_class, frames[sizes[-1]])
+
+    return {
+        'sizes': sizes,
+        'seconds': seconds,
+        'us_per_bar': [s / n * 1e6 for s, n in zip(seconds, sizes)],
+        'exponent': exponent,
+        'tail_exponent': tail_exponent,
+        'superlinear': bool(max(exponent, tail_exponent) > threshold),
+        'allocations_at': sizes[-1],
+        'allocations': allocations
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Strategy Complexity Microbenchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f'Input sizes in bars (default: {DEFAULT_SIZES})')
+    parser.add_argument('--strategies', nargs='+', choices=list(STRATEGIES), help='Strategies to analyze (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size, best is kept (default: 3)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Exponent above which a strategy is flagged (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--time-budget', type=float, default=30.0,
+                        help='Stop growing the input once a call takes longer than this (default: 30s)')
+    parser.add_argument('--seed', type=int, default=42, help='Synthetic data seed (default: 42)')
+    parser.add_argument('--output', default=DEFAULT_RESULTS_FILE, help=f'Results file (default: {DEFAULT_RESULTS_FILE})')
+    parser.add_argument('--strict', action='store_true', help='Exit with status 1 if any strategy is flagged')
+
+    args = parser.parse_args()
+    sizes = sorted(set(args.sizes))
+    names = args.strategies or list(STRATEGIES)
+
+    # Signal-level info logging would dominate the measurements
+    logging.getLogger().setLevel(logging.WARNING)
+
+    # One series, truncated per size, so every size sees the same market
+    full = prepare_data(generate_ohlcv(sizes[-1], seed=args.seed))
+    frames = {size: full.iloc[:size].copy() for size in sizes}
+
+    results = {}
+    for name in names:
+        results[name] = analyze_strategy(name, frames, args.repeat, args.time_budget, args.threshold)
+
+    print(f"\n{'Strategy':<28} {'Exponent':>9} {'Tail':>6} {'us/bar (max n)':>15} {'Peak KB':>10} {'Retained KB':>12}")
+    flagged = []
+    for name, result in results.items():
+        flag = ''
+        if result['superlinear']:
+            flagged.append(name)
+            flag = '  SUPER-LINEAR'
+        print(f"{name:<28} {result['exponent']:>9.2f} {result['tail_exponent']:>6.2f} {result['us_per_bar'][-1]:>15.2f} "
+              f"{result['allocations']['peak_kb']:>10.1f} {result['allocations']['retained_kb']:>12.1f}{flag}")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'generated_at': datetime.now().isoformat(),
+            'threshold': args.threshold,
+            'seed': args.seed,
+            'results': results
+        }, f, indent=2)
+    logger.info(f"Complexity results saved to {args.output}")
+
+    if flagged:
+        print(f"\n⚠️ {len(flagged)} strategy(ies) scale worse than n^{args.threshold}: {', '.join(flagged)}")
+        if args.strict:
+            sys.exit(1)
+    else:
+        print(f"\n✓ All strategies scale at or below n^{args.threshold}")
+
+
+if __name__ == "__main__":
+    main()
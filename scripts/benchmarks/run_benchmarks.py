@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Backtest Benchmark Suite
+
+Runs prepare_data, every strategy in trading/strategies.py and the full
+Backtester pipeline on deterministic synthetic data, against a stubbed
+exchange and database, and reports throughput in bars/sec and trades/sec.
+
+Usage:
+    python scripts/benchmarks/run_benchmarks.py                       # 1k and 10k bars
+    python scripts/benchmarks/run_benchmarks.py --full                # 1k, 10k, 100k and 1M bars
+    python scripts/benchmarks/run_benchmarks.py --save-baseline       # Store results as the baseline
+    python scripts/benchmarks/run_benchmarks.py --compare --tolerance 0.2   # Fail on >20% regression
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import logging
+import argparse
+import platform
+import tempfile
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+# Add the root directory to Python path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+
+from trading.strategies import (RSIStrategy, RSIDivergenceStrategy, EnhancedRSIStrategy, LiveReactiveRSIStrategy,
+                                MovingAverageCrossover, BollingerBandStrategy, MomentumStrategy,
+                                TrendFollowingStrategy, VWAPStrategy, PriceActionBreakoutStrategy)
+from scripts.helpers.backtest_utils import prepare_data
+from utils.synthetic_data import generate_ohlcv, symbol_seed, to_klines, TIMEFRAME_MS, DEFAULT_START
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_SIZES = [1_000, 10_000]
+FULL_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'XRPUSDT',
+                   'ADAUSDT', 'DOGEUSDT', 'AVAXUSDT', 'DOTUSDT', 'LINKUSDT']
+DEFAULT_RESULTS_FILE = 'output/benchmarks/latest.json'
+DEFAULT_BASELINE_FILE = 'data/benchmarks/baseline.json'
+
+STRATEGIES = {
+    'RSIStrategy': RSIStrategy,
+    'RSIDivergenceStrategy': RSIDivergenceStrategy,
+    'EnhancedRSIStrategy': EnhancedRSIStrategy,
+    'LiveReactiveRSIStrategy': LiveReactiveRSIStrategy,
+    'MovingAverageCrossover': MovingAverageCrossover,
+    'BollingerBandStrategy': BollingerBandStrategy,
+    'MomentumStrategy': MomentumStrategy,
+    'TrendFollowingStrategy': TrendFollowingStrategy,
+    'VWAPStrategy': VWAPStrategy,
+    'PriceActionBreakoutStrategy': PriceActionBreakoutStrategy
+}
+
+
+class StubClient:
+    """Serves synthetic klines through the get_historical_klines interface"""
+
+    def __init__(self, seed: int = 42, start: datetime = DEFAULT_START, max_bars: int = 1_000_000):
+        self.seed = seed
+        self.start = start
+        self.max_bars = max_bars
+        self.requests = 0
+        self._klines = {}
+
+    def _series(self, symbol: str, interval: str, end_ms: int):
+        key = (symbol, interval)
+        if key not in self._klines:
+            start_ms = int(pd.Timestamp(self.start).value // 1_000_000)
+            n_bars = min(self.max_bars, max(1, (end_ms - start_ms) // TIMEFRAME_MS[interval] + 1))
+            df = generate_ohlcv(n_bars, timeframe=interval, start=self.start,
+                                seed=symbol_seed(f"{symbol}_{interval}", self.seed))
+            klines = to_klines(df, interval)
+            self._klines[key] = ([k[0] for k in klines], klines)
+        return self._klines[key]
+
+    def add_candles(self, symbol: str, interval: str, df: pd.DataFrame):
+        """Serve pre-generated candles (e.g. from utils.synthetic_data.emit_to_client)"""
+        klines = to_klines(df, interval)
+        self._klines[(symbol, interval)] = ([k[0] for k in klines], klines)
+
+    def get_historical_klines(self, symbol, interval, start_str, end_str=None, limit=1000):
+        self.requests += 1
+        end_ms = int(end_str) if end_str is not None else int(time.time() * 1000)
+        open_times, klines = self._series(symbol, interval, end_ms)
+        lo = bisect.bisect_left(open_times, int(start_str))
+        hi = bisect.bisect_right(open_times, end_ms)
+        return klines[lo:hi]
+
+
+class StubDatabase:
+    """Accepts trade uploads without any network round trips"""
+
+    def __init__(self):
+        self.uploaded = 0
+
+    def clear_trades(self, run_name=None):
+        self.uploaded = 0
+        return True
+
+    def batch_upload_trades(self, trades, batch_size=1000, streaming=None):
+        self.uploaded += len(trades)
+        return len(trades)
+
+    def add_trade(self, trade):
+        self.uploaded += 1
+        return True
+
+
+def _best_time(func, repeat: int) -> float:
+    """Best wall time of several runs (func returns the seconds it measured)"""
+    return min(func() for _ in range(max(1, repeat)))
+
+
+def bench_prepare_data(sizes: List[int], symbols: List[str], repeat: int, seed: int) -> Dict[str, Dict[str, Any]]:
+    """Time prepare_data on synthetic data for each size"""
+    results = {}
+    for size in sizes:
+        frames = [generate_ohlcv(size, seed=symbol_seed(symbol, seed)) for symbol in symbols]
+
+        def run():
+            start = time.perf_counter()
+            for df in frames:
+                prepare_data(df.copy())
+            return time.perf_counter() - start
+
+        seconds = _best_time(run, repeat)
+        bars = size * len(symbols)
+        results[f"prepare_data/{size}"] = {
+            'bars': bars,
+            'seconds': seconds,
+            'bars_per_sec': bars / seconds if seconds > 0 else 0.0
+        }
+        logger.info(f"prepare_data {size:>9} bars x {len(symbols)} symbols: {bars / seconds:,.0f} bars/sec")
+    return results
+
+
+def bench_strategies(sizes: List[int], symbols: List[str], repeat: int, seed: int,
+                     time_budget: float, strategies: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Time generate_signals for each strategy, skipping larger sizes once a strategy exceeds the budget"""
+    results = {}
+    over_budget = set()
+    names = strategies or list(STRATEGIES)
+    for size in sizes:
+        frames = [prepare_data(generate_ohlcv(size, seed=symbol_seed(symbol, seed))) for symbol in symbols]
+        for name in names:
+            key = f"strategy/{name}/{size}"
+            if name in over_budget:
+                logger.warning(f"Skipping {key}: previous size exceeded the {time_budget}s budget")
+                results[key] = {'bars': size * len(symbols), 'skipped': True}
+                continue
+
+            strategy_class = STRATEGIES[name]
+
+            def run():
+                elapsed = 0.0
+                for df in frames:
+                    data = df.copy()
+                    strategy = strategy_class()
+                    start = time.perf_counter()
+                    strategy.generate_signals(data)
+                    elapsed += time.perf_counter() - start
+                return elapsed
+
+            seconds = _best_time(run, repeat)
+            bars = size * len(symbols)
+            results[key] = {
+                'bars': bars,
+                'seconds': seconds,
+                'bars_per_sec': bars / seconds if seconds > 0 else 0.0
+            }
+            logger.info(f"{name:<28} {size:>9} bars: {bars / seconds:,.0f} bars/sec")
+            if seconds > time_budget:
+                over_budget.add(name)
+    return results
+
+
+def bench_pipeline(sizes: List[int], symbols: List[str], seed: int, time_budget: float,
+                   timeframes: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Run the full Backtester (fetch, prepare, signals, simulation, export) against stubs"""
+    from scripts.bots.backTestBot import Backtester
+
+    results = {}
+    for size in sizes:
+        key = f"pipeline/{size}"
+        combos = [(symbol, strategy, timeframe) for symbol in symbols for strategy in STRATEGIES for timeframe in timeframes]
+        start_date = DEFAULT_START
+        end_date = start_date + timedelta(milliseconds=TIMEFRAME_MS[timeframes[0]] * size)
+        db = StubDatabase()
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            backtester = Backtester(
+                client=StubClient(seed=seed, start=start_date),
+                trading_pairs=combos,
+                start_date=start_date,
+                end_date=end_date,
+                db=db,
+                output_dir=output_dir,
+                chunk_delay=0
+            )
+            start = time.perf_counter()
+            backtester.run_backtest()
+            seconds = time.perf_counter() - start
+
+        bars = sum(r['candles'] for r in backtester.profiler.records if r['phase'] == 'simulation')
+        results[key] = {
+            'bars': bars,
+            'trades': db.uploaded,
+            'combinations': len(combos),
+            'seconds': seconds,
+            'bars_per_sec': bars / seconds if seconds > 0 else 0.0,
+            'trades_per_sec': db.uploaded / seconds if seconds > 0 else 0.0,
+            'phases': {phase: round(s['wall_time'], 4) for phase, s in backtester.profiler.summary().items()}
+        }
+        logger.info(f"pipeline {size:>9} bars: {results[key]['bars_per_sec']:,.0f} bars/sec, "
+                    f"{results[key]['trades_per_sec']:,.0f} trades/sec ({db.uploaded} trades)")
+        if seconds > time_budget:
+            logger.warning(f"Pipeline exceeded the {time_budget}s budget at {size} bars, skipping larger sizes")
+            break
+    return results
+
+
+def compare_results(current: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                    tolerance: float) -> List[str]:
+    """Return the benchmarks whose throughput dropped more than tolerance below the baseline"""
+    regressions = []
+    print(f"\n{'Benchmark':<50} {'Baseline':>14} {'Current':>14} {'Change':>9}")
+    for key in sorted(current):
+        if key not in baseline or current[key].get('skipped') or baseline[key].get('skipped'):
+            continue
+        for metric in ('bars_per_sec', 'trades_per_sec'):
+            base_value = baseline[key].get(metric)
+            value = current[key].get(metric)
+            if not base_value or value is None:
+                continue
+            change = (value - base_value) / base_value
+            flag = ''
+            if value < base_value * (1 - tolerance):
+                regressions.append(f"{key} {metric}")
+                flag = '  REGRESSION'
+            print(f"{key + ' ' + metric:<50} {base_value:>14,.0f} {value:>14,.0f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest Benchmark Suite')
+    parser.add_argument('--sizes', type=int, nargs='+', help='Bar counts to benchmark (default: 1000 10000)')
+    parser.add_argument('--full', action='store_true', help='Benchmark 1k, 10k, 100k and 1M bars')
+    parser.add_argument('--symbols', type=int, default=1, help='Number of synthetic symbols (default: 1)')
+    parser.add_argument('--suites', nargs='+', choices=['prepare_data', 'strategies', 'pipeline'],
+                        default=['prepare_data', 'strategies', 'pipeline'], help='Suites to run')
+    parser.add_argument('--strategies', nargs='+', choices=list(STRATEGIES), help='Limit the strategy suite')
+    parser.add_argument('--timeframes', nargs='+', default=['15m'], help='Pipeline timeframes (default: 15m)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per micro benchmark, best is kept (default: 3)')
+    parser.add_argument('--time-budget', type=float, default=60.0,
+                        help='Skip larger sizes once a benchmark takes longer than this many seconds (default: 60)')
+    parser.add_argument('--seed', type=int, default=42, help='Synthetic data seed (default: 42)')
+    parser.add_argument('--output', default=DEFAULT_RESULTS_FILE, help=f'Results file (default: {DEFAULT_RESULTS_FILE})')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_FILE, help=f'Baseline file (default: {DEFAULT_BASELINE_FILE})')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--compare', action='store_true', help='Compare against the baseline and fail on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed throughput drop (default: 0.2 = 20%%)')
+
+    args = parser.parse_args()
+
+    sizes = args.sizes or (FULL_SIZES if args.full else DEFAULT_SIZES)
+    if args.symbols > len(DEFAULT_SYMBOLS):
+        symbols = DEFAULT_SYMBOLS + [f"SYN{i}USDT" for i in range(len(DEFAULT_SYMBOLS), args.symbols)]
+    else:
+        symbols = DEFAULT_SYMBOLS[:args.symbols]
+
+    print("=== BACKTEST BENCHMARKS ===")
+    print(f"Sizes: {sizes}")
+    print(f"Symbols: {', '.join(symbols)}")
+    print(f"Suites: {', '.join(args.suites)}")
+    print("===========================\n")
+
+    # Trade- and signal-level info logging would dominate the measurements
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = {}
+    if 'prepare_data' in args.suites:
+        results.update(bench_prepare_data(sizes, symbols, args.repeat, args.seed))
+    if 'strategies' in args.suites:
+        results.update(bench_strategies(sizes, symbols, args.repeat, args.seed, args.time_budget, args.strategies))
+    if 'pipeline' in args.suites:
+        results.update(bench_pipeline(sizes, symbols, args.seed, args.time_budget, args.timeframes))
+
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'config': {'sizes': sizes, 'symbols': symbols, 'seed': args.seed, 'timeframes': args.timeframes},
+        'results': results
+    }
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Benchmark results saved to {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Baseline saved to {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            logger.error(f"No baseline found at {args.baseline}, run with --save-baseline first")
+            sys.exit(2)
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline.get('results', {}), args.tolerance)
+        if regressions:
+            print(f"\n✗ {len(regressions)} benchmark(s) regressed more than {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\n✓ No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ sys.path.insert(0, root_dir)
 
 from binance.client import Client
 from config.config import API_KEY, API_SECRET, TESTNET, INITIAL_BALANCE
+from utils.exchange_client import create_client
 from trading.strategies import RSIStrategy, RSIDivergenceStrategy, EnhancedRSIStrategy, LiveReactiveRSIStrategy, MovingAverageCrossover, BollingerBandStrategy, MomentumStrategy, TrendFollowingStrategy, VWAPStrategy, PriceActionBreakoutStrategy
 import pandas as pd
 import numpy as np
@@ -28,8 +29,9 @@ from utils.indicators import calculate_rsi, calculate_ema, calculate_macd, calcu
 from scripts.helpers.backtest_utils import prepare_data, calculate_position_size, calculate_fee_adjusted_profit, check_stop_loss_take_profit
 from scripts.helpers.performance_utils import generate_performance_report, save_trade_history, load_trade_history, export_summary_to_csv, export_daily_summary_to_csv, export_aggregated_summary_to_csv
 from scripts.helpers.trade_utils import execute_trade, update_open_positions
-from utils.bigquery_database import BigQueryDatabase
+from utils.storage_backend import create_database
 from utils.bot_core import BotCore
+from utils.profiler import PhaseProfiler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -573,8 +575,12 @@ BACKTEST_COMBOS = [
 ]
 
 class Backtester:
-    def __init__(self, client, trading_pairs, start_date, end_date, initial_balance=10000):
+    def __init__(self, client, trading_pairs, start_date, end_date, initial_balance=10000,
+                 db=None, output_dir='output', chunk_delay=1):
         self.client = client
+        self.db = db  # Defaults to the STORAGE_BACKEND database when the backtest starts
+        self.output_dir = output_dir
+        self.chunk_delay = chunk_delay  # Seconds between kline chunk requests
         self.trading_pairs = trading_pairs
         self.start_date = start_date
         self.end_date = end_date
@@ -585,6 +591,8 @@ class Backtester:
         self.open_positions = []
         self.daily_summary = []
         self.all_daily_summaries = []
+        self.profiler = PhaseProfiler(run_name=os.environ.get('RUN_NAME', 'backTestBot'),
+                                      output_dir=os.path.join(output_dir, 'profiles'))
         
         # Initialize strategies
         self.strategies = {
@@ -636,48 +644,52 @@ class Backtester:
             current_end = self.end_date
             current_start = current_end - chunk_size
 
-            while current_start >= self.start_date:
-                # Convert to milliseconds
-                start_ms = int(current_start.timestamp() * 1000)
-                end_ms = int(current_end.timestamp() * 1000)
-
-                logger.info(f"Fetching data for {symbol} at {timeframe} from {current_start} to {current_end}")
-
-                # Retry logic for each chunk
-                for retry in range(max_retries):
-                    try:
-                        # Fetch klines data for this chunk
-                        klines = self.client.get_historical_klines(
-                            symbol=symbol,
-                            interval=interval,
-                            start_str=start_ms,
-                            end_str=end_ms
-                        )
+            with self.profiler.phase('data_fetch', f"{symbol}_{timeframe}") as fetch_record:
+                while current_start >= self.start_date:
+                    # Convert to milliseconds
+                    start_ms = int(current_start.timestamp() * 1000)
+                    end_ms = int(current_end.timestamp() * 1000)
+
+                    logger.info(f"Fetching data for {symbol} at {timeframe} from {current_start} to {current_end}")
+
+                    # Retry logic for each chunk
+                    for retry in range(max_retries):
+                        try:
+                            # Fetch klines data for this chunk
+                            klines = self.client.get_historical_klines(
+                                symbol=symbol,
+                                interval=interval,
+                                start_str=start_ms,
+                                end_str=end_ms
+                            )
                         
-                        if klines:
-                            all_klines.extend(klines)
-                            logger.info(f"Fetched {len(klines)} candles for {symbol} at {timeframe}")
-                            break  # Success, exit retry loop
+                            if klines:
+                                all_klines.extend(klines)
+                                logger.info(f"Fetched {len(klines)} candles for {symbol} at {timeframe}")
+                                break  # Success, exit retry loop
                         
-                        # If no data but no error, wait and retry
-                        if retry < max_retries - 1:
-                            logger.warning(f"No data returned for {symbol} at {timeframe}, retrying...")
-                            time.sleep(retry_delay * (retry + 1))  # Exponential backoff
+                            # If no data but no error, wait and retry
+                            if retry < max_retries - 1:
+                                logger.warning(f"No data returned for {symbol} at {timeframe}, retrying...")
+                                time.sleep(retry_delay * (retry + 1))  # Exponential backoff
                     
-                    except Exception as e:
-                        if retry < max_retries - 1:
-                            logger.warning(f"Error fetching chunk for {symbol} at {timeframe} (attempt {retry + 1}/{max_retries}): {str(e)}")
-                            time.sleep(retry_delay * (retry + 1))  # Exponential backoff
-                        else:
-                            logger.error(f"Failed to fetch chunk for {symbol} at {timeframe} after {max_retries} attempts: {str(e)}")
-                            break
+                        except Exception as e:
+                            if retry < max_retries - 1:
+                                logger.warning(f"Error fetching chunk for {symbol} at {timeframe} (attempt {retry + 1}/{max_retries}): {str(e)}")
+                                time.sleep(retry_delay * (retry + 1))  # Exponential backoff
+                            else:
+                                logger.error(f"Failed to fetch chunk for {symbol} at {timeframe} after {max_retries} attempts: {str(e)}")
+                                break
                 
-                # Move to next chunk
-                current_end = current_start
-                current_start = current_end - chunk_size
+                    # Move to next chunk
+                    current_end = current_start
+                    current_start = current_end - chunk_size
                 
-                # Add a delay between chunks to avoid rate limits
-                time.sleep(1)  # Increased delay between chunks
+                    # Add a delay between chunks to avoid rate limits
+                    if self.chunk_delay:
+                        time.sleep(self.chunk_delay)
+
+                fetch_record['candles'] = len(all_klines)
 
             if not all_klines:
                 logger.warning(f"No data returned for {symbol} at {timeframe}")
@@ -714,7 +726,8 @@ class Backtester:
                 df = df.dropna(subset=['open', 'high', 'low', 'close', 'volume'])
 
             # Prepare data with indicators
-            df = prepare_data(df)
+            with self.profiler.phase('prepare_data', f"{symbol}_{timeframe}", candles=len(df)):
+                df = prepare_data(df)
 
             logger.info(f"Successfully fetched and processed {len(df)} candles for {symbol} at {timeframe}")
             return df
@@ -766,7 +779,7 @@ class Backtester:
                     continue
         
         # Initialize database
-        db = BigQueryDatabase()
+        db = self.db if self.db is not None else create_database()
         
         # Clear existing trades before starting
         logger.info("Clearing existing trades...")
@@ -802,7 +815,8 @@ class Backtester:
                     # Upload any remaining trades for this combination
                     if self.trades_to_upload:
                         logger.info(f"Uploading final batch of {len(self.trades_to_upload)} trades for {symbol} {strategy_name}")
-                        uploaded_count = db.batch_upload_trades(self.trades_to_upload)
+                        with self.profiler.phase('upload', f"{symbol}_{strategy_name}_{timeframe}"):
+                            uploaded_count = db.batch_upload_trades(self.trades_to_upload, streaming=False)
                         total_trades_uploaded += uploaded_count
                         self.trades_to_upload = []
                     
@@ -814,16 +828,25 @@ class Backtester:
                     continue
         
         # Export results
-        self._export_results(all_trades, db)
+        with self.profiler.phase('export', 'all'):
+            self._export_results(all_trades, db)
 
-        # Save all_trades to a JSON file for comparison
-        import json
-        with open('output/self_trades.json', 'w') as f:
-            json.dump(all_trades, f, default=str, indent=2)
-        logger.info(f"Saved {len(all_trades)} trades to output/self_trades.json for comparison.")
+            # Save all_trades to a JSON file for comparison
+            import json
+            self_trades_path = os.path.join(self.output_dir, 'self_trades.json')
+            with open(self_trades_path, 'w') as f:
+                json.dump(all_trades, f, default=str, indent=2)
+            logger.info(f"Saved {len(all_trades)} trades to {self_trades_path} for comparison.")
 
         end_time = time.time()
         logger.info(f"Backtest completed in {end_time - start_time:.2f} seconds")
+
+        # Per-phase timing report
+        self.profiler.log_summary()
+        try:
+            self.profiler.write_report()
+        except Exception as e:
+            logger.error(f"Error writing phase profile report: {str(e)}")
         
         # Print summary statistics
         logger.info("\n=== BACKTEST SUMMARY ===")
@@ -858,23 +881,27 @@ class Backtester:
         if hasattr(strategy, 'set_timeframe'):
             strategy.set_timeframe(timeframe)
         
-        signals = strategy.generate_signals(data)
+        combo = f"{symbol}_{strategy_name}_{timeframe}"
+        
+        with self.profiler.phase('generate_signals', combo, candles=len(data)):
+            signals = strategy.generate_signals(data)
         if signals is None:
             logger.warning(f"No signals generated for {symbol} at {timeframe}")
             return
         
         # Process signals
-        for idx, row in data.iterrows():
-            current_date = idx.date() if hasattr(idx, 'date') else pd.to_datetime(idx).date()
-            
-            if idx in signals.index:
-                signal = signals.loc[idx]
-                if signal['position'] != 0:
-                    self._process_signal(symbol, strategy_name, timeframe, row, idx, signal)
-            
-            # Update open positions
-            if self.open_positions:
-                self._update_positions(row, idx, db)
+        with self.profiler.phase('simulation', combo, candles=len(data)):
+            for idx, row in data.iterrows():
+                current_date = idx.date() if hasattr(idx, 'date') else pd.to_datetime(idx).date()
+                
+                if idx in signals.index:
+                    signal = signals.loc[idx]
+                    if signal['position'] != 0:
+                        self._process_signal(symbol, strategy_name, timeframe, row, idx, signal)
+                
+                # Update open positions
+                if self.open_positions:
+                    self._update_positions(row, idx, db)
 
     def _process_signal(self, symbol, strategy_name, timeframe, row, idx, signal):
         """Process a trading signal"""
@@ -936,7 +963,9 @@ class Backtester:
             
             if len(self.trades_to_upload) >= 500:
                 logger.info(f"Uploading batch of {len(self.trades_to_upload)} trades")
-                uploaded_count = db.batch_upload_trades(self.trades_to_upload)
+                # Load jobs: streamed rows could not be removed by the next run's clear_trades
+                with self.profiler.phase('upload', f"{closed_trade['symbol']}_{closed_trade['strategy']}_{closed_trade['timeframe']}"):
+                    uploaded_count = db.batch_upload_trades(self.trades_to_upload, streaming=False)
                 # Note: total_trades_uploaded is not accessible here, will be handled in main loop
                 self.trades_to_upload = []
 
@@ -944,16 +973,18 @@ class Backtester:
         """Export backtest results"""
         if all_trades:
             logger.info(f"Number of trades collected: {len(all_trades)}")
-            export_aggregated_summary_to_csv(all_trades, 'output/summary_report_aggregated.csv')
+            export_aggregated_summary_to_csv(all_trades, os.path.join(self.output_dir, 'summary_report_aggregated.csv'))
             
+            trades_path = os.path.join(self.output_dir, 'all_trades.csv')
             trades_df = pd.DataFrame(all_trades)
-            trades_df.to_csv('output/all_trades.csv', index=False)
-            logger.info("Exported all trades to 'output/all_trades.csv'")
+            trades_df.to_csv(trades_path, index=False)
+            logger.info(f"Exported all trades to '{trades_path}'")
             
             # Upload any remaining trades to BigQuery
             if self.trades_to_upload:
                 logger.info(f"Uploading final batch of {len(self.trades_to_upload)} trades")
-                uploaded_count = db.batch_upload_trades(self.trades_to_upload)
+                with self.profiler.phase('upload', 'all'):
+                    uploaded_count = db.batch_upload_trades(self.trades_to_upload, streaming=False)
                 logger.info(f"Successfully uploaded {uploaded_count} trades to BigQuery")
                 self.trades_to_upload = []
         else:
@@ -965,8 +996,8 @@ def main():
 
 def run_backtest():
     """Run standard backtest mode"""
-    # Initialize Binance client
-    client = Client(API_KEY, API_SECRET, testnet=TESTNET)
+    # Initialize Binance client (fake client when EXCHANGE_MODE=fake)
+    client = create_client()
     
     # Create output directories if they don't exist
     os.makedirs('data/output', exist_ok=True)
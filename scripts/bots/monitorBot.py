@@ -25,7 +25,14 @@ root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 sys.path.insert(0, root_dir)
 
 from utils.bot_core import BotCore
+from utils.persistence_queue import flush_persistence_queues
+from utils.exchange_client import create_kline_stream
+from utils.candle_buffer import CandleBuffer
+from utils.async_market_data import AsyncMarketData
+from utils.candle_scheduler import CandleScheduler
 from config.config import INITIAL_BALANCE
+from config.exchange_config import KLINE_STREAM_ENABLED, ASYNC_CYCLE_ENABLED
+from utils.synthetic_data import TIMEFRAME_MS
 
 # Configure logging for production
 if IS_PRODUCTION:
@@ -55,11 +62,14 @@ def signal_handler(signum, frame):
     """Handle shutdown signals gracefully"""
     global shutdown_requested
     logger.info(f"Received signal {signum}, initiating graceful shutdown...")
+    # Only the flag: the loops exit on it and cleanup() writes what is still queued
+    # (flushing here deadlocks if the signal arrives while a record is being queued)
     shutdown_requested = True
 
 def cleanup():
     """Cleanup function for graceful shutdown"""
     logger.info("Performing cleanup...")
+    flush_persistence_queues()
     # Add any cleanup logic here
 
 # Register signal handlers and cleanup
@@ -121,12 +131,18 @@ SCHEDULE_CONFIGS = {
 class MonitorBot:
     """Monitor Bot for daily performance tracking and active trading"""
     
-    def __init__(self, run_name: str = 'monitorBot', initial_balance: float = INITIAL_BALANCE):
+    def __init__(self, run_name: str = 'monitorBot', initial_balance: float = INITIAL_BALANCE,
+                 use_stream: bool = KLINE_STREAM_ENABLED, use_async: bool = ASYNC_CYCLE_ENABLED):
         self.run_name = run_name
         self.initial_balance = initial_balance
         self.bot_core = BotCore(bot_type='monitor', run_name=run_name)
         self.is_running = False
         self.last_check_time = 0
+        self.use_stream = use_stream  # Evaluate on kline stream candle closes instead of polling REST
+        self.stream = None
+        # Fetch all markets of a cycle concurrently and generate signals in a thread pool
+        self.market_data = AsyncMarketData(self.bot_core.client, self.bot_core.candle_buffer,
+                                          market_data_feed=self.bot_core.market_data_feed) if use_async else None
         
         # Trading state (like backTestBot)
         self.balance = initial_balance
@@ -142,10 +158,16 @@ class MonitorBot:
         config = SCHEDULE_CONFIGS[schedule]
         combinations = custom_combinations or config['combinations']
         
+        if self.use_stream:
+            self.run_stream_monitor(combinations)
+            return
+        
         logger.info(f"Starting {config['description']}")
         logger.info(f"Schedule: {schedule} (interval: {config['interval']} seconds)")
         logger.info(f"Monitoring {len(combinations)} combinations")
         
+        # Wake up on candle closes (at most once per schedule interval per combination), on the exchange clock
+        scheduler = self._create_scheduler(combinations, config['interval'])
         self.is_running = True
         self.last_check_time = time.time()
         
@@ -154,47 +176,39 @@ class MonitorBot:
             max_consecutive_errors = 5 if IS_PRODUCTION else 1
             
             while self.is_running and not shutdown_requested:
-                current_time = time.time()
-                
-                # Check if it's time for the next monitoring cycle
-                if current_time - self.last_check_time >= config['interval']:
-                    try:
-                        logger.info(f"=== {schedule.upper()} MONITORING CYCLE ===")
-                        logger.info(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                        
-                        # Run monitoring cycle
-                        self._run_monitoring_cycle(combinations, schedule)
-                        
-                        # Reset error counter on successful cycle
-                        consecutive_errors = 0
-                        
-                        # Update last check time
-                        self.last_check_time = current_time
-                        
-                        logger.info(f"Completed {schedule} monitoring cycle")
-                        logger.info(f"Next cycle in {config['interval']} seconds")
-                        logger.info("=" * 50)
-                        
-                    except Exception as e:
-                        consecutive_errors += 1
-                        logger.error(f"Error in monitoring cycle {consecutive_errors}/{max_consecutive_errors}: {e}")
-                        
-                        if consecutive_errors >= max_consecutive_errors:
-                            logger.error(f"Too many consecutive errors ({consecutive_errors}), stopping bot")
-                            self.is_running = False
-                            break
-                        
-                        # Wait before retrying
-                        logger.info(f"Waiting 60 seconds before retry...")
-                        time.sleep(60)
-                        continue
-                
-                # Sleep for a short interval to avoid excessive CPU usage
-                time.sleep(10)
+                due = scheduler.wait(should_stop=lambda: not self.is_running or shutdown_requested)
+                if not due:
+                    continue
                 
-                # Show "still alive" message every 5 minutes
-                if int(current_time) % 300 == 0:  # Every 5 minutes
-                    logger.info(f"💓 Monitor bot still alive - waiting for next {schedule} cycle...")
+                try:
+                    logger.info(f"=== {schedule.upper()} MONITORING CYCLE ===")
+                    logger.info(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                    
+                    # Run monitoring cycle on the combinations whose candle just closed
+                    self._run_monitoring_cycle(due, schedule)
+                    
+                    # Reset error counter on successful cycle
+                    consecutive_errors = 0
+                    
+                    # Update last check time
+                    self.last_check_time = time.time()
+                    
+                    logger.info(f"Completed {schedule} monitoring cycle")
+                    logger.info("=" * 50)
+                    
+                except Exception as e:
+                    consecutive_errors += 1
+                    logger.error(f"Error in monitoring cycle {consecutive_errors}/{max_consecutive_errors}: {e}")
+                    
+                    if consecutive_errors >= max_consecutive_errors:
+                        logger.error(f"Too many consecutive errors ({consecutive_errors}), stopping bot")
+                        self.is_running = False
+                        break
+                    
+                    # Wait before retrying
+                    logger.info(f"Waiting 60 seconds before retry...")
+                    time.sleep(60)
+                    continue
                 
         except KeyboardInterrupt:
             logger.info("Monitor bot stopped by user")
@@ -208,6 +222,42 @@ class MonitorBot:
             else:
                 raise
     
+    def _create_scheduler(self, combinations: List[Tuple[str, str, str]], min_interval: float = 0) -> CandleScheduler:
+        """Candle-close scheduler on the exchange clock, shared with the REST candle buffer"""
+        scheduler = CandleScheduler(combinations, self.bot_core.client, min_interval=min_interval)
+        self.bot_core.candle_buffer.clock = scheduler.time
+        # Fetch only the candles and indicators the strategies declared
+        self.bot_core.plan_lookback(combinations)
+        return scheduler
+    
+    def run_stream_monitor(self, combinations: List[Tuple[str, str, str]]):
+        """Evaluate combinations when their candle closes, from kline WebSocket streams"""
+        markets = sorted(set((symbol.upper(), timeframe) for symbol, _, timeframe in combinations))
+        logger.info(f"Starting stream monitoring of {len(combinations)} combinations over {len(markets)} markets")
+        
+        plan = self.bot_core.plan_lookback(combinations)
+        self.stream = create_kline_stream(self.bot_core.client, markets, history=plan.history())
+        self.stream.start()
+        buffer = CandleBuffer(self.stream.get_candles, getattr(self.stream, 'compute', self.bot_core.calculate_indicators),
+                              clock=self.stream.clock, plan=plan)
+        self.is_running = True
+        
+        try:
+            while self.is_running and not shutdown_requested:
+                closed = self.stream.wait_for_closes(timeout=10)
+                if not closed:
+                    continue
+                
+                due = [combo for combo in combinations if (combo[0].upper(), combo[2]) in closed]
+                logger.info(f"=== CANDLE CLOSE: {', '.join(f'{s} {tf}' for s, tf in sorted(closed))} ===")
+                self._run_monitoring_cycle(due, 'stream', buffer=buffer)
+                
+        except KeyboardInterrupt:
+            logger.info("Monitor bot stopped by user")
+        finally:
+            self.is_running = False
+            self.stream.stop()
+    
     def run_daily_monitor(self, combinations: List[Tuple[str, str, str]], monitor_interval: int = 3600):
         """Run daily monitoring (legacy method for compatibility)"""
         logger.info("Starting daily monitoring mode...")
@@ -222,38 +272,31 @@ class MonitorBot:
         logger.info(f"Trading interval: {trading_interval} seconds ({trading_interval/60:.1f} minutes)")
         logger.info(f"Trading {len(combinations)} combinations")
         
+        scheduler = self._create_scheduler(combinations, trading_interval)
         self.is_running = True
         self.last_check_time = time.time()
         
         try:
-            while self.is_running:
-                current_time = time.time()
+            while self.is_running and not shutdown_requested:
+                due = scheduler.wait(should_stop=lambda: not self.is_running or shutdown_requested)
+                if not due:
+                    continue
                 
-                # Check if it's time for the next trading cycle
-                if current_time - self.last_check_time >= trading_interval:
-                    logger.info(f"=== ACTIVE TRADING CYCLE ===")
-                    logger.info(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                    
-                    # Check streak conditions before trading
-                    if self.bot_core.check_streak_conditions():
-                        logger.info("✓ Streak conditions met - trading enabled")
-                        self._run_trading_cycle(combinations)
-                    else:
-                        logger.info("✗ Streak conditions not met - trading disabled")
-                    
-                    # Update last check time
-                    self.last_check_time = current_time
-                    
-                    logger.info(f"Completed trading cycle")
-                    logger.info(f"Next cycle in {trading_interval} seconds")
-                    logger.info("=" * 50)
+                logger.info(f"=== ACTIVE TRADING CYCLE ===")
+                logger.info(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                
+                # Check streak conditions before trading
+                if self.bot_core.check_streak_conditions():
+                    logger.info("✓ Streak conditions met - trading enabled")
+                    self._run_trading_cycle(due)
+                else:
+                    logger.info("✗ Streak conditions not met - trading disabled")
                 
-                # Sleep for a short interval
-                time.sleep(10)
+                # Update last check time
+                self.last_check_time = time.time()
                 
-                # Show "still alive" message every 5 minutes
-                if int(current_time) % 300 == 0:  # Every 5 minutes
-                    logger.info(f"💓 Trading bot still alive - waiting for next trading cycle...")
+                logger.info(f"Completed trading cycle")
+                logger.info("=" * 50)
                 
         except KeyboardInterrupt:
             logger.info("Active trading stopped by user")
@@ -263,8 +306,9 @@ class MonitorBot:
             self.is_running = False
             raise
     
-    def _run_monitoring_cycle(self, combinations: List[Tuple[str, str, str]], schedule: str):
-        """Run a single monitoring cycle with live trading execution"""
+    def _run_monitoring_cycle(self, combinations: List[Tuple[str, str, str]], schedule: str,
+                              buffer: Optional[CandleBuffer] = None):
+        """Run a single monitoring cycle with live trading execution (buffer defaults to the bot core's REST candle buffer)"""
         try:
             current_time = datetime.now()
             logger.info(f"🔄 LIVE TRADING CYCLE STARTED at {current_time}")
@@ -273,46 +317,39 @@ class MonitorBot:
             signals_found = 0
             trades_executed = 0
             
-            # Determine which timeframes should be checked based on current time
-            current_minute = current_time.minute
-            current_hour = current_time.hour
-            
-            # Define timeframe check intervals
-            timeframe_checks = {
-                '15m': True,  # Always check 15m combinations
-                '30m': current_minute % 30 == 0,  # Check every 30 minutes (at minute 0 and 30)
-                '1h': current_minute == 0,  # Check every hour (at minute 0)
-                '2h': current_minute == 0 and current_hour % 2 == 0,  # Check every 2 hours
-                '4h': current_minute == 0 and current_hour % 4 == 0,  # Check every 4 hours
-                '1d': current_minute == 0 and current_hour == 0,  # Check daily at midnight
-            }
-            
-            # Log which timeframes are being checked
-            active_timeframes = [tf for tf, should_check in timeframe_checks.items() if should_check]
+            # Combinations are dispatched on their candle close (CandleScheduler or kline stream)
+            active_timeframes = sorted(set(tf for _, _, tf in combinations), key=lambda tf: TIMEFRAME_MS.get(tf, 0))
             logger.info(f"⏰ Active timeframes for this cycle: {', '.join(active_timeframes)}")
             
             # Don't reset trading state - maintain across cycles
             # self.balance = self.initial_balance
             # self.open_positions = []
             
+            # Async mode: fetch every due market concurrently and evaluate all signals up front
+            evaluated = None
+            if self.market_data is not None:
+                evaluated = self.market_data.evaluate(combinations, self.bot_core.evaluate_latest_signal, buffer=buffer)
+                logger.info(f"⚡ Evaluated {len(combinations)} combinations in {self.market_data.stats['last_cycle_seconds']:.2f}s")
+            
             # Fetch latest market data and analyze
             for i, (symbol, strategy_name, timeframe) in enumerate(combinations, 1):
                 try:
-                    # Skip combinations that shouldn't be checked at this time
-                    if not timeframe_checks.get(timeframe, True):
-                        continue
-                    
-                    # Fetch market data
-                    df = self.bot_core.fetch_market_data(symbol, timeframe, limit=100)
+                    if evaluated is not None:
+                        outcome = evaluated[(symbol, strategy_name, timeframe)]
+                        if isinstance(outcome, Exception):
+                            raise outcome
+                        df, signals = outcome
+                    else:
+                        # Closed candles with indicators, shared by every strategy on this market
+                        df = (buffer or self.bot_core.candle_buffer).get(symbol, timeframe)
+                        signals = None
                     if df.empty:
                         logger.warning(f"⚠️ No data available for {symbol} {timeframe}")
                         continue
                     
-                    # Calculate indicators
-                    df = self.bot_core.calculate_indicators(df)
-                    
-                    # Generate signals
-                    signals = self.bot_core.generate_signals(df, strategy_name)
+                    # Newest bar's signal only (same as the last row of generate_signals)
+                    if signals is None:
+                        signals = self.bot_core.evaluate_latest_signal(df, strategy_name)
                     
                     # Log current market conditions
                     latest_row = df.iloc[-1]
@@ -477,18 +514,28 @@ class MonitorBot:
     def _run_trading_cycle(self, combinations: List[Tuple[str, str, str]]):
         """Run a single trading cycle"""
         try:
+            # Async mode: fetch every market concurrently and evaluate all signals up front
+            evaluated = None
+            if self.market_data is not None:
+                evaluated = self.market_data.evaluate(combinations, self.bot_core.evaluate_latest_signal)
+            
             for symbol, strategy_name, timeframe in combinations:
                 try:
-                    # Fetch market data
-                    df = self.bot_core.fetch_market_data(symbol, timeframe, limit=100)
+                    if evaluated is not None:
+                        outcome = evaluated[(symbol, strategy_name, timeframe)]
+                        if isinstance(outcome, Exception):
+                            raise outcome
+                        df, signals = outcome
+                    else:
+                        # Closed candles with indicators, shared by every strategy on this market
+                        df = self.bot_core.get_market_data(symbol, timeframe)
+                        signals = None
                     if df.empty:
                         continue
                     
-                    # Calculate indicators
-                    df = self.bot_core.calculate_indicators(df)
-                    
-                    # Generate signals
-                    signals = self.bot_core.generate_signals(df, strategy_name)
+                    # Newest bar's signal only (same as the last row of generate_signals)
+                    if signals is None:
+                        signals = self.bot_core.evaluate_latest_signal(df, strategy_name)
                     
                     # Check for trading signals
                     if not signals.empty:
@@ -522,6 +569,8 @@ class MonitorBot:
     def stop(self):
         """Stop the monitor bot"""
         self.is_running = False
+        if self.market_data is not None:
+            self.market_data.stop()
         logger.info("Monitor bot stopping...")
 
 def main():
@@ -537,6 +586,10 @@ def main():
                        help='Specific combinations to monitor (format: symbol:strategy:timeframe)')
     parser.add_argument('--run-name', default='monitorBot',
                        help='Run name for BigQuery (default: monitorBot)')
+    parser.add_argument('--stream', action='store_true', default=KLINE_STREAM_ENABLED,
+                       help='Evaluate on candle close from kline WebSocket streams instead of polling REST')
+    parser.add_argument('--async', dest='use_async', action='store_true', default=ASYNC_CYCLE_ENABLED,
+                       help='Fetch all markets of a cycle concurrently and generate signals in a thread pool')
     
     args = parser.parse_args()
     
@@ -553,7 +606,7 @@ def main():
                 continue
     
     # Initialize monitor bot
-    monitor_bot = MonitorBot(run_name=args.run_name)
+    monitor_bot = MonitorBot(run_name=args.run_name, use_stream=args.stream, use_async=args.use_async)
     
     try:
         if args.mode == 'trading':
@@ -9,6 +9,17 @@ from binance.client import Client
 import pandas as pd
 import time
 from config.config import API_KEY, API_SECRET, TESTNET, TESTNET_API_URL
+from utils.exchange_client import create_client
+from utils.candle_buffer import CandleBuffer
+from utils.async_market_data import AsyncMarketData
+from utils.candle_scheduler import CandleScheduler
+from utils.lookback_planner import LookbackPlan
+from utils.price_snapshot import PriceSnapshot
+from utils.market_stream import klines_to_frame
+from config.exchange_config import ASYNC_CYCLE_ENABLED
+from config.storage_config import TRADE_JOURNAL_ENABLED
+from utils.trade_journal import TradeJournal
+from utils.history_backup import HistoryBackup
 from trading.strategies import MovingAverageCrossover, RSIStrategy, BollingerBandStrategy, RelativeStrengthStrategy, EnhancedRSIStrategy, RSIDivergenceStrategy, TrendFollowingStrategy
 import logging
 from datetime import datetime
@@ -16,7 +27,7 @@ from datetime import datetime
 from utils.indicators import calculate_rsi, calculate_macd, calculate_bollinger_bands, calculate_atr
 from scripts.helpers.backtest_utils import prepare_data, calculate_position_size, calculate_fee_adjusted_profit, check_stop_loss_take_profit
 from scripts.helpers.performance_utils import generate_performance_report, save_trade_history, load_trade_history
-from scripts.helpers.trade_utils import execute_trade, update_open_positions, backup_trade_history, restore_from_backup
+from scripts.helpers.trade_utils import execute_trade, update_open_positions
 
 # Configure logging
 logging.basicConfig(
@@ -29,10 +40,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize Binance client
-client = Client(API_KEY, API_SECRET, testnet=TESTNET)
-if TESTNET:
-    client.API_URL = TESTNET_API_URL
+# Initialize Binance client (fake client when EXCHANGE_MODE=fake)
+client = create_client()
 
 # ===== PRODUCTION TRADING CONFIGURATION =====
 # Define all production trading combinations
@@ -81,6 +90,12 @@ for symbol in symbols.values():
         'TrendFollowingStrategy': {'trades': [], 'profit_usd': 0.0}
     }
 
+# Opened and closed positions appended once to a journal instead of rewriting the history (TRADE_JOURNAL_ENABLED=true)
+trade_journal = TradeJournal('data/history/prod_trade_history.json') if TRADE_JOURNAL_ENABLED else None
+
+# Backups as a compressed base plus one delta per cycle, with retention (restorable to any saved point)
+history_backup = HistoryBackup('prod_trade_history')
+
 # Initialize strategies for each symbol
 strategies = {}
 for symbol in symbols.values():
@@ -96,14 +111,46 @@ active_strategies = {
     "LINKUSDT": ['EnhancedRSIStrategy']     # 4h timeframe
 }
 
-def analyze_market():
-    """Gather market data and calculate indicators for all symbols"""
+# Candles and indicators per market from the warm-up the active strategies declare
+lookback_plan = LookbackPlan()
+for symbol, strategy_name, timeframe in PROD_TRADING_COMBOS:
+    lookback_plan.add(symbol, timeframe, strategies[symbol][strategy_name], name=strategy_name)
+lookback_plan.log_summary()
+
+def add_indicators(df, indicators=None):
+    """Indicator columns used by the production strategies (only the named ones if indicators is given)"""
+    if indicators is None or 'rsi' in indicators:
+        df['rsi'] = calculate_rsi(df['close'])
+    if indicators is None or 'macd' in indicators:
+        df['macd'], df['signal'], df['histogram'] = calculate_macd(df['close'])
+    if indicators is None or 'bollinger' in indicators:
+        df['upper_band'], df['middle_band'], df['lower_band'] = calculate_bollinger_bands(df['close'])
+    if indicators is None or 'atr' in indicators:
+        df['atr'] = calculate_atr(df['high'], df['low'], df['close'])
+    return df
+
+def fetch_candles(symbol, timeframe, limit=100):
+    return klines_to_frame(client.get_klines(symbol=symbol, interval=timeframe, limit=limit))
+
+# Fetch all symbols of a cycle concurrently (ASYNC_CYCLE_ENABLED=true)
+market_data = AsyncMarketData(client, CandleBuffer(fetch_candles, add_indicators, plan=lookback_plan)) if ASYNC_CYCLE_ENABLED else None
+
+def analyze_market(due_symbols=None):
+    """Gather market data and calculate indicators for all symbols (or only due_symbols)"""
     try:
         all_data = {}
         all_signals = {}
         
+        # Async mode: fetch every symbol's candles concurrently up front
+        prefetched = None
+        if market_data is not None:
+            prefetched = market_data.prefetch([(symbol, timeframe) for symbol, _, timeframe in PROD_TRADING_COMBOS
+                                               if due_symbols is None or symbol in due_symbols])
+        
         # First pass: Get data for all symbols
         for coin, symbol in symbols.items():
+            if due_symbols is not None and symbol not in due_symbols:
+                continue
             logger.info(f"\n=== Data Update for {coin} ({symbol}) ===")
             
             # Set appropriate timeframe for each pair
@@ -114,10 +161,18 @@ def analyze_market():
                 interval = Client.KLINE_INTERVAL_4HOUR
                 timeframe = "4-hour"
             
+            if prefetched is not None:
+                if prefetched.get((symbol, interval)) is not None:
+                    logger.error(f"Error fetching {symbol}: {prefetched[(symbol, interval)]}")
+                    continue
+                all_data[symbol] = market_data.buffer.peek(symbol, interval)
+                logger.info(f"Data update complete for {symbol}")
+                continue
+            
             logger.info(f"Fetching {timeframe} candles for {symbol}")
             
-            # Get klines data with appropriate timeframe
-            klines = client.get_klines(symbol=symbol, interval=interval, limit=100)
+            # Get klines data with appropriate timeframe (the planned lookback + the candle still open)
+            klines = client.get_klines(symbol=symbol, interval=interval, limit=(lookback_plan.limit(symbol, interval) or 100) + 1)
             
             # Create dataframe
             df = pd.DataFrame(klines, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time', 
@@ -129,16 +184,15 @@ def analyze_market():
             
             # Calculate indicators
             logger.info(f"Calculating indicators for {symbol} using {timeframe} timeframe")
-            df['rsi'] = calculate_rsi(df['close'])
-            df['macd'], df['signal'], df['histogram'] = calculate_macd(df['close'])
-            df['upper_band'], df['middle_band'], df['lower_band'] = calculate_bollinger_bands(df['close'])
-            df['atr'] = calculate_atr(df['high'], df['low'], df['close'])
+            df = add_indicators(df, lookback_plan.indicators(symbol, interval))
             
             all_data[symbol] = df
             logger.info(f"Data update complete for {symbol}")
         
         # Second pass: Generate signals
         for coin, symbol in symbols.items():
+            if symbol not in all_data:
+                continue
             df = all_data[symbol]
             symbol_signals = {}
             
@@ -148,7 +202,7 @@ def analyze_market():
                     strategy = strategies[symbol][strategy_name]
                     logger.info(f"Generating signals for {symbol} using {strategy_name}")
                     
-                    signals = strategy.generate_signals(df)
+                    signals = strategy.generate_latest_signal(df)
                     
                     # Log signal information
                     if signals is not None and not signals.empty:
@@ -187,8 +241,11 @@ def execute_trades(all_signals, all_data):
     if all_signals is None:
         return
     
+    # One ticker request for the cycle: position updates and entries of a symbol use the same price
+    prices = PriceSnapshot.take(client, symbols.values())
+    
     for symbol in symbols.values():
-        current_price = float(client.get_symbol_ticker(symbol=symbol)['price'])
+        current_price = prices.price(symbol)
         timestamp = datetime.now()
         
         # Check for stop loss and take profit on existing positions
@@ -205,8 +262,12 @@ def execute_trades(all_signals, all_data):
             strategy = position['strategy']
             trade_history[symbol][strategy]['trades'].append(position)
             trade_history[symbol][strategy]['profit_usd'] += position['profit']
+            if trade_journal is not None:
+                trade_journal.record(symbol, strategy, position, profit=position['profit'], kind='close')
         
-        # Generate new trades based on signals
+        # Generate new trades based on signals (only symbols analyzed this cycle)
+        if symbol not in all_signals:
+            continue
         for strategy_name in active_strategies[symbol]:
             signals = all_signals[symbol][strategy_name]
             if signals is None or signals.empty:
@@ -236,28 +297,58 @@ def execute_trades(all_signals, all_data):
                 
                 # Add to open positions
                 trade_history[symbol]['open_positions'].append(trade)
+                if trade_journal is not None:
+                    trade_journal.record(symbol, strategy_name, trade, kind='open')
                 logger.info(f"New {trade['type']} position opened for {symbol} using {strategy_name}")
 
+def load_journaled_history():
+    """Rebuild trade_history from the journal's snapshot and the events after it"""
+    global trade_history
+    trade_history, _ = trade_journal.load(trade_history)
+    for strategies in trade_history.values():
+        strategies.setdefault('open_positions', [])
+        for position in strategies['open_positions']:
+            if isinstance(position['entry_time'], str):
+                position['entry_time'] = datetime.fromisoformat(position['entry_time'])
+
+def save_journaled_history():
+    """fsync the cycle's journaled events, write the full history only when a snapshot is due"""
+    trade_journal.flush()
+    if trade_journal.snapshot_due():
+        trade_journal.snapshot(trade_history)
+
 def run_bot(interval=60):
-    """Main bot loop"""
+    """Main bot loop, woken on candle closes (each symbol at most once per interval)"""
     logger.info("Starting production trading bot...")
+    if trade_journal is not None:
+        load_journaled_history()
+    
+    # Candle-close scheduler on the exchange clock
+    scheduler = CandleScheduler(PROD_TRADING_COMBOS, client, min_interval=interval)
+    if market_data is not None:
+        market_data.buffer.clock = scheduler.time
     
     while True:
         try:
-            # Analyze market and get signals
-            all_data, all_signals = analyze_market()
+            # Sleep until the next candle close
+            due = scheduler.wait()
+            if not due:
+                continue
+            
+            # Analyze the symbols whose candle just closed and get signals
+            all_data, all_signals = analyze_market(set(symbol for symbol, _, _ in due))
             
             # Execute trades based on signals
             execute_trades(all_signals, all_data)
             
-            # Save trade history
-            save_trade_history(trade_history, 'data/history/trade_history.json')
+            if trade_journal is not None:
+                save_journaled_history()
+            else:
+                # Save trade history
+                save_trade_history(trade_history, 'data/history/trade_history.json')
             
-            # Backup trade history
-            backup_trade_history('data/history/trade_history.json')
-            
-            # Sleep for the specified interval
-            time.sleep(interval)
+            # Back up only what changed since the last cycle
+            history_backup.save(trade_history)
             
         except Exception as e:
             logger.error(f"Error in main loop: {e}")
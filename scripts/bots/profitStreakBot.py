@@ -25,7 +25,14 @@ root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 sys.path.insert(0, root_dir)
 
 from utils.bot_core import BotCore
+from utils.persistence_queue import flush_persistence_queues
+from utils.exchange_client import create_kline_stream
+from utils.candle_buffer import CandleBuffer
+from utils.async_market_data import AsyncMarketData
+from utils.candle_scheduler import CandleScheduler
+from utils.synthetic_data import TIMEFRAME_MS
 from config.config import INITIAL_BALANCE
+from config.exchange_config import KLINE_STREAM_ENABLED, ASYNC_CYCLE_ENABLED
 
 # Configure logging for production
 if IS_PRODUCTION:
@@ -53,11 +60,14 @@ def signal_handler(signum, frame):
     """Handle shutdown signals gracefully"""
     global shutdown_requested
     logger.info(f"Received signal {signum}, initiating graceful shutdown...")
+    # Only the flag: the loops exit on it and cleanup() writes what is still queued
+    # (flushing here deadlocks if the signal arrives while a record is being queued)
     shutdown_requested = True
 
 def cleanup():
     """Cleanup function for graceful shutdown"""
     logger.info("Performing cleanup...")
+    flush_persistence_queues()
 
 # Register signal handlers and cleanup
 signal.signal(signal.SIGTERM, signal_handler)
@@ -67,12 +77,18 @@ atexit.register(cleanup)
 class ProfitStreakBot:
     """Bot that only trades after 5 consecutive profitable days"""
     
-    def __init__(self, run_name: str = 'profitStreakBot', initial_balance: float = INITIAL_BALANCE):
+    def __init__(self, run_name: str = 'profitStreakBot', initial_balance: float = INITIAL_BALANCE,
+                 use_stream: bool = KLINE_STREAM_ENABLED, use_async: bool = ASYNC_CYCLE_ENABLED):
         self.run_name = run_name
         self.initial_balance = initial_balance
         self.bot_core = BotCore(bot_type='profit_streak', run_name=run_name)
         self.is_running = False
         self.last_check_time = 0
+        self.use_stream = use_stream  # Evaluate on kline stream candle closes instead of polling REST
+        self.stream = None
+        # Fetch all markets of a cycle concurrently and generate signals in a thread pool
+        self.market_data = AsyncMarketData(self.bot_core.client, self.bot_core.candle_buffer,
+                                          market_data_feed=self.bot_core.market_data_feed) if use_async else None
         
         # Trading state
         self.balance = initial_balance
@@ -114,6 +130,14 @@ class ProfitStreakBot:
             logger.error(f"Error checking profit streak: {e}")
             return False
     
+    def _streak_active(self) -> bool:
+        """Profit streak status, re-checked once per day"""
+        current_date = datetime.now().date()
+        if self.last_daily_check != current_date:
+            self.last_daily_check = current_date
+            return self.check_profit_streak()
+        return self.consecutive_profitable_days >= self.required_profitable_days
+    
     def run_profit_streak_trading(self, trading_interval: int = 900):  # 15 minutes
         """Run trading only when profit streak is achieved"""
         logger.info("Starting Profit Streak Bot")
@@ -121,6 +145,15 @@ class ProfitStreakBot:
         logger.info(f"Trading interval: {trading_interval} seconds ({trading_interval/60:.1f} minutes)")
         logger.info(f"Trading combinations: {len(self.trading_combinations)}")
         
+        if self.use_stream:
+            self.run_stream_trading()
+            return
+        
+        # Wake up on candle closes (at most once per trading interval per combination), on the exchange clock
+        scheduler = CandleScheduler(self.trading_combinations, self.bot_core.client, min_interval=trading_interval)
+        self.bot_core.candle_buffer.clock = scheduler.time
+        # Fetch only the candles and indicators the strategies declared
+        self.bot_core.plan_lookback(self.trading_combinations)
         self.is_running = True
         self.last_check_time = time.time()
         
@@ -129,61 +162,48 @@ class ProfitStreakBot:
             max_consecutive_errors = 5 if IS_PRODUCTION else 1
             
             while self.is_running and not shutdown_requested:
-                current_time = time.time()
-                
-                # Check if it's time for the next cycle
-                if current_time - self.last_check_time >= trading_interval:
-                    try:
-                        logger.info(f"=== PROFIT STREAK TRADING CYCLE ===")
-                        logger.info(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                        
-                        # Check profit streak (only once per day)
-                        current_date = datetime.now().date()
-                        if self.last_daily_check != current_date:
-                            self.last_daily_check = current_date
-                            streak_achieved = self.check_profit_streak()
-                        else:
-                            streak_achieved = self.consecutive_profitable_days >= self.required_profitable_days
-                        
-                        if streak_achieved:
-                            logger.info("🚀 PROFIT STREAK ACTIVE - TRADING ENABLED")
-                            # Use only the combinations that have 5-day profit streaks
-                            profitable_combos = [(combo['symbol'], combo['strategy'], combo['timeframe']) 
-                                               for combo in self.profitable_combinations]
-                            self._run_trading_cycle(profitable_combos)
-                        else:
-                            logger.info("⏸️ Waiting for profit streak - trading disabled")
-                        
-                        # Reset error counter on successful cycle
-                        consecutive_errors = 0
-                        
-                        # Update last check time
-                        self.last_check_time = current_time
-                        
-                        logger.info(f"Completed trading cycle")
-                        logger.info(f"Next cycle in {trading_interval} seconds")
-                        logger.info("=" * 50)
-                        
-                    except Exception as e:
-                        consecutive_errors += 1
-                        logger.error(f"Error in trading cycle {consecutive_errors}/{max_consecutive_errors}: {e}")
-                        
-                        if consecutive_errors >= max_consecutive_errors:
-                            logger.error(f"Too many consecutive errors ({consecutive_errors}), stopping bot")
-                            self.is_running = False
-                            break
-                        
-                        # Wait before retrying
-                        logger.info(f"Waiting 60 seconds before retry...")
-                        time.sleep(60)
-                        continue
-                
-                # Sleep for a short interval
-                time.sleep(10)
+                closed = scheduler.wait(should_stop=lambda: not self.is_running or shutdown_requested)
+                if not closed:
+                    continue
                 
-                # Show "still alive" message every 5 minutes
-                if int(current_time) % 300 == 0:
-                    logger.info(f"💓 Profit Streak Bot still alive - waiting for next cycle...")
+                try:
+                    logger.info(f"=== PROFIT STREAK TRADING CYCLE ===")
+                    logger.info(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                    
+                    # Check profit streak (only once per day)
+                    if self._streak_active():
+                        logger.info("🚀 PROFIT STREAK ACTIVE - TRADING ENABLED")
+                        # Use only the combinations that have 5-day profit streaks and whose candle just closed
+                        closed_timeframes = set(timeframe for _, _, timeframe in closed)
+                        profitable_combos = [(combo['symbol'], combo['strategy'], combo['timeframe']) 
+                                           for combo in self.profitable_combinations
+                                           if combo['timeframe'] in closed_timeframes]
+                        self._run_trading_cycle(profitable_combos)
+                    else:
+                        logger.info("⏸️ Waiting for profit streak - trading disabled")
+                    
+                    # Reset error counter on successful cycle
+                    consecutive_errors = 0
+                    
+                    # Update last check time
+                    self.last_check_time = time.time()
+                    
+                    logger.info(f"Completed trading cycle")
+                    logger.info("=" * 50)
+                    
+                except Exception as e:
+                    consecutive_errors += 1
+                    logger.error(f"Error in trading cycle {consecutive_errors}/{max_consecutive_errors}: {e}")
+                    
+                    if consecutive_errors >= max_consecutive_errors:
+                        logger.error(f"Too many consecutive errors ({consecutive_errors}), stopping bot")
+                        self.is_running = False
+                        break
+                    
+                    # Wait before retrying
+                    logger.info(f"Waiting 60 seconds before retry...")
+                    time.sleep(60)
+                    continue
                 
         except KeyboardInterrupt:
             logger.info("Profit Streak Bot stopped by user")
@@ -196,8 +216,41 @@ class ProfitStreakBot:
             else:
                 raise
     
-    def _run_trading_cycle(self, combinations: List[Tuple[str, str, str]]):
-        """Run a single trading cycle with live trading execution"""
+    def run_stream_trading(self):
+        """Trade profitable combinations when their candle closes, from kline WebSocket streams"""
+        markets = sorted(set((symbol.upper(), timeframe) for symbol, _, timeframe in self.trading_combinations))
+        logger.info(f"Streaming {len(markets)} markets, trading on candle close")
+        
+        plan = self.bot_core.plan_lookback(self.trading_combinations)
+        self.stream = create_kline_stream(self.bot_core.client, markets, history=plan.history())
+        self.stream.start()
+        buffer = CandleBuffer(self.stream.get_candles, getattr(self.stream, 'compute', self.bot_core.calculate_indicators),
+                              clock=self.stream.clock, plan=plan)
+        self.is_running = True
+        
+        try:
+            while self.is_running and not shutdown_requested:
+                closed = self.stream.wait_for_closes(timeout=10)
+                if not closed:
+                    continue
+                
+                if not self._streak_active():
+                    logger.info("⏸️ Waiting for profit streak - trading disabled")
+                    continue
+                
+                due = [(combo['symbol'], combo['strategy'], combo['timeframe']) for combo in self.profitable_combinations
+                       if (combo['symbol'].upper(), combo['timeframe']) in closed]
+                if due:
+                    self._run_trading_cycle(due, buffer=buffer)
+                
+        except KeyboardInterrupt:
+            logger.info("Profit Streak Bot stopped by user")
+        finally:
+            self.is_running = False
+            self.stream.stop()
+    
+    def _run_trading_cycle(self, combinations: List[Tuple[str, str, str]], buffer: Optional[CandleBuffer] = None):
+        """Run a single trading cycle with live trading execution (buffer defaults to the bot core's REST candle buffer)"""
         try:
             current_time = datetime.now()
             logger.info(f"🔄 PROFIT STREAK TRADING CYCLE STARTED at {current_time}")
@@ -206,39 +259,34 @@ class ProfitStreakBot:
             signals_found = 0
             trades_executed = 0
             
-            # Determine which timeframes should be checked based on current time
-            current_minute = current_time.minute
-            current_hour = current_time.hour
-            
-            timeframe_checks = {
-                '15m': True,
-                '30m': current_minute % 30 == 0,
-                '1h': current_minute == 0,
-                '2h': current_minute == 0 and current_hour % 2 == 0,
-                '4h': current_minute == 0 and current_hour % 4 == 0,
-                '1d': current_minute == 0 and current_hour == 0,
-            }
-            
-            active_timeframes = [tf for tf, should_check in timeframe_checks.items() if should_check]
+            # Combinations are dispatched on their candle close (CandleScheduler or kline stream)
+            active_timeframes = sorted(set(tf for _, _, tf in combinations), key=lambda tf: TIMEFRAME_MS.get(tf, 0))
             logger.info(f"⏰ Active timeframes for this cycle: {', '.join(active_timeframes)}")
             
+            # Async mode: fetch every due market concurrently and evaluate all signals up front
+            evaluated = None
+            if self.market_data is not None:
+                evaluated = self.market_data.evaluate(combinations, self.bot_core.evaluate_latest_signal, buffer=buffer)
+                logger.info(f"⚡ Evaluated {len(combinations)} combinations in {self.market_data.stats['last_cycle_seconds']:.2f}s")
+            
             # Fetch latest market data and analyze
             for i, (symbol, strategy_name, timeframe) in enumerate(combinations, 1):
                 try:
-                    # Skip combinations that shouldn't be checked at this time
-                    if not timeframe_checks.get(timeframe, True):
-                        continue
-                    
-                    # Fetch market data
-                    df = self.bot_core.fetch_market_data(symbol, timeframe, limit=100)
+                    if evaluated is not None:
+                        outcome = evaluated[(symbol, strategy_name, timeframe)]
+                        if isinstance(outcome, Exception):
+                            raise outcome
+                        df, signals = outcome
+                    else:
+                        # Closed candles with indicators, shared by every strategy on this market
+                        df = (buffer or self.bot_core.candle_buffer).get(symbol, timeframe)
+                        signals = None
                     if df.empty:
                         continue
                     
-                    # Calculate indicators
-                    df = self.bot_core.calculate_indicators(df)
-                    
-                    # Generate signals
-                    signals = self.bot_core.generate_signals(df, strategy_name)
+                    # Newest bar's signal only (same as the last row of generate_signals)
+                    if signals is None:
+                        signals = self.bot_core.evaluate_latest_signal(df, strategy_name)
                     
                     # Log current market conditions
                     latest_row = df.iloc[-1]
@@ -393,6 +441,8 @@ class ProfitStreakBot:
     def stop(self):
         """Stop the profit streak bot"""
         self.is_running = False
+        if self.market_data is not None:
+            self.market_data.stop()
         logger.info("Profit Streak Bot stopping...")
 
 def main():
@@ -402,11 +452,15 @@ def main():
                         help='Trading interval in seconds (default: 900 = 15 minutes)')
     parser.add_argument('--run-name', default='profitStreakBot',
                         help='Run name for BigQuery (default: profitStreakBot)')
+    parser.add_argument('--stream', action='store_true', default=KLINE_STREAM_ENABLED,
+                        help='Trade on candle close from kline WebSocket streams instead of polling REST')
+    parser.add_argument('--async', dest='use_async', action='store_true', default=ASYNC_CYCLE_ENABLED,
+                        help='Fetch all markets of a cycle concurrently and generate signals in a thread pool')
     
     args = parser.parse_args()
     
     # Initialize profit streak bot
-    profit_streak_bot = ProfitStreakBot(run_name=args.run_name)
+    profit_streak_bot = ProfitStreakBot(run_name=args.run_name, use_stream=args.stream, use_async=args.use_async)
     
     try:
         profit_streak_bot.run_profit_streak_trading(args.interval)
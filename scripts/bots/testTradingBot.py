@@ -18,12 +18,24 @@ from trading.execution import TradeExecutor
 from trading.strategies import RSIStrategy, BollingerBandStrategy, EnhancedRSIStrategy, RSIDivergenceStrategy, TrendFollowingStrategy, LiveReactiveRSIStrategy, MomentumStrategy, VWAPStrategy, PriceActionBreakoutStrategy
 import logging
 import json
+import threading
+from functools import partial
 from datetime import datetime, timedelta
-import shutil
 import glob
 
 # Import shared bot core
 from utils.bot_core import BotCore
+from utils.async_market_data import AsyncMarketData
+from utils.candle_scheduler import CandleScheduler
+from utils.exchange_client import create_account_state
+from utils.price_snapshot import PriceSnapshot
+from utils.oco_exits import OcoExitTracker
+from utils.order_pipeline import OrderPipeline
+from utils.trade_journal import TradeJournal
+from utils.history_backup import HistoryBackup
+from config.storage_config import TRADE_JOURNAL_ENABLED
+from config.exchange_config import (ASYNC_CYCLE_ENABLED, ACCOUNT_STREAM_ENABLED, EXIT_MODE, OCO_STOP_LIMIT_BUFFER,
+                                    ORDER_PIPELINE_ENABLED, ORDER_CYCLE_TIMEOUT)
 
 # Configure logging
 logging.basicConfig(
@@ -39,10 +51,11 @@ logger = logging.getLogger(__name__)
 # Initialize shared bot core
 bot_core = BotCore(bot_type='test', run_name='testBot')
 
-# Keep using Testnet
-client = Client(API_KEY, API_SECRET, testnet=TESTNET)
-if TESTNET:
-    client.API_URL = TESTNET_API_URL
+# Keep using Testnet (or the fake client when EXCHANGE_MODE=fake), shared with the bot core
+client = bot_core.client
+
+# Fetch all markets of a cycle concurrently and generate signals in a thread pool (ASYNC_CYCLE_ENABLED=true)
+market_data = AsyncMarketData(client, bot_core.candle_buffer, market_data_feed=bot_core.market_data_feed) if ASYNC_CYCLE_ENABLED else None
 
 # ===== ACTIVE TRADING CONFIGURATION =====
 # Import all combinations from BackTestBot for comprehensive testing
@@ -97,35 +110,66 @@ for symbol in symbols.values():
     for strategy_name in strategies.keys():
         trade_history[symbol][strategy_name] = {'trades': [], 'profit_usd': 0.0}
 
+# Balances from the user data stream instead of a get_account() per order (ACCOUNT_STREAM_ENABLED=true)
+account_state = create_account_state(client) if ACCOUNT_STREAM_ENABLED else None
+
+# Exchange-side OCO stop loss/take profit after each entry, reported by the user data stream (EXIT_MODE=oco)
+exit_tracker = OcoExitTracker(client, account_state) if EXIT_MODE == 'oco' else None
+
+# Orders sent by a worker pool with per-signal client order IDs (ORDER_PIPELINE_ENABLED=true)
+order_pipeline = OrderPipeline(client, bot_core.run_name) if ORDER_PIPELINE_ENABLED else None
+history_lock = threading.Lock()
+
+# Each trade appended once to a journal, the full history only in periodic snapshots (TRADE_JOURNAL_ENABLED=true)
+trade_journal = TradeJournal('data/history/trade_history.json') if TRADE_JOURNAL_ENABLED else None
+
+# Backups as a compressed base plus one delta per save, with retention (restorable to any saved point)
+history_backup = HistoryBackup('trade_history')
+
+# Set by stop() (e.g. from the in-process bot runtime) to end run_bot's loop
+stop_requested = threading.Event()
+
 # Create trade executors for each symbol
 trade_executors = {
-    symbol: TradeExecutor(client, symbol, test_mode=False)
+    symbol: TradeExecutor(client, symbol, test_mode=False, account_state=account_state, exit_tracker=exit_tracker)
     for symbol in symbols.values()
 }
 
-def analyze_market():
-    """Analyze all combinations using BotCore (same approach as BackTestBot)"""
+def analyze_market(combinations=None):
+    """Analyze combinations (default: all active ones) using BotCore (same approach as BackTestBot)"""
     try:
+        combinations = combinations or ACTIVE_TRADING_COMBOS
         all_data = {}
         all_signals = {}
         
-        logger.info(f"🔄 Starting market analysis for {len(ACTIVE_TRADING_COMBOS)} combinations...")
+        logger.info(f"🔄 Starting market analysis for {len(combinations)} combinations...")
+        
+        # Async mode: fetch every market concurrently and evaluate all signals up front
+        evaluated = None
+        if market_data is not None:
+            evaluated = market_data.evaluate(combinations, bot_core.evaluate_latest_signal)
+            logger.info(f"⚡ Evaluated {len(combinations)} combinations in {market_data.stats['last_cycle_seconds']:.2f}s")
         
-        for i, (symbol, strategy_name, timeframe) in enumerate(ACTIVE_TRADING_COMBOS, 1):
+        for i, (symbol, strategy_name, timeframe) in enumerate(combinations, 1):
             try:
-                logger.info(f"📊 Analyzing {symbol} {strategy_name} {timeframe} ({i}/{len(ACTIVE_TRADING_COMBOS)})")
+                logger.info(f"📊 Analyzing {symbol} {strategy_name} {timeframe} ({i}/{len(combinations)})")
                 
-                # Use BotCore to fetch market data and generate signals
-                df = bot_core.fetch_market_data(symbol, timeframe, limit=100)
+                if evaluated is not None:
+                    outcome = evaluated[(symbol, strategy_name, timeframe)]
+                    if isinstance(outcome, Exception):
+                        raise outcome
+                    df, signals = outcome
+                else:
+                    # Closed candles with indicators, fetched once per market and candle close
+                    df = bot_core.get_market_data(symbol, timeframe)
+                    signals = None
                 if df.empty:
                     logger.warning(f"⚠️ No data available for {symbol} {timeframe}")
                     continue
                 
-                # Calculate indicators
-                df = bot_core.calculate_indicators(df)
-                
-                # Generate signals
-                signals = bot_core.generate_signals(df, strategy_name)
+                # Newest bar's signal only (same as the last row of generate_signals)
+                if signals is None:
+                    signals = bot_core.evaluate_latest_signal(df, strategy_name)
                 
                 # Store data and signals
                 key = f"{symbol}_{strategy_name}_{timeframe}"
@@ -150,7 +194,7 @@ def analyze_market():
                 
                 # Progress indicator every 10 combinations
                 if i % 10 == 0:
-                    logger.info(f"📈 Progress: {i}/{len(ACTIVE_TRADING_COMBOS)} combinations analyzed...")
+                    logger.info(f"📈 Progress: {i}/{len(combinations)} combinations analyzed...")
                     
             except Exception as e:
                 logger.error(f"❌ Error analyzing {symbol} {strategy_name} {timeframe}: {e}")
@@ -163,6 +207,74 @@ def analyze_market():
         logger.error(f"❌ Error in market analysis: {e}")
         return {}, {}
 
+def record_buy(symbol, strategy_name, price, quantity, status):
+    """Record a BUY in the trade history"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    value_usd = price * quantity
+    logger.info(f"BUY: {symbol} - {strategy_name} - Price: ${price:.2f} - Size: {quantity:.3f} - Value: ${value_usd:.2f}")
+    
+    trade = {
+        'timestamp': timestamp,
+        'type': 'BUY',
+        'price': price,
+        'quantity': quantity,
+        'value_usd': value_usd,
+        'status': status
+    }
+    with history_lock:
+        trade_history[symbol][strategy_name]['trades'].append(trade)
+        if trade_journal is not None:
+            trade_journal.record(symbol, strategy_name, trade)
+
+def record_sell(symbol, strategy_name, price, quantity, status):
+    """Record a SELL in the trade history, realizing P&L against the last BUY"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    value_usd = price * quantity
+    
+    with history_lock:
+        # Calculate P&L if we have previous trades
+        pnl = 0
+        last_buy = last_buy_trade(trade_history[symbol][strategy_name]['trades'])
+        if last_buy:
+            buy_price = last_buy['price']
+            buy_qty = last_buy['quantity']
+            
+            if quantity <= buy_qty:
+                pnl = (price - buy_price) * quantity
+                trade_history[symbol][strategy_name]['profit_usd'] += pnl
+        
+        trade = {
+            'timestamp': timestamp,
+            'type': 'SELL',
+            'price': price,
+            'quantity': quantity,
+            'value_usd': value_usd,
+            'status': status
+        }
+        trade_history[symbol][strategy_name]['trades'].append(trade)
+        if trade_journal is not None:
+            trade_journal.record(symbol, strategy_name, trade, profit=pnl, entry=last_buy)
+    
+    logger.info(f"SELL: {symbol} - {strategy_name} - Price: ${price:.2f} - Size: {quantity:.3f} - Value: ${value_usd:.2f} - PnL: ${pnl:.2f}")
+
+def last_buy_trade(trades):
+    """The most recent BUY of a strategy's trades (None if there is none)"""
+    for trade in reversed(trades):
+        if trade['type'] == 'BUY':
+            return trade
+    return None
+
+def record_order_result(current_price, result):
+    """OrderPipeline callback (worker thread): record an acked order at its fill price"""
+    order = result['order']
+    if order is None:
+        return
+    executed = float(order.get('executedQty', 0) or 0)
+    price = float(order['cummulativeQuoteQty']) / executed if executed else current_price
+    quantity = executed or float(result['quantity'])
+    record = record_buy if result['side'] == 'BUY' else record_sell
+    record(result['symbol'], result['strategy'], price, quantity, order.get('status', 'TEST'))
+
 def execute_trades(all_signals, all_data):
     """Execute trades based on signals from all combinations"""
     if not all_signals:
@@ -171,6 +283,11 @@ def execute_trades(all_signals, all_data):
     
     logger.info(f"🔄 Executing trades for {len(all_signals)} combinations...")
     
+    # One ticker request for the cycle: every strategy on a symbol trades at the same price
+    prices = PriceSnapshot.take(client, symbols.values())
+    queued = 0
+    executed = 0
+    
     for key, signals in all_signals.items():
         try:
             # Parse key: "BTCUSDT_RSIStrategy_15m"
@@ -180,101 +297,148 @@ def execute_trades(all_signals, all_data):
                 continue
             
             latest_signal = signals.iloc[-1]
+            if latest_signal['position'] == 0:
+                continue
+            side = 'BUY' if latest_signal['position'] > 0 else 'SELL'
             
             # Get current price
-            current_price = float(client.get_symbol_ticker(symbol=symbol)['price'])
+            current_price = prices.price(symbol)
             
-            if latest_signal['position'] > 0:  # Buy signal
-                # Calculate position size (1% risk, 2% stop loss)
-                quantity = trade_executors[symbol].calculate_position_size(current_price, risk_percent=0.5, stop_loss_percent=2.0)
-                
-                # Execute buy order
-                order = trade_executors[symbol].place_market_order(side='BUY', quantity=quantity)
-                
-                if order:
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    value_usd = current_price * quantity
-                    logger.info(f"BUY: {symbol} - {strategy_name} - Price: ${current_price:.2f} - Size: {quantity:.3f} - Value: ${value_usd:.2f}")
-                    
-                    # Record trade
-                    trade_history[symbol][strategy_name]['trades'].append({
-                        'timestamp': timestamp,
-                        'type': 'BUY',
-                        'price': current_price,
-                        'quantity': quantity,
-                        'value_usd': value_usd,
-                        'status': order.get('status', 'TEST')
-                    })
-                    
-                    # Save trade history and display updated performance
-                    save_trade_history()
-                    display_performance_summary()
-                    display_strategy_performance()
-                    display_pair_performance()
-                    
-            elif latest_signal['position'] < 0:  # Sell signal
-                quantity = trade_executors[symbol].calculate_position_size(current_price, risk_percent=0.5, stop_loss_percent=2.0)
-                
-                # Execute sell order
-                order = trade_executors[symbol].place_market_order(side='SELL', quantity=quantity)
-                
-                if order:
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    value_usd = current_price * quantity
-                    
-                    # Calculate P&L if we have previous trades
-                    pnl = 0
-                    if trade_history[symbol][strategy_name]['trades']:
-                        last_buy = None
-                        for trade in reversed(trade_history[symbol][strategy_name]['trades']):
-                            if trade['type'] == 'BUY':
-                                last_buy = trade
-                                break
-                        
-                        if last_buy:
-                            buy_price = last_buy['price']
-                            buy_qty = last_buy['quantity']
-                            
-                            if quantity <= buy_qty:
-                                pnl = (current_price - buy_price) * quantity
-                                trade_history[symbol][strategy_name]['profit_usd'] += pnl
-                    
-                    logger.info(f"SELL: {symbol} - {strategy_name} - Price: ${current_price:.2f} - Size: {quantity:.3f} - Value: ${value_usd:.2f} - PnL: ${pnl:.2f}")
-                    
-                    # Record trade
-                    trade_history[symbol][strategy_name]['trades'].append({
-                        'timestamp': timestamp,
-                        'type': 'SELL',
-                        'price': current_price,
-                        'quantity': quantity,
-                        'value_usd': value_usd,
-                        'status': order.get('status', 'TEST')
-                    })
-                    
-                    # Save trade history and display updated performance
-                    save_trade_history()
-                    display_performance_summary()
-                    display_strategy_performance()
-                    display_pair_performance()
+            # Calculate position size (0.5% risk, 2% stop loss)
+            quantity = trade_executors[symbol].calculate_position_size(current_price, risk_percent=0.5, stop_loss_percent=2.0)
+            
+            # A signal exit replaces the strategy's working OCOs (their quantity is locked on the exchange)
+            if side == 'SELL' and exit_tracker is not None:
+                exit_tracker.cancel(symbol, strategy_name)
+            
+            if order_pipeline is not None and not (side == 'BUY' and exit_tracker is not None):
+                # Queued with an ID unique to this signal's candle; recorded by the callback once acked
+                trade_executors[symbol].submit_market_order(
+                    order_pipeline, side, quantity, strategy_name, all_data[key]['timestamp'].iloc[-1],
+                    callback=partial(record_order_result, current_price))
+                queued += 1
+                continue
+            
+            # Execute the order inline (a buy with its OCO exit in oco mode: the OCO needs the fill)
+            if side == 'BUY' and exit_tracker is not None:
+                order = trade_executors[symbol].place_market_order_with_oco(
+                    side='BUY', quantity=quantity, stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct,
+                    stop_limit_buffer=OCO_STOP_LIMIT_BUFFER, strategy=strategy_name)
+            else:
+                order = trade_executors[symbol].place_market_order(side=side, quantity=quantity)
+            
+            if order:
+                record = record_buy if side == 'BUY' else record_sell
+                record(symbol, strategy_name, current_price, quantity, order.get('status', 'TEST'))
+                executed += 1
         except Exception as e:
             logger.error(f"❌ Error processing {key}: {e}")
             continue
+    
+    if queued:
+        # Orders went out concurrently; the cycle's trades are complete once all are acked
+        results = order_pipeline.wait(ORDER_CYCLE_TIMEOUT)
+        logger.info(f"📨 {sum(1 for r in results if r['order'] is not None)}/{queued} queued orders acked")
+    if queued or executed:
+        # Once per cycle, not per trade: the performance summaries walk the whole history
+        save_trade_history(prices)
+        display_performance_summary()
+        display_strategy_performance(prices)
+        display_pair_performance(prices)
+
+def record_oco_exits():
+    """Record the positions the exchange closed through their OCO since the last cycle"""
+    if exit_tracker is None:
+        return
+    # Without a live stream the legs are queried over REST
+    if account_state is None or not account_state.connected:
+        exit_tracker.reconcile()
+    
+    closed = [p for p in exit_tracker.pop_closed() if p['exit_reason'] != 'canceled']
+    for position in closed:
+        symbol, strategy_name = position['symbol'], position['strategy']
+        if strategy_name not in trade_history.get(symbol, {}):
+            continue
+        trade = {
+            'timestamp': position['exit_time'].strftime("%Y-%m-%d %H:%M:%S"),
+            'type': 'SELL',
+            'price': position['exit_price'],
+            'quantity': position['position_size'],
+            'value_usd': position['exit_price'] * position['position_size'],
+            'status': 'FILLED',
+            'exit_reason': position['exit_reason']
+        }
+        with history_lock:
+            last_buy = last_buy_trade(trade_history[symbol][strategy_name]['trades'])
+            trade_history[symbol][strategy_name]['profit_usd'] += position['profit']
+            trade_history[symbol][strategy_name]['trades'].append(trade)
+            if trade_journal is not None:
+                trade_journal.record(symbol, strategy_name, trade, profit=position['profit'], entry=last_buy)
+    if closed:
+        save_trade_history()
+
+def completed_trade_record(symbol, strategy_name, buy_trade, sell_trade):
+    """Trade database record of a completed BUY + SELL round trip"""
+    return {
+        'entry_time': buy_trade['timestamp'],
+        'exit_time': sell_trade['timestamp'],
+        'strategy': strategy_name,
+        'symbol': symbol,
+        'timeframe': '4h' if symbol in ['ETHUSDT', 'LINKUSDT'] else '1h',
+        'trade_type': 'LONG',
+        'entry_price': buy_trade['price'],
+        'exit_price': sell_trade['price'],
+        'position_size': buy_trade['quantity'],
+        'profit': (sell_trade['price'] - buy_trade['price']) * sell_trade['quantity'],
+        'fees': (buy_trade['value_usd'] + sell_trade['value_usd']) * 0.001,  # 0.1% fee
+        'run_name': 'testBot'
+    }
+
+def save_journaled_history(prices=None):
+    """save_trade_history with the journal: fsync it, snapshot when due and upload only the new round trips"""
+    try:
+        trade_journal.flush()
+        if trade_journal.snapshot_due():
+            if prices is None:
+                prices = PriceSnapshot.take(client, symbols.values())
+            performance = {
+                'strategy_performance': calculate_strategy_performance(prices),
+                'pair_performance': calculate_pair_performance(prices)
+            }
+            with history_lock:
+                trade_journal.snapshot(trade_history, performance)
+        with history_lock:
+            history_backup.save(trade_history)
+    except Exception as e:
+        logger.error(f"Error saving trade history: {e}")
+    
+    # The journal lists each completed trade once, so nothing has to be read back to dedupe
+    events = trade_journal.completed_trades()
+    if not events:
+        return
+    try:
+        bot_core.db.batch_upload_trades([
+            completed_trade_record(event['symbol'], event['strategy'], event['entry'], event['trade'])
+            for event in events
+        ])
+        trade_journal.mark_uploaded(events[-1]['seq'])
+        logger.info(f"Uploaded {len(events)} new completed trades to BigQuery")
+    except Exception as e:
+        logger.warning(f"Failed to save to BigQuery: {e}")
 
-def save_trade_history():
+def save_trade_history(prices=None):
     """Save trade history to a JSON file with proper error handling"""
+    if trade_journal is not None:
+        return save_journaled_history(prices)
     try:
-        # Create backup of existing file first
-        if os.path.exists('data/history/trade_history.json'):
-            backup_path = f'data/history/trade_history_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
-            shutil.copy2('data/history/trade_history.json', backup_path)
-            logger.info(f"Created backup at {backup_path}")
-        
         # Create output directory if it doesn't exist
         os.makedirs('data/history', exist_ok=True)
         
-        # Calculate current performance metrics
-        strategy_performance = calculate_strategy_performance()
-        pair_performance = calculate_pair_performance()
+        # Calculate current performance metrics (one price snapshot for both)
+        if prices is None:
+            prices = PriceSnapshot.take(client, symbols.values())
+        strategy_performance = calculate_strategy_performance(prices)
+        pair_performance = calculate_pair_performance(prices)
         
         # Validate trade history structure
         validated_history = {}
@@ -314,10 +478,12 @@ def save_trade_history():
         os.replace(temp_file, 'data/history/trade_history.json')
         logger.info("Trade history saved successfully")
         
+        # Back up only what changed since the last save
+        history_backup.save(validated_history)
+        
         # Also save to BigQuery for streak analysis (only new trades)
         try:
-            from utils.bigquery_database import BigQueryDatabase
-            db = BigQueryDatabase()
+            db = bot_core.db
             
             # Get existing trades from BigQuery to avoid duplicates
             existing_trades = db.get_trades({'run_name': 'testBot'})
@@ -343,30 +509,12 @@ def save_trade_history():
                                     break
                             
                             if buy_trade:
-                                # Calculate profit
-                                profit = (trade['price'] - buy_trade['price']) * trade['quantity']
-                                
                                 # Create unique key for this trade
                                 trade_key = f"{symbol}_{strategy_name}_{buy_trade['timestamp']}_{trade['timestamp']}"
                                 
                                 # Only upload if this trade doesn't already exist in BigQuery
                                 if trade_key not in existing_trade_keys:
-                                    # Prepare BigQuery trade record
-                                    bigquery_trade = {
-                                        'entry_time': buy_trade['timestamp'],
-                                        'exit_time': trade['timestamp'],
-                                        'strategy': strategy_name,
-                                        'symbol': symbol,
-                                        'timeframe': '4h' if symbol in ['ETHUSDT', 'LINKUSDT'] else '1h',
-                                        'trade_type': 'LONG',
-                                        'entry_price': buy_trade['price'],
-                                        'exit_price': trade['price'],
-                                        'position_size': buy_trade['quantity'],
-                                        'profit': profit,
-                                        'fees': (buy_trade['value_usd'] + trade['value_usd']) * 0.001,  # 0.1% fee
-                                        'run_name': 'testBot'
-                                    }
-                                    bigquery_trades.append(bigquery_trade)
+                                    bigquery_trades.append(completed_trade_record(symbol, strategy_name, buy_trade, trade))
             
             # Upload to BigQuery if we have new trades
             if bigquery_trades:
@@ -386,6 +534,14 @@ def save_trade_history():
 
 def load_trade_history():
     """Load trade history with validation and error recovery"""
+    if trade_journal is not None:
+        # Snapshot plus the journal after it; a damaged snapshot falls back to the backups
+        try:
+            history, _ = trade_journal.load(initialize_empty_trade_history())
+            return history
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"Error loading trade history snapshot: {e}, attempting to restore from backup")
+            return restore_from_backup()
     try:
         if os.path.exists('data/history/trade_history.json'):
             with open('data/history/trade_history.json', 'r') as f:
@@ -437,6 +593,12 @@ def load_trade_history():
 def restore_from_backup():
     """Attempt to restore trade history from the most recent backup"""
     try:
+        history = history_backup.restore()
+        if history is not None:
+            logger.info(f"Restored trade history from {history_backup.directory}")
+            return history
+        
+        # Full-copy backups written before the compacted ones
         backup_files = glob.glob('data/history/trade_history_backup_*.json')
         if not backup_files:
             logger.error("No backup files found")
@@ -462,9 +624,12 @@ def initialize_empty_trade_history():
         }
     }
 
-def calculate_portfolio_value():
+def calculate_portfolio_value(prices=None):
     """Calculate total portfolio value in USD"""
     try:
+        if prices is None:
+            prices = PriceSnapshot.take(client, symbols.values())
+        
         portfolio = {
             'assets': {},
             'total_USD': 0.0
@@ -481,7 +646,7 @@ def calculate_portfolio_value():
         # Get crypto balances
         for coin, symbol in symbols.items():
             balance = trade_executors[symbol].get_account_balance(coin)
-            price = float(client.get_symbol_ticker(symbol=symbol)['price'])
+            price = prices.price(symbol)
             value_usd = balance * price
             
             portfolio['assets'][coin] = {
@@ -496,9 +661,11 @@ def calculate_portfolio_value():
         logger.error(f"Error calculating portfolio value: {e}")
         return None
 
-def calculate_strategy_performance():
+def calculate_strategy_performance(prices=None):
     """Calculate and display performance metrics by strategy"""
     strategy_performance = {}
+    if prices is None:
+        prices = PriceSnapshot.take(client, symbols.values())
     
     for symbol, strategies in trade_history.items():
         for strategy, data in strategies.items():
@@ -531,7 +698,7 @@ def calculate_strategy_performance():
                                 strategy_performance[strategy]['winning_trades'] += 1
                 
                 # Calculate unrealized profit for remaining open positions
-                current_price = float(client.get_symbol_ticker(symbol=symbol)['price'])
+                current_price = prices.price(symbol)
                 for position in open_positions:
                     unrealized_profit = (current_price - position['price']) * position['quantity']
                     strategy_performance[strategy]['unrealized_profit'] += unrealized_profit
@@ -540,9 +707,9 @@ def calculate_strategy_performance():
     
     return strategy_performance
 
-def display_strategy_performance():
+def display_strategy_performance(prices=None):
     """Display performance metrics by strategy in table format"""
-    strategy_performance = calculate_strategy_performance()
+    strategy_performance = calculate_strategy_performance(prices)
     
     print("\n=== Strategy Performance ===")
     print(f"{'Strategy':<25} {'Trades':<8} {'Wins':<8} {'Win Rate':<10} {'P&L':<12} {'Open':<8}")
@@ -554,9 +721,11 @@ def display_strategy_performance():
             print(f"{strategy:<25} {metrics['total_trades']:<8} {metrics['winning_trades']:<8} "
                   f"{win_rate:<10.2f}% ${metrics['realized_profit']:<12.2f} {metrics['open_positions']:<8}")
 
-def calculate_pair_performance():
+def calculate_pair_performance(prices=None):
     """Calculate and display performance metrics by trading pair"""
     pair_performance = {}
+    if prices is None:
+        prices = PriceSnapshot.take(client, symbols.values())
     
     for symbol, strategies in trade_history.items():
         pair_total_trades = 0
@@ -585,7 +754,7 @@ def calculate_pair_performance():
                                 pair_winning_trades += 1
                 
                 # Calculate unrealized profit for remaining open positions
-                current_price = float(client.get_symbol_ticker(symbol=symbol)['price'])
+                current_price = prices.price(symbol)
                 for position in open_positions:
                     unrealized_profit = (current_price - position['price']) * position['quantity']
                     pair_unrealized_profit += unrealized_profit
@@ -604,9 +773,9 @@ def calculate_pair_performance():
     
     return pair_performance
 
-def display_pair_performance():
+def display_pair_performance(prices=None):
     """Display performance metrics by trading pair in table format"""
-    pair_performance = calculate_pair_performance()
+    pair_performance = calculate_pair_performance(prices)
     
     print("\n=== Pair Performance ===")
     print(f"{'Pair':<10} {'Trades':<8} {'Wins':<8} {'Win Rate':<10} {'P&L':<12} {'Open':<8}")
@@ -696,8 +865,7 @@ def check_streak_conditions():
 def calculate_daily_profit(date):
     """Calculate total profit for a specific date from BigQuery"""
     try:
-        from utils.bigquery_database import BigQueryDatabase
-        db = BigQueryDatabase()
+        db = bot_core.db
         
         # Query BigQuery for trades on the specific date
         start_datetime = datetime.combine(date, datetime.min.time())
@@ -760,7 +928,7 @@ def display_automation_status():
     bot_core.display_performance_summary()
 
 def run_bot(interval=900):  # Default to 15 minutes (900 seconds)
-    """Main bot loop"""
+    """Main bot loop, woken on candle closes (each combination at most once per interval)"""
     try:
         # Load existing trade history at startup
         global trade_history
@@ -775,7 +943,20 @@ def run_bot(interval=900):  # Default to 15 minutes (900 seconds)
         # Initialize cycle counter
         cycle_count = 0
         
-        while True:
+        if account_state is not None:
+            account_state.start()
+        
+        # Candle-close scheduler on the exchange clock, shared with the candle buffer
+        scheduler = CandleScheduler(ACTIVE_TRADING_COMBOS, client, min_interval=interval)
+        bot_core.candle_buffer.clock = scheduler.time
+        # Fetch only the candles and indicators the strategies declared
+        bot_core.plan_lookback(ACTIVE_TRADING_COMBOS)
+        
+        while not stop_requested.is_set():
+            # Sleep until the next candle close and analyze only the combinations that just closed
+            due = scheduler.wait(should_stop=stop_requested.is_set)
+            if not due:
+                continue
             cycle_count += 1
             current_time = datetime.now()
             
@@ -784,19 +965,18 @@ def run_bot(interval=900):  # Default to 15 minutes (900 seconds)
             
             logger.info(f"=== CYCLE {cycle_count} - {current_time.strftime('%Y-%m-%d %H:%M:%S')} ===")
             logger.info(f"Trading Status: {'🟢 ENABLED' if trading_enabled else '🔴 DISABLED'}")
-            logger.info(f"Next cycle in {interval/60:.1f} minutes")
+            logger.info(f"Combinations due: {len(due)}")
+            
+            # Exits already happened on the exchange; only the bookkeeping waits for the cycle
+            record_oco_exits()
             
             # Only execute trades if enabled
             if trading_enabled:
-                all_data, all_signals = analyze_market()
+                all_data, all_signals = analyze_market(due)
                 if all_data and all_signals:
                     try:
+                        # Saves and displays the updated performance once the cycle's trades are in
                         execute_trades(all_signals, all_data)
-                        
-                        # Display updated performance after trades
-                        display_performance_summary()
-                        display_strategy_performance()
-                        display_pair_performance()
                     except Exception as e:
                         logger.error(f"Error executing trades: {e}")
                         # Provide more detailed error information
@@ -805,15 +985,13 @@ def run_bot(interval=900):  # Default to 15 minutes (900 seconds)
                         # Continue running even if there's an error with one trade
             else:
                 # Still analyze market but don't execute trades
-                all_data, all_signals = analyze_market()
+                all_data, all_signals = analyze_market(due)
                 if all_data and all_signals:
                     logger.info("Trading disabled - analyzing market only")
             
             # Save trade history periodically
             save_trade_history()
             
-            time.sleep(interval)
-            
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
         # Save final state and display final performance
@@ -825,6 +1003,17 @@ def run_bot(interval=900):  # Default to 15 minutes (900 seconds)
         logger.error(f"Error in main loop: {e}")
         # Save state on error
         save_trade_history()
+    finally:
+        if order_pipeline is not None:
+            order_pipeline.stop()
+        if trade_journal is not None:
+            trade_journal.close()
+        if account_state is not None:
+            account_state.stop()
+
+def stop():
+    """Make run_bot return after the current cycle (state is saved on the way out)"""
+    stop_requested.set()
 
 def debug_trade_history():
     """Debug function to print out trade history structure"""
@@ -851,10 +1040,10 @@ def debug_trade_history():
 if __name__ == "__main__":
     # Display current prices
     print("Current Crypto Prices:")
+    prices = PriceSnapshot.take(client, symbols.values())
     for coin, symbol in symbols.items():
         try:
-            price = client.get_symbol_ticker(symbol=symbol)
-            print(f"{coin}: ${float(price['price']):.2f}")
+            print(f"{coin}: ${prices.price(symbol):.2f}")
         except Exception as e:
             print(f"Error getting price for {coin}: {e}")
     
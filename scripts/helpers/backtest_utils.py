@@ -6,8 +6,13 @@ from utils.indicators import calculate_rsi, calculate_ema, calculate_macd, calcu
 
 logger = logging.getLogger(__name__)
 
-def prepare_data(df):
-    """Prepare data for backtesting by calculating all necessary indicators"""
+def prepare_data(df, indicators=None):
+    """
+    Prepare data for backtesting by calculating all necessary indicators
+    
+    indicators: Names to compute ('rsi', 'macd', 'bollinger', 'atr', 'sma_20', 'sma_50', 'sma_200',
+                'price_change', 'volume_change'); all if None
+    """
     # Check if timestamp is already the index and converted to datetime
     if df.index.name == 'timestamp' and pd.api.types.is_datetime64_any_dtype(df.index):
         # Timestamp is already the index and converted, no need to process it
@@ -17,20 +22,29 @@ def prepare_data(df):
         if 'timestamp' in df.columns:
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
     
+    def wanted(name):
+        return indicators is None or name in indicators
+    
     # Calculate technical indicators
-    df['rsi'] = calculate_rsi(df['close'])
-    df['macd'], df['signal'], df['histogram'] = calculate_macd(df['close'])
-    df['upper_band'], df['middle_band'], df['lower_band'] = calculate_bollinger_bands(df['close'])
-    df['atr'] = calculate_atr(df['high'], df['low'], df['close'])
+    if wanted('rsi'):
+        df['rsi'] = calculate_rsi(df['close'])
+    if wanted('macd'):
+        df['macd'], df['signal'], df['histogram'] = calculate_macd(df['close'])
+    if wanted('bollinger'):
+        df['upper_band'], df['middle_band'], df['lower_band'] = calculate_bollinger_bands(df['close'])
+    if wanted('atr'):
+        df['atr'] = calculate_atr(df['high'], df['low'], df['close'])
     
     # Calculate moving averages
-    df['sma_20'] = df['close'].rolling(window=20).mean()
-    df['sma_50'] = df['close'].rolling(window=50).mean()
-    df['sma_200'] = df['close'].rolling(window=200).mean()
+    for period in (20, 50, 200):
+        if wanted(f'sma_{period}'):
+            df[f'sma_{period}'] = df['close'].rolling(window=period).mean()
     
     # Calculate price changes
-    df['price_change'] = df['close'].pct_change()
-    df['volume_change'] = df['volume'].pct_change()
+    if wanted('price_change'):
+        df['price_change'] = df['close'].pct_change()
+    if wanted('volume_change'):
+        df['volume_change'] = df['volume'].pct_change()
     
     return df
 
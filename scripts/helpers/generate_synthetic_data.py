@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic candles into the local candle store
+
+Usage:
+    python scripts/helpers/generate_synthetic_data.py --symbols BTCUSDT ETHUSDT --bars 100000
+    python scripts/helpers/generate_synthetic_data.py --model mixed --correlation 0.6 --timeframes 15m 1h 4h 1d
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+
+# Add the root directory to Python path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+
+from utils.candle_store import CandleStore, DEFAULT_CANDLE_DIR
+from utils.synthetic_data import generate_market, resample_candles, emit_to_store, DEFAULT_REGIMES, TIMEFRAME_MS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Market dynamics presets
+MODELS = {
+    'gbm': {},
+    'regime': {'regimes': DEFAULT_REGIMES, 'regime_duration': 2000},
+    'garch': {'vol_persistence': 0.98, 'vol_of_vol': 0.15},
+    'jump': {'jump_intensity': 0.002, 'jump_mean': 0.0, 'jump_std': 0.04},
+    'mixed': {'regimes': DEFAULT_REGIMES, 'regime_duration': 2000, 'vol_persistence': 0.98,
+              'vol_of_vol': 0.15, 'jump_intensity': 0.002, 'jump_std': 0.04}
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic candles into the local candle store')
+    parser.add_argument('--symbols', nargs='+', default=['BTCUSDT', 'ETHUSDT', 'SOLUSDT'], help='Symbols to generate')
+    parser.add_argument('--bars', type=int, default=100_000, help='Candles per symbol at the base timeframe')
+    parser.add_argument('--timeframes', nargs='+', default=['15m', '30m', '1h', '2h', '4h', '1d'],
+                        help='Timeframes to store; the shortest is generated, the rest are resampled from it')
+    parser.add_argument('--model', choices=list(MODELS), default='mixed', help='Market dynamics (default: mixed)')
+    parser.add_argument('--volatility', type=float, default=0.006, help='Base volatility per bar (default: 0.006)')
+    parser.add_argument('--correlation', type=float, default=0.0, help='Cross-symbol shock correlation (default: 0)')
+    parser.add_argument('--seed', type=int, default=42, help='Market seed (default: 42)')
+    parser.add_argument('--store-dir', default=DEFAULT_CANDLE_DIR, help=f'Candle store directory (default: {DEFAULT_CANDLE_DIR})')
+
+    args = parser.parse_args()
+
+    timeframes = sorted(args.timeframes, key=lambda tf: TIMEFRAME_MS[tf])
+    base_timeframe = timeframes[0]
+    store = CandleStore(args.store_dir)
+
+    start = time.perf_counter()
+    frames = generate_market(args.symbols, args.bars, timeframe=base_timeframe, seed=args.seed,
+                             correlation=args.correlation, volatility=args.volatility, **MODELS[args.model])
+    logger.info(f"Generated {args.bars * len(args.symbols):,} {base_timeframe} candles in {time.perf_counter() - start:.2f}s")
+
+    emit_to_store(store, frames, base_timeframe)
+    for timeframe in timeframes[1:]:
+        emit_to_store(store, {symbol: resample_candles(df, timeframe) for symbol, df in frames.items()}, timeframe)
+
+    logger.info(f"Candle store now holds {len(store.list_markets())} markets in {args.store_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Trade History Backups
+
+Lists, restores and imports the compacted trade history backups
+(utils/history_backup.py). 'import' folds the old full-copy
+trade_history_backup_*.json files into bases and deltas.
+
+Usage:
+    python scripts/helpers/history_backups.py list
+    python scripts/helpers/history_backups.py restore --at "2025-08-08 10:00" --output restored.json
+    python scripts/helpers/history_backups.py import --remove
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+import logging
+from datetime import datetime
+
+# Add the root directory to Python path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+
+from utils.history_backup import HistoryBackup
+from config.storage_config import HISTORY_BACKUP_DIR
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compacted trade history backups')
+    parser.add_argument('command', choices=['list', 'restore', 'import'])
+    parser.add_argument('--name', default='trade_history', help='History name (trade_history, prod_trade_history)')
+    parser.add_argument('--dir', default=HISTORY_BACKUP_DIR, help='Backup directory')
+    parser.add_argument('--at', type=datetime.fromisoformat, help='restore: point in time (default: latest)')
+    parser.add_argument('--output', default='data/history/trade_history_restored.json', help='restore: output file')
+    parser.add_argument('--files', default='data/history/trade_history_backup_*.json', help='import: files to fold in')
+    parser.add_argument('--remove', action='store_true', help='import: delete each file once imported')
+    args = parser.parse_args()
+
+    backup = HistoryBackup(args.name, directory=args.dir)
+
+    if args.command == 'list':
+        for when, path in backup.bases():
+            print(f"{when:%Y-%m-%d %H:%M:%S}  {os.path.basename(path)}")
+        points = backup.points()
+        if points:
+            print(f"{len(points)} restorable points from {points[0]:%Y-%m-%d %H:%M:%S} to {points[-1]:%Y-%m-%d %H:%M:%S}")
+        else:
+            print("No backups")
+    elif args.command == 'restore':
+        history = backup.restore(args.at)
+        if history is None:
+            logger.error("No backup covers that time")
+            sys.exit(1)
+        with open(args.output, 'w') as f:
+            json.dump({'trade_history': history, 'last_updated': datetime.now().isoformat()}, f, indent=2)
+        logger.info(f"Restored trade history written to {args.output}")
+    else:
+        backup.import_files(glob.glob(args.files), remove=args.remove)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,14 +9,16 @@ This script demonstrates how to run the complete trading bot system:
 3. Production Bot - runs only when conditions are met
 
 Usage:
-    python scripts/run_bot_system.py --mode monitor    # Start daily monitoring
-    python scripts/run_bot_system.py --mode test       # Start test bot
-    python scripts/run_bot_system.py --mode prod       # Start production bot
-    python scripts/run_bot_system.py --mode all        # Start all components
+    python scripts/helpers/run_bot_system.py --mode monitor    # Start daily monitoring
+    python scripts/helpers/run_bot_system.py --mode test       # Start test bot
+    python scripts/helpers/run_bot_system.py --mode prod       # Start production bot
+    python scripts/helpers/run_bot_system.py --mode all        # Start all components
+    python scripts/helpers/run_bot_system.py --mode inprocess  # Monitor, profit-streak and test bots in one process
 """
 
 import os
 import sys
+import signal
 import subprocess
 import time
 import argparse
@@ -24,11 +26,12 @@ import logging
 from datetime import datetime
 
 # Add the root directory to Python path
-root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.append(root_dir)
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
 
 from utils.bot_core import BotCore
 from config.automation_config import *
+from config.exchange_config import MARKET_DATA_SERVICE_ENABLED
 
 # Configure logging
 logging.basicConfig(
@@ -41,6 +44,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def run_market_data_service():
+    """Start the shared market-data service the bots subscribe to"""
+    logger.info("Starting market data service...")
+    
+    try:
+        cmd = [sys.executable, 'scripts/helpers/run_market_data_service.py']
+        
+        logger.info(f"Running command: {' '.join(cmd)}")
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        
+        logger.info(f"Market data service started with PID: {process.pid}")
+        return process
+        
+    except Exception as e:
+        logger.error(f"Failed to start market data service: {e}")
+        return None
+
 def run_daily_monitor():
     """Start the daily monitoring bot (monitorBot)"""
     logger.info("Starting daily monitoring bot...")
@@ -49,7 +69,7 @@ def run_daily_monitor():
         # Run monitorBot in comprehensive monitoring mode
         cmd = [
             sys.executable, 
-            'scripts/monitorBot.py', 
+            'scripts/bots/monitorBot.py', 
             '--schedule', 'comprehensive'
         ]
         
@@ -69,7 +89,7 @@ def run_test_bot():
     
     try:
         # Run testTradingBot
-        cmd = [sys.executable, 'scripts/testTradingBot.py']
+        cmd = [sys.executable, 'scripts/bots/testTradingBot.py']
         
         logger.info(f"Running command: {' '.join(cmd)}")
         process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
@@ -87,7 +107,7 @@ def run_prod_bot():
     
     try:
         # Run prodTradingBot
-        cmd = [sys.executable, 'scripts/prodTradingBot.py']
+        cmd = [sys.executable, 'scripts/bots/prodTradingBot.py']
         
         logger.info(f"Running command: {' '.join(cmd)}")
         process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
@@ -99,6 +119,28 @@ def run_prod_bot():
         logger.error(f"Failed to start production bot: {e}")
         return None
 
+def run_in_process():
+    """Host the monitor, profit-streak and test bots as threads of this process"""
+    from utils.bot_runtime import BotRuntime
+    
+    # Shared client, database and market data must exist before the bots create their cores
+    runtime = BotRuntime().activate()
+    
+    from scripts.bots.monitorBot import MonitorBot
+    from scripts.bots.profitStreakBot import ProfitStreakBot
+    import scripts.bots.testTradingBot as test_bot
+    
+    monitor_bot = MonitorBot()
+    profit_streak_bot = ProfitStreakBot()
+    runtime.add('monitor', lambda: monitor_bot.run_schedule_monitor('comprehensive'), monitor_bot.stop)
+    runtime.add('profit_streak', profit_streak_bot.run_profit_streak_trading, profit_streak_bot.stop)
+    runtime.add('test', lambda: test_bot.run_bot(interval=900), test_bot.stop)
+    
+    # The bot modules install their own handlers on import; the runtime stops them all
+    signal.signal(signal.SIGTERM, lambda signum, frame: runtime.request_stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: runtime.request_stop())
+    runtime.run_forever()
+
 def check_streak_conditions():
     """Check if trading should be enabled based on streak conditions"""
     try:
@@ -175,7 +217,7 @@ def monitor_and_control():
 
 def main():
     parser = argparse.ArgumentParser(description='Complete Bot System Runner')
-    parser.add_argument('--mode', choices=['monitor', 'test', 'prod', 'all', 'control'], 
+    parser.add_argument('--mode', choices=['monitor', 'test', 'prod', 'all', 'inprocess', 'control'], 
                        default='control', help='Run mode')
     parser.add_argument('--monitor-interval', type=int, default=3600,
                        help='Monitor interval in seconds (default: 3600)')
@@ -221,6 +263,11 @@ def main():
         # Run all components
         processes = {}
         
+        # Start the market data service first: the bots subscribe to it instead of fetching
+        if MARKET_DATA_SERVICE_ENABLED:
+            processes['market_data'] = run_market_data_service()
+            time.sleep(5)  # Give the service time to listen
+        
         # Start daily monitor
         processes['monitor'] = run_daily_monitor()
         time.sleep(5)  # Give monitor time to start
@@ -235,9 +282,13 @@ def main():
         try:
             # Wait for all processes
             for name, process in processes.items():
-                if process:
+                if process and name != 'market_data':
                     logger.info(f"Waiting for {name} process...")
                     process.wait()
+            market_data = processes.get('market_data')
+            if market_data and market_data.poll() is None:
+                market_data.terminate()
+                market_data.wait()
         except KeyboardInterrupt:
             logger.info("Shutting down all processes...")
             for name, process in processes.items():
@@ -245,6 +296,10 @@ def main():
                     process.terminate()
                     process.wait()
     
+    elif args.mode == 'inprocess':
+        # All bots in this process: one set of imports, clients and market data
+        run_in_process()
+    
     elif args.mode == 'control':
         # Run the intelligent controller
         monitor_and_control()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Market Data Service Runner
+
+Runs the shared market-data service (utils/market_data_service.py): one
+process streams klines and computes indicators for every bot on the host.
+Bots use it with MARKET_DATA_SERVICE_ENABLED=true and subscribe to the
+markets they trade; --markets starts streaming some before any bot connects.
+
+Usage:
+    python scripts/helpers/run_market_data_service.py
+    python scripts/helpers/run_market_data_service.py --markets BTCUSDT:1h,ETHUSDT:15m
+"""
+
+import os
+import sys
+import signal
+import argparse
+import logging
+
+# Add the root directory to Python path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+
+from utils.exchange_client import create_client
+from utils.market_data_service import MarketDataService, default_socket_path
+from config.exchange_config import MARKET_DATA_HISTORY
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def parse_markets(value: str):
+    """'BTCUSDT:1h,ETHUSDT:15m' -> [('BTCUSDT', '1h'), ('ETHUSDT', '15m')]"""
+    markets = []
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        symbol, _, timeframe = item.partition(':')
+        if not timeframe:
+            raise argparse.ArgumentTypeError(f"Expected SYMBOL:TIMEFRAME, got '{item}'")
+        markets.append((symbol.upper(), timeframe))
+    return markets
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shared market-data service for all bot processes')
+    parser.add_argument('--socket', default=default_socket_path(), help='Unix socket to listen on')
+    parser.add_argument('--history', type=int, default=MARKET_DATA_HISTORY,
+                        help='Closed candles kept (and indicators computed over) per market')
+    parser.add_argument('--markets', type=parse_markets, default=[],
+                        help='Markets to stream from the start, e.g. BTCUSDT:1h,ETHUSDT:15m')
+    parser.add_argument('--log-interval', type=float, default=300, help='Seconds between stats logs')
+    args = parser.parse_args()
+
+    service = MarketDataService(create_client(), socket_path=args.socket, history=args.history)
+    signal.signal(signal.SIGTERM, lambda signum, frame: service.request_stop())
+    service.start()
+    if args.markets:
+        service.add_markets(args.markets)
+    service.serve_forever(log_interval=args.log_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,72 +2,79 @@ from binance.client import Client
 from binance.exceptions import BinanceAPIException
 import logging
 import math
+from datetime import datetime
+
+from utils.exchange_info_cache import get_exchange_info_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class TradeExecutor:
-    def __init__(self, client, symbol, test_mode=True):
+    def __init__(self, client, symbol, test_mode=True, exchange_info=None, account_state=None, exit_tracker=None):
         self.client = client
         self.symbol = symbol
         self.test_mode = test_mode
         
-        # Get symbol info for proper quantity formatting
+        # Balances from the user data stream (utils/account_state.py) instead of get_account() per order
+        self.account_state = account_state
+        
+        # Exchange-side OCO exits are registered here (utils/oco_exits.py)
+        self.exit_tracker = exit_tracker
+        
+        # Trading rules come from the process-wide exchange info cache (one download for all executors)
+        self.exchange_info = exchange_info or get_exchange_info_cache(client)
         self.symbol_info = self._get_symbol_info()
     
     def _get_symbol_info(self):
         """Get trading rules for this symbol"""
-        try:
-            exchange_info = self.client.get_exchange_info()
-            for symbol_info in exchange_info['symbols']:
-                if symbol_info['symbol'] == self.symbol:
-                    return symbol_info
-            return None
-        except BinanceAPIException as e:
-            logger.error(f"Error getting symbol info: {e}")
-            return None
+        symbol_info = self.exchange_info.get_symbol_info(self.symbol)
+        if symbol_info is None:
+            logger.error(f"No exchange info for {self.symbol}")
+        return symbol_info
     
     def _format_quantity(self, quantity):
         """Format quantity according to symbol's lot size rules"""
-        if self.symbol_info is None:
-            # If we can't get symbol info, use default formatting (6 decimal places)
-            return "{:.6f}".format(quantity).rstrip('0').rstrip('.')
-        
-        # Find the LOT_SIZE filter
-        lot_size = None
-        for filter_item in self.symbol_info['filters']:
-            if filter_item['filterType'] == 'LOT_SIZE':
-                lot_size = filter_item
-                break
+        # LOT_SIZE step, precision and minimum, precomputed by the cache
+        lot_size = self.exchange_info.get_lot_size(self.symbol)
         
         if lot_size is None:
-            # Default to 6 decimal places if we can't find the filter
+            # If we can't get the lot size rules, use default formatting (6 decimal places)
             return "{:.6f}".format(quantity).rstrip('0').rstrip('.')
         
-        # Calculate step size precision
-        step_size = float(lot_size['stepSize'])
-        precision = 0
-        if '.' in lot_size['stepSize']:
-            precision = len(lot_size['stepSize'].split('.')[1].rstrip('0'))
+        precision = lot_size['precision']
         
         # Round quantity to step size
-        step_size = float(lot_size['stepSize'])
+        step_size = lot_size['step_size']
         quantity = math.floor(quantity / step_size) * step_size
         
         # Format to correct precision
         formatted_qty = "{:.{}f}".format(quantity, precision)
         
         # Check minimum quantity
-        min_qty = float(lot_size['minQty'])
+        min_qty = lot_size['min_qty']
         if quantity < min_qty:
             logger.warning(f"Calculated quantity {quantity} is below minimum {min_qty}, using minimum")
             return "{:.{}f}".format(min_qty, precision)
         
         return formatted_qty
     
+    def _format_price(self, price):
+        """Format price according to symbol's tick size"""
+        price_filter = self.exchange_info.get_filter(self.symbol, 'PRICE_FILTER')
+        
+        if price_filter is None:
+            return "{:.8f}".format(price).rstrip('0').rstrip('.')
+        
+        tick = price_filter['tickSize']
+        precision = len(tick.split('.')[1].rstrip('0')) if '.' in tick else 0
+        tick_size = float(tick)
+        return "{:.{}f}".format(round(price / tick_size) * tick_size, precision)
+    
     def get_account_balance(self, asset='USDT'):
         """Get available balance for a specific asset"""
+        if self.account_state is not None:
+            return self.account_state.get_balance(asset)
         try:
             account = self.client.get_account()
             for balance in account['balances']:
@@ -95,11 +102,6 @@ class TradeExecutor:
                 logger.info(f"TEST ORDER: {self.symbol} {side} {formatted_quantity}")
                 return order
             
-            # Get current price for value calculation
-            ticker = self.client.get_symbol_ticker(symbol=self.symbol)
-            current_price = float(ticker['price'])
-            value_usd = current_price * float(formatted_quantity)
-            
             # Place actual order
             order = self.client.create_order(
                 symbol=self.symbol,
@@ -108,7 +110,8 @@ class TradeExecutor:
                 quantity=formatted_quantity
             )
             
-            # Log concise order info
+            # Log concise order info (the fill's quote amount, no extra ticker request)
+            value_usd = float(order.get('cummulativeQuoteQty', 0))
             status = order.get('status', 'UNKNOWN')
             logger.info(f"{self.symbol} {side} {formatted_quantity} (${value_usd:.2f}) - {status}")
             
@@ -117,6 +120,12 @@ class TradeExecutor:
             logger.error(f"Error placing {side} order for {self.symbol}: {e}")
             return None
     
+    def submit_market_order(self, pipeline, side, quantity, strategy, candle_time, callback=None):
+        """Queue a market order on an OrderPipeline instead of placing it inline (returns its Future)"""
+        formatted_quantity = self._format_quantity(quantity)
+        return pipeline.submit(self.symbol, side, formatted_quantity, strategy, candle_time,
+                               callback=callback, test=self.test_mode)
+    
     def calculate_position_size(self, price, risk_percent=1.0, stop_loss_percent=2.0):
         """Calculate position size based on risk parameters"""
         usdt_balance = self.get_account_balance('USDT')
@@ -193,4 +202,98 @@ class TradeExecutor:
                 
         except BinanceAPIException as e:
             logger.error(f"Order failed: {e}")
-            return None
\ No newline at end of file
+            return None
+    
+    def place_market_order_with_oco(self, side, quantity, stop_loss_pct=0.02, take_profit_pct=0.06,
+                                    stop_limit_buffer=0.005, strategy=None):
+        """Place a market order, then an exchange-side OCO exit (take-profit limit + stop-limit)"""
+        try:
+            formatted_quantity = self._format_quantity(quantity)
+            
+            if self.test_mode:
+                # No test endpoint for OCOs: validate the entry only
+                self.client.create_test_order(
+                    symbol=self.symbol,
+                    side=side,
+                    type='MARKET',
+                    quantity=formatted_quantity
+                )
+                logger.info(f"TEST ORDER: {side} {formatted_quantity} {self.symbol} with OCO exit "
+                            f"(SL {stop_loss_pct:.1%}, TP {take_profit_pct:.1%})")
+                return {"status": "TEST", "side": side, "quantity": formatted_quantity}
+            
+            order = self.client.create_order(
+                symbol=self.symbol,
+                side=side,
+                type='MARKET',
+                quantity=formatted_quantity
+            )
+            
+            fills = order.get('fills', [])
+            executed_qty = float(order.get('executedQty', 0))
+            if not fills or executed_qty <= 0:
+                logger.warning(f"No fill information for {self.symbol} {side}, no OCO exit placed")
+                return {**order, 'oco': None}
+            
+            # Average entry price, and the quantity actually held (commission paid in the base asset is gone)
+            total_qty = sum(float(fill['qty']) for fill in fills)
+            avg_price = sum(float(fill['qty']) * float(fill['price']) for fill in fills) / total_qty
+            exit_qty = executed_qty
+            if side == 'BUY' and self.symbol_info is not None:
+                base_asset = self.symbol_info['baseAsset']
+                exit_qty -= sum(float(fill['commission']) for fill in fills if fill['commissionAsset'] == base_asset)
+            
+            oco = self.place_oco_exit(side, exit_qty, avg_price, stop_loss_pct, take_profit_pct, stop_limit_buffer)
+            if oco is None:
+                logger.warning(f"⚠️ {self.symbol} position has no exchange-side exit")
+            elif self.exit_tracker is not None:
+                # Same fields as a position from scripts/helpers/trade_utils.execute_trade
+                self.exit_tracker.track(oco, {
+                    'symbol': self.symbol,
+                    'type': 'LONG' if side == 'BUY' else 'SHORT',
+                    'entry_price': avg_price,
+                    'entry_time': datetime.now(),
+                    'position_size': float(self._format_quantity(exit_qty)),
+                    'strategy': strategy,
+                    'stop_loss': avg_price * (1 - stop_loss_pct) if side == 'BUY' else avg_price * (1 + stop_loss_pct),
+                    'take_profit': avg_price * (1 + take_profit_pct) if side == 'BUY' else avg_price * (1 - take_profit_pct),
+                    'entry_order_id': order['orderId']
+                })
+            return {**order, 'oco': oco}
+        
+        except Exception as e:
+            logger.error(f"Error placing {side} order with OCO exit for {self.symbol}: {e}")
+            return None
+    
+    def place_oco_exit(self, entry_side, quantity, entry_price, stop_loss_pct=0.02, take_profit_pct=0.06,
+                       stop_limit_buffer=0.005):
+        """Place the OCO closing a position: take-profit LIMIT_MAKER and STOP_LOSS_LIMIT around the entry price"""
+        formatted_quantity = self._format_quantity(quantity)
+        
+        if entry_side == 'BUY':
+            # Long: sell above at the target, stop below (the stop limit a bit lower so it still fills on a gap)
+            take_profit = self._format_price(entry_price * (1 + take_profit_pct))
+            stop_price = self._format_price(entry_price * (1 - stop_loss_pct))
+            stop_limit = self._format_price(entry_price * (1 - stop_loss_pct) * (1 - stop_limit_buffer))
+            params = dict(side='SELL',
+                          aboveType='LIMIT_MAKER', abovePrice=take_profit,
+                          belowType='STOP_LOSS_LIMIT', belowStopPrice=stop_price, belowPrice=stop_limit,
+                          belowTimeInForce='GTC')
+        else:
+            # Short: buy back below at the target, stop above
+            take_profit = self._format_price(entry_price * (1 - take_profit_pct))
+            stop_price = self._format_price(entry_price * (1 + stop_loss_pct))
+            stop_limit = self._format_price(entry_price * (1 + stop_loss_pct) * (1 + stop_limit_buffer))
+            params = dict(side='BUY',
+                          aboveType='STOP_LOSS_LIMIT', aboveStopPrice=stop_price, abovePrice=stop_limit,
+                          aboveTimeInForce='GTC',
+                          belowType='LIMIT_MAKER', belowPrice=take_profit)
+        
+        try:
+            oco = self.client.create_oco_order(symbol=self.symbol, quantity=formatted_quantity, **params)
+            logger.info(f"OCO exit {self.symbol} {params['side']} {formatted_quantity}: "
+                        f"TP {take_profit}, stop {stop_price} (limit {stop_limit}) - list {oco['orderListId']}")
+            return oco
+        except Exception as e:
+            logger.error(f"Error placing OCO exit for {self.symbol}: {e}")
+            return None
@@ -2,7 +2,53 @@ import numpy as np
 import pandas as pd
 import logging
 
-class MovingAverageCrossover:
+from utils.indicators import INDICATOR_WARMUP
+
+class LatestBarMixin:
+    """
+    Newest-bar evaluation for live trading
+
+    Each strategy declares `lookback`: how many bars (including the newest) its
+    newest signal depends on. generate_latest_signal() runs generate_signals on
+    only lookback + 1 bars (one more for the position diff), so the cost per call
+    does not grow with the history held, and the returned row is the last row of
+    generate_signals(df) (checked by utils/parity.compare_latest).
+    
+    `required_indicators` names the precomputed indicator columns (see
+    utils.indicators.INDICATOR_WARMUP) the strategy reads from df.
+    """
+    
+    required_indicators = ()
+    
+    @property
+    def lookback(self):
+        return None  # Newest bar depends on the whole history
+    
+    @property
+    def warmup_period(self):
+        """
+        Candles needed for the newest signal to equal a full-history evaluation:
+        the lookback + 1 bars plus the warm-up of the indicators they read
+        (None if the newest signal depends on the whole history)
+        """
+        lookback = self.lookback
+        if lookback is None:
+            return None
+        return lookback + 1 + max((INDICATOR_WARMUP[name] for name in self.required_indicators), default=0)
+    
+    def generate_latest_signal(self, df):
+        """Single-row DataFrame: the newest bar of generate_signals(df)"""
+        if len(df) == 0:
+            return pd.DataFrame()
+        lookback = self.lookback
+        if lookback is not None:
+            df = df.iloc[-(lookback + 1):]
+        signals = self.generate_signals(df)
+        if signals is None or signals.empty:
+            return pd.DataFrame()
+        return signals.iloc[-1:]
+
+class MovingAverageCrossover(LatestBarMixin):
     """Enhanced Moving Average Crossover Strategy with trend confirmation"""
     
     def __init__(self, short_window=8, long_window=21, volume_threshold=1.1, trend_period=50):
@@ -23,6 +69,11 @@ class MovingAverageCrossover:
                 self.long_window = 40
                 self.trend_period = 80
     
+    @property
+    def lookback(self):
+        # volatility_ma: long window over a short-window std of returns; momentum_ma: short window over pct_change(short)
+        return max(self.long_window + self.short_window, 2 * self.short_window, self.trend_period)
+    
     def generate_signals(self, df):
         try:
             if len(df) == 0:
@@ -102,9 +153,11 @@ class MovingAverageCrossover:
             self.logger.error(f"Error in MovingAverageCrossover: {e}")
             return pd.DataFrame()
 
-class RSIStrategy:
+class RSIStrategy(LatestBarMixin):
     """Enhanced RSI Mean-Reversion Strategy with timeframe-specific parameters"""
     
+    required_indicators = ('rsi',)
+    
     def __init__(self, timeframe='1h', rsi_period=None, overbought=None, oversold=None, trend_period=None):
         self.timeframe = timeframe
         
@@ -128,6 +181,14 @@ class RSIStrategy:
         self.position = 0
         self.logger = logging.getLogger(__name__)
     
+    @property
+    def lookback(self):
+        trend_period = getattr(self, 'trend_period', None)
+        if trend_period is None:
+            return None  # Unsupported timeframe (generate_signals fails on any length)
+        # volatility_threshold: 20-bar mean of a trend_period std of returns
+        return trend_period + 20
+    
     def generate_signals(self, df):
         try:
             if len(df) == 0:
@@ -202,9 +263,11 @@ class RSIStrategy:
             self.logger.error(f"Error in RSIStrategy: {e}")
             return pd.DataFrame()
 
-class EnhancedRSIStrategy:
+class EnhancedRSIStrategy(LatestBarMixin):
     """Enhanced RSI strategy with relaxed rules"""
     
+    required_indicators = ('rsi',)
+    
     def __init__(self, rsi_period=14, oversold_threshold=40, overbought_threshold=60, 
                  trend_period=5, volatility_period=5, volatility_factor=0.1):
         self.rsi_period = rsi_period
@@ -215,6 +278,10 @@ class EnhancedRSIStrategy:
         self.volatility_factor = volatility_factor
         self.logger = logging.getLogger(__name__)
     
+    @property
+    def lookback(self):
+        return max(self.trend_period, self.volatility_period + 1, 5)
+    
     def generate_signals(self, df):
         try:
             if len(df) == 0:
@@ -273,15 +340,47 @@ class EnhancedRSIStrategy:
             self.logger.error(f"Error in EnhancedRSIStrategy: {e}")
             return pd.DataFrame()
 
-class LiveReactiveRSIStrategy:
+class LiveReactiveRSIStrategy(LatestBarMixin):
     """Strategy that uses RSI with dynamic thresholds based on market conditions"""
     
+    required_indicators = ('rsi',)
+    
     def __init__(self, rsi_period=14, oversold_threshold=30, overbought_threshold=70, volatility_factor=0.02):
         self.rsi_period = rsi_period
         self.oversold_threshold = oversold_threshold
         self.overbought_threshold = overbought_threshold
         self.volatility_factor = volatility_factor
         self.logger = logging.getLogger(__name__)
+    
+    def generate_latest_signal(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Newest bar of generate_signals(data), evaluating the rules for that bar only.
+        The volatility filter compares against the mean volatility of the whole
+        history, so that one series is still computed over all bars.
+        """
+        if data.empty:
+            return pd.DataFrame()
+        missing_columns = [col for col in ['close', 'rsi', 'volume'] if col not in data.columns]
+        if missing_columns:
+            self.logger.error(f"Missing required columns: {missing_columns}")
+            return pd.DataFrame()
+        
+        i = len(data) - 1
+        signal = 0
+        volatility = data['close'].pct_change().rolling(window=10).std()
+        if i >= 1 and not volatility.iloc[i] > 3 * volatility.mean():
+            current_rsi = data['rsi'].iloc[i]
+            current_volume = data['volume'].iloc[i]
+            avg_volume = data['volume'].iloc[max(0, i-20):i+1].mean()
+            if current_rsi < self.oversold_threshold:
+                if current_volume > avg_volume * 1.2:
+                    signal = 1
+            elif current_rsi > self.overbought_threshold:
+                if current_volume > avg_volume * 1.2:
+                    signal = -1
+        
+        # Position is set to the signal directly (no diff)
+        return pd.DataFrame({'signal': [signal], 'position': [signal]}, index=data.index[-1:])
         
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """
@@ -380,7 +479,7 @@ class LiveReactiveRSIStrategy:
             self.logger.error(f"Error in LiveReactiveRSIStrategy: {e}")
             return pd.DataFrame()
 
-class BollingerBandStrategy:
+class BollingerBandStrategy(LatestBarMixin):
     """Enhanced Bollinger Bands Strategy with trend confirmation"""
     
     def __init__(self, strategy_type='breakout', period=20, std_dev=2.0, trend_period=50):
@@ -401,6 +500,11 @@ class BollingerBandStrategy:
                 self.std_dev = 2.4
                 self.trend_period = 80
     
+    @property
+    def lookback(self):
+        # volatility_ma: period mean of a period std of returns
+        return max(2 * self.period, self.trend_period)
+    
     def generate_signals(self, df):
         try:
             if len(df) == 0:
@@ -510,14 +614,21 @@ class BollingerBandStrategy:
             self.logger.error(f"Error in BollingerBandStrategy: {e}")
             return pd.DataFrame()
 
-class RSIDivergenceStrategy:
+class RSIDivergenceStrategy(LatestBarMixin):
     """Strategy that looks for divergences between price and RSI"""
     
+    required_indicators = ('rsi',)
+    
     def __init__(self, rsi_period=14, divergence_threshold=0.1):
         self.rsi_period = rsi_period
         self.divergence_threshold = divergence_threshold
         self.logger = logging.getLogger(__name__)
     
+    @property
+    def lookback(self):
+        # Extrema are confirmed 10 bars later, so the newest two bars never carry a signal
+        return 1
+    
     def _find_local_minima(self, series, window=10):
         """Find local minima in a time series"""
         local_minima = []
@@ -591,7 +702,7 @@ class RSIDivergenceStrategy:
             self.logger.error(f"Error in RSIDivergenceStrategy: {e}")
             return pd.DataFrame()
 
-class MomentumStrategy:
+class MomentumStrategy(LatestBarMixin):
     """Enhanced momentum strategy with trend confirmation"""
     
     def __init__(self, period=14, threshold=0.001, trend_period=50, volatility_period=20):
@@ -612,6 +723,11 @@ class MomentumStrategy:
                 self.threshold = 0.003
                 self.trend_period = 80
     
+    @property
+    def lookback(self):
+        # volatility_ma: two volatility_period windows over pct_change(period); acceleration_ma: period over momentum.diff()
+        return max(2 * self.period + 1, self.trend_period, 2 * self.volatility_period + self.period - 1, 20)
+    
     def generate_signals(self, df):
         try:
             if len(df) == 0:
@@ -701,7 +817,7 @@ class MomentumStrategy:
             self.logger.error(f"Error in MomentumStrategy: {e}")
             return pd.DataFrame()
 
-class TrendFollowingStrategy:
+class TrendFollowingStrategy(LatestBarMixin):
     """Enhanced trend following strategy with multiple timeframe confirmation"""
     
     def __init__(self, short_period=10, long_period=30, threshold=0.001, trend_period=50):
@@ -724,6 +840,11 @@ class TrendFollowingStrategy:
                 self.threshold = 0.003
                 self.trend_period = 80
     
+    @property
+    def lookback(self):
+        # volatility_ma: long window over a short-window std of returns; momentum_ma: short window over pct_change(short)
+        return max(self.long_period + self.short_period, 2 * self.short_period, self.trend_period, 20)
+    
     def generate_signals(self, df):
         try:
             if len(df) == 0:
@@ -823,7 +944,7 @@ class TrendFollowingStrategy:
             return pd.DataFrame()
 
 
-class VWAPStrategy:
+class VWAPStrategy(LatestBarMixin):
     """Volume-Weighted Average Price Strategy - Institutional favorite"""
     
     def __init__(self, period=20, buffer_percent=0.01, volume_threshold=1.2):
@@ -841,6 +962,11 @@ class VWAPStrategy:
                 self.period = 50
                 self.buffer_percent = 0.02
     
+    @property
+    def lookback(self):
+        # vwap_momentum: pct_change(5) of a period VWAP
+        return self.period + 5
+    
     def generate_signals(self, df):
         try:
             if len(df) == 0:
@@ -909,7 +1035,7 @@ class VWAPStrategy:
             return pd.DataFrame()
 
 
-class PriceActionBreakoutStrategy:
+class PriceActionBreakoutStrategy(LatestBarMixin):
     """Simple Price Action Breakout Strategy - Pure price-based, no indicators"""
     
     def __init__(self, breakout_period=20, atr_period=14, atr_multiplier=1.5, volume_threshold=1.3):
@@ -928,6 +1054,11 @@ class PriceActionBreakoutStrategy:
                 self.breakout_period = 50
                 self.atr_multiplier = 2.0
     
+    @property
+    def lookback(self):
+        # atr: atr_period mean of true ranges (each needs the previous close)
+        return max(self.breakout_period, self.atr_period + 1, 4)
+    
     def generate_signals(self, df):
         try:
             if len(df) == 0:
@@ -0,0 +1,313 @@
+"""
+Local account state kept current from the Binance user data stream
+
+Balances (outboundAccountPosition, balanceUpdate) and order updates/fills
+(executionReport) are applied from a background WebSocket thread, so order
+sizing reads balances from memory instead of a REST get_account() per order.
+A REST reconcile runs on start, after every reconnect and periodically; a
+snapshot only overwrites assets whose last stream update is not newer. The
+listen key is kept alive in the background. While the stream is down, reads
+fall back to REST once the last reconcile is older than the reconcile interval.
+"""
+
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Optional, Callable
+
+import websockets
+
+from config.exchange_config import ACCOUNT_RECONCILE_INTERVAL
+from utils.market_stream import BINANCE_STREAM_URL
+
+logger = logging.getLogger(__name__)
+
+# Binance expires listen keys after 60 minutes without a keepalive
+LISTEN_KEY_KEEPALIVE = 30 * 60
+
+
+class AccountState:
+    """Balances, orders and fills from the user data stream, reconciled over REST"""
+
+    def __init__(self, client, url: str = BINANCE_STREAM_URL, reconcile_interval: float = ACCOUNT_RECONCILE_INTERVAL,
+                 keepalive_interval: float = LISTEN_KEY_KEEPALIVE, reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 60.0, max_orders: int = 1000):
+        """
+        Args:
+            client: REST client for listen keys and reconciles (binance Client or FakeBinanceClient)
+            url: Stream base URL (without /ws)
+            reconcile_interval: Seconds between REST get_account reconciles
+            keepalive_interval: Seconds between listen key keepalives
+            reconnect_delay: First reconnect delay in seconds (doubles up to max_reconnect_delay)
+            max_reconnect_delay: Upper bound for reconnect backoff
+            max_orders: Orders (and fills) remembered
+        """
+        self.client = client
+        self.url = url.rstrip('/')
+        self.reconcile_interval = reconcile_interval
+        self.keepalive_interval = keepalive_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_orders = max_orders
+
+        self._balances: Dict[str, Dict[str, float]] = {}
+        self._balance_times: Dict[str, int] = {}
+        self._orders: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        self._fills = deque(maxlen=max_orders)
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._listen_key = None
+        self._last_reconcile = None
+        self._loop = None
+        self._thread = None
+        self._tasks = []
+        self._stopping = False
+        self._connected = threading.Event()
+        self._live = False
+
+        self.stats = {
+            'events': 0,
+            'balance_updates': 0,
+            'executions': 0,
+            'fills': 0,
+            'reconciles': 0,
+            'reconcile_corrections': 0,
+            'rest_fallbacks': 0,
+            'reconnects': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """Register callback(event), called from the stream thread for every user data event"""
+        self._listeners.append(callback)
+
+    def start(self, wait: float = 10.0):
+        """Connect the user data stream in a background thread (balances are reconciled once connected)"""
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run_loop, name='user-data-stream', daemon=True)
+        self._thread.start()
+        if wait and not self._connected.wait(wait):
+            logger.warning(f"⚠️ User data stream not connected after {wait:.0f}s, using REST balances meanwhile")
+            self.reconcile()
+        else:
+            logger.info("🟢 User data stream connected")
+
+    def stop(self, timeout: float = 5.0):
+        """Close the stream, its listen key and the background thread"""
+        self._stopping = True
+        if self._loop is not None and self._loop.is_running():
+            for task in self._tasks:
+                self._loop.call_soon_threadsafe(task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._listen_key is not None:
+            try:
+                self.client.stream_close(self._listen_key)
+            except Exception as e:
+                logger.warning(f"⚠️ Error closing listen key: {e}")
+            self._listen_key = None
+        logger.info("User data stream stopped")
+
+    @property
+    def connected(self) -> bool:
+        return self._live
+
+    def get_balance(self, asset: str = 'USDT') -> float:
+        """Free balance of an asset (REST reconcile first if the stream is down and the data is stale)"""
+        if not self._live and (self._last_reconcile is None or
+                               time.time() - self._last_reconcile >= self.reconcile_interval):
+            self.stats['rest_fallbacks'] += 1
+            self.reconcile()
+        with self._lock:
+            return self._balances.get(asset, {}).get('free', 0.0)
+
+    def get_balances(self) -> Dict[str, Dict[str, float]]:
+        """{asset: {'free', 'locked'}} copy of all known balances"""
+        with self._lock:
+            return {asset: dict(balance) for asset, balance in self._balances.items()}
+
+    def get_order(self, order_id: int) -> Optional[Dict[str, Any]]:
+        """Latest known state of an order from its execution reports"""
+        with self._lock:
+            order = self._orders.get(order_id)
+            return dict(order) if order is not None else None
+
+    def get_fills(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recent fills (oldest first), optionally of one symbol"""
+        with self._lock:
+            return [dict(fill) for fill in self._fills if symbol is None or fill['symbol'] == symbol]
+
+    def reconcile(self) -> bool:
+        """Overwrite balances from a REST get_account() snapshot (keeps stream updates newer than it)"""
+        try:
+            account = self.client.get_account()
+        except Exception as e:
+            logger.error(f"Error reconciling account balances: {e}")
+            return False
+
+        snapshot_ms = int(account.get('updateTime', 0))
+        corrections = 0
+        with self._lock:
+            for balance in account['balances']:
+                asset = balance['asset']
+                if self._balance_times.get(asset, 0) > snapshot_ms:
+                    continue  # The stream already has a newer value
+                free, locked = float(balance['free']), float(balance['locked'])
+                known = self._balances.get(asset)
+                if known is not None and (abs(known['free'] - free) > 1e-8 or abs(known['locked'] - locked) > 1e-8):
+                    corrections += 1
+                self._balances[asset] = {'free': free, 'locked': locked}
+                self._balance_times[asset] = snapshot_ms
+        self._last_reconcile = time.time()
+        self.stats['reconciles'] += 1
+        if corrections:
+            self.stats['reconcile_corrections'] += corrections
+            logger.warning(f"⚠️ Reconcile corrected {corrections} balance(s) the stream had missed")
+        return True
+
+    # ------------------------------------------------------------------
+    # Event handling
+    # ------------------------------------------------------------------
+
+    def apply_event(self, event: Dict[str, Any]):
+        """Apply one user data stream event (also usable to feed events directly, e.g. in tests)"""
+        self.stats['events'] += 1
+        event_type = event.get('e')
+        if event_type == 'outboundAccountPosition':
+            update_ms = int(event.get('u', event.get('E', 0)))
+            with self._lock:
+                for balance in event['B']:
+                    asset = balance['a']
+                    if self._balance_times.get(asset, 0) > update_ms:
+                        continue
+                    self._balances[asset] = {'free': float(balance['f']), 'locked': float(balance['l'])}
+                    self._balance_times[asset] = update_ms
+            self.stats['balance_updates'] += 1
+        elif event_type == 'balanceUpdate':
+            # Deposits/withdrawals/transfers: a delta on the free balance
+            with self._lock:
+                balance = self._balances.setdefault(event['a'], {'free': 0.0, 'locked': 0.0})
+                balance['free'] += float(event['d'])
+                self._balance_times[event['a']] = int(event.get('T', event.get('E', 0)))
+            self.stats['balance_updates'] += 1
+        elif event_type == 'executionReport':
+            self._apply_execution(event)
+
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Error in user data stream listener: {e}")
+
+    def _apply_execution(self, event: Dict[str, Any]):
+        order_id = int(event['i'])
+        with self._lock:
+            self._orders[order_id] = {
+                'symbol': event['s'],
+                'orderId': order_id,
+                'orderListId': int(event.get('g', -1)),
+                'clientOrderId': event['c'],
+                'side': event['S'],
+                'type': event['o'],
+                'status': event['X'],
+                'origQty': float(event['q']),
+                'executedQty': float(event['z']),
+                'cummulativeQuoteQty': float(event['Z']),
+                'updateTime': int(event['T'])
+            }
+            self._orders.move_to_end(order_id)
+            while len(self._orders) > self.max_orders:
+                self._orders.popitem(last=False)
+            if event['x'] == 'TRADE':
+                self._fills.append({
+                    'symbol': event['s'],
+                    'orderId': order_id,
+                    'side': event['S'],
+                    'price': float(event['L']),
+                    'qty': float(event['l']),
+                    'commission': float(event['n']),
+                    'commissionAsset': event['N'],
+                    'time': int(event['T'])
+                })
+                self.stats['fills'] += 1
+        self.stats['executions'] += 1
+
+    # ------------------------------------------------------------------
+    # WebSocket handling
+    # ------------------------------------------------------------------
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._tasks = [self._loop.create_task(self._run_connection()),
+                           self._loop.create_task(self._keepalive()),
+                           self._loop.create_task(self._periodic_reconcile())]
+            self._loop.run_until_complete(asyncio.gather(*self._tasks, return_exceptions=True))
+        finally:
+            self._loop.close()
+
+    async def _run_connection(self):
+        delay = self.reconnect_delay
+        first = True
+
+        while not self._stopping:
+            try:
+                # Binance returns the active key again, or a new one if it expired
+                self._listen_key = await self._loop.run_in_executor(None, self.client.stream_get_listen_key)
+                async with websockets.connect(f"{self.url}/ws/{self._listen_key}", ping_interval=20,
+                                              ping_timeout=20) as ws:
+                    self._live = True
+                    try:
+                        if not first:
+                            self.stats['reconnects'] += 1
+                            logger.info("User data stream reconnected, reconciling balances")
+                        # Snapshot after subscribing, so no event falls between the two
+                        await self._loop.run_in_executor(None, self.reconcile)
+                        first = False
+                        delay = self.reconnect_delay
+                        self._connected.set()
+
+                        async for message in ws:
+                            self._handle_message(message)
+                    finally:
+                        self._live = False
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ User data stream connection error: {e}")
+
+            if self._stopping:
+                break
+            logger.info(f"Reconnecting user data stream in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _keepalive(self):
+        while not self._stopping:
+            await asyncio.sleep(self.keepalive_interval)
+            if self._listen_key is None:
+                continue
+            try:
+                await self._loop.run_in_executor(None, self.client.stream_keepalive, self._listen_key)
+            except Exception as e:
+                logger.warning(f"⚠️ Listen key keepalive failed: {e}")
+
+    async def _periodic_reconcile(self):
+        while not self._stopping:
+            await asyncio.sleep(self.reconcile_interval)
+            await self._loop.run_in_executor(None, self.reconcile)
+
+    def _handle_message(self, message):
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            logger.warning(f"⚠️ Invalid user data stream message: {message[:100]}")
+            return
+        self.apply_event(payload.get('data', payload))
@@ -0,0 +1,183 @@
+"""
+Concurrent market data fetching and signal evaluation for live bot cycles
+
+All unique markets of a cycle are fetched at once (bounded by a semaphore)
+on a background asyncio loop: through python-binance's AsyncClient for the
+real exchange, or the buffer's own fetch in a thread pool otherwise
+(FakeBinanceClient, KlineStream-backed buffers, the shared market-data
+feed). Indicator and signal computation run in the same thread pool. Every
+combination gets its own outcome or exception, so a failing market or
+strategy never aborts the rest of the cycle.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Any, Callable, Optional
+
+import pandas as pd
+from binance.client import Client
+
+from utils.candle_buffer import CandleBuffer
+from utils.market_stream import klines_to_frame
+from config.exchange_config import ASYNC_CONCURRENCY, ASYNC_WORKERS
+
+logger = logging.getLogger(__name__)
+
+Combo = Tuple[str, str, str]
+
+
+class AsyncMarketData:
+    """Fetch a cycle's markets concurrently and evaluate its combinations in a thread pool"""
+
+    def __init__(self, client, buffer: CandleBuffer, concurrency: int = ASYNC_CONCURRENCY,
+                 workers: int = ASYNC_WORKERS, async_client=None, market_data_feed=None):
+        """
+        Args:
+            client: Sync exchange client (binance Client or FakeBinanceClient)
+            buffer: REST candle buffer to keep current (e.g. BotCore.candle_buffer)
+            concurrency: Maximum kline requests in flight
+            workers: Threads for sync requests, indicators and signal generation
+            async_client: AsyncClient to use (created on start() for a real binance Client)
+            market_data_feed: Shared market-data feed the buffer reads from (e.g. BotCore.market_data_feed);
+                              while set, refreshes go through buffer.fetch instead of the exchange
+        """
+        self.client = client
+        self.buffer = buffer
+        self.concurrency = concurrency
+        self.async_client = async_client
+        self.market_data_feed = market_data_feed
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='market-data')
+        self._loop = None
+        self._thread = None
+        self._owns_async_client = False
+        self.stats = {'cycles': 0, 'requests': 0, 'errors': 0, 'last_cycle_seconds': 0.0}
+
+    def start(self):
+        """Start the event loop thread (and the AsyncClient for the real exchange)"""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='async-market-data', daemon=True)
+        self._thread.start()
+
+        # The aiohttp session stays bound to this loop, so connections are reused across cycles
+        if self.async_client is None and self.market_data_feed is None and isinstance(self.client, Client):
+            from utils.exchange_client import create_async_client
+            self.async_client = self._run(create_async_client())
+            self._owns_async_client = True
+        mode = 'AsyncClient' if self.async_client is not None and self.market_data_feed is None else 'thread pool'
+        logger.info(f"🟢 Async market data started ({mode}, concurrency {self.concurrency})")
+
+    def stop(self, timeout: float = 5.0):
+        """Close the AsyncClient, stop the loop thread and the thread pool"""
+        if self._loop is None:
+            return
+        if self._owns_async_client and self.async_client is not None:
+            try:
+                self._run(self.async_client.close_connection(), timeout)
+            except Exception as e:
+                logger.warning(f"⚠️ Error closing AsyncClient: {e}")
+            self.async_client = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._loop.close()
+        self._loop = None
+        self.executor.shutdown(wait=False)
+
+    def evaluate(self, combinations: List[Combo], generate: Callable[[pd.DataFrame, str], pd.DataFrame],
+                 buffer: Optional[CandleBuffer] = None, timeout: Optional[float] = None) -> Dict[Combo, Any]:
+        """
+        Refresh the markets of a cycle concurrently and generate every combination's signals
+
+        Args:
+            combinations: (symbol, strategy_name, timeframe) tuples
+            generate: generate(df, strategy_name) -> signals (e.g. BotCore.evaluate_latest_signal)
+            buffer: Candle buffer to read (default: the REST buffer; any other buffer,
+                    e.g. a KlineStream one, is refreshed through its own fetch)
+            timeout: Seconds to wait for the whole cycle
+
+        Returns:
+            {combo: (df, signals)} or {combo: exception} for combinations that failed
+        """
+        self.start()
+        started = time.perf_counter()
+        results = self._run(self._evaluate(list(combinations), generate, buffer or self.buffer), timeout)
+        self.stats['cycles'] += 1
+        self.stats['last_cycle_seconds'] = time.perf_counter() - started
+        return results
+
+    def prefetch(self, markets: List[Tuple[str, str]], buffer: Optional[CandleBuffer] = None,
+                 timeout: Optional[float] = None) -> Dict[Tuple[str, str], Optional[Exception]]:
+        """
+        Refresh (symbol, timeframe) markets concurrently without generating signals
+
+        Returns:
+            {market: None or the exception that made its refresh fail}; read the candles with buffer.peek()
+        """
+        self.start()
+        failed = self._run(self._refresh_markets(markets, buffer or self.buffer), timeout)
+        return {market: failed.get(market) for market in markets}
+
+    async def fetch_market_data(self, symbol: str, timeframe: str, limit: int = 100) -> pd.DataFrame:
+        """Kline request -> DataFrame in the BotCore.fetch_market_data layout (Binance intervals match timeframes)"""
+        self.stats['requests'] += 1
+        if self.async_client is not None:
+            klines = await self.async_client.get_klines(symbol=symbol, interval=timeframe, limit=limit)
+        else:
+            loop = asyncio.get_running_loop()
+            klines = await loop.run_in_executor(
+                self.executor, partial(self.client.get_klines, symbol=symbol, interval=timeframe, limit=limit))
+        return klines_to_frame(klines)
+
+    def _run(self, coro, timeout: Optional[float] = None):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    async def _refresh_markets(self, markets: List[Tuple[str, str]], buffer: CandleBuffer) -> Dict[Tuple[str, str], Exception]:
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # The feed serves the buffer's fetch (with its own REST fallback): don't bypass it
+        rest = buffer is self.buffer and self.market_data_feed is None
+
+        async def refresh(symbol: str, timeframe: str):
+            limit = buffer.pending(symbol, timeframe)
+            if limit is None:
+                buffer.stats['hits'] += 1
+                return
+            async with semaphore:
+                if rest:
+                    candles = await self.fetch_market_data(symbol, timeframe, limit)
+                else:
+                    candles = await loop.run_in_executor(self.executor, partial(buffer.fetch, symbol, timeframe, limit=limit))
+            # Indicators are CPU-bound: keep them off the event loop
+            await loop.run_in_executor(self.executor, buffer.update, symbol, timeframe, candles)
+
+        markets = sorted(set(markets))
+        outcomes = await asyncio.gather(*(refresh(*market) for market in markets), return_exceptions=True)
+        failed = {}
+        for market, outcome in zip(markets, outcomes):
+            if isinstance(outcome, Exception):
+                self.stats['errors'] += 1
+                logger.error(f"❌ Error fetching {market[0]} {market[1]}: {outcome}")
+                failed[market] = outcome
+        return failed
+
+    async def _evaluate(self, combinations: List[Combo], generate: Callable[[pd.DataFrame, str], pd.DataFrame],
+                        buffer: CandleBuffer) -> Dict[Combo, Any]:
+        loop = asyncio.get_running_loop()
+        failed = await self._refresh_markets([(symbol, timeframe) for symbol, _, timeframe in combinations], buffer)
+
+        async def run(symbol: str, strategy_name: str, timeframe: str):
+            if (symbol, timeframe) in failed:
+                raise failed[(symbol, timeframe)]
+            df = buffer.peek(symbol, timeframe)
+            if df.empty:
+                return df, pd.DataFrame()
+            signals = await loop.run_in_executor(self.executor, generate, df, strategy_name)
+            return df, signals
+
+        outcomes = await asyncio.gather(*(run(*combo) for combo in combinations), return_exceptions=True)
+        return dict(zip(combinations, outcomes))
@@ -3,20 +3,52 @@ BigQuery database operations for trading data
 """
 
 import os
+import math
+import json
+import hashlib
 import pandas as pd
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
 from typing import List, Dict, Optional, Any
 import time
 
 from google.cloud import bigquery
 from google.oauth2 import service_account
 
+from config.storage_config import BIGQUERY_STREAMING_MAX_ROWS
+
 logger = logging.getLogger(__name__)
 
 # Determine the run name (e.g., 'backTestBot', 'testBot', 'prodBot')
 RUN_NAME = os.getenv('RUN_NAME', 'backTestBot')
 
+# Rows per insertAll request (BigQuery recommends at most 500)
+STREAMING_CHUNK_ROWS = 500
+
+
+def _json_value(value):
+    """A value as insertAll expects it (timestamps as ISO strings, no numpy types or NaN)"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, 'item'):  # numpy scalars
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _json_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: _json_value(value) for key, value in row.items()}
+
+
+def row_insert_id(row: Dict[str, Any]) -> str:
+    """Deterministic insert ID of a row: a retried insert of the same row gets the same ID (created_at aside)"""
+    key = {field: value for field, value in row.items() if field != 'created_at'}
+    digest = hashlib.sha256(json.dumps(_json_row(key), sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:32]
+
 class BigQueryDatabase:
     def __init__(self):
         """Initialize BigQuery client"""
@@ -156,13 +188,41 @@ class BigQueryDatabase:
         
         return prepared_data
 
-    def batch_upload_trades(self, trades_data: List[Dict[str, Any]], batch_size: int = 1000) -> int:
+    def _stream_rows(self, table_id: str, rows: List[Dict[str, Any]]) -> int:
+        """
+        Streaming insert (insertAll) with deterministic insert IDs, so a retried row is deduplicated
+        
+        Note: streamed rows sit in the streaming buffer for a while, where DELETE (clear_trades) cannot reach them.
+        
+        Args:
+            table_id: Table in the dataset
+            rows: Rows to insert
+            
+        Returns:
+            int: Number of rows accepted
+        """
+        table = f"{self.project_id}.{self.dataset_id}.{table_id}"
+        inserted = 0
+        for i in range(0, len(rows), STREAMING_CHUNK_ROWS):
+            chunk = rows[i:i + STREAMING_CHUNK_ROWS]
+            errors = self.client.insert_rows_json(table, [_json_row(row) for row in chunk],
+                                                  row_ids=[row_insert_id(row) for row in chunk])
+            rejected = {error['index'] for error in errors}
+            if errors:
+                logger.error(f"Streaming insert into {table_id} rejected {len(rejected)}/{len(chunk)} rows: "
+                             f"{errors[0].get('errors')}")
+            inserted += len(chunk) - len(rejected)
+        return inserted
+
+    def batch_upload_trades(self, trades_data: List[Dict[str, Any]], batch_size: int = 1000,
+                            streaming: Optional[bool] = None) -> int:
         """
         Upload multiple trades in batches to BigQuery.
         
         Args:
             trades_data (list): List of trade dictionaries to upload
             batch_size (int): Number of trades to upload in each batch
+            streaming (bool): Streaming insert (True) or load jobs (False); None: streaming up to BIGQUERY_STREAMING_MAX_ROWS trades
             
         Returns:
             int: Number of trades successfully uploaded
@@ -171,6 +231,15 @@ class BigQueryDatabase:
             logger.info("No trades to upload")
             return 0
 
+        # Live bots' few rows: streamed (no load job latency or quota); bulk backtest uploads: load jobs
+        if streaming is None:
+            streaming = len(trades_data) <= BIGQUERY_STREAMING_MAX_ROWS
+        if streaming:
+            rows = [self._prepare_trade_data(trade) for trade in trades_data]
+            uploaded_count = self._stream_rows(self.trades_table_id, rows)
+            logger.info(f"Completed streaming insert: {uploaded_count}/{len(rows)} trades uploaded")
+            return uploaded_count
+
         total_trades = len(trades_data)
         uploaded_count = 0
         
@@ -227,6 +296,12 @@ class BigQueryDatabase:
         try:
             prepared_trade = self._prepare_trade_data(trade_data)
             
+            if BIGQUERY_STREAMING_MAX_ROWS > 0:
+                if self._stream_rows(self.trades_table_id, [prepared_trade]) != 1:
+                    raise RuntimeError("Streaming insert rejected the trade")
+                logger.info(f"Successfully added trade for {trade_data['symbol']}")
+                return 1
+            
             # Convert to DataFrame
             df = pd.DataFrame([prepared_trade])
             
@@ -415,6 +490,13 @@ class BigQueryDatabase:
             return 0
         
         try:
+            if len(daily_summary) <= BIGQUERY_STREAMING_MAX_ROWS:
+                saved = self._stream_rows(self.daily_summary_table_id, daily_summary)
+                if saved < len(daily_summary):
+                    raise ValueError(f"Streaming insert rejected {len(daily_summary) - saved} daily summary records")
+                logger.info(f"Saved {saved} daily summary records to BigQuery")
+                return saved
+            
             # Convert to DataFrame
             df = pd.DataFrame(daily_summary)
             
@@ -9,41 +9,62 @@ from datetime import datetime, timedelta
 import logging
 import json
 import time
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterable
 
 from binance.client import Client
 from config.config import API_KEY, API_SECRET, TESTNET, INITIAL_BALANCE
 from config.automation_config import *
 from trading.strategies import *
-from utils.indicators import calculate_rsi, calculate_ema, calculate_macd, calculate_bollinger_bands, calculate_atr
+from utils.indicators import calculate_rsi, calculate_ema, calculate_macd, calculate_bollinger_bands, calculate_atr, compute_indicators
 from scripts.helpers.backtest_utils import prepare_data, calculate_position_size, calculate_fee_adjusted_profit, check_stop_loss_take_profit
 from scripts.helpers.performance_utils import generate_performance_report, save_trade_history, load_trade_history
 from scripts.helpers.trade_utils import execute_trade, update_open_positions
-from utils.bigquery_database import BigQueryDatabase
+from utils.storage_backend import create_database
+from utils.exchange_client import create_client
+from utils.bot_runtime import current_runtime, shared_market_data_feed
+from utils.persistence_queue import get_persistence_queue
+from config.storage_config import PERSISTENCE_QUEUE_ENABLED
+from utils.candle_buffer import CandleBuffer
+from utils.lookback_planner import LookbackPlan, plan_lookback
 
 logger = logging.getLogger(__name__)
 
 class BotCore:
     """Shared core functionality for all trading bots"""
     
-    def __init__(self, bot_type: str, run_name: str):
+    def __init__(self, bot_type: str, run_name: str, client=None, db=None):
         """
         Initialize the bot core
         
         Args:
             bot_type: 'backtest', 'test', or 'prod'
             run_name: Name for this bot run (e.g., 'backTestBot', 'testBot', 'prodBot')
+            client: Optional exchange client (e.g. FakeBinanceClient); created from EXCHANGE_MODE otherwise
+            db: Optional trade database; created from STORAGE_BACKEND otherwise
         """
         self.bot_type = bot_type
         self.run_name = run_name
-        self.client = None
-        self.db = BigQueryDatabase()
+        self.client = client
+        # Bots hosted in one process (utils/bot_runtime.py) share its client and database
+        runtime = current_runtime()
+        if db is None:
+            db = runtime.db if runtime is not None else create_database()
+        self.db = db
+        
+        # Trade and summary writes batched on a background thread instead of one load job each (live bots)
+        self.persistence = get_persistence_queue(db) if PERSISTENCE_QUEUE_ENABLED and bot_type != 'backtest' else None
         
         # Initialize Binance client for live bots
-        if bot_type in ['test', 'prod', 'monitor']:
-            self.client = Client(API_KEY, API_SECRET, testnet=TESTNET)
-            if TESTNET:
-                self.client.API_URL = "https://testnet.binance.vision/api"
+        if self.client is None and bot_type in ['test', 'prod', 'monitor', 'profit_streak']:
+            self.client = runtime.client if runtime is not None else create_client()
+        
+        # Candles and indicator columns from the shared market-data service instead of REST (live bots)
+        self.market_data_feed = shared_market_data_feed() if bot_type != 'backtest' else None
+        
+        # Closed candles + indicators per market, shared by all strategies of a cycle
+        compute = self.market_data_feed.compute if self.market_data_feed is not None else self.calculate_indicators
+        self.candle_buffer = CandleBuffer(self.fetch_market_data, compute, size=100,
+                                          clock=getattr(self.client, 'clock', None))
         
         # Automation state
         self.automation_state = {
@@ -165,6 +186,14 @@ class BotCore:
     def fetch_market_data(self, symbol: str, timeframe: str, limit: int = 100) -> pd.DataFrame:
         """Fetch market data for a symbol and timeframe"""
         try:
+            if self.market_data_feed is not None:
+                # Served by the market-data service; REST only while it is unreachable
+                plan = self.candle_buffer.plan
+                indicators = plan.indicators(symbol, timeframe) if plan is not None else None
+                df = self.market_data_feed.get_candles(symbol, timeframe, limit=limit, indicators=indicators)
+                if not df.empty:
+                    return df
+            
             # Map timeframe strings to Binance intervals
             interval_map = {
                 '1m': Client.KLINE_INTERVAL_1MINUTE,
@@ -210,17 +239,30 @@ class BotCore:
             logger.error(f"Error fetching market data for {symbol}: {e}")
             return pd.DataFrame()
 
-    def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate technical indicators for the dataframe"""
+    def get_market_data(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Closed candles with indicators from the shared candle buffer (refreshed once per candle close)"""
+        return self.candle_buffer.get(symbol, timeframe)
+
+    def plan_lookback(self, combinations: List[Tuple[str, str, str]]) -> LookbackPlan:
+        """
+        Candles and indicators per market from the warm-up the strategies of the combinations declare;
+        applied to the shared candle buffer (RSI is always computed: signal checks and cycle logs read it)
+        """
+        plan = plan_lookback(combinations, self.get_strategy_instance, base_indicators=('rsi',))
+        self.candle_buffer.plan = plan
+        plan.log_summary()
+        return plan
+
+    def calculate_indicators(self, df: pd.DataFrame, indicators: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Calculate technical indicators for the dataframe
+        
+        Args:
+            df: Candles
+            indicators: Names to compute ('rsi', 'ema_12', 'ema_26', 'macd', 'bollinger', 'atr'); all if None
+        """
         try:
-            df['rsi'] = calculate_rsi(df['close'])
-            df['ema_12'] = calculate_ema(df['close'], 12)
-            df['ema_26'] = calculate_ema(df['close'], 26)
-            df['macd'], df['macd_signal'], df['macd_histogram'] = calculate_macd(df['close'])
-            df['bb_upper'], df['bb_middle'], df['bb_lower'] = calculate_bollinger_bands(df['close'])
-            df['atr'] = calculate_atr(df['high'], df['low'], df['close'])
-            
-            return df
+            return compute_indicators(df, indicators)
         except Exception as e:
             logger.error(f"Error calculating indicators: {e}")
             return df
@@ -247,6 +289,28 @@ class BotCore:
             logger.error(f"Error generating signals for {strategy_name}: {e}")
             return pd.DataFrame()
 
+    def evaluate_latest_signal(self, df: pd.DataFrame, strategy_name: str, **strategy_params) -> pd.DataFrame:
+        """
+        Newest bar's signals only (single-row frame equal to generate_signals(df).iloc[-1:]);
+        the strategy evaluates just the bars that row depends on, independent of history length
+        """
+        try:
+            if df.empty:
+                logger.warning(f"Empty DataFrame provided to {strategy_name}")
+                return pd.DataFrame()
+            
+            required_columns = ['close', 'rsi']
+            missing_columns = [col for col in required_columns if col not in df.columns]
+            if missing_columns:
+                logger.error(f"Missing required columns for {strategy_name}: {missing_columns}")
+                return pd.DataFrame()
+            
+            strategy = self.get_strategy_instance(strategy_name, **strategy_params)
+            return strategy.generate_latest_signal(df)
+        except Exception as e:
+            logger.error(f"Error evaluating latest signal for {strategy_name}: {e}")
+            return pd.DataFrame()
+
     def check_streak_conditions(self) -> bool:
         """Check if trading should be enabled based on streak conditions"""
         # Emergency override - force trading enabled
@@ -354,6 +418,10 @@ class BotCore:
                 'run_name': self.run_name
             }
             
+            if self.persistence is not None:
+                self.persistence.put('trade', bigquery_trade)
+                logger.info(f"Queued trade for BigQuery: {trade_data.get('symbol')} - ${trade_data.get('profit', 0):.2f}")
+                return
             self.db.add_trade(bigquery_trade)
             logger.info(f"Saved trade to BigQuery: {trade_data.get('symbol')} - ${trade_data.get('profit', 0):.2f}")
             
@@ -361,25 +429,17 @@ class BotCore:
             logger.error(f"Error saving trade to BigQuery: {e}")
 
     def save_signal_to_bigquery(self, signal_data: Dict[str, Any]):
-        """Save a trading signal to BigQuery for monitoring purposes"""
-        try:
-            # Prepare signal data for BigQuery
-            bigquery_signal = {
-                'timestamp': signal_data.get('timestamp'),
-                'symbol': signal_data.get('symbol'),
-                'strategy': signal_data.get('strategy'),
-                'timeframe': signal_data.get('timeframe'),
-                'signal_type': signal_data.get('signal'),
-                'price': signal_data.get('price'),
-                'run_name': self.run_name
-            }
-            
-            # Use the daily_summary table for signals
-            self.db.save_daily_summary([bigquery_signal])
-            logger.info(f"Saved signal to BigQuery: {signal_data.get('symbol')} - {signal_data.get('signal')}")
-            
-        except Exception as e:
-            logger.error(f"Error saving signal to BigQuery: {e}")
+        """Record a trading signal for monitoring purposes (logged: no table has columns for signals)"""
+        # daily_summary rows need a date and trade counts, which a signal does not have
+        logger.info(f"Signal: {signal_data.get('symbol')} - {signal_data.get('strategy')} - "
+                    f"{signal_data.get('timeframe')} - {signal_data.get('signal')} @ {signal_data.get('price')}")
+
+    def save_daily_summary(self, record: Dict[str, Any]):
+        """Write one daily_summary record (queued when the persistence queue is enabled)"""
+        if self.persistence is not None:
+            self.persistence.put('daily_summary', record)
+        else:
+            self.db.save_daily_summary([record])
 
     def calculate_performance_metrics(self) -> Dict[str, Any]:
         """Calculate comprehensive performance metrics"""
@@ -472,6 +532,7 @@ class BotCore:
             monitor_interval: How often to check (in seconds)
         """
         logger.info(f"Starting daily monitor mode for {len(trading_combinations)} combinations")
+        plan = self.plan_lookback(trading_combinations)
         
         while True:
             try:
@@ -484,16 +545,16 @@ class BotCore:
                 # Analyze all combinations
                 for symbol, strategy_name, timeframe in trading_combinations:
                     try:
-                        # Fetch market data
-                        df = self.fetch_market_data(symbol, timeframe)
+                        # Fetch market data (+1: the candle still open)
+                        df = self.fetch_market_data(symbol, timeframe, limit=(plan.limit(symbol, timeframe) or self.candle_buffer.size) + 1)
                         if df.empty:
                             continue
                         
-                        # Calculate indicators
-                        df = self.calculate_indicators(df)
+                        # Calculate the indicators the strategy reads
+                        df = self.calculate_indicators(df, plan.indicators(symbol, timeframe))
                         
-                        # Generate signals
-                        signals = self.generate_signals(df, strategy_name)
+                        # Generate signals (newest bar only)
+                        signals = self.evaluate_latest_signal(df, strategy_name)
                         
                         if not signals.empty:
                             latest_signal = signals.iloc[-1]
@@ -510,8 +571,7 @@ class BotCore:
                                 'run_name': self.run_name
                             }
                             
-                            # Save analysis to BigQuery (for tracking purposes)
-                            self.db.save_daily_summary([analysis_record])
+                            # Tracked in the log below (daily_summary has no columns for signals)
                             
                             if trading_enabled:
                                 logger.info(f"✅ {symbol} - {strategy_name} - {analysis_record['signal']} signal detected")
@@ -0,0 +1,196 @@
+"""
+Single-process runtime hosting several bots
+
+Each bot runs in its own thread behind a failure boundary: an exception
+ends (and, up to max_restarts, restarts) only that bot, the others keep
+trading. While a runtime is active, BotCore takes the shared exchange
+client and trade database from it instead of creating its own. Market data
+is shared too: an in-process MarketDataService (or the host's daemon with
+MARKET_DATA_SERVICE_ENABLED) streams each market once and computes its
+indicators once for every bot. The bots' loops block (scheduler sleeps,
+stream waits), so they are threads rather than asyncio tasks; the imports,
+client, caches and connections exist once per process either way.
+"""
+
+import os
+import time
+import logging
+import tempfile
+import threading
+import traceback
+from typing import Dict, Any, Optional, Callable
+
+from config.exchange_config import MARKET_DATA_SERVICE_ENABLED
+from utils.persistence_queue import flush_persistence_queues
+
+logger = logging.getLogger(__name__)
+
+_current: Optional['BotRuntime'] = None
+
+
+def current_runtime() -> Optional['BotRuntime']:
+    """The runtime hosting this process's bots (None when a bot runs on its own)"""
+    return _current
+
+
+def shared_market_data_feed():
+    """Feed the bots of this process read candles from: the runtime's, the daemon's or None"""
+    if _current is not None and _current.market_data_feed is not None:
+        return _current.market_data_feed
+    if MARKET_DATA_SERVICE_ENABLED:
+        from utils.market_data_service import get_market_data_feed
+        return get_market_data_feed()
+    return None
+
+
+class BotRuntime:
+    """Several bots in one process: shared client, database and market data, one thread and failure boundary per bot"""
+
+    def __init__(self, client=None, db=None, share_market_data: bool = True, restart_delay: float = 60.0,
+                 max_restarts: int = 3):
+        """
+        Args:
+            client: Exchange client shared by every bot (created from EXCHANGE_MODE if None)
+            db: Trade database shared by every bot (created from STORAGE_BACKEND if None)
+            share_market_data: Serve candles and indicators to all bots from one MarketDataService
+                               (the host's daemon if MARKET_DATA_SERVICE_ENABLED, else one in this process)
+            restart_delay: Seconds before a failed bot is restarted
+            max_restarts: Restarts per bot before it is left stopped
+        """
+        self.client = client
+        self.db = db
+        self.share_market_data = share_market_data
+        self.restart_delay = restart_delay
+        self.max_restarts = max_restarts
+        self.market_data_service = None
+        self.market_data_feed = None
+        self._bots: Dict[str, Dict[str, Any]] = {}
+        self._stop_requested = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def activate(self) -> 'BotRuntime':
+        """Create the shared resources and make BotCore use them (call before creating the bots)"""
+        global _current
+        from utils.exchange_client import create_client
+        from utils.storage_backend import create_database
+
+        if self.client is None:
+            self.client = create_client()
+        if self.db is None:
+            self.db = create_database()
+        if self.share_market_data:
+            from utils.market_data_service import MarketDataService, get_market_data_feed
+            if MARKET_DATA_SERVICE_ENABLED:
+                self.market_data_feed = get_market_data_feed()
+            else:
+                path = os.path.join(tempfile.gettempdir(), f"tradingbot_market_data_{os.getpid()}.sock")
+                self.market_data_service = MarketDataService(self.client, socket_path=path)
+                self.market_data_service.start()
+                self.market_data_feed = get_market_data_feed(path)
+        _current = self
+        logger.info("Bot runtime active: bots share one exchange client, database and market data")
+        return self
+
+    def add(self, name: str, run: Callable[[], Any], stop: Optional[Callable[[], Any]] = None):
+        """
+        Host a bot
+
+        Args:
+            name: Bot name for logs and status
+            run: Runs the bot's loop (blocks until the bot stops)
+            stop: Makes run() return (e.g. MonitorBot.stop)
+        """
+        self._bots[name] = {'run': run, 'stop': stop, 'thread': None, 'starts': 0, 'failures': 0,
+                            'last_error': None, 'running': False}
+
+    def start(self):
+        """Start every bot in its own thread"""
+        for name, bot in self._bots.items():
+            bot['thread'] = threading.Thread(target=self._supervise, args=(name,), name=f"bot-{name}", daemon=True)
+            bot['thread'].start()
+        logger.info(f"🚀 Bot runtime started {len(self._bots)} bots: {', '.join(self._bots)}")
+
+    def run_forever(self, status_interval: float = 3600.0):
+        """Start the bots and block until request_stop() (or Ctrl-C) or until every bot has ended"""
+        self.start()
+        next_status = time.monotonic() + status_interval
+        try:
+            while any(bot['thread'].is_alive() for bot in self._bots.values()):
+                if self._stop_requested.wait(5.0):
+                    break
+                if time.monotonic() >= next_status:
+                    self.log_status()
+                    next_status += status_interval
+        except KeyboardInterrupt:
+            logger.info("Bot runtime stopped by user")
+        finally:
+            self.stop()
+
+    def request_stop(self):
+        """Make run_forever() stop the bots and return (safe from signal handlers)"""
+        self._stop_requested.set()
+
+    def stop(self, timeout: float = 30.0):
+        """Stop every bot, wait for their threads, then release the shared resources"""
+        global _current
+        self._stop_requested.set()
+        for name, bot in self._bots.items():
+            if bot['stop'] is not None and bot['running']:
+                try:
+                    bot['stop']()
+                except Exception as e:
+                    logger.error(f"Error stopping {name}: {e}")
+        deadline = time.monotonic() + timeout
+        for name, bot in self._bots.items():
+            if bot['thread'] is not None:
+                bot['thread'].join(max(0.0, deadline - time.monotonic()))
+                if bot['thread'].is_alive():
+                    logger.warning(f"⚠️ {name} did not stop within {timeout:.0f}s")
+        flush_persistence_queues()
+        if self.market_data_feed is not None:
+            self.market_data_feed.stop(force=True)
+        if self.market_data_service is not None:
+            self.market_data_service.stop()
+        if _current is self:
+            _current = None
+        logger.info("Bot runtime stopped")
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """{name: {'running', 'starts', 'failures', 'last_error'}}"""
+        return {name: {key: bot[key] for key in ('running', 'starts', 'failures', 'last_error')}
+                for name, bot in self._bots.items()}
+
+    def log_status(self):
+        for name, status in self.status().items():
+            state = '🟢 running' if status['running'] else '🔴 stopped'
+            logger.info(f"{name}: {state}, {status['starts']} start(s), {status['failures']} failure(s)")
+
+    # ------------------------------------------------------------------
+    # Failure boundary
+    # ------------------------------------------------------------------
+
+    def _supervise(self, name: str):
+        bot = self._bots[name]
+        while not self._stop_requested.is_set():
+            bot['starts'] += 1
+            bot['running'] = True
+            try:
+                bot['run']()
+                logger.info(f"{name} finished")
+                return
+            except Exception as e:
+                bot['failures'] += 1
+                bot['last_error'] = str(e)
+                logger.error(f"❌ {name} failed: {e}\n{traceback.format_exc()}")
+            finally:
+                bot['running'] = False
+
+            if bot['failures'] > self.max_restarts:
+                logger.error(f"{name} failed {bot['failures']} times, leaving it stopped (other bots keep running)")
+                return
+            logger.info(f"Restarting {name} in {self.restart_delay:.0f}s")
+            if self._stop_requested.wait(self.restart_delay):
+                return
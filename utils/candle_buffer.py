@@ -0,0 +1,149 @@
+"""
+Per-market candle buffer shared by every strategy of a live bot cycle
+
+Keeps the last N closed candles and their indicator columns per
+(symbol, timeframe). A market is refreshed at most once per candle close,
+fetching only the candles that closed since the last refresh, so all
+strategies on the same market share one REST call and one indicator pass.
+With a LookbackPlan (utils/lookback_planner.py) each market keeps only the
+candles and computes only the indicators its strategies declared.
+"""
+
+import time
+import logging
+import pandas as pd
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from utils.synthetic_data import TIMEFRAME_MS
+
+logger = logging.getLogger(__name__)
+
+
+class CandleBuffer:
+    """Bounded buffer of closed candles + indicators per (symbol, timeframe)"""
+
+    def __init__(self, fetch: Callable[[str, str, int], pd.DataFrame], compute: Callable[[pd.DataFrame], pd.DataFrame],
+                 size: int = 100, clock: Optional[Callable[[], float]] = None, plan=None):
+        """
+        Args:
+            fetch: fetch(symbol, timeframe, limit) -> candles with 'timestamp' and 'close_time' columns
+                   (e.g. BotCore.fetch_market_data or KlineStream.get_candles)
+            compute: Adds indicator columns to a candle frame (e.g. BotCore.calculate_indicators);
+                     called as compute(df, indicators) for markets in the plan
+            size: Closed candles kept per market (markets not in the plan)
+            clock: Time source in seconds (default time.time)
+            plan: LookbackPlan with the candles and indicators per market
+        """
+        self.fetch = fetch
+        self.compute = compute
+        self.size = size
+        self.clock = clock or time.time
+        self.plan = plan
+        self._markets: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.stats = {'hits': 0, 'refreshes': 0, 'fetches': 0, 'candles_fetched': 0}
+
+    def get(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """
+        Closed candles with indicators for a market (a copy, safe for strategies to modify)
+
+        Returns:
+            DataFrame (empty if no data could be fetched)
+        """
+        market = self._refresh(symbol, timeframe)
+        if market is None:
+            return pd.DataFrame()
+        return market['data'].copy()
+
+    def peek(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Cached candles with indicators without refreshing (a copy, empty if never fetched)"""
+        market = self._markets.get((symbol, timeframe))
+        if market is None:
+            return pd.DataFrame()
+        return market['data'].copy()
+
+    def invalidate(self, symbol: Optional[str] = None, timeframe: Optional[str] = None):
+        """Drop cached markets (all, one symbol, or one market)"""
+        for key in list(self._markets):
+            if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe):
+                del self._markets[key]
+
+    def pending(self, symbol: str, timeframe: str) -> Optional[int]:
+        """
+        Candles to fetch for a market, or None while its latest closed candle is still current
+
+        Lets callers (e.g. utils.async_market_data) fetch many markets concurrently and
+        hand the results to update().
+        """
+        market = self._markets.get((symbol, timeframe))
+        interval_ms = TIMEFRAME_MS.get(timeframe)
+        now_ms = int(self.clock() * 1000)
+        size, indicators = self.requirements(symbol, timeframe)
+
+        # A changed plan needs the full lookback again
+        if market is not None and (market['size'] != size or market['indicators'] != indicators):
+            market = None
+
+        if market is not None and interval_ms and now_ms < market['next_close_ms']:
+            return None
+
+        # Only fetch what closed since the last refresh (+1 for the candle still open)
+        if market is not None and interval_ms:
+            missing = (now_ms - market['last_open_ms']) // interval_ms
+            return int(min(missing + 1, size + 1))
+        return size + 1
+
+    def requirements(self, symbol: str, timeframe: str) -> Tuple[int, Optional[Tuple[str, ...]]]:
+        """(closed candles to keep, indicators to compute or None for all) for a market"""
+        if self.plan is not None:
+            limit = self.plan.limit(symbol, timeframe)
+            if limit is not None:
+                return limit, self.plan.indicators(symbol, timeframe)
+        return self.size, None
+
+    def update(self, symbol: str, timeframe: str, candles: Optional[pd.DataFrame]) -> Optional[Dict[str, Any]]:
+        """Merge freshly fetched candles into a market and recompute its indicators if a new candle closed"""
+        key = (symbol, timeframe)
+        market = self._markets.get(key)
+        interval_ms = TIMEFRAME_MS.get(timeframe)
+        now_ms = int(self.clock() * 1000)
+        size, indicators = self.requirements(symbol, timeframe)
+        replan = market is not None and (market['size'] != size or market['indicators'] != indicators)
+
+        self.stats['fetches'] += 1
+        if candles is None or candles.empty:
+            return market
+
+        candles = candles[candles['close_time'].astype('int64') < now_ms]
+        self.stats['candles_fetched'] += len(candles)
+        if market is not None:
+            candles = pd.concat([market['candles'], candles], ignore_index=True)
+            candles = candles.drop_duplicates(subset='timestamp', keep='last')
+        candles = candles.tail(size).reset_index(drop=True)
+        if candles.empty:
+            return market
+
+        last_open_ms = int(candles['timestamp'].iloc[-1].value // 1_000_000)
+        if market is not None and last_open_ms == market['last_open_ms'] and not replan:
+            # Nothing new closed yet (exchange lag): keep the cached indicators
+            return market
+
+        data = self.compute(candles.copy()) if indicators is None else self.compute(candles.copy(), indicators)
+        market = {
+            'candles': candles,
+            'data': data,
+            'size': size,
+            'indicators': indicators,
+            'last_open_ms': last_open_ms,
+            # The candle after the latest closed one closes at last_open + 2 intervals
+            'next_close_ms': last_open_ms + 2 * interval_ms if interval_ms else 0
+        }
+        self._markets[key] = market
+        self.stats['refreshes'] += 1
+        return market
+
+    def _refresh(self, symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
+        limit = self.pending(symbol, timeframe)
+        if limit is None:
+            self.stats['hits'] += 1
+            return self._markets[(symbol, timeframe)]
+        return self.update(symbol, timeframe, self.fetch(symbol, timeframe, limit=limit))
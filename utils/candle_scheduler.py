@@ -0,0 +1,147 @@
+"""
+Candle-close aligned scheduler for the polling (REST) bot loops
+
+Computes the next close of every active timeframe, sleeps until the earliest
+one plus a short settle delay, and returns only the combinations whose candle
+just closed. Time is kept on the exchange clock: the offset to the server
+time is measured (half round trip corrected) and refreshed periodically, so
+local clock drift doesn't make a cycle fire before the candle has closed.
+Closes missed while a long cycle was running are dispatched on the next wait.
+"""
+
+import time
+import logging
+from datetime import datetime, timezone
+from typing import List, Tuple, Callable, Optional
+
+from utils.synthetic_data import TIMEFRAME_MS
+from config.exchange_config import CANDLE_SETTLE_DELAY, CLOCK_RESYNC_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+Combo = Tuple[str, str, str]
+
+
+class CandleScheduler:
+    """Wake up on candle closes of a set of (symbol, strategy_name, timeframe) combinations"""
+
+    def __init__(self, combinations: List[Combo], client=None, settle_delay: float = CANDLE_SETTLE_DELAY,
+                 min_interval: float = 0, resync_interval: float = CLOCK_RESYNC_INTERVAL,
+                 clock: Optional[Callable[[], float]] = None, sleep: Callable[[float], None] = time.sleep,
+                 max_sleep: float = 5.0):
+        """
+        Args:
+            combinations: Combinations to schedule (timeframes without a fixed length are skipped)
+            client: Exchange client used for get_server_time() (no clock sync if None)
+            settle_delay: Seconds to wait after a close before dispatching (lets the exchange publish the candle)
+            min_interval: Minimum seconds between evaluations of a combination; a combination is due on
+                          closes of max(timeframe, min_interval), e.g. a 4h schedule evaluates 15m combos every 4h
+            resync_interval: Seconds between server time re-syncs
+            clock: Local time source in seconds (default: the client's clock, else time.time)
+            sleep: Sleep function (sleeps are chunked to max_sleep so should_stop is honoured)
+            max_sleep: Longest single sleep in seconds
+        """
+        self.client = client
+        self.settle_delay = settle_delay
+        self.min_interval_ms = int(min_interval * 1000)
+        self.resync_interval = resync_interval
+        self.clock = clock or getattr(client, 'clock', None) or time.time
+        self.sleep = sleep
+        self.max_sleep = max_sleep
+        self.offset_ms = 0
+        self._last_sync = None
+        self._last_close_ms = None
+        self.stats = {'cycles': 0, 'closes': 0, 'missed_closes': 0, 'syncs': 0}
+
+        self.combinations = []
+        self.periods = {}
+        for combo in combinations:
+            interval_ms = TIMEFRAME_MS.get(combo[2])
+            if interval_ms is None:
+                logger.warning(f"⚠️ Cannot schedule {combo[0]} {combo[1]} {combo[2]}: unsupported timeframe")
+                continue
+            self.combinations.append(combo)
+            self.periods[combo[2]] = max(interval_ms, self.min_interval_ms)
+
+    def time(self) -> float:
+        """Exchange time in seconds (usable as a clock for CandleBuffer)"""
+        return self.clock() + self.offset_ms / 1000
+
+    def now_ms(self) -> int:
+        return int(self.clock() * 1000) + self.offset_ms
+
+    def sync_clock(self) -> int:
+        """Measure the offset between the exchange and local clocks (ms, server minus local)"""
+        if self.client is None:
+            return self.offset_ms
+        try:
+            sent = self.clock()
+            server_ms = self.client.get_server_time()['serverTime']
+            received = self.clock()
+            self.offset_ms = int(server_ms - (sent + received) / 2 * 1000)
+            self._last_sync = received
+            self.stats['syncs'] += 1
+            logger.info(f"🕒 Exchange clock offset {self.offset_ms:+d} ms (round trip {(received - sent) * 1000:.0f} ms)")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not sync with exchange time, keeping offset {self.offset_ms:+d} ms: {e}")
+            self._last_sync = self.clock()
+        return self.offset_ms
+
+    def next_close_ms(self, after_ms: Optional[int] = None) -> Optional[int]:
+        """Earliest candle close strictly after after_ms (default: now) over all scheduled timeframes"""
+        if not self.periods:
+            return None
+        after_ms = self.now_ms() if after_ms is None else after_ms
+        return min((after_ms // period + 1) * period for period in self.periods.values())
+
+    def due(self, close_ms: int) -> List[Combo]:
+        """Combinations whose candle closes at close_ms"""
+        return [combo for combo in self.combinations if close_ms % self.periods[combo[2]] == 0]
+
+    def wait(self, should_stop: Optional[Callable[[], bool]] = None) -> List[Combo]:
+        """
+        Sleep until the next candle close (+ settle delay) and return the combinations that just closed
+
+        Closes skipped while the previous cycle ran are merged into the returned list.
+        Returns an empty list if should_stop() became true while waiting.
+        """
+        if self._last_sync is None or self.clock() - self._last_sync >= self.resync_interval:
+            self.sync_clock()
+
+        now_ms = self.now_ms()
+        if self._last_close_ms is None:
+            self._last_close_ms = now_ms
+        close_ms = self.next_close_ms(self._last_close_ms)
+        if close_ms is None:
+            return []
+
+        if close_ms + self.settle_delay * 1000 > now_ms:
+            closing = sorted((tf for tf, period in self.periods.items() if close_ms % period == 0),
+                             key=lambda tf: TIMEFRAME_MS[tf])
+            close_time = datetime.fromtimestamp(close_ms / 1000, tz=timezone.utc).strftime('%H:%M:%S')
+            logger.info(f"⏳ Next candle close {close_time} UTC ({', '.join(closing)}) in {(close_ms - now_ms) / 1000:.0f}s")
+            while True:
+                remaining = (close_ms - self.now_ms()) / 1000 + self.settle_delay
+                if remaining <= 0:
+                    break
+                if should_stop is not None and should_stop():
+                    return []
+                self.sleep(min(remaining, self.max_sleep))
+
+        # Every close between the last dispatch and now (more than one after an overrunning cycle)
+        now_ms = self.now_ms() - int(self.settle_delay * 1000)
+        due, seen, closes = [], set(), 0
+        while close_ms <= now_ms:
+            for combo in self.due(close_ms):
+                if combo not in seen:
+                    seen.add(combo)
+                    due.append(combo)
+            self._last_close_ms = close_ms
+            close_ms = self.next_close_ms(close_ms)
+            closes += 1
+        if closes > 1:
+            logger.warning(f"⚠️ Previous cycle overran {closes - 1} candle close(s), evaluating them together")
+            self.stats['missed_closes'] += closes - 1
+        self.stats['closes'] += closes
+        self.stats['cycles'] += 1
+        return due
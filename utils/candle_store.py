@@ -0,0 +1,102 @@
+"""
+Local on-disk candle store, one file per (symbol, timeframe)
+"""
+
+import os
+import logging
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CANDLE_DIR = os.getenv('CANDLE_STORE_DIR', 'data/candles')
+
+
+class CandleStore:
+    """Stores OHLCV frames indexed by timestamp under <base_dir>/<SYMBOL>/<timeframe>.pkl"""
+
+    def __init__(self, base_dir: str = DEFAULT_CANDLE_DIR):
+        self.base_dir = base_dir
+        self._cache = {}
+
+    def _path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.base_dir, symbol.upper(), f"{timeframe}.pkl")
+
+    def exists(self, symbol: str, timeframe: str) -> bool:
+        return os.path.exists(self._path(symbol, timeframe))
+
+    def write(self, symbol: str, timeframe: str, df: pd.DataFrame, append: bool = False):
+        """
+        Save candles for a market.
+
+        Args:
+            symbol: Trading pair
+            timeframe: Candle interval
+            df: Candles indexed by timestamp
+            append: Merge with stored candles instead of replacing them (newer rows win)
+        """
+        if append and self.exists(symbol, timeframe):
+            df = pd.concat([self.read(symbol, timeframe), df])
+            df = df[~df.index.duplicated(keep='last')]
+        df = df.sort_index()
+        df.index.name = 'timestamp'
+
+        path = self._path(symbol, timeframe)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        df.to_pickle(temp_path)
+        os.replace(temp_path, path)
+        self._cache[(symbol.upper(), timeframe)] = df
+
+    def read(self, symbol: str, timeframe: str, start=None, end=None) -> Optional[pd.DataFrame]:
+        """
+        Load candles for a market, optionally limited to [start, end].
+
+        Returns:
+            DataFrame or None if the market is not stored
+        """
+        key = (symbol.upper(), timeframe)
+        df = self._cache.get(key)
+        if df is None:
+            path = self._path(symbol, timeframe)
+            if not os.path.exists(path):
+                return None
+            try:
+                df = pd.read_pickle(path)
+            except Exception as e:
+                logger.error(f"Error reading candles for {symbol} {timeframe}: {e}")
+                return None
+            self._cache[key] = df
+
+        if start is not None or end is not None:
+            df = df.loc[pd.Timestamp(start) if start is not None else None:
+                        pd.Timestamp(end) if end is not None else None]
+        return df
+
+    def open_times_ms(self, symbol: str, timeframe: str) -> Optional[np.ndarray]:
+        """Candle open times in milliseconds, for range lookups with np.searchsorted"""
+        df = self.read(symbol, timeframe)
+        if df is None:
+            return None
+        return df.index.values.astype('datetime64[ms]').astype(np.int64)
+
+    def list_markets(self) -> List[Tuple[str, str]]:
+        """All stored (symbol, timeframe) pairs"""
+        markets = []
+        if not os.path.isdir(self.base_dir):
+            return markets
+        for symbol in sorted(os.listdir(self.base_dir)):
+            symbol_dir = os.path.join(self.base_dir, symbol)
+            if not os.path.isdir(symbol_dir):
+                continue
+            for filename in sorted(os.listdir(symbol_dir)):
+                if filename.endswith('.pkl'):
+                    markets.append((symbol, filename[:-len('.pkl')]))
+        return markets
+
+    def delete(self, symbol: str, timeframe: str):
+        path = self._path(symbol, timeframe)
+        if os.path.exists(path):
+            os.remove(path)
+        self._cache.pop((symbol.upper(), timeframe), None)
@@ -0,0 +1,138 @@
+"""
+Factory for the exchange client used by the bots
+"""
+
+import logging
+from typing import Optional
+
+from binance.client import Client
+from config.config import API_KEY, API_SECRET, TESTNET, TESTNET_API_URL
+from config.exchange_config import (EXCHANGE_MODE, FAKE_LATENCY_DISTRIBUTION, FAKE_LATENCY_MS, FAKE_LATENCY_SIGMA,
+                                    FAKE_WEIGHT_LIMIT, FAKE_ERROR_RATE, FAKE_ORDER_TIMEOUT_RATE, FAKE_CANDLE_DIR,
+                                    FAKE_SEED, FAKE_BALANCE_USDT, KLINE_STREAM_URL, KLINE_STREAM_HISTORY, USER_STREAM_URL,
+                                    RATE_LIMIT_ENABLED)
+
+logger = logging.getLogger(__name__)
+
+
+def create_fake_client(**overrides):
+    """Fake Binance client configured from config/exchange_config.py (keyword overrides win)"""
+    from utils.fake_binance_client import FakeBinanceClient, LatencyModel
+    from utils.candle_store import CandleStore
+
+    settings = {
+        'candle_store': CandleStore(FAKE_CANDLE_DIR) if FAKE_CANDLE_DIR else None,
+        'latency': LatencyModel(FAKE_LATENCY_DISTRIBUTION, FAKE_LATENCY_MS, FAKE_LATENCY_SIGMA, seed=FAKE_SEED),
+        'weight_limit': FAKE_WEIGHT_LIMIT,
+        'error_rate': FAKE_ERROR_RATE,
+        'order_timeout_rate': FAKE_ORDER_TIMEOUT_RATE,
+        'seed': FAKE_SEED,
+        'balances': {'USDT': FAKE_BALANCE_USDT},
+        'rate_limiter': _rate_limiter('fake')
+    }
+    settings.update(overrides)
+    return FakeBinanceClient(**settings)
+
+
+def create_client(mode: str = None):
+    """
+    Create the exchange client
+
+    Args:
+        mode: 'binance' or 'fake' (default: EXCHANGE_MODE)
+
+    Returns:
+        binance Client (testnet URL applied when TESTNET; a RateLimitedClient when
+        RATE_LIMIT_ENABLED) or FakeBinanceClient
+    """
+    mode = mode or EXCHANGE_MODE
+    if mode == 'fake':
+        logger.info("Using fake Binance client")
+        return create_fake_client()
+
+    limiter = _rate_limiter('testnet' if TESTNET else 'binance')
+    if limiter is not None:
+        from utils.rate_limiter import RateLimitedClient
+        client = RateLimitedClient(API_KEY, API_SECRET, testnet=TESTNET, rate_limiter=limiter)
+    else:
+        client = Client(API_KEY, API_SECRET, testnet=TESTNET)
+    if TESTNET:
+        client.API_URL = TESTNET_API_URL
+    return client
+
+
+async def create_async_client():
+    """python-binance AsyncClient for the configured (testnet) API, created on the running event loop"""
+    from binance import AsyncClient
+
+    limiter = _rate_limiter('testnet' if TESTNET else 'binance')
+    if limiter is None:
+        return await AsyncClient.create(API_KEY, API_SECRET, testnet=TESTNET)
+    from utils.rate_limiter import RateLimitedAsyncClient
+    client = await RateLimitedAsyncClient.create(API_KEY, API_SECRET, testnet=TESTNET)
+    client.rate_limiter = limiter
+    return client
+
+
+def _rate_limiter(source: str):
+    """Host-wide request-weight limiter of an exchange (None unless RATE_LIMIT_ENABLED)"""
+    if not RATE_LIMIT_ENABLED:
+        return None
+    from utils.rate_limiter import get_rate_limiter
+    return get_rate_limiter(source)
+
+
+def create_kline_stream(client, markets, history: int = KLINE_STREAM_HISTORY, shared: Optional[bool] = None):
+    """
+    Create (not start) a kline stream for the given (symbol, timeframe) markets
+
+    With a FakeBinanceClient a local stream server fed by the fake client is
+    started and exposed as ``stream.fake_server``. When the process shares
+    market data (MARKET_DATA_SERVICE_ENABLED or a BotRuntime; ``shared=False``
+    opts out) its MarketDataFeed is returned instead, subscribed to the
+    markets (same interface, no exchange connection of its own).
+    """
+    from utils.bot_runtime import shared_market_data_feed
+
+    feed = shared_market_data_feed() if shared is not False else None
+    if shared and feed is None:
+        from utils.market_data_service import get_market_data_feed
+        feed = get_market_data_feed()
+    if feed is not None:
+        feed.subscribe(markets, history=history, wait=False)
+        return feed
+
+    from utils.market_stream import KlineStream, BINANCE_STREAM_URL, TESTNET_STREAM_URL
+    from utils.fake_binance_client import FakeBinanceClient
+
+    if isinstance(client, FakeBinanceClient):
+        from utils.fake_streams import FakeKlineStreamServer
+        server = FakeKlineStreamServer(client)
+        stream = KlineStream(client, markets, history=history, url=server.start(), clock=client.clock)
+        stream.fake_server = server
+        return stream
+
+    url = KLINE_STREAM_URL or (TESTNET_STREAM_URL if TESTNET else BINANCE_STREAM_URL)
+    return KlineStream(client, markets, history=history, url=url)
+
+
+def create_account_state(client):
+    """
+    Create (not start) the user-data-stream account state for the client
+
+    With a FakeBinanceClient a local user data stream server fed by the fake
+    client's order events is started and exposed as ``state.fake_server``.
+    """
+    from utils.account_state import AccountState
+    from utils.market_stream import BINANCE_STREAM_URL, TESTNET_STREAM_URL
+    from utils.fake_binance_client import FakeBinanceClient
+
+    if isinstance(client, FakeBinanceClient):
+        from utils.fake_streams import FakeUserDataStreamServer
+        server = FakeUserDataStreamServer(client)
+        state = AccountState(client, url=server.start())
+        state.fake_server = server
+        return state
+
+    url = USER_STREAM_URL or (TESTNET_STREAM_URL if TESTNET else BINANCE_STREAM_URL)
+    return AccountState(client, url=url)
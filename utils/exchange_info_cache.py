@@ -0,0 +1,175 @@
+"""
+Process-wide exchange info cache
+
+get_exchange_info() returns a multi-megabyte payload with every symbol's
+trading rules. The cache downloads it once per TTL for the whole process,
+keeps a copy on disk (data/cache) so restarts within the TTL skip the
+download, and indexes it by symbol. The LOT_SIZE step, precision and minimum
+used to format order quantities are precomputed per symbol.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+from config.exchange_config import EXCHANGE_INFO_TTL, EXCHANGE_INFO_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before retrying a failed download (stale data is served meanwhile)
+RETRY_INTERVAL = 60
+
+
+def lot_size_rules(symbol_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Precomputed LOT_SIZE rules of a symbol: step_size, precision (decimals of the step) and min_qty"""
+    for filter_item in symbol_info.get('filters', []):
+        if filter_item['filterType'] == 'LOT_SIZE':
+            step = filter_item['stepSize']
+            return {
+                'step_size': float(step),
+                'precision': len(step.split('.')[1].rstrip('0')) if '.' in step else 0,
+                'min_qty': float(filter_item['minQty'])
+            }
+    return None
+
+
+class ExchangeInfoCache:
+    """Symbol trading rules from get_exchange_info(), refreshed once per TTL"""
+
+    def __init__(self, client, source: str = 'binance', ttl: float = EXCHANGE_INFO_TTL,
+                 cache_dir: str = EXCHANGE_INFO_CACHE_DIR):
+        """
+        Args:
+            client: Exchange client (binance Client or FakeBinanceClient)
+            source: Name of the exchange/environment; keeps testnet, mainnet and fake caches apart on disk
+            ttl: Seconds before the exchange info is downloaded again
+            cache_dir: Directory of the on-disk copy ('' to keep it in memory only)
+        """
+        self.client = client
+        self.ttl = ttl
+        self.path = os.path.join(cache_dir, f"exchange_info_{source}.json") if cache_dir else None
+        self._lock = threading.Lock()
+        self._symbols: Dict[str, Dict[str, Any]] = {}
+        self._filters: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lot_sizes: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._fetched_at = None
+        self._failed_at = None
+        self.stats = {'downloads': 0, 'disk_loads': 0, 'errors': 0}
+
+    def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Trading rules of a symbol (None if unknown or never downloaded)"""
+        self._ensure_fresh()
+        return self._symbols.get(symbol)
+
+    def get_filter(self, symbol: str, filter_type: str) -> Optional[Dict[str, Any]]:
+        """One filter of a symbol (e.g. 'PRICE_FILTER', 'NOTIONAL')"""
+        self._ensure_fresh()
+        return self._filters.get(symbol, {}).get(filter_type)
+
+    def get_lot_size(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Precomputed LOT_SIZE rules (see lot_size_rules)"""
+        self._ensure_fresh()
+        return self._lot_sizes.get(symbol)
+
+    def refresh(self):
+        """Download the exchange info now (keeps the previous data if the download fails)"""
+        with self._lock:
+            self._download()
+
+    def invalidate(self):
+        """Force a download on the next lookup"""
+        with self._lock:
+            self._fetched_at = None
+            self._failed_at = None
+
+    def _fresh(self) -> bool:
+        return self._fetched_at is not None and time.time() - self._fetched_at < self.ttl
+
+    def _ensure_fresh(self):
+        if self._fresh():
+            return
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._fresh():
+                return
+            if self._fetched_at is None and self._load_from_disk():
+                return
+            if self._failed_at is not None and time.time() - self._failed_at < RETRY_INTERVAL:
+                return
+            self._download()
+
+    def _download(self):
+        try:
+            exchange_info = self.client.get_exchange_info()
+        except Exception as e:
+            self._failed_at = time.time()
+            self.stats['errors'] += 1
+            stale = f", using data from {time.time() - self._fetched_at:.0f}s ago" if self._symbols else ''
+            logger.error(f"Error getting exchange info{stale}: {e}")
+            return
+        fetched_at = time.time()
+        self._index(exchange_info['symbols'], fetched_at)
+        self._failed_at = None
+        self.stats['downloads'] += 1
+        logger.info(f"✓ Exchange info cached for {len(self._symbols)} symbols")
+        self._save_to_disk(exchange_info['symbols'], fetched_at)
+
+    def _index(self, symbols, fetched_at: float):
+        self._symbols = {item['symbol']: item for item in symbols}
+        self._filters = {symbol: {f['filterType']: f for f in item.get('filters', [])}
+                         for symbol, item in self._symbols.items()}
+        self._lot_sizes = {symbol: lot_size_rules(item) for symbol, item in self._symbols.items()}
+        self._fetched_at = fetched_at
+
+    def _load_from_disk(self) -> bool:
+        if self.path is None or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path) as f:
+                cached = json.load(f)
+            if time.time() - cached['fetched_at'] >= self.ttl:
+                return False
+            self._index(cached['symbols'], cached['fetched_at'])
+            self.stats['disk_loads'] += 1
+            logger.info(f"✓ Exchange info loaded from {self.path} ({len(self._symbols)} symbols)")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable exchange info cache {self.path}: {e}")
+            return False
+
+    def _save_to_disk(self, symbols, fetched_at: float):
+        if self.path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump({'fetched_at': fetched_at, 'symbols': symbols}, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write exchange info cache {self.path}: {e}")
+
+
+_caches: Dict[str, ExchangeInfoCache] = {}
+_caches_lock = threading.Lock()
+
+
+def exchange_source(client) -> str:
+    """'fake', 'testnet' or 'binance' for a client"""
+    from utils.fake_binance_client import FakeBinanceClient
+    if isinstance(client, FakeBinanceClient):
+        return 'fake'
+    return 'testnet' if getattr(client, 'testnet', False) else 'binance'
+
+
+def get_exchange_info_cache(client) -> ExchangeInfoCache:
+    """The process-wide cache for the client's exchange (created on first use)"""
+    source = exchange_source(client)
+    with _caches_lock:
+        cache = _caches.get(source)
+        if cache is None:
+            cache = _caches[source] = ExchangeInfoCache(client, source=source)
+        return cache
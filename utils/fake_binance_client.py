@@ -0,0 +1,988 @@
+"""
+In-process fake Binance client for offline load testing
+
+Implements the subset of python-binance's Client used by the bots
+(get_klines, get_historical_klines, get_symbol_ticker, get_exchange_info,
+get_account, create_order, create_oco_order, create_test_order, user data
+stream listen keys, ...) on top of the local candle store or the synthetic
+generator, with configurable latency, request-weight accounting and 429/418
+responses. Resting orders (limits, stops, OCO legs) are matched against the
+ticker price whenever the client is used or match_orders() is called.
+"""
+
+import json
+import math
+import time
+import random
+import logging
+import secrets
+import threading
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Callable
+
+from requests.exceptions import ReadTimeout
+from binance.exceptions import BinanceAPIException
+
+from utils.synthetic_data import generate_ohlcv, resample_candles, to_klines, symbol_seed, TIMEFRAME_MS
+from utils.rate_limiter import kline_weight
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'XRPUSDT',
+                   'ADAUSDT', 'DOGEUSDT', 'AVAXUSDT', 'DOTUSDT', 'LINKUSDT', 'UNIUSDT']
+
+# Rough start prices so lot sizes and notionals look realistic
+DEFAULT_PRICES = {
+    'BTCUSDT': 60000.0, 'ETHUSDT': 3000.0, 'SOLUSDT': 150.0, 'BNBUSDT': 550.0, 'XRPUSDT': 0.55,
+    'ADAUSDT': 0.45, 'DOGEUSDT': 0.15, 'AVAXUSDT': 35.0, 'DOTUSDT': 7.0, 'LINKUSDT': 15.0, 'UNIUSDT': 8.0
+}
+
+# Cap on synthetic base-timeframe candles per symbol (long timeframes get fewer bars)
+MAX_BASE_BARS = 500_000
+
+QUOTE_ASSETS = ('USDT', 'BUSD', 'USDC', 'BTC', 'ETH', 'BNB')
+
+# Request weights per endpoint (Binance spot REST, 1-minute window)
+ENDPOINT_WEIGHTS = {
+    'ping': 1,
+    'time': 1,
+    'exchangeInfo': 20,
+    'ticker/price': 2,
+    'ticker/price_all': 4,
+    'ticker/bookTicker': 2,
+    'ticker/bookTicker_all': 4,
+    'account': 20,
+    'order': 1,
+    'order/test': 1,
+    'order/oco': 1,
+    'order_query': 4,
+    'openOrders': 6,
+    'userDataStream': 2
+}
+
+
+class LatencyModel:
+    """Samples per-request latency in seconds from a configurable distribution"""
+
+    def __init__(self, distribution: str = 'lognormal', median_ms: float = 50.0, sigma: float = 0.5,
+                 min_ms: float = 0.0, max_ms: float = 5000.0, seed: Optional[int] = None):
+        """
+        Args:
+            distribution: 'none', 'constant', 'uniform', 'normal', 'lognormal' or 'pareto'
+            median_ms: Typical latency
+            sigma: Spread (lognormal/normal sigma relative to the median, pareto shape is 1/sigma)
+            min_ms: Lower clamp
+            max_ms: Upper clamp
+            seed: Random seed for reproducible latency
+        """
+        self.distribution = distribution
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.rng = random.Random(seed)
+
+    def sample(self) -> float:
+        """Latency of one request in seconds"""
+        if self.distribution in ('none', None) or self.median_ms <= 0:
+            return 0.0
+        if self.distribution == 'constant':
+            ms = self.median_ms
+        elif self.distribution == 'uniform':
+            ms = self.rng.uniform(self.median_ms * (1 - self.sigma), self.median_ms * (1 + self.sigma))
+        elif self.distribution == 'normal':
+            ms = self.rng.gauss(self.median_ms, self.median_ms * self.sigma)
+        elif self.distribution == 'pareto':
+            # Heavy tail: most requests near the median, occasional large stalls
+            ms = self.median_ms * self.rng.paretovariate(1 / max(self.sigma, 1e-6)) / 2 ** self.sigma
+        else:
+            ms = self.rng.lognormvariate(math.log(self.median_ms), self.sigma)
+        return min(max(ms, self.min_ms), self.max_ms) / 1000.0
+
+
+class _FakeResponse:
+    """Minimal stand-in for requests.Response (headers/status/text)"""
+
+    def __init__(self, status_code: int = 200, headers: Optional[Dict[str, str]] = None, text: str = ''):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+        self.request = None
+
+
+class FakeBinanceClient:
+    """Drop-in replacement for binance.client.Client backed by local or synthetic candles"""
+
+    API_URL = 'fake://binance'
+
+    def __init__(self, candle_store=None, symbols: Optional[List[str]] = None, n_bars: int = 5000,
+                 seed: int = 42, latency: Optional[LatencyModel] = None,
+                 endpoint_latency: Optional[Dict[str, LatencyModel]] = None, weight_limit: int = 6000,
+                 error_rate: float = 0.0, ban_after: int = 3, ban_seconds: float = 120.0,
+                 balances: Optional[Dict[str, float]] = None, fee_rate: float = 0.001,
+                 slippage: float = 0.0, price_timeframe: str = '15m',
+                 clock: Optional[Callable[[], float]] = None, sleep: bool = True, order_timeout_rate: float = 0.0,
+                 rate_limiter=None):
+        """
+        Initialize the fake client
+
+        Args:
+            candle_store: Optional CandleStore to serve candles from (synthetic data otherwise)
+            symbols: Symbols listed in exchange info and synthetic data
+            n_bars: History length generated per synthetic market
+            seed: Seed for synthetic data and injected errors
+            latency: Default latency model (None for no latency)
+            endpoint_latency: Per-endpoint latency overrides
+            weight_limit: Request weight allowed per minute before 429s
+            error_rate: Probability of an injected 429 on any request
+            ban_after: 429s within a minute before the IP is banned with 418s
+            ban_seconds: Length of a 418 ban
+            balances: Starting free balances per asset (default 10,000 USDT)
+            fee_rate: Commission charged on fills
+            slippage: Fractional price slippage applied to market fills
+            price_timeframe: Base timeframe of synthetic data, its latest close is the ticker price
+            clock: Time source in seconds (default time.time), e.g. for replaying stored candles
+            sleep: Actually sleep for sampled latency (disable for pure accounting)
+            order_timeout_rate: Probability that create_order times out after the exchange accepted
+                                the order (the client cannot tell whether it was placed)
+            rate_limiter: utils.rate_limiter.RateLimiter every request reserves its weight from
+        """
+        self.candle_store = candle_store
+        self.symbols = list(symbols or DEFAULT_SYMBOLS)
+        self.n_bars = n_bars
+        self.seed = seed
+        self.latency = latency
+        self.endpoint_latency = endpoint_latency or {}
+        self.weight_limit = weight_limit
+        self.error_rate = error_rate
+        self.ban_after = ban_after
+        self.ban_seconds = ban_seconds
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.price_timeframe = price_timeframe
+        self.clock = clock or time.time
+        self.sleep = sleep
+        self.order_timeout_rate = order_timeout_rate
+        self.rate_limiter = rate_limiter
+
+        self.balances = {asset: {'free': float(amount), 'locked': 0.0}
+                         for asset, amount in (balances or {'USDT': 10000.0}).items()}
+        self.response = _FakeResponse()
+
+        self._lock = threading.RLock()
+        self._rng = random.Random(seed)
+        self._markets = {}
+        self._base = {}
+        self._orders = {}
+        self._client_order_ids = {}
+        self._next_order_id = 1
+        self._order_lists = {}
+        self._next_order_list_id = 1
+        self._triggered = set()
+        self._weight_window = None
+        self._used_weight = 0
+        self._violations = 0
+        self._banned_until = 0.0
+        self._listeners = []
+        self._listen_keys = set()
+
+        # Request statistics
+        self.stats = {
+            'requests': defaultdict(int),
+            'weight': 0,
+            'throttled': 0,
+            'banned': 0,
+            'timeouts': 0,
+            'latency': 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Request accounting
+    # ------------------------------------------------------------------
+
+    def _raise(self, status_code: int, code: int, msg: str, retry_after: Optional[float] = None):
+        text = json.dumps({'code': code, 'msg': msg})
+        headers = self._headers()
+        if retry_after is not None:
+            headers['Retry-After'] = str(max(1, int(math.ceil(retry_after))))
+        self.response = _FakeResponse(status_code, headers, text)
+        raise BinanceAPIException(self.response, status_code, text)
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            'x-mbx-used-weight': str(self._used_weight),
+            'x-mbx-used-weight-1m': str(self._used_weight)
+        }
+
+    def _request(self, endpoint: str, weight: int):
+        """Apply latency, weight accounting and injected errors for one request"""
+        if self.rate_limiter is not None:
+            # Used-weight headers are only comparable with the limiter's windows on the wall clock
+            last_response = (lambda: self.response) if self.clock is time.time else (lambda: None)
+            return self.rate_limiter.run(weight, lambda: self._serve(endpoint, weight), last_response)
+        return self._serve(endpoint, weight)
+
+    def _serve(self, endpoint: str, weight: int):
+        model = self.endpoint_latency.get(endpoint, self.latency)
+        delay = model.sample() if model is not None else 0.0
+        if delay and self.sleep:
+            time.sleep(delay)
+
+        with self._lock:
+            now = self.clock()
+            self.stats['requests'][endpoint] += 1
+            self.stats['latency'] += delay
+
+            if now < self._banned_until:
+                self.stats['banned'] += 1
+                self._raise(418, -1003, f"Way too many requests; IP banned until {int(self._banned_until * 1000)}.",
+                            retry_after=self._banned_until - now)
+
+            window = int(now // 60)
+            if window != self._weight_window:
+                self._weight_window = window
+                self._used_weight = 0
+                self._violations = 0
+
+            injected = self.error_rate > 0 and self._rng.random() < self.error_rate
+            if injected or self._used_weight + weight > self.weight_limit:
+                self.stats['throttled'] += 1
+                self._violations += 1
+                if self._violations >= self.ban_after and not injected:
+                    self._banned_until = now + self.ban_seconds
+                self._raise(429, -1003, 'Too much request weight used; please use WebSocket Streams for live updates.',
+                            retry_after=(window + 1) * 60 - now)
+
+            self._used_weight += weight
+            self.stats['weight'] += weight
+            self.response = _FakeResponse(200, self._headers())
+
+            # The price only moves with the clock, so matching on every request is as good as continuous
+            self.match_orders()
+
+    @property
+    def used_weight(self) -> int:
+        """Request weight used in the current minute"""
+        return self._used_weight
+
+    # ------------------------------------------------------------------
+    # Market data
+    # ------------------------------------------------------------------
+
+    def add_candles(self, symbol: str, interval: str, df: pd.DataFrame):
+        """Serve the given candles for a market (e.g. from utils.synthetic_data.emit_to_client)"""
+        with self._lock:
+            if symbol not in self.symbols:
+                self.symbols.append(symbol)
+            self._markets[(symbol, interval)] = {
+                'df': df,
+                'open_times': df.index.values.astype('datetime64[ms]').astype(np.int64),
+                'synthetic': False
+            }
+
+    def _base_series(self, symbol: str, timeframe: str, bars: int) -> Dict[str, Any]:
+        """Synthetic path for a symbol at a base timeframe covering at least `bars` candles up to now"""
+        interval_ms = TIMEFRAME_MS[timeframe]
+        now_ms = int(self.clock() * 1000)
+        key = (symbol, timeframe)
+        base = self._base.get(key)
+
+        if base is None:
+            first_open = (now_ms // interval_ms - bars + 1) * interval_ms
+            df = generate_ohlcv(bars, timeframe=timeframe, start=pd.to_datetime(first_open, unit='ms'),
+                                start_price=DEFAULT_PRICES.get(symbol, 100.0), volatility=0.004,
+                                seed=symbol_seed(f"{symbol}_{timeframe}", self.seed))
+            base = {'df': df, 'segments': 1, 'version': 1}
+            self._base[key] = base
+        elif len(base['df']) < bars:
+            # Longer history needed: prepend older candles scaled to join the existing path,
+            # so prices already served do not change
+            first_open = int(base['df'].index[0].value // 1_000_000)
+            missing = bars - len(base['df'])
+            older = generate_ohlcv(missing, timeframe=timeframe,
+                                   start=pd.to_datetime(first_open - missing * interval_ms, unit='ms'),
+                                   volatility=0.004, seed=symbol_seed(f"{symbol}_{timeframe}_history", self.seed))
+            scale = float(base['df']['open'].iloc[0]) / float(older['close'].iloc[-1])
+            for column in ('open', 'high', 'low', 'close', 'quote_asset_volume', 'taker_buy_quote'):
+                older[column] = older[column] * scale
+            base['df'] = pd.concat([older, base['df']])
+            base['version'] += 1
+
+        if int(base['df'].index[-1].value // 1_000_000) + interval_ms <= now_ms:
+            # Time moved on: continue the path from the last close
+            last_open = int(base['df'].index[-1].value // 1_000_000)
+            missing = int((now_ms - last_open) // interval_ms)
+            extra = generate_ohlcv(missing, timeframe=timeframe,
+                                   start=pd.to_datetime(last_open + interval_ms, unit='ms'),
+                                   start_price=float(base['df']['close'].iloc[-1]), volatility=0.004,
+                                   seed=symbol_seed(f"{symbol}_{timeframe}_{base['segments']}", self.seed))
+            base['df'] = pd.concat([base['df'], extra])
+            base['segments'] += 1
+            base['version'] += 1
+        return base
+
+    def _market(self, symbol: str, interval: str) -> Dict[str, Any]:
+        """Candles for a market; synthetic markets are kept up to date with the clock"""
+        if interval not in TIMEFRAME_MS:
+            self._raise(400, -1120, 'Invalid interval.')
+        if symbol not in self.symbols and not (self.candle_store and self.candle_store.exists(symbol, interval)):
+            self._raise(400, -1121, 'Invalid symbol.')
+
+        key = (symbol, interval)
+        with self._lock:
+            market = self._markets.get(key)
+            if market is not None and not market['synthetic']:
+                return market
+            if market is None and self.candle_store is not None:
+                stored = self.candle_store.read(symbol, interval)
+                if stored is not None and not stored.empty:
+                    self.add_candles(symbol, interval, stored)
+                    return self._markets[key]
+
+            # Longer timeframes are resampled from the price_timeframe path so prices agree
+            # across timeframes and with the ticker; shorter ones get their own path
+            base_timeframe = self.price_timeframe
+            if TIMEFRAME_MS[interval] < TIMEFRAME_MS[base_timeframe]:
+                base_timeframe = interval
+            ratio = TIMEFRAME_MS[interval] // TIMEFRAME_MS[base_timeframe]
+            base = self._base_series(symbol, base_timeframe, min(self.n_bars * ratio, MAX_BASE_BARS))
+            if market is None or market['version'] != base['version']:
+                df = base['df'] if ratio == 1 else resample_candles(base['df'], interval)
+                market = {'df': df, 'open_times': df.index.values.astype('datetime64[ms]').astype(np.int64),
+                          'synthetic': True, 'version': base['version']}
+                self._markets[key] = market
+            return market
+
+    def _klines(self, symbol: str, interval: str, start_ms: Optional[int], end_ms: Optional[int],
+                limit: int) -> List[list]:
+        market = self._market(symbol, interval)
+        open_times = market['open_times']
+        now_ms = int(self.clock() * 1000)
+        # Never serve candles that have not opened yet
+        end_ms = now_ms if end_ms is None else min(end_ms, now_ms)
+        hi = int(np.searchsorted(open_times, end_ms, side='right'))
+        if start_ms is not None:
+            lo = int(np.searchsorted(open_times, start_ms, side='left'))
+            hi = min(hi, lo + limit)
+        else:
+            lo = max(0, hi - limit)
+        return to_klines(market['df'].iloc[lo:hi], interval)
+
+    def closed_klines(self, symbol: str, interval: str, after_open_ms: Optional[int] = None) -> List[list]:
+        """Candles closed by now and opened after after_open_ms, without weight or latency (for stream stand-ins)"""
+        market = self._market(symbol, interval)
+        open_times = market['open_times']
+        now_ms = int(self.clock() * 1000)
+        hi = int(np.searchsorted(open_times, now_ms - TIMEFRAME_MS[interval], side='right'))
+        lo = 0 if after_open_ms is None else int(np.searchsorted(open_times, after_open_ms, side='right'))
+        return to_klines(market['df'].iloc[lo:hi], interval) if lo < hi else []
+
+    def _to_ms(self, value) -> Optional[int]:
+        if value is None:
+            return None
+        if isinstance(value, (int, float, np.integer)):
+            return int(value)
+        value = str(value)
+        if value.isdigit():
+            return int(value)
+        text = value.replace(' UTC', '').strip()
+        if text.endswith(' ago'):
+            # Relative to the simulated clock, like every other timestamp of this client
+            return int(self.clock() * 1000) - int(pd.Timedelta(text[:-4]).value // 1_000_000)
+        return int(pd.Timestamp(text).value // 1_000_000)
+
+    def get_klines(self, symbol=None, interval=None, limit=500, startTime=None, endTime=None, **kwargs):
+        limit = min(int(limit), 1000)
+        self._request('klines', kline_weight(limit))
+        return self._klines(symbol, interval, self._to_ms(startTime), self._to_ms(endTime), limit)
+
+    def get_historical_klines(self, symbol, interval, start_str=None, end_str=None, limit=1000, **kwargs):
+        """Paged like the real client: one weighted request per 1000 candles"""
+        start_ms = self._to_ms(start_str)
+        end_ms = self._to_ms(end_str)
+        if start_ms is None:
+            # No start: the real client returns the most recent `limit` candles
+            self._request('klines', kline_weight(limit))
+            return self._klines(symbol, interval, None, end_ms, limit)
+
+        klines = []
+        page_limit = min(int(limit), 1000)
+        while True:
+            self._request('klines', kline_weight(page_limit))
+            page = self._klines(symbol, interval, start_ms, end_ms, page_limit)
+            klines.extend(page)
+            if len(page) < page_limit:
+                break
+            start_ms = page[-1][0] + TIMEFRAME_MS[interval]
+        return klines
+
+    def _price(self, symbol: str) -> float:
+        market = self._market(symbol, self.price_timeframe)
+        now_ms = int(self.clock() * 1000)
+        idx = max(0, int(np.searchsorted(market['open_times'], now_ms, side='right')) - 1)
+        return float(market['df']['close'].iloc[idx])
+
+    def get_symbol_ticker(self, symbol=None, symbols=None, **kwargs):
+        if symbol is None:
+            # symbols: JSON list as sent to the real API, e.g. '["BTCUSDT","ETHUSDT"]'
+            wanted = json.loads(symbols) if symbols is not None else self.symbols
+            self._request('ticker/price_all', ENDPOINT_WEIGHTS['ticker/price_all'])
+            for s in wanted:
+                if s not in self.symbols:
+                    self._raise(400, -1121, 'Invalid symbol.')
+            return [{'symbol': s, 'price': f"{self._price(s):.8f}"} for s in wanted]
+        self._request('ticker/price', ENDPOINT_WEIGHTS['ticker/price'])
+        return {'symbol': symbol, 'price': f"{self._price(symbol):.8f}"}
+
+    def get_all_tickers(self, **kwargs):
+        return self.get_symbol_ticker()
+
+    def get_orderbook_ticker(self, symbol=None, **kwargs):
+        def book(s):
+            price = self._price(s)
+            return {'symbol': s, 'bidPrice': f"{price * 0.9999:.8f}", 'bidQty': '10.00000000',
+                    'askPrice': f"{price * 1.0001:.8f}", 'askQty': '10.00000000'}
+
+        if symbol is None:
+            self._request('ticker/bookTicker_all', ENDPOINT_WEIGHTS['ticker/bookTicker_all'])
+            return [book(s) for s in self.symbols]
+        self._request('ticker/bookTicker', ENDPOINT_WEIGHTS['ticker/bookTicker'])
+        return book(symbol)
+
+    def get_server_time(self):
+        self._request('time', ENDPOINT_WEIGHTS['time'])
+        return {'serverTime': int(self.clock() * 1000)}
+
+    def ping(self):
+        self._request('ping', ENDPOINT_WEIGHTS['ping'])
+        return {}
+
+    # ------------------------------------------------------------------
+    # Exchange info and account
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _split_symbol(symbol: str):
+        for quote in QUOTE_ASSETS:
+            if symbol.endswith(quote) and len(symbol) > len(quote):
+                return symbol[:-len(quote)], quote
+        return symbol[:-4], symbol[-4:]
+
+    def _symbol_info(self, symbol: str) -> Dict[str, Any]:
+        base, quote = self._split_symbol(symbol)
+        price = DEFAULT_PRICES.get(symbol, 100.0)
+        # Coarser lots for cheaper assets, as on the real exchange
+        step_decimals = min(8, max(0, int(math.ceil(math.log10(max(price, 1e-8)))) + 1))
+        step = f"{10 ** -step_decimals:.8f}" if step_decimals else '1.00000000'
+        tick_decimals = min(8, max(2, 6 - int(math.ceil(math.log10(max(price, 1e-8))))))
+        tick = f"{10 ** -tick_decimals:.8f}"
+        return {
+            'symbol': symbol,
+            'status': 'TRADING',
+            'baseAsset': base,
+            'baseAssetPrecision': 8,
+            'quoteAsset': quote,
+            'quotePrecision': 8,
+            'quoteAssetPrecision': 8,
+            'orderTypes': ['LIMIT', 'LIMIT_MAKER', 'MARKET', 'STOP_LOSS_LIMIT', 'TAKE_PROFIT_LIMIT'],
+            'icebergAllowed': True,
+            'ocoAllowed': True,
+            'isSpotTradingAllowed': True,
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'minPrice': tick, 'maxPrice': '1000000.00000000', 'tickSize': tick},
+                {'filterType': 'LOT_SIZE', 'minQty': step, 'maxQty': '9000000.00000000', 'stepSize': step},
+                {'filterType': 'NOTIONAL', 'minNotional': '5.00000000', 'applyMinToMarket': True,
+                 'maxNotional': '9000000.00000000', 'applyMaxToMarket': False, 'avgPriceMins': 5}
+            ]
+        }
+
+    def get_exchange_info(self):
+        self._request('exchangeInfo', ENDPOINT_WEIGHTS['exchangeInfo'])
+        return {
+            'timezone': 'UTC',
+            'serverTime': int(self.clock() * 1000),
+            'rateLimits': [
+                {'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE', 'intervalNum': 1, 'limit': self.weight_limit}
+            ],
+            'symbols': [self._symbol_info(symbol) for symbol in self.symbols]
+        }
+
+    def get_symbol_info(self, symbol):
+        info = self.get_exchange_info()
+        for item in info['symbols']:
+            if item['symbol'] == symbol:
+                return item
+        return None
+
+    def get_account(self, **kwargs):
+        self._request('account', ENDPOINT_WEIGHTS['account'])
+        with self._lock:
+            return {
+                'makerCommission': 10,
+                'takerCommission': 10,
+                'canTrade': True,
+                'canWithdraw': False,
+                'canDeposit': False,
+                'updateTime': int(self.clock() * 1000),
+                'accountType': 'SPOT',
+                'balances': [
+                    {'asset': asset, 'free': f"{b['free']:.8f}", 'locked': f"{b['locked']:.8f}"}
+                    for asset, b in self.balances.items()
+                ]
+            }
+
+    def get_asset_balance(self, asset, **kwargs):
+        account = self.get_account()
+        for balance in account['balances']:
+            if balance['asset'] == asset:
+                return balance
+        return None
+
+    # ------------------------------------------------------------------
+    # Orders
+    # ------------------------------------------------------------------
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """Register a callback for user-data-stream style events (executionReport, outboundAccountPosition)"""
+        self._listeners.append(callback)
+
+    def stream_get_listen_key(self):
+        """Listen key for the user data stream (served by utils.fake_streams.FakeUserDataStreamServer)"""
+        self._request('userDataStream', ENDPOINT_WEIGHTS['userDataStream'])
+        with self._lock:
+            listen_key = secrets.token_hex(30)
+            self._listen_keys.add(listen_key)
+            return listen_key
+
+    def stream_keepalive(self, listenKey):
+        self._request('userDataStream', ENDPOINT_WEIGHTS['userDataStream'])
+        with self._lock:
+            if listenKey not in self._listen_keys:
+                self._raise(400, -1125, 'This listenKey does not exist.')
+            return {}
+
+    def stream_close(self, listenKey):
+        self._request('userDataStream', ENDPOINT_WEIGHTS['userDataStream'])
+        with self._lock:
+            self._listen_keys.discard(listenKey)
+            return {}
+
+    def valid_listen_key(self, listen_key: str) -> bool:
+        with self._lock:
+            return listen_key in self._listen_keys
+
+    def _emit(self, event: Dict[str, Any]):
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Error in fake client listener: {e}")
+
+    def _balance(self, asset: str) -> Dict[str, float]:
+        return self.balances.setdefault(asset, {'free': 0.0, 'locked': 0.0})
+
+    def _has_free(self, asset: str, amount: float) -> bool:
+        # Balances are floats here but 8-decimal amounts on the exchange: ignore float error below that
+        return self._balance(asset)['free'] >= amount - 1e-9
+
+    def _validate_order(self, symbol: str, side: str, order_type: str, quantity, quote_order_qty):
+        if symbol not in self.symbols:
+            self._raise(400, -1121, 'Invalid symbol.')
+        if side not in ('BUY', 'SELL'):
+            self._raise(400, -1102, "Mandatory parameter 'side' was not sent, was empty/null, or malformed.")
+        if quantity is None and quote_order_qty is None:
+            self._raise(400, -1102, "Mandatory parameter 'quantity' was not sent, was empty/null, or malformed.")
+        if order_type not in ('MARKET', 'LIMIT', 'LIMIT_MAKER', 'STOP_LOSS_LIMIT', 'TAKE_PROFIT_LIMIT'):
+            self._raise(400, -1116, 'Invalid orderType.')
+
+    def _account_position_event(self, assets: List[str]) -> Dict[str, Any]:
+        now_ms = int(self.clock() * 1000)
+        return {
+            'e': 'outboundAccountPosition',
+            'E': now_ms,
+            'u': now_ms,
+            'B': [{'a': a, 'f': f"{self._balance(a)['free']:.8f}", 'l': f"{self._balance(a)['locked']:.8f}"}
+                  for a in assets]
+        }
+
+    def _execution_report(self, order: Dict[str, Any], execution_type: str, last_qty: float = 0.0,
+                          last_price: float = 0.0, commission: float = 0.0, commission_asset: str = '') -> Dict[str, Any]:
+        return {
+            'e': 'executionReport',
+            'E': int(self.clock() * 1000),
+            's': order['symbol'],
+            'c': order['clientOrderId'],
+            'S': order['side'],
+            'o': order['type'],
+            'q': order['origQty'],
+            'p': order['price'],
+            'P': order.get('stopPrice', '0.00000000'),
+            'g': order.get('orderListId', -1),
+            'x': execution_type,
+            'X': order['status'],
+            'i': order['orderId'],
+            'l': f"{last_qty:.8f}",
+            'z': order['executedQty'],
+            'L': f"{last_price:.8f}",
+            'n': f"{commission:.8f}",
+            'N': commission_asset or None,
+            'T': order['updateTime'],
+            'Z': order['cummulativeQuoteQty']
+        }
+
+    def _fill(self, order: Dict[str, Any], price: float) -> List[Dict[str, str]]:
+        """Fill an order completely at price, moving balances and emitting stream events"""
+        base, quote = self._split_symbol(order['symbol'])
+        qty = float(order['origQty'])
+        notional = qty * price
+
+        # Charged as reported (8 decimals), so quantities net of the reported commission are held in full
+        if order['side'] == 'BUY':
+            commission = round(qty * self.fee_rate, 8)
+            commission_asset = base
+            self._balance(quote)['free'] -= notional
+            self._balance(base)['free'] += qty - commission
+        else:
+            commission = round(notional * self.fee_rate, 8)
+            commission_asset = quote
+            self._balance(base)['free'] -= qty
+            self._balance(quote)['free'] += notional - commission
+
+        order['status'] = 'FILLED'
+        order['executedQty'] = f"{qty:.8f}"
+        order['cummulativeQuoteQty'] = f"{notional:.8f}"
+        order['updateTime'] = int(self.clock() * 1000)
+        fills = [{'price': f"{price:.8f}", 'qty': f"{qty:.8f}", 'commission': f"{commission:.8f}",
+                  'commissionAsset': commission_asset, 'tradeId': order['orderId']}]
+        order['fills'] = fills
+
+        self._emit(self._execution_report(order, 'TRADE', qty, price, commission, commission_asset))
+        self._emit(self._account_position_event([base, quote]))
+        return fills
+
+    def _new_order(self, symbol: str, side: str, order_type: str, quantity, price=None, stop_price=None,
+                   client_order_id: Optional[str] = None, order_list_id: int = -1) -> Dict[str, Any]:
+        if client_order_id and client_order_id in self._client_order_ids:
+            existing = self._orders[self._client_order_ids[client_order_id]]
+            if existing['status'] in ('NEW', 'PARTIALLY_FILLED', 'FILLED'):
+                self._raise(400, -2010, 'Duplicate order sent.')
+
+        order_id = self._next_order_id
+        self._next_order_id += 1
+        now_ms = int(self.clock() * 1000)
+        order = {
+            'symbol': symbol,
+            'orderId': order_id,
+            'orderListId': order_list_id,
+            'clientOrderId': client_order_id or f"fake{order_id:012d}",
+            'transactTime': now_ms,
+            'price': f"{float(price or 0):.8f}",
+            'origQty': f"{float(quantity):.8f}",
+            'executedQty': '0.00000000',
+            'cummulativeQuoteQty': '0.00000000',
+            'status': 'NEW',
+            'timeInForce': 'GTC',
+            'type': order_type,
+            'side': side,
+            'updateTime': now_ms,
+            'fills': []
+        }
+        if stop_price is not None:
+            order['stopPrice'] = f"{float(stop_price):.8f}"
+        self._orders[order_id] = order
+        self._client_order_ids[order['clientOrderId']] = order_id
+        return order
+
+    def create_order(self, symbol=None, side=None, type=None, quantity=None, quoteOrderQty=None, price=None,
+                     stopPrice=None, newClientOrderId=None, timeInForce=None, **kwargs):
+        self._request('order', ENDPOINT_WEIGHTS['order'])
+        self._validate_order(symbol, side, type, quantity, quoteOrderQty)
+
+        with self._lock:
+            market_price = self._price(symbol)
+            if quantity is None:
+                quantity = float(quoteOrderQty) / market_price
+            quantity = float(quantity)
+            base, quote = self._split_symbol(symbol)
+
+            if type == 'MARKET':
+                fill_price = market_price * (1 + self.slippage if side == 'BUY' else 1 - self.slippage)
+                if side == 'BUY' and not self._has_free(quote, quantity * fill_price):
+                    self._raise(400, -2010, 'Account has insufficient balance for requested action.')
+                if side == 'SELL' and not self._has_free(base, quantity):
+                    self._raise(400, -2010, 'Account has insufficient balance for requested action.')
+                order = self._new_order(symbol, side, type, quantity, client_order_id=newClientOrderId)
+                self._emit(self._execution_report(order, 'NEW'))
+                self._fill(order, fill_price)
+            else:
+                order = self._new_order(symbol, side, type, quantity, price=price, stop_price=stopPrice,
+                                        client_order_id=newClientOrderId)
+                self._emit(self._execution_report(order, 'NEW'))
+
+            if self.order_timeout_rate and self._rng.random() < self.order_timeout_rate:
+                self.stats['timeouts'] += 1
+                raise ReadTimeout(f"Read timed out placing {newClientOrderId or order['clientOrderId']}")
+            return {k: v for k, v in order.items()}
+
+    def create_test_order(self, symbol=None, side=None, type=None, quantity=None, quoteOrderQty=None, **kwargs):
+        self._request('order/test', ENDPOINT_WEIGHTS['order/test'])
+        self._validate_order(symbol, side, type, quantity, quoteOrderQty)
+        return {}
+
+    def get_order(self, symbol=None, orderId=None, origClientOrderId=None, **kwargs):
+        self._request('order_query', ENDPOINT_WEIGHTS['order_query'])
+        with self._lock:
+            if orderId is None and origClientOrderId is not None:
+                orderId = self._client_order_ids.get(origClientOrderId)
+            order = self._orders.get(int(orderId)) if orderId is not None else None
+            if order is None or order['symbol'] != symbol:
+                self._raise(400, -2013, 'Order does not exist.')
+            return {k: v for k, v in order.items() if k != 'fills'}
+
+    def get_open_orders(self, symbol=None, **kwargs):
+        self._request('openOrders', ENDPOINT_WEIGHTS['openOrders'])
+        with self._lock:
+            return [{k: v for k, v in o.items() if k != 'fills'} for o in self._orders.values()
+                    if o['status'] in ('NEW', 'PARTIALLY_FILLED') and (symbol is None or o['symbol'] == symbol)]
+
+    def cancel_order(self, symbol=None, orderId=None, origClientOrderId=None, **kwargs):
+        self._request('order', ENDPOINT_WEIGHTS['order'])
+        with self._lock:
+            if orderId is None and origClientOrderId is not None:
+                orderId = self._client_order_ids.get(origClientOrderId)
+            order = self._orders.get(int(orderId)) if orderId is not None else None
+            if order is None or order['status'] not in ('NEW', 'PARTIALLY_FILLED'):
+                self._raise(400, -2011, 'Unknown order sent.')
+            # Canceling one leg of an order list cancels the whole list
+            order_list = self._order_lists.get(order['orderListId'])
+            legs = [self._orders[o['orderId']] for o in order_list['orders']] if order_list else [order]
+            released = order_list.get('locked') if order_list else None
+            self._release_lock(order_list)
+            for leg in legs:
+                if leg['status'] in ('NEW', 'PARTIALLY_FILLED'):
+                    self._finish(leg, 'CANCELED')
+            if order_list:
+                self._list_done(order_list, 'ALL_DONE')
+            if released:
+                self._emit(self._account_position_event([released[0]]))
+            return {k: v for k, v in order.items() if k != 'fills'}
+
+    # ------------------------------------------------------------------
+    # OCO order lists and matching
+    # ------------------------------------------------------------------
+
+    def create_oco_order(self, symbol=None, side=None, quantity=None, listClientOrderId=None,
+                         aboveType=None, abovePrice=None, aboveStopPrice=None, aboveClientOrderId=None,
+                         belowType=None, belowPrice=None, belowStopPrice=None, belowClientOrderId=None, **kwargs):
+        """
+        New OCO order list (POST /api/v3/orderList/oco)
+
+        A SELL takes profit above the price (LIMIT_MAKER/TAKE_PROFIT*) and stops below it
+        (STOP_LOSS*), a BUY the other way round. The list's quantity is locked until one
+        leg fills, which expires the other.
+        """
+        self._request('order/oco', ENDPOINT_WEIGHTS['order/oco'])
+        self._validate_order(symbol, side, 'LIMIT', quantity, None)
+        profit_types, stop_types = ('LIMIT_MAKER', 'TAKE_PROFIT', 'TAKE_PROFIT_LIMIT'), ('STOP_LOSS', 'STOP_LOSS_LIMIT')
+        above_types, below_types = (profit_types, stop_types) if side == 'SELL' else (stop_types, profit_types)
+        if aboveType not in above_types or belowType not in below_types:
+            self._raise(400, -1116, 'Invalid orderType.')
+
+        with self._lock:
+            market_price = self._price(symbol)
+            above_trigger = float(abovePrice if aboveType == 'LIMIT_MAKER' else aboveStopPrice or 0)
+            below_trigger = float(belowPrice if belowType == 'LIMIT_MAKER' else belowStopPrice or 0)
+            if not below_trigger < market_price < above_trigger:
+                self._raise(400, -2010, 'The relationship of the prices for the orders is not correct.')
+            quantity = float(quantity)
+            base, quote = self._split_symbol(symbol)
+            if side == 'SELL':
+                asset, amount = base, quantity
+            else:
+                asset, amount = quote, quantity * max(float(abovePrice or 0), float(aboveStopPrice or 0))
+            if not self._has_free(asset, amount):
+                self._raise(400, -2010, 'Account has insufficient balance for requested action.')
+
+            order_list_id = self._next_order_list_id
+            self._next_order_list_id += 1
+            legs = [
+                self._new_order(symbol, side, belowType, quantity, price=belowPrice, stop_price=belowStopPrice,
+                                client_order_id=belowClientOrderId, order_list_id=order_list_id),
+                self._new_order(symbol, side, aboveType, quantity, price=abovePrice, stop_price=aboveStopPrice,
+                                client_order_id=aboveClientOrderId, order_list_id=order_list_id)
+            ]
+            self._balance(asset)['free'] -= amount
+            self._balance(asset)['locked'] += amount
+            order_list = {
+                'orderListId': order_list_id,
+                'contingencyType': 'OCO',
+                'listStatusType': 'EXEC_STARTED',
+                'listOrderStatus': 'EXECUTING',
+                'listClientOrderId': listClientOrderId or f"fakelist{order_list_id:08d}",
+                'transactionTime': int(self.clock() * 1000),
+                'symbol': symbol,
+                'orders': [{'symbol': symbol, 'orderId': o['orderId'], 'clientOrderId': o['clientOrderId']}
+                           for o in legs],
+                'locked': (asset, amount)
+            }
+            self._order_lists[order_list_id] = order_list
+
+            for leg in legs:
+                self._emit(self._execution_report(leg, 'NEW'))
+            self._emit(self._list_status_event(order_list))
+            self._emit(self._account_position_event([asset]))
+
+            response = {k: v for k, v in order_list.items() if k != 'locked'}
+            response['orderReports'] = [{k: v for k, v in o.items() if k != 'fills'} for o in legs]
+            return response
+
+    def order_oco_sell(self, symbol=None, quantity=None, price=None, stopPrice=None, stopLimitPrice=None,
+                       **kwargs):
+        """Legacy-style SELL OCO (limit price above, stop below) mapped onto create_oco_order"""
+        return self.create_oco_order(
+            symbol=symbol, side='SELL', quantity=quantity, listClientOrderId=kwargs.get('listClientOrderId'),
+            aboveType='LIMIT_MAKER', abovePrice=price, aboveClientOrderId=kwargs.get('limitClientOrderId'),
+            belowType='STOP_LOSS_LIMIT' if stopLimitPrice is not None else 'STOP_LOSS', belowPrice=stopLimitPrice,
+            belowStopPrice=stopPrice, belowClientOrderId=kwargs.get('stopClientOrderId'))
+
+    def order_oco_buy(self, symbol=None, quantity=None, price=None, stopPrice=None, stopLimitPrice=None,
+                      **kwargs):
+        """Legacy-style BUY OCO (limit price below, stop above) mapped onto create_oco_order"""
+        return self.create_oco_order(
+            symbol=symbol, side='BUY', quantity=quantity, listClientOrderId=kwargs.get('listClientOrderId'),
+            belowType='LIMIT_MAKER', belowPrice=price, belowClientOrderId=kwargs.get('limitClientOrderId'),
+            aboveType='STOP_LOSS_LIMIT' if stopLimitPrice is not None else 'STOP_LOSS', abovePrice=stopLimitPrice,
+            aboveStopPrice=stopPrice, aboveClientOrderId=kwargs.get('stopClientOrderId'))
+
+    def match_orders(self) -> int:
+        """
+        Trigger and fill resting orders against the current ticker price
+
+        Limit legs fill at their limit price once the price reaches it; stops trigger
+        when the price crosses the stop and then fill at the price (STOP_LOSS/TAKE_PROFIT)
+        or rest as a limit order (*_LIMIT) until marketable. A filled list leg expires
+        its sibling.
+
+        Returns:
+            Number of orders filled
+        """
+        with self._lock:
+            resting = [o for o in self._orders.values() if o['status'] in ('NEW', 'PARTIALLY_FILLED')
+                       and o['type'] != 'MARKET']
+            prices = {}
+            filled = 0
+            for order in resting:
+                if order['status'] not in ('NEW', 'PARTIALLY_FILLED'):
+                    continue  # Expired by a sibling filled earlier in this pass
+                symbol = order['symbol']
+                if symbol not in prices:
+                    prices[symbol] = self._price(symbol)
+                fill_price = self._match_price(order, prices[symbol])
+                if fill_price is None:
+                    continue
+
+                order_list = self._order_lists.get(order['orderListId'])
+                if order_list is None and not self._can_fill(order, fill_price):
+                    continue
+                self._release_lock(order_list)
+                self._fill(order, fill_price)
+                self._triggered.discard(order['orderId'])
+                filled += 1
+                if order_list is not None:
+                    for leg in order_list['orders']:
+                        sibling = self._orders[leg['orderId']]
+                        if sibling['status'] in ('NEW', 'PARTIALLY_FILLED'):
+                            self._finish(sibling, 'EXPIRED')
+                    self._list_done(order_list, 'ALL_DONE')
+            return filled
+
+    def _match_price(self, order: Dict[str, Any], price: float) -> Optional[float]:
+        """Fill price of a resting order at the current price (None: keeps resting)"""
+        sell = order['side'] == 'SELL'
+        order_type = order['type']
+        limit = float(order['price'])
+
+        if order_type.startswith(('STOP_LOSS', 'TAKE_PROFIT')) and order['orderId'] not in self._triggered:
+            stop = float(order['stopPrice'])
+            # Stop losses trigger on the way down for sells, take profits on the way up
+            falling = order_type.startswith('STOP_LOSS') == sell
+            if not (price <= stop if falling else price >= stop):
+                return None
+            self._triggered.add(order['orderId'])
+            if order_type in ('STOP_LOSS', 'TAKE_PROFIT'):
+                return price * (1 - self.slippage if sell else 1 + self.slippage)
+            # A triggered stop-limit takes liquidity when its limit is already marketable
+            if price >= limit if sell else price <= limit:
+                return price
+            return None
+
+        if order_type in ('STOP_LOSS', 'TAKE_PROFIT'):
+            return None
+        # Limit orders (and triggered stop-limits) fill at their limit once reached
+        return limit if (price >= limit if sell else price <= limit) else None
+
+    def _can_fill(self, order: Dict[str, Any], price: float) -> bool:
+        # Standalone resting orders do not lock funds, so check the balance at fill time
+        base, quote = self._split_symbol(order['symbol'])
+        qty = float(order['origQty'])
+        if order['side'] == 'BUY':
+            return self._has_free(quote, qty * price)
+        return self._has_free(base, qty)
+
+    def _release_lock(self, order_list: Optional[Dict[str, Any]]):
+        if order_list is None or order_list.get('locked') is None:
+            return
+        asset, amount = order_list['locked']
+        self._balance(asset)['locked'] -= amount
+        self._balance(asset)['free'] += amount
+        order_list['locked'] = None
+
+    def _finish(self, order: Dict[str, Any], status: str):
+        order['status'] = status
+        order['updateTime'] = int(self.clock() * 1000)
+        self._triggered.discard(order['orderId'])
+        self._emit(self._execution_report(order, status))
+
+    def _list_done(self, order_list: Dict[str, Any], status: str):
+        order_list['listStatusType'] = status
+        order_list['listOrderStatus'] = status
+        order_list['transactionTime'] = int(self.clock() * 1000)
+        self._emit(self._list_status_event(order_list))
+
+    def _list_status_event(self, order_list: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'e': 'listStatus',
+            'E': int(self.clock() * 1000),
+            's': order_list['symbol'],
+            'g': order_list['orderListId'],
+            'c': order_list['contingencyType'],
+            'l': order_list['listStatusType'],
+            'L': order_list['listOrderStatus'],
+            'r': 'NONE',
+            'C': order_list['listClientOrderId'],
+            'T': order_list['transactionTime'],
+            'O': [{'s': o['symbol'], 'i': o['orderId'], 'c': o['clientOrderId']} for o in order_list['orders']]
+        }
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request counts per endpoint, total weight, throttled/banned requests and simulated latency"""
+        with self._lock:
+            return {
+                'requests': dict(self.stats['requests']),
+                'total_requests': sum(self.stats['requests'].values()),
+                'weight': self.stats['weight'],
+                'used_weight_1m': self._used_weight,
+                'throttled': self.stats['throttled'],
+                'banned': self.stats['banned'],
+                'timeouts': self.stats['timeouts'],
+                'latency_seconds': self.stats['latency']
+            }
+
+    def close_connection(self):
+        pass
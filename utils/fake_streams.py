@@ -0,0 +1,267 @@
+"""
+Local WebSocket stand-ins for Binance streams, backed by FakeBinanceClient
+
+FakeKlineStreamServer serves /stream?streams=<symbol>@kline_<tf>/... and
+pushes a closed-kline event whenever a candle of the fake client closes,
+with knobs to drop messages and connections so reconnects and REST
+backfills can be exercised offline.
+
+FakeUserDataStreamServer serves /ws/<listenKey> and forwards the client's
+executionReport / outboundAccountPosition events as the user data stream.
+"""
+
+import json
+import random
+import asyncio
+import logging
+import threading
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+
+def kline_row_to_event(symbol: str, interval: str, row: list, closed: bool = True) -> dict:
+    """REST kline row -> combined-stream kline event"""
+    return {
+        'stream': f"{symbol.lower()}@kline_{interval}",
+        'data': {
+            'e': 'kline',
+            'E': int(row[6]) + 1,
+            's': symbol,
+            'k': {
+                't': int(row[0]), 'T': int(row[6]), 's': symbol, 'i': interval,
+                'f': 0, 'L': 0,
+                'o': row[1], 'c': row[4], 'h': row[2], 'l': row[3], 'v': row[5],
+                'n': int(row[8]), 'x': closed, 'q': row[7], 'V': row[9], 'Q': row[10], 'B': '0'
+            }
+        }
+    }
+
+
+class FakeKlineStreamServer:
+    """Combined kline stream server fed by a FakeBinanceClient's candles and clock"""
+
+    def __init__(self, client, host: str = '127.0.0.1', port: int = 0, poll_interval: float = 0.05,
+                 drop_rate: float = 0.0, seed: int = 42):
+        """
+        Args:
+            client: FakeBinanceClient whose candles and clock drive the stream
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            poll_interval: Seconds between checks for newly closed candles
+            drop_rate: Probability of silently dropping a close event (to create gaps)
+            seed: Random seed for dropped messages
+        """
+        self.client = client
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self.drop_rate = drop_rate
+        self._rng = random.Random(seed)
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._ready = threading.Event()
+        self._connections = set()
+        self.stats = {'connections': 0, 'sent': 0, 'dropped': 0}
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 5.0) -> str:
+        """Start serving in a background thread and return the base URL"""
+        self._thread = threading.Thread(target=self._run_loop, name='fake-kline-stream', daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("Fake kline stream server did not start")
+        logger.info(f"Fake kline stream serving on {self.url}")
+        return self.url
+
+    def stop(self, timeout: float = 5.0):
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def drop_connections(self):
+        """Close every client connection (clients are expected to reconnect and backfill)"""
+        if self._loop is None:
+            return
+        for ws in list(self._connections):
+            asyncio.run_coroutine_threadsafe(ws.close(code=1001, reason='going away'), self._loop)
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._loop.close()
+
+    async def _serve(self):
+        async with websockets.serve(self._handler, self.host, self.port) as server:
+            self._server = server
+            self.port = list(server.sockets)[0].getsockname()[1]
+            self._ready.set()
+            await server.wait_closed()
+
+    async def _handler(self, ws, path: Optional[str] = None):
+        request = getattr(ws, 'request', None)
+        path = path or (request.path if request is not None else getattr(ws, 'path', ''))
+        streams = [s for s in parse_qs(urlparse(path).query).get('streams', [''])[0].split('/') if s]
+
+        markets = []
+        for name in streams:
+            symbol, kline = name.split('@')
+            markets.append((symbol.upper(), kline[len('kline_'):]))
+
+        # Only candles that close after the connection opens are pushed
+        last_sent = {}
+        for symbol, interval in markets:
+            closed = self.client.closed_klines(symbol, interval)
+            last_sent[(symbol, interval)] = closed[-1][0] if closed else None
+
+        self._connections.add(ws)
+        self.stats['connections'] += 1
+        try:
+            while True:
+                for market in markets:
+                    for row in self.client.closed_klines(market[0], market[1], last_sent[market]):
+                        last_sent[market] = row[0]
+                        if self.drop_rate and self._rng.random() < self.drop_rate:
+                            self.stats['dropped'] += 1
+                            continue
+                        await ws.send(json.dumps(kline_row_to_event(market[0], market[1], row)))
+                        self.stats['sent'] += 1
+                await asyncio.sleep(self.poll_interval)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._connections.discard(ws)
+
+
+class FakeUserDataStreamServer:
+    """User data stream server pushing a FakeBinanceClient's order and balance events"""
+
+    def __init__(self, client, host: str = '127.0.0.1', port: int = 0, drop_rate: float = 0.0, seed: int = 42,
+                 match_interval: float = 1.0):
+        """
+        Args:
+            client: FakeBinanceClient whose listen keys and events drive the stream
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            drop_rate: Probability of silently dropping an event (for reconcile testing)
+            seed: Random seed for dropped messages
+            match_interval: Seconds between matching resting orders (stops and OCO legs fill
+                            without the bot making requests, as on the exchange)
+        """
+        self.client = client
+        self.host = host
+        self.port = port
+        self.drop_rate = drop_rate
+        self.match_interval = match_interval
+        self._rng = random.Random(seed)
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._ready = threading.Event()
+        self._queues = {}
+        self.stats = {'connections': 0, 'sent': 0, 'dropped': 0, 'rejected': 0}
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 5.0) -> str:
+        """Start serving in a background thread and return the base URL"""
+        self._thread = threading.Thread(target=self._run_loop, name='fake-user-stream', daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("Fake user data stream server did not start")
+        self.client.add_listener(self._on_event)
+        logger.info(f"Fake user data stream serving on {self.url}")
+        return self.url
+
+    def stop(self, timeout: float = 5.0):
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def drop_connections(self):
+        """Close every client connection (clients are expected to reconnect and reconcile)"""
+        if self._loop is None:
+            return
+        for ws in list(self._queues):
+            asyncio.run_coroutine_threadsafe(ws.close(code=1001, reason='going away'), self._loop)
+
+    def _on_event(self, event: dict):
+        # Called from the fake client (possibly under its lock): only hand the event over
+        if self._loop is None or not self._queues:
+            return
+        if self.drop_rate and self._rng.random() < self.drop_rate:
+            self.stats['dropped'] += 1
+            return
+        message = json.dumps(event)
+        for events in list(self._queues.values()):
+            self._loop.call_soon_threadsafe(events.put_nowait, message)
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._loop.close()
+
+    async def _serve(self):
+        async with websockets.serve(self._handler, self.host, self.port) as server:
+            self._server = server
+            self.port = list(server.sockets)[0].getsockname()[1]
+            self._ready.set()
+            matcher = asyncio.ensure_future(self._match_orders())
+            try:
+                await server.wait_closed()
+            finally:
+                matcher.cancel()
+
+    async def _match_orders(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.match_interval)
+            try:
+                await loop.run_in_executor(None, self.client.match_orders)
+            except Exception as e:
+                logger.warning(f"⚠️ Error matching fake orders: {e}")
+
+    async def _handler(self, ws, path: Optional[str] = None):
+        request = getattr(ws, 'request', None)
+        path = path or (request.path if request is not None else getattr(ws, 'path', ''))
+        listen_key = urlparse(path).path.rsplit('/', 1)[-1]
+        if not self.client.valid_listen_key(listen_key):
+            self.stats['rejected'] += 1
+            await ws.close(code=1008, reason='invalid listen key')
+            return
+
+        events = asyncio.Queue()
+        self._queues[ws] = events
+        self.stats['connections'] += 1
+        closed = asyncio.ensure_future(ws.wait_closed())
+        try:
+            while True:
+                next_event = asyncio.ensure_future(events.get())
+                await asyncio.wait({next_event, closed}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_event.done():
+                    next_event.cancel()
+                    break
+                await ws.send(next_event.result())
+                self.stats['sent'] += 1
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            closed.cancel()
+            self._queues.pop(ws, None)
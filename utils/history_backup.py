@@ -0,0 +1,302 @@
+"""
+Compacted trade history backups with retention and point-in-time restore
+
+Instead of a full copy of the history per save, each backup is a delta
+against the previous one: the trades appended to each strategy since then
+plus the fields that changed (profit_usd, open positions, ...). Deltas are
+appended as gzip members to the segment of the current base, a gzipped
+full copy of the history. After base_every deltas (and at the first save
+of a process) a new base starts a new segment, and the retention policy
+drops the bases (with their segments) beyond the newest keep or older than
+max_age_days - the newest base is always kept. restore(at) rebuilds the
+history as of any time covered: the last base before it plus the deltas
+up to it.
+
+Files in the backup directory, per history name:
+    <name>_base_<YYYYmmdd_HHMMSS>.json.gz     full history
+    <name>_delta_<YYYYmmdd_HHMMSS>.jsonl.gz   one line per save after that base: {'time', 'ops'}
+"""
+
+import os
+import re
+import glob
+import gzip
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+
+from config.storage_config import (HISTORY_BACKUP_DIR, HISTORY_BACKUP_KEEP, HISTORY_BACKUP_MAX_AGE_DAYS,
+                                   HISTORY_BACKUP_BASE_EVERY)
+
+logger = logging.getLogger(__name__)
+
+TIME_FORMAT = '%Y%m%d_%H%M%S'
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, sort_keys=True, default=_encode)
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, 'item'):  # numpy scalars
+        return value.item()
+    return str(value)
+
+
+def apply_ops(history: Dict[str, Any], ops: List[Dict[str, Any]]):
+    """Apply one delta's operations to a history dict"""
+    for op in ops:
+        if 'key' not in op:
+            # Symbol-level: the symbol was removed, or added without entries
+            if op.get('delete'):
+                history.pop(op['symbol'], None)
+            else:
+                history.setdefault(op['symbol'], {})
+            continue
+        entries = history.setdefault(op['symbol'], {})
+        key = op['key']
+        if op.get('delete'):
+            entries.pop(key, None)
+        elif 'replace' in op:
+            entries[key] = op['replace']
+        else:
+            value = entries.setdefault(key, {'trades': []})
+            value['trades'].extend(op.get('append', []))
+            value.update(op.get('set', {}))
+
+
+class HistoryBackup:
+    """Base snapshot plus delta segments of a trade history, with count/age retention"""
+
+    def __init__(self, name: str = 'trade_history', directory: str = HISTORY_BACKUP_DIR,
+                 keep: int = HISTORY_BACKUP_KEEP, max_age_days: float = HISTORY_BACKUP_MAX_AGE_DAYS,
+                 base_every: int = HISTORY_BACKUP_BASE_EVERY):
+        """
+        Args:
+            name: History name, prefix of the backup files (e.g. 'trade_history')
+            directory: Backup directory
+            keep: Bases (each with its deltas) kept at most
+            max_age_days: Bases older than this are dropped (the newest one is always kept)
+            base_every: Deltas appended to a base before a new base is written
+        """
+        self.name = name
+        self.directory = directory
+        self.keep = keep
+        self.max_age_days = max_age_days
+        self.base_every = base_every
+        self._segment: Optional[str] = None
+        self._deltas = 0
+        self._state: Dict[Tuple[str, str], Any] = {}
+        self._symbols = set()
+        self.stats = {'bases': 0, 'deltas': 0, 'unchanged': 0, 'pruned': 0}
+
+    # ------------------------------------------------------------------
+    # Backing up
+    # ------------------------------------------------------------------
+
+    def save(self, history: Dict[str, Any], now: Optional[datetime] = None):
+        """Back up the current history: a delta against the previous save, or a new base when due"""
+        now = now or datetime.now()
+        if self._segment is None or self._deltas >= self.base_every:
+            self._write_base(history, now)
+            return
+        ops = self._diff(history)
+        if not ops:
+            self.stats['unchanged'] += 1
+            return
+        self._append_delta(self._segment, {'time': now.isoformat(), 'ops': ops})
+        self._deltas += 1
+        self.stats['deltas'] += 1
+
+    def import_files(self, paths: List[str], remove: bool = False) -> int:
+        """
+        Fold full-copy backups (e.g. trade_history_backup_*.json) into bases and deltas, oldest first
+
+        Args:
+            paths: Backup files holding {'trade_history': ...} (or the history itself)
+            remove: Delete each file once it is folded in
+
+        Returns:
+            Number of files imported
+        """
+        imported = 0
+        for path, when in sorted(((path, _file_time(path)) for path in paths), key=lambda item: item[1]):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"⚠️ Skipping unreadable backup {path}: {e}")
+                continue
+            self.save(data.get('trade_history', data) if isinstance(data, dict) else data, now=when)
+            imported += 1
+            if remove:
+                os.remove(path)
+        self.prune()
+        logger.info(f"✓ Imported {imported} backups into {self.directory}")
+        return imported
+
+    # ------------------------------------------------------------------
+    # Restoring
+    # ------------------------------------------------------------------
+
+    def restore(self, at: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        The history as of a point in time
+
+        Args:
+            at: Time to restore (None: the latest backup)
+
+        Returns:
+            The history, or None if no backup covers that time
+        """
+        bases = [(when, path) for when, path in self.bases() if at is None or when <= at]
+        if not bases:
+            return None
+        base_time, base_path = bases[-1]
+        with gzip.open(base_path, 'rt') as f:
+            history = json.load(f)
+        for delta in self._read_deltas(self._delta_path(base_time)):
+            if at is not None and datetime.fromisoformat(delta['time']) > at:
+                break
+            apply_ops(history, delta['ops'])
+        return history
+
+    def bases(self) -> List[Tuple[datetime, str]]:
+        """(time, path) of every base, oldest first"""
+        bases = []
+        for path in glob.glob(os.path.join(self.directory, f"{self.name}_base_*.json.gz")):
+            match = re.search(r'_base_(\d{8}_\d{6})\.json\.gz$', path)
+            if match:
+                bases.append((datetime.strptime(match.group(1), TIME_FORMAT), path))
+        return sorted(bases)
+
+    def points(self) -> List[datetime]:
+        """Every time restore() can return a distinct history for, oldest first"""
+        points = []
+        for base_time, _ in self.bases():
+            points.append(base_time)
+            points.extend(datetime.fromisoformat(delta['time'])
+                          for delta in self._read_deltas(self._delta_path(base_time)))
+        return points
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """Drop the bases (and deltas) beyond the retention policy, returns how many were dropped"""
+        now = now or datetime.now()
+        bases = self.bases()
+        cutoff = now - timedelta(days=self.max_age_days)
+        pruned = 0
+        for i, (when, path) in enumerate(bases[:-1]):
+            if i < len(bases) - self.keep or when < cutoff:
+                for stale in (path, self._delta_path(when)):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+                pruned += 1
+        if pruned:
+            self.stats['pruned'] += pruned
+            logger.info(f"Pruned {pruned} old {self.name} backups")
+        return pruned
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def _write_base(self, history: Dict[str, Any], now: datetime):
+        os.makedirs(self.directory, exist_ok=True)
+        base_time = now.replace(microsecond=0)
+        latest = self.bases()
+        if latest and latest[-1][0] >= base_time:
+            base_time = latest[-1][0] + timedelta(seconds=1)  # Two bases within a second
+        path = os.path.join(self.directory, f"{self.name}_base_{base_time.strftime(TIME_FORMAT)}.json.gz")
+        temp_file = path + '.tmp'
+        with gzip.open(temp_file, 'wt') as f:
+            f.write(_dumps(history))
+        os.replace(temp_file, path)
+        self._segment = self._delta_path(base_time)
+        self._deltas = 0
+        self._diff(history)  # The base is the state the next delta is taken against
+        self.stats['bases'] += 1
+        logger.info(f"📦 History backup base written: {path}")
+        self.prune(now)
+
+    def _append_delta(self, path: str, delta: Dict[str, Any]):
+        # Each save is its own gzip member; gzip readers decompress concatenated members as one stream
+        with open(path, 'ab') as raw:
+            raw.write(gzip.compress((_dumps(delta) + '\n').encode()))
+            raw.flush()
+            os.fsync(raw.fileno())
+
+    def _read_deltas(self, path: str):
+        if not os.path.exists(path):
+            return
+        try:
+            with gzip.open(path, 'rt') as f:
+                for line in f:
+                    yield json.loads(line)
+        except (EOFError, OSError, json.JSONDecodeError) as e:
+            # A member cut short by a crash: the deltas before it are intact
+            logger.warning(f"⚠️ Backup segment {path} ends early: {e}")
+
+    def _delta_path(self, base_time: datetime) -> str:
+        return os.path.join(self.directory, f"{self.name}_delta_{base_time.strftime(TIME_FORMAT)}.jsonl.gz")
+
+    # ------------------------------------------------------------------
+    # Deltas
+    # ------------------------------------------------------------------
+
+    def _diff(self, history: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Operations turning the previous saved state into this history (and remember this one)"""
+        ops = []
+        state = {}
+        symbols = set()
+        for symbol, entries in history.items():
+            if not isinstance(entries, dict):
+                continue
+            symbols.add(symbol)
+            if not entries and symbol not in self._symbols:
+                ops.append({'symbol': symbol})
+            for key, value in entries.items():
+                previous = self._state.get((symbol, key))
+                if isinstance(value, dict) and isinstance(value.get('trades'), list):
+                    # Trades only grow: send the new ones, checked against the last one sent
+                    trades = value['trades']
+                    fields = {field: item for field, item in value.items() if field != 'trades'}
+                    current = ('trades', len(trades), _dumps(trades[-1]) if trades else None, _dumps(fields))
+                    if previous is not None and previous[0] == 'trades' and len(trades) >= previous[1] and \
+                            (previous[1] == 0 or _dumps(trades[previous[1] - 1]) == previous[2]):
+                        op = {'symbol': symbol, 'key': key}
+                        if len(trades) > previous[1]:
+                            op['append'] = trades[previous[1]:]
+                        if current[3] != previous[3]:
+                            op['set'] = fields
+                        if len(op) > 2:
+                            ops.append(op)
+                    elif previous != current:
+                        ops.append({'symbol': symbol, 'key': key, 'replace': value})
+                else:
+                    current = ('value', _dumps(value))
+                    if previous != current:
+                        ops.append({'symbol': symbol, 'key': key, 'replace': value})
+                state[(symbol, key)] = current
+        for symbol in sorted(self._symbols - symbols):
+            ops.append({'symbol': symbol, 'delete': True})
+        for symbol, key in self._state.keys() - state.keys():
+            if symbol in symbols:
+                ops.append({'symbol': symbol, 'key': key, 'delete': True})
+        self._state = state
+        self._symbols = symbols
+        return ops
+
+
+def _file_time(path: str) -> datetime:
+    """Time in a backup's file name (trade_history_backup_20250808_101905.json), else its modification time"""
+    match = re.search(r'(\d{8}_\d{6})', os.path.basename(path))
+    if match:
+        return datetime.strptime(match.group(1), TIME_FORMAT)
+    return datetime.fromtimestamp(os.path.getmtime(path))
@@ -1,6 +1,32 @@
 import pandas as pd
 import numpy as np
 
+# Bars before the newest one that an indicator's newest value depends on.
+# EMAs never fully forget their seed: 3 spans leave < 0.3% weight on older bars.
+INDICATOR_WARMUP = {
+    'rsi': 14,
+    'ema_12': 36,
+    'ema_26': 78,
+    'macd': 78 + 27,
+    'bollinger': 19,
+    'atr': 14,
+    'sma_20': 19,
+    'sma_50': 49,
+    'sma_200': 199,
+    'price_change': 1,
+    'volume_change': 1
+}
+
+# Columns each indicator name adds to a candle frame (compute_indicators)
+INDICATOR_COLUMNS = {
+    'rsi': ('rsi',),
+    'ema_12': ('ema_12',),
+    'ema_26': ('ema_26',),
+    'macd': ('macd', 'macd_signal', 'macd_histogram'),
+    'bollinger': ('bb_upper', 'bb_middle', 'bb_lower'),
+    'atr': ('atr',)
+}
+
 def calculate_rsi(series, period=14):
     """Calculate Relative Strength Index"""
     delta = series.diff()
@@ -36,4 +62,21 @@ def calculate_atr(high, low, close, period=14):
     tr2 = abs(high - close.shift())
     tr3 = abs(low - close.shift())
     tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    return tr.rolling(window=period).mean() 
\ No newline at end of file
+    return tr.rolling(window=period).mean()
+
+def compute_indicators(df, indicators=None):
+    """Add indicator columns to a candle frame: names from INDICATOR_COLUMNS, all if None"""
+    wanted = set(indicators) if indicators is not None else None
+    if wanted is None or 'rsi' in wanted:
+        df['rsi'] = calculate_rsi(df['close'])
+    if wanted is None or 'ema_12' in wanted:
+        df['ema_12'] = calculate_ema(df['close'], 12)
+    if wanted is None or 'ema_26' in wanted:
+        df['ema_26'] = calculate_ema(df['close'], 26)
+    if wanted is None or 'macd' in wanted:
+        df['macd'], df['macd_signal'], df['macd_histogram'] = calculate_macd(df['close'])
+    if wanted is None or 'bollinger' in wanted:
+        df['bb_upper'], df['bb_middle'], df['bb_lower'] = calculate_bollinger_bands(df['close'])
+    if wanted is None or 'atr' in wanted:
+        df['atr'] = calculate_atr(df['high'], df['low'], df['close'])
+    return df
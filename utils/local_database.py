@@ -0,0 +1,516 @@
+"""
+Local SQLite database with the same interface as BigQueryDatabase
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+import pandas as pd
+from datetime import datetime, date
+from typing import List, Dict, Optional, Any, Iterable, Tuple
+
+from config.storage_config import LOCAL_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Determine the run name (e.g., 'backTestBot', 'testBot', 'prodBot')
+RUN_NAME = os.getenv('RUN_NAME', 'backTestBot')
+
+TRADE_COLUMNS = [
+    'entry_time', 'exit_time', 'strategy', 'symbol', 'timeframe', 'trade_type', 'entry_price',
+    'position_size', 'stop_loss', 'take_profit', 'profit', 'fees', 'created_at', 'run_name'
+]
+
+DAILY_SUMMARY_COLUMNS = [
+    'date', 'symbol', 'strategy', 'timeframe', 'trades_count', 'total_profit',
+    'winning_trades', 'losing_trades', 'win_rate', 'created_at'
+]
+
+TIMESTAMP_COLUMNS = ('entry_time', 'exit_time', 'created_at')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    entry_time TEXT NOT NULL,
+    exit_time TEXT,
+    strategy TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    trade_type TEXT NOT NULL,
+    entry_price REAL NOT NULL,
+    position_size REAL NOT NULL,
+    stop_loss REAL,
+    take_profit REAL,
+    profit REAL,
+    fees REAL,
+    created_at TEXT,
+    run_name TEXT,
+    synced INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_trades_run_entry ON trades (run_name, entry_time);
+CREATE TABLE IF NOT EXISTS daily_summary (
+    date TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    trades_count INTEGER,
+    total_profit REAL,
+    winning_trades INTEGER,
+    losing_trades INTEGER,
+    win_rate REAL,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS performance_metrics (
+    metric TEXT,
+    value REAL,
+    created_at TEXT
+);
+"""
+
+
+def _to_text(value) -> Optional[str]:
+    """Timestamps are stored as sortable 'YYYY-MM-DD HH:MM:SS[.ffffff]' text"""
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, datetime):
+        # Also covers pd.Timestamp, whose str() uses the same layout
+        if value.tzinfo is not None:
+            value = value.replace(tzinfo=None)
+        return str(value)
+    if isinstance(value, str):
+        return value.replace('T', ' ').replace('Z', '')
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _to_datetime(value) -> Optional[datetime]:
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return value
+
+
+class LocalDatabase:
+    """Trades, daily summaries and streak queries in a local SQLite file (WAL mode)"""
+
+    def __init__(self, db_path: str = LOCAL_DB_PATH):
+        """Open (or create) the local database"""
+        try:
+            self.db_path = db_path
+            if db_path != ':memory:':
+                os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+            self.conn.commit()
+            self._lock = threading.Lock()
+
+            # Same names as BigQueryDatabase so callers can use either backend
+            self.dataset_id = 'local'
+            self.trades_table_id = 'trades'
+            self.daily_summary_table_id = 'daily_summary'
+            self.performance_metrics_table_id = 'performance_metrics'
+
+            logger.info(f"Connected to local database: {db_path}")
+
+        except Exception as e:
+            logger.error(f"Error opening local database: {str(e)}")
+            raise
+
+    def _trade_row(self, trade_data: Dict[str, Any], created_at: str) -> Tuple:
+        """Trade dictionary -> row tuple in TRADE_COLUMNS order"""
+        return (
+            _to_text(trade_data.get('entry_time')),
+            _to_text(trade_data.get('exit_time')),
+            trade_data['strategy'],
+            trade_data['symbol'],
+            trade_data['timeframe'],
+            trade_data['trade_type'],
+            float(trade_data['entry_price']),
+            float(trade_data['position_size']),
+            trade_data.get('stop_loss'),
+            trade_data.get('take_profit'),
+            trade_data.get('profit', 0),
+            trade_data.get('fees', 0),
+            created_at,
+            trade_data.get('run_name', RUN_NAME)
+        )
+
+    def _insert_trades(self, rows: Iterable[Tuple]) -> int:
+        placeholders = ', '.join('?' for _ in TRADE_COLUMNS)
+        with self._lock:
+            cursor = self.conn.executemany(
+                f"INSERT INTO trades ({', '.join(TRADE_COLUMNS)}) VALUES ({placeholders})", rows
+            )
+            self.conn.commit()
+            return cursor.rowcount
+
+    def _query(self, query: str, params: Iterable = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            cursor = self.conn.execute(query, tuple(params))
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def batch_upload_trades(self, trades_data: List[Dict[str, Any]], batch_size: int = 1000,
+                            streaming: Optional[bool] = None) -> int:
+        """
+        Insert multiple trades in one transaction.
+
+        Args:
+            trades_data (list): List of trade dictionaries to insert
+            batch_size (int): Accepted for interface compatibility with BigQueryDatabase
+            streaming (bool): Accepted for interface compatibility with BigQueryDatabase
+
+        Returns:
+            int: Number of trades inserted
+        """
+        if not trades_data:
+            logger.info("No trades to upload")
+            return 0
+
+        try:
+            created_at = _to_text(datetime.now())
+            uploaded_count = self._insert_trades(self._trade_row(trade, created_at) for trade in trades_data)
+            logger.info(f"Completed batch upload: {uploaded_count}/{len(trades_data)} trades saved locally")
+            return uploaded_count
+
+        except Exception as e:
+            logger.error(f"Error uploading trades: {str(e)}")
+            return 0
+
+    def add_trade(self, trade_data: Dict[str, Any]) -> int:
+        """
+        Add a single trade record.
+
+        Returns:
+            int: Row ID of the inserted trade
+        """
+        try:
+            row = self._trade_row(trade_data, _to_text(datetime.now()))
+            placeholders = ', '.join('?' for _ in TRADE_COLUMNS)
+            with self._lock:
+                cursor = self.conn.execute(
+                    f"INSERT INTO trades ({', '.join(TRADE_COLUMNS)}) VALUES ({placeholders})", row
+                )
+                self.conn.commit()
+            logger.info(f"Successfully added trade for {trade_data['symbol']}")
+            return cursor.lastrowid
+
+        except Exception as e:
+            logger.error(f"Error adding trade: {str(e)}")
+            raise
+
+    def get_trades(self, filters: Optional[Dict[str, Any]] = None, limit: Optional[int] = 1000) -> List[Dict[str, Any]]:
+        """
+        Retrieve trades, newest first.
+
+        Args:
+            filters (dict, optional): Column equality filters
+            limit (int, optional): Maximum number of trades to return. None for no limit
+
+        Returns:
+            list: List of trade dictionaries
+        """
+        try:
+            query = f"SELECT {', '.join(TRADE_COLUMNS)} FROM trades"
+            params = []
+            if filters:
+                conditions = []
+                for field, value in filters.items():
+                    if field not in TRADE_COLUMNS:
+                        raise ValueError(f"Unknown trade column: {field}")
+                    conditions.append(f"{field} = ?")
+                    params.append(_to_text(value) if field in TIMESTAMP_COLUMNS else value)
+                query += " WHERE " + " AND ".join(conditions)
+
+            query += " ORDER BY entry_time DESC"
+            if limit is not None:
+                query += f" LIMIT {int(limit)}"
+
+            trades = self._query(query, params)
+            for trade in trades:
+                for column in TIMESTAMP_COLUMNS:
+                    trade[column] = _to_datetime(trade[column])
+
+            logger.info(f"Retrieved {len(trades)} trades from local database")
+            return trades
+
+        except Exception as e:
+            logger.error(f"Error retrieving trades: {str(e)}")
+            raise
+
+    def clear_trades(self, run_name: Optional[str] = None) -> int:
+        """
+        Clear trades.
+
+        Args:
+            run_name (str, optional): Only clear trades from specific run
+
+        Returns:
+            int: Number of trades deleted
+        """
+        try:
+            with self._lock:
+                if run_name:
+                    cursor = self.conn.execute("DELETE FROM trades WHERE run_name = ?", (run_name,))
+                else:
+                    cursor = self.conn.execute("DELETE FROM trades")
+                self.conn.commit()
+
+            logger.info(f"Cleared {cursor.rowcount} trades from local database")
+            return cursor.rowcount
+
+        except Exception as e:
+            logger.error(f"Error clearing trades: {str(e)}")
+            raise
+
+    def export_to_csv(self, filters: Optional[Dict[str, Any]] = None, filename: Optional[str] = None) -> pd.DataFrame:
+        """Export trades to CSV"""
+        try:
+            df = pd.DataFrame(self.get_trades(filters, limit=None))
+            if filename:
+                df.to_csv(filename, index=False)
+                logger.info(f"Exported {len(df)} trades to {filename}")
+            return df
+
+        except Exception as e:
+            logger.error(f"Error exporting to CSV: {str(e)}")
+            raise
+
+    def get_performance_summary(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Get performance summary per symbol/strategy/timeframe.
+
+        Args:
+            start_date (datetime, optional): Start date filter
+            end_date (datetime, optional): End date filter
+
+        Returns:
+            pd.DataFrame: Performance summary DataFrame
+        """
+        try:
+            query = """
+                SELECT
+                    symbol,
+                    strategy,
+                    timeframe,
+                    COUNT(*) as total_trades,
+                    SUM(profit) as total_profit,
+                    COUNT(CASE WHEN profit > 0 THEN 1 END) as winning_trades,
+                    ROUND(COUNT(CASE WHEN profit > 0 THEN 1 END) * 100.0 / COUNT(*), 2) as win_rate,
+                    ROUND(AVG(profit), 2) as avg_profit_per_trade
+                FROM trades
+                WHERE profit IS NOT NULL
+            """
+            params = []
+            if start_date:
+                query += " AND entry_time >= ?"
+                params.append(_to_text(start_date))
+            if end_date:
+                query += " AND entry_time <= ?"
+                params.append(_to_text(end_date))
+            query += " GROUP BY symbol, strategy, timeframe ORDER BY total_profit DESC"
+
+            df = pd.DataFrame(self._query(query, params))
+            logger.info(f"Generated performance summary with {len(df)} records")
+            return df
+
+        except Exception as e:
+            logger.error(f"Error generating performance summary: {str(e)}")
+            raise
+
+    def save_daily_summary(self, daily_summary: List[Dict[str, Any]]) -> int:
+        """
+        Save daily summary data.
+
+        Returns:
+            int: Number of records saved
+        """
+        if not daily_summary:
+            return 0
+
+        try:
+            created_at = _to_text(datetime.now())
+            rows = [
+                tuple(_to_text(record.get(column)) if column in ('date', 'created_at') else record.get(column)
+                      for column in DAILY_SUMMARY_COLUMNS[:-1]) + (_to_text(record.get('created_at')) or created_at,)
+                for record in daily_summary
+            ]
+            placeholders = ', '.join('?' for _ in DAILY_SUMMARY_COLUMNS)
+            with self._lock:
+                self.conn.executemany(
+                    f"INSERT INTO daily_summary ({', '.join(DAILY_SUMMARY_COLUMNS)}) VALUES ({placeholders})", rows
+                )
+                self.conn.commit()
+
+            logger.info(f"Saved {len(daily_summary)} daily summary records to local database")
+            return len(daily_summary)
+
+        except Exception as e:
+            logger.error(f"Error saving daily summary: {str(e)}")
+            raise
+
+    def get_database_stats(self) -> Dict[str, Any]:
+        """Table counts, latest trade date and total profit"""
+        try:
+            stats = {}
+            for table in [self.trades_table_id, self.daily_summary_table_id, self.performance_metrics_table_id]:
+                stats[f"{table}_count"] = self._query(f"SELECT COUNT(*) as count FROM {table}")[0]['count']
+            row = self._query("SELECT MAX(entry_time) as latest_trade_date, SUM(profit) as total_profit FROM trades")[0]
+            stats['latest_trade_date'] = _to_datetime(row['latest_trade_date'])
+            stats['total_profit'] = row['total_profit'] or 0
+            stats['unsynced_trades'] = self._query("SELECT COUNT(*) as count FROM trades WHERE synced = 0")[0]['count']
+
+            logger.info(f"Local database stats: {stats}")
+            return stats
+
+        except Exception as e:
+            logger.error(f"Error getting database stats: {str(e)}")
+            raise
+
+    def get_daily_profits(self, start_date, end_date, run_name: str = 'monitorBot') -> List[Dict[str, Any]]:
+        """Get daily profit/loss data for a specific run"""
+        try:
+            start_date_str = start_date.strftime('%Y-%m-%d')
+            end_date_str = end_date.strftime('%Y-%m-%d')
+
+            rows = self._query("""
+                SELECT
+                    DATE(entry_time) as trade_date,
+                    SUM(profit) as daily_profit,
+                    COUNT(*) as trade_count
+                FROM trades
+                WHERE run_name = ?
+                AND DATE(entry_time) BETWEEN ? AND ?
+                GROUP BY DATE(entry_time)
+                ORDER BY trade_date DESC
+            """, (run_name, start_date_str, end_date_str))
+
+            logger.info(f"Querying daily profits for {run_name} from {start_date_str} to {end_date_str}")
+
+            daily_profits = [{
+                'trade_date': date.fromisoformat(row['trade_date']),
+                'daily_profit': float(row['daily_profit']) if row['daily_profit'] else 0.0,
+                'trade_count': int(row['trade_count']) if row['trade_count'] else 0
+            } for row in rows]
+
+            logger.info(f"Found {len(daily_profits)} days of profit data")
+            return daily_profits
+
+        except Exception as e:
+            logger.error(f"Error getting daily profits: {e}")
+            return []
+
+    def get_profitable_combinations(self, run_name: str = 'monitorBot', streak_days: int = 5) -> List[Dict[str, Any]]:
+        """Get combinations that have N consecutive profitable days (same query as BigQueryDatabase)"""
+        try:
+            rows = self._query("""
+            WITH daily_summary AS (
+              SELECT
+                DATE(entry_time) AS trade_date,
+                symbol,
+                strategy,
+                timeframe,
+                SUM(profit - fees) AS net_profit_after_fees
+              FROM trades
+              WHERE run_name = ?
+              GROUP BY trade_date, symbol, strategy, timeframe
+            ),
+
+            with_lags AS (
+              SELECT
+                *,
+                LAG(net_profit_after_fees, 1) OVER (PARTITION BY symbol, strategy, timeframe ORDER BY trade_date) AS np_day_1_ago,
+                LAG(net_profit_after_fees, 2) OVER (PARTITION BY symbol, strategy, timeframe ORDER BY trade_date) AS np_day_2_ago,
+                LAG(net_profit_after_fees, 3) OVER (PARTITION BY symbol, strategy, timeframe ORDER BY trade_date) AS np_day_3_ago,
+                LAG(net_profit_after_fees, 4) OVER (PARTITION BY symbol, strategy, timeframe ORDER BY trade_date) AS np_day_4_ago,
+                LAG(net_profit_after_fees, 5) OVER (PARTITION BY symbol, strategy, timeframe ORDER BY trade_date) AS np_day_5_ago
+              FROM daily_summary
+            )
+
+            SELECT
+              symbol,
+              strategy,
+              timeframe,
+              symbol || ' - ' || strategy || ' - ' || timeframe AS combination,
+              net_profit_after_fees,
+              np_day_1_ago,
+              np_day_2_ago,
+              np_day_3_ago,
+              np_day_4_ago,
+              np_day_5_ago
+            FROM with_lags
+            WHERE np_day_1_ago > 0
+              AND np_day_2_ago > 0
+              AND np_day_3_ago > 0
+              AND np_day_4_ago > 0
+              AND np_day_5_ago > 0
+            ORDER BY net_profit_after_fees DESC
+            """, (run_name,))
+
+            logger.info(f"Querying profitable combinations for {run_name} with {streak_days}-day streaks")
+
+            profitable_combinations = []
+            for row in rows:
+                combination = {key: row[key] for key in ('symbol', 'strategy', 'timeframe', 'combination')}
+                for key in ('net_profit_after_fees', 'np_day_1_ago', 'np_day_2_ago', 'np_day_3_ago',
+                            'np_day_4_ago', 'np_day_5_ago'):
+                    combination[key] = float(row[key]) if row[key] else 0.0
+                profitable_combinations.append(combination)
+
+            logger.info(f"Found {len(profitable_combinations)} combinations with {streak_days}-day profit streaks")
+            return profitable_combinations
+
+        except Exception as e:
+            logger.error(f"Error getting profitable combinations: {e}")
+            return []
+
+    def sync_to_bigquery(self, run_name: Optional[str] = None, target=None, batch_size: int = 10000) -> int:
+        """
+        Upload trades not yet synced to BigQuery and mark them synced.
+
+        Args:
+            run_name (str, optional): Only sync trades from specific run
+            target: Destination database (default: a new BigQueryDatabase)
+            batch_size (int): Trades per upload
+
+        Returns:
+            int: Number of trades synced
+        """
+        if target is None:
+            from utils.bigquery_database import BigQueryDatabase
+            target = BigQueryDatabase()
+
+        query = f"SELECT rowid, {', '.join(TRADE_COLUMNS)} FROM trades WHERE synced = 0"
+        params = []
+        if run_name:
+            query += " AND run_name = ?"
+            params.append(run_name)
+        query += " ORDER BY rowid"
+
+        pending = self._query(query, params)
+        synced = 0
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i:i + batch_size]
+            trades = [{k: v for k, v in trade.items() if k != 'rowid'} for trade in batch]
+            uploaded = target.batch_upload_trades(trades, batch_size=batch_size, streaming=False)
+            if uploaded != len(batch):
+                # BigQueryDatabase skips failed batches, so only mark fully uploaded chunks
+                logger.error(f"Sync stopped: {uploaded}/{len(batch)} trades of chunk uploaded")
+                break
+            with self._lock:
+                self.conn.executemany("UPDATE trades SET synced = 1 WHERE rowid = ?",
+                                      [(trade['rowid'],) for trade in batch])
+                self.conn.commit()
+            synced += len(batch)
+
+        logger.info(f"Synced {synced}/{len(pending)} trades to BigQuery")
+        return synced
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,105 @@
+"""
+Per-market candle counts and indicator sets from declared strategy warm-ups
+
+Every strategy declares the indicator columns it reads (required_indicators)
+and how many candles its newest signal needs (warmup_period). The plan takes
+the maximum over all strategies running on a (symbol, timeframe), so each
+market fetches just the candles its strategies consume and computes only the
+indicators they read. Strategies whose newest signal depends on the whole
+history fall back to LOOKBACK_DEFAULT_LIMIT candles.
+"""
+
+import logging
+from typing import Dict, List, Tuple, Callable, Iterable, Optional
+
+from utils.indicators import INDICATOR_WARMUP
+from config.exchange_config import LOOKBACK_DEFAULT_LIMIT, LOOKBACK_MAX_LIMIT
+
+logger = logging.getLogger(__name__)
+
+Combo = Tuple[str, str, str]
+Market = Tuple[str, str]
+
+
+class LookbackPlan:
+    """Closed candles to keep and indicators to compute per (symbol, timeframe)"""
+
+    def __init__(self, default_limit: int = LOOKBACK_DEFAULT_LIMIT, max_limit: int = LOOKBACK_MAX_LIMIT,
+                 base_indicators: Iterable[str] = ()):
+        """
+        Args:
+            default_limit: Candles for strategies without a finite warm-up
+            max_limit: Upper bound on candles per market (exchange request limit)
+            base_indicators: Indicators every market computes (e.g. columns the bot itself logs or checks)
+        """
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+        self.base_indicators = tuple(base_indicators)
+        self._limits: Dict[Market, int] = {}
+        self._indicators: Dict[Market, Tuple[str, ...]] = {}
+        self._strategies: Dict[Market, List[str]] = {}
+
+    def add(self, symbol: str, timeframe: str, strategy, name: Optional[str] = None):
+        """Account for a strategy instance running on a market"""
+        market = (symbol, timeframe)
+        warmup = getattr(strategy, 'warmup_period', None)
+        needed = self.default_limit if warmup is None else warmup
+
+        # The base indicators only have to be valid on the newest bar
+        for indicator in self.base_indicators:
+            needed = max(needed, INDICATOR_WARMUP[indicator] + 1)
+        if needed > self.max_limit:
+            logger.warning(f"⚠️ {name or type(strategy).__name__} on {symbol} {timeframe} needs {needed} candles, "
+                           f"capped at {self.max_limit}")
+            needed = self.max_limit
+
+        self._limits[market] = max(self._limits.get(market, 0), needed)
+        indicators = set(self._indicators.get(market, self.base_indicators))
+        indicators.update(getattr(strategy, 'required_indicators', ()))
+        self._indicators[market] = tuple(sorted(indicators))
+        self._strategies.setdefault(market, []).append(name or type(strategy).__name__)
+
+    def limit(self, symbol: str, timeframe: str) -> Optional[int]:
+        """Closed candles needed for a market (None if no strategy was planned on it)"""
+        return self._limits.get((symbol, timeframe))
+
+    def indicators(self, symbol: str, timeframe: str) -> Optional[Tuple[str, ...]]:
+        """Indicator names to compute for a market (None: not planned, compute all)"""
+        return self._indicators.get((symbol, timeframe))
+
+    def history(self) -> int:
+        """Largest candle count over all markets (e.g. the history a kline stream has to keep)"""
+        return max(self._limits.values(), default=self.default_limit)
+
+    def markets(self) -> List[Market]:
+        return sorted(self._limits)
+
+    def log_summary(self):
+        for symbol, timeframe in self.markets():
+            indicators = self._indicators[(symbol, timeframe)]
+            logger.info(f"📐 {symbol} {timeframe}: {self._limits[(symbol, timeframe)]} candles, "
+                        f"indicators [{', '.join(indicators) or 'none'}] for "
+                        f"{', '.join(self._strategies[(symbol, timeframe)])}")
+
+
+def plan_lookback(combinations: Iterable[Combo], get_strategy: Callable[[str], object], **kwargs) -> LookbackPlan:
+    """
+    Build a LookbackPlan for (symbol, strategy_name, timeframe) combinations
+
+    Args:
+        combinations: Combinations the bot evaluates
+        get_strategy: strategy_name -> strategy instance as the bot runs it (e.g. BotCore.get_strategy_instance)
+        **kwargs: LookbackPlan settings
+
+    Returns:
+        LookbackPlan
+    """
+    plan = LookbackPlan(**kwargs)
+    for symbol, strategy_name, timeframe in combinations:
+        try:
+            strategy = get_strategy(strategy_name)
+        except Exception as e:
+            logger.error(f"Cannot plan lookback for {strategy_name}: {e}")
+            continue
+        plan.add(symbol, timeframe, strategy, name=strategy_name)
+    return plan
@@ -0,0 +1,823 @@
+"""
+Shared market-data service: one process streams candles for every bot
+
+MarketDataService owns the exchange connections (kline streams with REST
+backfill), the closed candles of every subscribed market and their
+indicator columns: the union of what the subscribers asked for, computed
+once per candle close. Bots connect over a Unix socket with MarketDataFeed,
+subscribe to (symbol, timeframe, candles, indicators), get a snapshot and
+then one feature row per close, so exchange load stays the same however
+many bots run. Frames are binary: a 5-byte header (type, payload length),
+then the market, the column names, int64 open/close times and float64
+columns.
+
+MarketDataFeed has the KlineStream interface (start, get_candles,
+wait_for_closes, ...), so stream-mode bots use it in place of their own
+stream and BotCore's candle buffer reads from it instead of REST; its
+compute() keeps the indicator columns the service already published.
+"""
+
+import os
+import time
+import queue
+import socket
+import struct
+import asyncio
+import logging
+import tempfile
+import threading
+from typing import Dict, List, Any, Optional, Callable, Iterable, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.exchange_config import MARKET_DATA_SOCKET, MARKET_DATA_HISTORY, KLINE_STREAM_HISTORY
+from utils.indicators import INDICATOR_COLUMNS, compute_indicators
+from utils.synthetic_data import TIMEFRAME_MS
+
+logger = logging.getLogger(__name__)
+
+Market = Tuple[str, str]
+
+# Frame header: message type, payload length
+HEADER = struct.Struct('<BI')
+# Candle block: symbol, timeframe, rows, value columns
+CANDLE_BLOCK = struct.Struct('<12s4sHH')
+# Subscription entry: symbol, timeframe, candles wanted, indicator names that follow
+SUBSCRIPTION = struct.Struct('<12s4sHB')
+
+MSG_SUBSCRIBE = 1  # feed -> service
+MSG_SNAPSHOT = 2   # service -> feed: the latest candles of a market (replaces what the feed has)
+MSG_CANDLES = 3    # service -> feed: newly closed candle(s)
+MSG_ERROR = 4      # service -> feed: a market could not be served (empty candle block + message)
+
+MAX_PAYLOAD = 64 * 1024 * 1024
+
+# Numeric kline columns sent with every row, after the open and close times
+CANDLE_COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'quote_asset_volume', 'trades',
+                  'taker_buy_base', 'taker_buy_quote')
+
+
+def default_socket_path() -> str:
+    return MARKET_DATA_SOCKET or os.path.join(tempfile.gettempdir(), 'tradingbot_market_data.sock')
+
+
+def feature_columns(indicators: Iterable[str]) -> List[str]:
+    """Columns the given indicator names add (unknown names add none)"""
+    return [column for name in indicators for column in INDICATOR_COLUMNS.get(name, ())]
+
+
+# ----------------------------------------------------------------------
+# Binary frames
+# ----------------------------------------------------------------------
+
+def _pack_name(name: str) -> bytes:
+    data = name.encode()
+    return struct.pack('<B', len(data)) + data
+
+
+def _unpack_name(payload: bytes, offset: int) -> Tuple[str, int]:
+    length = payload[offset]
+    return payload[offset + 1:offset + 1 + length].decode(), offset + 1 + length
+
+
+def _text(field: bytes) -> str:
+    return field.rstrip(b'\0').decode()
+
+
+def encode_frame(msg_type: int, payload: bytes) -> bytes:
+    return HEADER.pack(msg_type, len(payload)) + payload
+
+
+def encode_subscribe(subscriptions: Dict[Market, Tuple[int, Tuple[str, ...]]]) -> bytes:
+    """SUBSCRIBE frame for {(symbol, timeframe): (candles, indicator names)}"""
+    parts = [struct.pack('<H', len(subscriptions))]
+    for (symbol, timeframe), (history, indicators) in subscriptions.items():
+        parts.append(SUBSCRIPTION.pack(symbol.encode(), timeframe.encode(), min(history, 0xFFFF), len(indicators)))
+        parts.extend(_pack_name(name) for name in indicators)
+    return encode_frame(MSG_SUBSCRIBE, b''.join(parts))
+
+
+def decode_subscribe(payload: bytes) -> Dict[Market, Tuple[int, Tuple[str, ...]]]:
+    count, = struct.unpack_from('<H', payload)
+    offset = 2
+    subscriptions = {}
+    for _ in range(count):
+        symbol, timeframe, history, count_names = SUBSCRIPTION.unpack_from(payload, offset)
+        offset += SUBSCRIPTION.size
+        names = []
+        for _ in range(count_names):
+            name, offset = _unpack_name(payload, offset)
+            names.append(name)
+        subscriptions[(_text(symbol).upper(), _text(timeframe))] = (history, tuple(names))
+    return subscriptions
+
+
+def encode_candles(msg_type: int, symbol: str, timeframe: str, df: Optional[pd.DataFrame],
+                   columns: List[str]) -> bytes:
+    """
+    SNAPSHOT/CANDLES frame of a candle frame
+
+    Args:
+        df: Candles ('timestamp', 'close_time' and the value columns); None or empty for no rows
+        columns: Value columns to send (CANDLE_COLUMNS + feature columns), as float64
+    """
+    rows = 0 if df is None else len(df)
+    parts = [CANDLE_BLOCK.pack(symbol.encode(), timeframe.encode(), rows, len(columns))]
+    parts.extend(_pack_name(column) for column in columns)
+    if rows:
+        parts.append(df['timestamp'].to_numpy().astype('datetime64[ms]').astype('<i8').tobytes())
+        parts.append(pd.to_numeric(df['close_time']).to_numpy().astype('<i8').tobytes())
+        values = np.empty((len(columns), rows), dtype='<f8')
+        for i, column in enumerate(columns):
+            values[i] = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+        parts.append(values.tobytes())
+    return encode_frame(msg_type, b''.join(parts))
+
+
+def decode_candles(payload: bytes) -> Tuple[str, str, List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """SNAPSHOT/CANDLES payload -> (symbol, timeframe, columns, open_ms, close_ms, values[column, row])"""
+    symbol, timeframe, rows, count_columns = CANDLE_BLOCK.unpack_from(payload)
+    offset = CANDLE_BLOCK.size
+    columns = []
+    for _ in range(count_columns):
+        column, offset = _unpack_name(payload, offset)
+        columns.append(column)
+    open_ms = np.frombuffer(payload, dtype='<i8', count=rows, offset=offset).copy()
+    offset += 8 * rows
+    close_ms = np.frombuffer(payload, dtype='<i8', count=rows, offset=offset).copy()
+    offset += 8 * rows
+    values = np.frombuffer(payload, dtype='<f8', count=rows * count_columns, offset=offset)
+    return _text(symbol), _text(timeframe), columns, open_ms, close_ms, values.reshape(count_columns, rows).copy()
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    msg_type, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if length > MAX_PAYLOAD:
+        raise ConnectionError(f"Frame of {length} bytes exceeds {MAX_PAYLOAD}")
+    return msg_type, await reader.readexactly(length)
+
+
+# ----------------------------------------------------------------------
+# Service
+# ----------------------------------------------------------------------
+
+class MarketDataService:
+    """Kline streams, candles and indicator columns of every subscribed market, served over a Unix socket"""
+
+    def __init__(self, client, socket_path: Optional[str] = None, history: int = MARKET_DATA_HISTORY,
+                 max_buffer: int = 4 * 1024 * 1024):
+        """
+        Args:
+            client: Exchange client for the streams' REST backfills (binance Client or FakeBinanceClient)
+            socket_path: Unix socket to listen on (default MARKET_DATA_SOCKET or the temp dir)
+            history: Closed candles kept (and indicators computed over) per market
+            max_buffer: Bytes queued for one subscriber before it is disconnected as too slow
+        """
+        self.client = client
+        self.socket_path = socket_path or default_socket_path()
+        self.history = history
+        self.max_buffer = max_buffer
+
+        self._streams = []
+        self._stream_of: Dict[Market, Any] = {}
+        self._markets: Dict[Market, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._open_lock = threading.Lock()
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._ready = threading.Event()
+        self._stop_requested = threading.Event()
+
+        self.stats = {
+            'connections': 0,
+            'subscriptions': 0,
+            'closes': 0,
+            'frames': 0,
+            'bytes': 0,
+            'slow_disconnects': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self, wait: float = 10.0):
+        """Listen on the socket from a background thread"""
+        if not hasattr(socket, 'AF_UNIX'):
+            raise RuntimeError("The market data service needs Unix domain sockets")
+        self._claim_socket()
+        self._stop_requested.clear()
+        self._thread = threading.Thread(target=self._run_loop, name='market-data-service', daemon=True)
+        self._thread.start()
+        if not self._ready.wait(wait):
+            raise RuntimeError(f"Market data service did not start listening on {self.socket_path}")
+        logger.info(f"🟢 Market data service listening on {self.socket_path}")
+
+    def add_markets(self, markets: Iterable[Market]):
+        """Start streaming markets before any bot subscribes (e.g. on daemon start)"""
+        self._open_stream(sorted(set((symbol.upper(), timeframe) for symbol, timeframe in markets)))
+
+    def markets(self) -> List[Market]:
+        with self._lock:
+            return sorted(self._markets)
+
+    def serve_forever(self, log_interval: float = 300.0):
+        """Start, then serve until request_stop() (or Ctrl-C), logging stats every log_interval seconds"""
+        if self._thread is None:
+            self.start()
+        try:
+            while not self._stop_requested.wait(log_interval):
+                self.log_stats()
+        except KeyboardInterrupt:
+            logger.info("Market data service stopped by user")
+        finally:
+            self.stop()
+
+    def request_stop(self):
+        """Make serve_forever() return (safe from signal handlers)"""
+        self._stop_requested.set()
+
+    def stop(self, timeout: float = 5.0):
+        """Disconnect subscribers, close the socket and the exchange streams"""
+        self._stop_requested.set()
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        for stream in self._streams:
+            stream.stop()
+        self._streams = []
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+        logger.info("Market data service stopped")
+
+    def log_stats(self):
+        with self._lock:
+            subscribers = len(set(writer for state in self._markets.values() for writer in state['subscribers']))
+        logger.info(f"Market data service: {len(self._markets)} markets, {subscribers} subscribers, "
+                    f"{self.stats['closes']} closes, {self.stats['frames']} frames "
+                    f"({self.stats['bytes'] / 1024:.0f} KiB)")
+
+    # ------------------------------------------------------------------
+    # Candles and features
+    # ------------------------------------------------------------------
+
+    def _open_stream(self, markets: List[Market]):
+        """Start one kline stream for the markets not streamed yet (blocks for the REST backfill)"""
+        from utils.exchange_client import create_kline_stream
+
+        with self._open_lock:
+            markets = [market for market in markets if market not in self._stream_of]
+            if not markets:
+                return
+            # The service's own stream talks to the exchange, never to another service
+            stream = create_kline_stream(self.client, markets, history=self.history, shared=False)
+            stream.add_listener(self._on_close)
+            stream.start()
+            self._register(stream)
+        logger.info(f"Streaming {len(markets)} new market(s): {', '.join(f'{s} {tf}' for s, tf in markets)}")
+
+    def _register(self, stream):
+        with self._lock:
+            self._streams.append(stream)
+            for market in stream.markets:
+                self._stream_of[market] = stream
+                self._markets.setdefault(market, {'indicators': set(), 'subscribers': set(),
+                                                  'data': None, 'computed': None})
+
+    def _features(self, market: Market, refresh: bool) -> Optional[pd.DataFrame]:
+        """Candles of a market with the indicators its subscribers asked for (cached until the next close)"""
+        with self._lock:
+            state = self._markets[market]
+            indicators = tuple(sorted(state['indicators']))
+            stream = self._stream_of[market]
+            if not refresh and state['data'] is not None and state['computed'] == indicators:
+                return state['data']
+        candles = stream.get_candles(*market)
+        if candles.empty:
+            return None
+        data = compute_indicators(candles, indicators)
+        with self._lock:
+            state['data'], state['computed'] = data, indicators
+        return data
+
+    def _encode(self, msg_type: int, market: Market, data: Optional[pd.DataFrame]) -> bytes:
+        indicators = self._markets[market]['computed'] or ()
+        return encode_candles(msg_type, market[0], market[1], data, list(CANDLE_COLUMNS) + feature_columns(indicators))
+
+    def _snapshot(self, market: Market, history: int) -> bytes:
+        data = self._features(market, refresh=False)
+        if data is None:
+            return self._encode(MSG_SNAPSHOT, market, None)
+        if history > len(data):
+            logger.debug(f"{market[0]} {market[1]}: {history} candles asked, {len(data)} kept")
+        return self._encode(MSG_SNAPSHOT, market, data.tail(history))
+
+    def _on_close(self, symbol: str, timeframe: str):
+        """Kline stream listener: compute the new feature row once and publish it to every subscriber"""
+        market = (symbol, timeframe)
+        try:
+            data = self._features(market, refresh=True)
+        except Exception as e:
+            logger.error(f"Error computing features for {symbol} {timeframe}: {e}")
+            return
+        if data is None:
+            return
+        self.stats['closes'] += 1
+        frame = self._encode(MSG_CANDLES, market, data.tail(1))
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._broadcast, market, frame)
+
+    # ------------------------------------------------------------------
+    # Socket handling
+    # ------------------------------------------------------------------
+
+    def _claim_socket(self):
+        """Remove a stale socket file, refusing to start next to a running service"""
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+        else:
+            raise RuntimeError(f"A market data service is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_unix_server(self._handle_client, path=self.socket_path))
+            os.chmod(self.socket_path, 0o600)
+            self._ready.set()
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    async def _shutdown(self):
+        if self._server is not None:
+            self._server.close()
+        writers = list(self._writers)
+        for writer in writers:
+            writer.close()
+        # Let the closes reach the subscribers, so they reconnect instead of waiting on a dead socket
+        await asyncio.wait([asyncio.ensure_future(writer.wait_closed()) for writer in writers] or
+                           [asyncio.ensure_future(asyncio.sleep(0))], timeout=1.0)
+        self._loop.stop()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats['connections'] += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                msg_type, payload = await _read_frame(reader)
+                if msg_type == MSG_SUBSCRIBE:
+                    await self._subscribe(writer, decode_subscribe(payload))
+                else:
+                    logger.warning(f"⚠️ Unexpected market data message type {msg_type} from a subscriber")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Subscriber went away
+        except Exception as e:
+            logger.error(f"Error serving market data subscriber: {e}")
+        finally:
+            self._writers.discard(writer)
+            with self._lock:
+                for state in self._markets.values():
+                    state['subscribers'].discard(writer)
+            writer.close()
+
+    async def _subscribe(self, writer: asyncio.StreamWriter, subscriptions: Dict[Market, Tuple[int, Tuple[str, ...]]]):
+        missing = [market for market in subscriptions if market not in self._stream_of]
+        if missing:
+            try:
+                await self._loop.run_in_executor(None, self._open_stream, missing)
+            except Exception as e:
+                logger.error(f"Error streaming {missing}: {e}")
+
+        for market, (history, indicators) in subscriptions.items():
+            if market not in self._stream_of:
+                writer.write(encode_frame(MSG_ERROR, CANDLE_BLOCK.pack(market[0].encode(), market[1].encode(), 0, 0)
+                                          + f"{market[0]} {market[1]} is not available".encode()))
+                continue
+            unknown = [name for name in indicators if name not in INDICATOR_COLUMNS]
+            if unknown:
+                logger.warning(f"⚠️ Subscriber asked for unknown indicators {unknown}, ignored")
+            with self._lock:
+                state = self._markets[market]
+                state['indicators'].update(name for name in indicators if name in INDICATOR_COLUMNS)
+                state['subscribers'].add(writer)
+            writer.write(await self._loop.run_in_executor(None, self._snapshot, market, history))
+            self.stats['subscriptions'] += 1
+        await writer.drain()
+
+    def _broadcast(self, market: Market, frame: bytes):
+        with self._lock:
+            writers = list(self._markets[market]['subscribers'])
+        for writer in writers:
+            if writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                # A subscriber that stopped reading must not make the service buffer without bound
+                self.stats['slow_disconnects'] += 1
+                logger.warning(f"⚠️ Market data subscriber not reading ({self.max_buffer} bytes queued), disconnecting")
+                writer.close()
+                continue
+            writer.write(frame)
+            self.stats['frames'] += 1
+            self.stats['bytes'] += len(frame)
+
+
+# ----------------------------------------------------------------------
+# Subscriber
+# ----------------------------------------------------------------------
+
+class MarketDataFeed:
+    """Candles and indicator columns of subscribed markets, received from a MarketDataService"""
+
+    def __init__(self, markets: Iterable[Market] = (), history: int = KLINE_STREAM_HISTORY,
+                 socket_path: Optional[str] = None, clock: Optional[Callable[[], float]] = None,
+                 subscribe_timeout: float = 10.0, settle_timeout: float = 3.0, reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 30.0):
+        """
+        Args:
+            markets: (symbol, timeframe) pairs to subscribe to on start (all indicators)
+            history: Closed candles kept per market unless a subscription asks for more
+            socket_path: Service socket (default MARKET_DATA_SOCKET or the temp dir)
+            clock: Time source in seconds used to tell which candle should have closed (default time.time)
+            subscribe_timeout: Seconds to wait for the snapshot of a new subscription
+            settle_timeout: Seconds get_candles waits for a close the service has not published yet
+            reconnect_delay: First reconnect delay in seconds (doubles up to max_reconnect_delay)
+            max_reconnect_delay: Upper bound for reconnect backoff
+        """
+        self.socket_path = socket_path or default_socket_path()
+        self.history = history
+        self.clock = clock or time.time
+        self.subscribe_timeout = subscribe_timeout
+        self.settle_timeout = settle_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self._subscriptions: Dict[Market, Tuple[int, Tuple[str, ...]]] = {}
+        self._snapshots: Dict[Market, threading.Event] = {}
+        self._candles: Dict[Market, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._updated = threading.Condition(self._lock)
+        self._start_lock = threading.Lock()
+        self._closed = queue.Queue()
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._loop = None
+        self._thread = None
+        self._task = None
+        self._writer = None
+        self._users = 0
+        self._stopping = False
+        self._connected = threading.Event()
+
+        self.stats = {
+            'snapshots': 0,
+            'updates': 0,
+            'duplicates': 0,
+            'closes': 0,
+            'misses': 0,
+            'published_features': 0,
+            'local_computes': 0,
+            'reconnects': 0
+        }
+
+        if markets:
+            self.subscribe(markets, wait=False)
+
+    @property
+    def markets(self) -> List[Market]:
+        with self._lock:
+            return sorted(self._subscriptions)
+
+    # ------------------------------------------------------------------
+    # Public API (KlineStream-compatible)
+    # ------------------------------------------------------------------
+
+    def add_listener(self, callback: Callable[[str, str], None]):
+        """Register callback(symbol, timeframe), called from the feed thread on every candle close"""
+        self._listeners.append(callback)
+
+    def start(self, wait: float = 10.0):
+        """Connect to the service in a background thread and wait for the subscribed markets' snapshots"""
+        with self._start_lock:
+            self._users += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run_loop, name='market-data-feed', daemon=True)
+                self._thread.start()
+        if not wait:
+            return
+        if not self._connected.wait(wait):
+            logger.warning(f"⚠️ Market data service not reachable at {self.socket_path} after {wait:.0f}s, "
+                           f"will keep retrying")
+            return
+        if self._wait_snapshots(self.markets, wait):
+            logger.info(f"🟢 Market data feed connected: {len(self.markets)} markets")
+
+    def stop(self, timeout: float = 5.0, force: bool = False):
+        """Disconnect from the service once every start() has been matched by a stop() (or with force)"""
+        with self._start_lock:
+            self._users = 0 if force else max(0, self._users - 1)
+            if self._users:
+                return  # Still used by another bot of this process
+        self._stopping = True
+        if self._loop is not None and self._loop.is_running() and self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        logger.info("Market data feed stopped")
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def subscribe(self, markets: Iterable[Market], history: Optional[int] = None,
+                  indicators: Optional[Iterable[str]] = None, wait: bool = True) -> bool:
+        """
+        Subscribe to markets (or widen a subscription's candles/indicators)
+
+        Args:
+            markets: (symbol, timeframe) pairs
+            history: Closed candles wanted (default the feed's history)
+            indicators: Indicator names the service should compute (all if None)
+            wait: Block until the snapshots arrived (at most subscribe_timeout)
+
+        Returns:
+            True once every market's snapshot is here (or without waiting)
+        """
+        names = tuple(INDICATOR_COLUMNS) if indicators is None else tuple(indicators)
+        changed = {}
+        with self._lock:
+            for symbol, timeframe in markets:
+                market = (symbol.upper(), timeframe)
+                known_history, known_names = self._subscriptions.get(market, (0, ()))
+                wanted = (max(history or self.history, known_history), tuple(sorted(set(names) | set(known_names))))
+                if wanted == (known_history, known_names):
+                    continue
+                self._subscriptions[market] = wanted
+                self._snapshots[market] = threading.Event()
+                changed[market] = wanted
+            writer = self._writer
+        if not changed:
+            return True
+        if writer is not None:
+            self._loop.call_soon_threadsafe(self._send, encode_subscribe(changed))
+        if not wait:
+            return True
+        if self._thread is None:
+            self.start(wait=self.subscribe_timeout)
+        return self.connected and self._wait_snapshots(list(changed), self.subscribe_timeout)
+
+    def get_candles(self, symbol: str, timeframe: str, limit: Optional[int] = None,
+                    indicators: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Closed candles of a market with the service's indicator columns (BotCore.fetch_market_data layout)
+
+        Subscribes on first use. Returns an empty frame while the service is unreachable, so callers
+        can fall back to REST.
+
+        Args:
+            limit: Newest candles to return (all kept if None)
+            indicators: Indicator columns to include (all received if None)
+        """
+        market = (symbol.upper(), timeframe)
+        self.subscribe([market], history=limit, indicators=indicators)
+        self._wait_settled(market)
+
+        with self._lock:
+            data = self._candles.get(market)
+            if data is None or not len(data['open']):
+                self.stats['misses'] += 1
+                return pd.DataFrame()
+            start = -limit if limit else 0
+            open_ms, close_ms = data['open'][start:], data['close'][start:]
+            values = data['values'][:, start:]
+            index = {column: i for i, column in enumerate(data['columns'])}
+
+        frame = {'timestamp': pd.to_datetime(open_ms, unit='ms')}
+        for column in CANDLE_COLUMNS[:5]:
+            frame[column] = values[index[column]]
+        frame['close_time'] = close_ms
+        for column in CANDLE_COLUMNS[5:]:
+            frame[column] = values[index[column]]
+        wanted = feature_columns(indicators) if indicators is not None else index
+        for column in wanted:
+            if column in index and column not in frame:
+                frame[column] = values[index[column]]
+        return pd.DataFrame(frame)
+
+    def last_close_time(self, symbol: str, timeframe: str) -> Optional[int]:
+        """Open time (ms) of the latest closed candle of a market"""
+        with self._lock:
+            data = self._candles.get((symbol.upper(), timeframe))
+            return int(data['open'][-1]) if data is not None and len(data['open']) else None
+
+    def wait_for_closes(self, timeout: Optional[float] = None) -> Set[Market]:
+        """
+        Block until at least one candle closes (or timeout) and return every closed market since the last call
+
+        Returns:
+            Set of (symbol, timeframe) pairs; empty on timeout
+        """
+        closed = set()
+        try:
+            closed.add(self._closed.get(timeout=timeout))
+        except queue.Empty:
+            return closed
+        while True:
+            try:
+                closed.add(self._closed.get_nowait())
+            except queue.Empty:
+                return closed
+
+    def compute(self, df: pd.DataFrame, indicators: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        CandleBuffer compute: keep the indicator columns the service published, compute locally otherwise
+
+        The service computes over its full history, so published columns are complete; a frame mixing
+        in REST candles (service unreachable) has gaps and is recomputed.
+        """
+        names = tuple(INDICATOR_COLUMNS) if indicators is None else tuple(indicators)
+        columns = feature_columns(names)
+        if all(column in df.columns for column in columns) and not df[columns].isna().to_numpy().any():
+            self.stats['published_features'] += 1
+            return df
+        self.stats['local_computes'] += 1
+        return compute_indicators(df, indicators)
+
+    # ------------------------------------------------------------------
+    # Candle bookkeeping
+    # ------------------------------------------------------------------
+
+    def _wait_snapshots(self, markets: List[Market], timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        for market in markets:
+            event = self._snapshots.get(market)
+            if event is not None and not event.wait(max(0.0, deadline - time.monotonic())):
+                logger.warning(f"⚠️ No market data snapshot for {market[0]} {market[1]} after {timeout:.0f}s")
+                return False
+        return True
+
+    def _wait_settled(self, market: Market):
+        """Wait briefly for a candle that should have closed but was not published yet"""
+        interval_ms = TIMEFRAME_MS.get(market[1])
+        if not interval_ms or not self.connected:
+            return
+        deadline = time.monotonic() + self.settle_timeout
+        with self._updated:
+            while True:
+                data = self._candles.get(market)
+                if data is None or not len(data['open']):
+                    return
+                expected_open = (int(self.clock() * 1000) // interval_ms - 1) * interval_ms
+                remaining = deadline - time.monotonic()
+                if data['open'][-1] >= expected_open or remaining <= 0:
+                    return
+                self._updated.wait(remaining)
+
+    def _store(self, market: Market, columns: List[str], open_ms: np.ndarray, close_ms: np.ndarray,
+               values: np.ndarray, snapshot: bool):
+        with self._updated:
+            keep = self._subscriptions.get(market, (self.history,))[0]
+            data = self._candles.get(market)
+            previous = int(data['open'][-1]) if data is not None and len(data['open']) else None
+
+            if snapshot or data is None:
+                data = {'columns': columns, 'open': open_ms, 'close': close_ms, 'values': values}
+            else:
+                new = open_ms > previous if previous is not None else np.ones(len(open_ms), dtype=bool)
+                if not new.any():
+                    self.stats['duplicates'] += 1
+                    return
+                # Keep the stored columns: the service may publish more for other subscribers
+                index = {column: i for i, column in enumerate(columns)}
+                rows = np.full((len(data['columns']), int(new.sum())), np.nan)
+                for i, column in enumerate(data['columns']):
+                    if column in index:
+                        rows[i] = values[index[column], new]
+                data = {
+                    'columns': data['columns'],
+                    'open': np.concatenate([data['open'], open_ms[new]]),
+                    'close': np.concatenate([data['close'], close_ms[new]]),
+                    'values': np.concatenate([data['values'], rows], axis=1)
+                }
+            data['open'], data['close'] = data['open'][-keep:], data['close'][-keep:]
+            data['values'] = data['values'][:, -keep:]
+            self._candles[market] = data
+            latest = int(data['open'][-1]) if len(data['open']) else None
+            self._updated.notify_all()
+
+        self.stats['snapshots' if snapshot else 'updates'] += 1
+        if snapshot and market in self._snapshots:
+            self._snapshots[market].set()
+        if previous is not None and latest is not None and latest > previous:
+            self._notify(market)
+
+    def _notify(self, market: Market):
+        self.stats['closes'] += 1
+        self._closed.put(market)
+        for callback in list(self._listeners):
+            try:
+                callback(*market)
+            except Exception as e:
+                logger.error(f"Error in market data close listener for {market}: {e}")
+
+    # ------------------------------------------------------------------
+    # Socket handling
+    # ------------------------------------------------------------------
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._task = self._loop.create_task(self._run_connection())
+            self._loop.run_until_complete(asyncio.gather(self._task, return_exceptions=True))
+        finally:
+            self._loop.close()
+
+    def _send(self, frame: bytes):
+        if self._writer is not None and not self._writer.is_closing():
+            self._writer.write(frame)
+
+    async def _run_connection(self):
+        delay = self.reconnect_delay
+        first = True
+
+        while not self._stopping:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path)
+                try:
+                    with self._lock:
+                        self._writer = writer
+                        subscriptions = dict(self._subscriptions)
+                    if subscriptions:
+                        # Snapshots replace what was kept, so closes missed while disconnected are caught up
+                        writer.write(encode_subscribe(subscriptions))
+                    if not first:
+                        self.stats['reconnects'] += 1
+                        logger.info(f"Market data feed reconnected, resubscribed {len(subscriptions)} markets")
+                    first = False
+                    delay = self.reconnect_delay
+                    self._connected.set()
+
+                    while True:
+                        msg_type, payload = await _read_frame(reader)
+                        self._handle_frame(msg_type, payload)
+                finally:
+                    with self._lock:
+                        self._writer = None
+                    self._connected.clear()
+                    writer.close()
+            except asyncio.CancelledError:
+                raise
+            except asyncio.IncompleteReadError:
+                logger.warning("⚠️ Market data service closed the connection")
+            except Exception as e:
+                logger.warning(f"⚠️ Market data service connection error: {e}")
+
+            if self._stopping:
+                break
+            logger.info(f"Reconnecting to the market data service in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _handle_frame(self, msg_type: int, payload: bytes):
+        if msg_type in (MSG_SNAPSHOT, MSG_CANDLES):
+            symbol, timeframe, columns, open_ms, close_ms, values = decode_candles(payload)
+            self._store((symbol, timeframe), columns, open_ms, close_ms, values, snapshot=msg_type == MSG_SNAPSHOT)
+        elif msg_type == MSG_ERROR:
+            symbol, timeframe, _, _ = CANDLE_BLOCK.unpack_from(payload)
+            market = (_text(symbol), _text(timeframe))
+            logger.warning(f"⚠️ Market data service: {payload[CANDLE_BLOCK.size:].decode()}")
+            if market in self._snapshots:
+                self._snapshots[market].set()
+        else:
+            logger.warning(f"⚠️ Unexpected market data message type {msg_type}")
+
+
+_feeds: Dict[str, MarketDataFeed] = {}
+_feeds_lock = threading.Lock()
+
+
+def get_market_data_feed(socket_path: Optional[str] = None) -> MarketDataFeed:
+    """The process-wide feed of a service socket, shared by a bot's stream and candle buffer"""
+    path = socket_path or default_socket_path()
+    with _feeds_lock:
+        feed = _feeds.get(path)
+        if feed is None:
+            feed = _feeds[path] = MarketDataFeed(socket_path=path)
+        return feed
@@ -0,0 +1,315 @@
+"""
+WebSocket kline stream that keeps closed candles per (symbol, timeframe)
+
+Subscribes to Binance combined kline streams from a background thread,
+stores the last N closed candles of every market, backfills gaps over
+REST (on start, after reconnects and when a close event is missed) and
+notifies listeners whenever a candle closes.
+"""
+
+import json
+import time
+import queue
+import asyncio
+import logging
+import threading
+import pandas as pd
+from collections import deque
+from typing import Dict, List, Any, Optional, Callable, Iterable, Set, Tuple
+
+import websockets
+
+from utils.synthetic_data import TIMEFRAME_MS
+
+logger = logging.getLogger(__name__)
+
+BINANCE_STREAM_URL = 'wss://stream.binance.com:9443'
+TESTNET_STREAM_URL = 'wss://testnet.binance.vision'
+
+# Binance allows up to 1024 streams per connection; keep connections smaller
+MAX_STREAMS_PER_CONNECTION = 200
+
+KLINE_FRAME_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume',
+                       'close_time', 'quote_asset_volume', 'trades',
+                       'taker_buy_base', 'taker_buy_quote', 'ignored']
+
+
+def klines_to_frame(klines: List[list]) -> pd.DataFrame:
+    """Kline rows -> DataFrame in the same layout as BotCore.fetch_market_data"""
+    df = pd.DataFrame(klines, columns=KLINE_FRAME_COLUMNS)
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        df[col] = pd.to_numeric(df[col])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
+
+def kline_event_to_row(k: Dict[str, Any]) -> list:
+    """Kline payload of a stream event -> REST kline row"""
+    return [k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'], k['q'], k['n'], k['V'], k['Q'], '0']
+
+
+def stream_name(symbol: str, timeframe: str) -> str:
+    return f"{symbol.lower()}@kline_{timeframe}"
+
+
+class KlineStream:
+    """Closed candles per market, kept current from combined kline WebSocket streams"""
+
+    def __init__(self, client, markets: Iterable[Tuple[str, str]], history: int = 200, url: str = BINANCE_STREAM_URL,
+                 on_close: Optional[Callable[[str, str], None]] = None, reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 60.0, clock: Optional[Callable[[], float]] = None):
+        """
+        Args:
+            client: REST client used for backfills (binance Client or FakeBinanceClient)
+            markets: (symbol, timeframe) pairs to subscribe to
+            history: Closed candles kept per market
+            url: Stream base URL (without /stream)
+            on_close: Optional callback(symbol, timeframe) called from the stream thread on every close
+            reconnect_delay: First reconnect delay in seconds (doubles up to max_reconnect_delay)
+            max_reconnect_delay: Upper bound for reconnect backoff
+            clock: Time source in seconds used to tell closed from open candles (default time.time)
+        """
+        self.client = client
+        self.markets = sorted(set((symbol.upper(), timeframe) for symbol, timeframe in markets))
+        self.history = history
+        self.url = url.rstrip('/')
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.clock = clock or time.time
+
+        self._candles = {market: deque(maxlen=history) for market in self.markets}
+        self._lock = threading.Lock()
+        self._closed = queue.Queue()
+        self._listeners = [on_close] if on_close else []
+        self._loop = None
+        self._thread = None
+        self._tasks = []
+        self._stopping = False
+        self._connected = threading.Event()
+        self._live_connections = 0
+
+        self.stats = {
+            'messages': 0,
+            'closes': 0,
+            'duplicates': 0,
+            'gaps': 0,
+            'backfills': 0,
+            'backfilled_candles': 0,
+            'reconnects': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def add_listener(self, callback: Callable[[str, str], None]):
+        """Register callback(symbol, timeframe), called from the stream thread on every candle close"""
+        self._listeners.append(callback)
+
+    def start(self, wait: float = 10.0):
+        """Backfill every market over REST, then connect the streams in a background thread"""
+        for symbol, timeframe in self.markets:
+            self._backfill(symbol, timeframe)
+
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run_loop, name='kline-stream', daemon=True)
+        self._thread.start()
+        if wait and not self._connected.wait(wait):
+            logger.warning(f"⚠️ Kline stream not connected after {wait:.0f}s, will keep retrying")
+        else:
+            logger.info(f"🟢 Kline stream connected: {len(self.markets)} markets")
+
+    def stop(self, timeout: float = 5.0):
+        """Close the streams and stop the background thread"""
+        self._stopping = True
+        if self._loop is not None and self._loop.is_running():
+            for task in self._tasks:
+                self._loop.call_soon_threadsafe(task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        logger.info("Kline stream stopped")
+
+    @property
+    def connected(self) -> bool:
+        return self._live_connections > 0
+
+    def get_candles(self, symbol: str, timeframe: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """Closed candles of a market as a DataFrame (same layout as BotCore.fetch_market_data)"""
+        with self._lock:
+            klines = list(self._candles.get((symbol.upper(), timeframe), ()))
+        if limit is not None:
+            klines = klines[-limit:]
+        if not klines:
+            return pd.DataFrame()
+        return klines_to_frame(klines)
+
+    def last_close_time(self, symbol: str, timeframe: str) -> Optional[int]:
+        """Open time (ms) of the latest closed candle of a market"""
+        with self._lock:
+            candles = self._candles.get((symbol.upper(), timeframe))
+            return candles[-1][0] if candles else None
+
+    def wait_for_closes(self, timeout: Optional[float] = None) -> Set[Tuple[str, str]]:
+        """
+        Block until at least one candle closes (or timeout) and return every closed market since the last call
+
+        Returns:
+            Set of (symbol, timeframe) pairs; empty on timeout
+        """
+        closed = set()
+        try:
+            closed.add(self._closed.get(timeout=timeout))
+        except queue.Empty:
+            return closed
+        while True:
+            try:
+                closed.add(self._closed.get_nowait())
+            except queue.Empty:
+                return closed
+
+    # ------------------------------------------------------------------
+    # Candle bookkeeping
+    # ------------------------------------------------------------------
+
+    def _append(self, market: Tuple[str, str], klines: List[list], notify: bool, closed: bool = False) -> int:
+        """
+        Store closed klines newer than the latest stored one, returns how many were added
+
+        Args:
+            closed: The klines are known to be closed (stream rows with x=true): the local clock
+                    is not consulted, it may run behind the exchange
+        """
+        now_ms = int(self.clock() * 1000)
+        added = 0
+        with self._lock:
+            candles = self._candles[market]
+            for kline in klines:
+                if not closed and int(kline[6]) >= now_ms:
+                    continue  # still open (REST backfill includes the open candle)
+                if candles and int(kline[0]) <= candles[-1][0]:
+                    continue
+                candles.append([int(kline[0])] + list(kline[1:]))
+                added += 1
+        if added and notify:
+            self._notify(market)
+        return added
+
+    def _notify(self, market: Tuple[str, str]):
+        self.stats['closes'] += 1
+        self._closed.put(market)
+        for callback in list(self._listeners):
+            try:
+                callback(*market)
+            except Exception as e:
+                logger.error(f"Error in kline close listener for {market}: {e}")
+
+    def _backfill(self, symbol: str, timeframe: str, notify: bool = False) -> int:
+        """Fetch closed candles missing since the latest stored one over REST"""
+        market = (symbol, timeframe)
+        last_open = self.last_close_time(symbol, timeframe)
+        try:
+            if last_open is None:
+                klines = self.client.get_klines(symbol=symbol, interval=timeframe, limit=min(self.history + 1, 1000))
+            else:
+                klines = self.client.get_klines(symbol=symbol, interval=timeframe, limit=1000,
+                                                startTime=last_open + TIMEFRAME_MS[timeframe])
+        except Exception as e:
+            logger.error(f"Error backfilling {symbol} {timeframe}: {e}")
+            return 0
+
+        added = self._append(market, klines, notify=notify)
+        self.stats['backfills'] += 1
+        self.stats['backfilled_candles'] += added
+        if added and last_open is not None:
+            logger.info(f"Backfilled {added} {symbol} {timeframe} candles over REST")
+        return added
+
+    # ------------------------------------------------------------------
+    # WebSocket handling
+    # ------------------------------------------------------------------
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            streams = [stream_name(symbol, timeframe) for symbol, timeframe in self.markets]
+            chunks = [streams[i:i + MAX_STREAMS_PER_CONNECTION]
+                      for i in range(0, len(streams), MAX_STREAMS_PER_CONNECTION)]
+            self._tasks = [self._loop.create_task(self._run_connection(chunk)) for chunk in chunks]
+            self._loop.run_until_complete(asyncio.gather(*self._tasks, return_exceptions=True))
+        finally:
+            self._loop.close()
+
+    async def _run_connection(self, streams: List[str]):
+        url = f"{self.url}/stream?streams={'/'.join(streams)}"
+        markets = [self._market_of(name) for name in streams]
+        delay = self.reconnect_delay
+        first = True
+
+        while not self._stopping:
+            try:
+                async with websockets.connect(url, ping_interval=20, ping_timeout=20) as ws:
+                    self._live_connections += 1
+                    try:
+                        if not first:
+                            # Candles that closed while disconnected
+                            self.stats['reconnects'] += 1
+                            logger.info(f"Kline stream reconnected, backfilling {len(markets)} markets")
+                            for symbol, timeframe in markets:
+                                await self._loop.run_in_executor(None, self._backfill, symbol, timeframe, True)
+                        first = False
+                        delay = self.reconnect_delay
+                        self._connected.set()
+
+                        async for message in ws:
+                            await self._handle_message(message)
+                    finally:
+                        self._live_connections -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Kline stream connection error: {e}")
+
+            if self._stopping:
+                break
+            logger.info(f"Reconnecting kline stream in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _market_of(self, name: str) -> Tuple[str, str]:
+        symbol, kline = name.split('@')
+        return symbol.upper(), kline[len('kline_'):]
+
+    async def _handle_message(self, message):
+        self.stats['messages'] += 1
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            logger.warning(f"⚠️ Invalid kline stream message: {message[:100]}")
+            return
+
+        data = payload.get('data', payload)
+        if data.get('e') != 'kline':
+            return
+        k = data['k']
+        if not k.get('x'):
+            return  # only closed candles are kept
+
+        market = (k['s'].upper(), k['i'])
+        if market not in self._candles:
+            return
+
+        last_open = self.last_close_time(*market)
+        if last_open is not None and k['t'] <= last_open:
+            self.stats['duplicates'] += 1
+            return
+        filled = 0
+        if last_open is not None and k['t'] > last_open + TIMEFRAME_MS[market[1]]:
+            # Missed close events: fill the gap before storing this candle
+            self.stats['gaps'] += 1
+            filled = await self._loop.run_in_executor(None, self._backfill, market[0], market[1], False)
+
+        added = self._append(market, [kline_event_to_row(k)], notify=False, closed=True)
+        # One notification per close event that stored new candles, even if the gap fill already stored this one
+        if added or filled:
+            self._notify(market)
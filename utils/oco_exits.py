@@ -0,0 +1,192 @@
+"""
+Exchange-side OCO exits tracked from the user data stream
+
+TradeExecutor.place_market_order_with_oco places a take-profit limit and a
+stop-limit as one OCO order list after each entry fill and registers it
+here. The exchange fills one leg and expires the other as soon as the price
+gets there; the tracker learns which one from the legs' execution reports
+(AccountState listener), so bots no longer poll prices for exits. Closed
+positions have the same fields update_open_positions produces. While the
+stream is down, reconcile() queries the open lists' legs over REST.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+# Leg order types by exit reason
+TAKE_PROFIT_TYPES = ('LIMIT_MAKER', 'LIMIT', 'TAKE_PROFIT', 'TAKE_PROFIT_LIMIT')
+STOP_LOSS_TYPES = ('STOP_LOSS', 'STOP_LOSS_LIMIT')
+
+
+class OcoExitTracker:
+    """Open OCO exits by order list, closed from stream events or a REST reconcile"""
+
+    def __init__(self, client, account_state=None, max_closed: int = 1000):
+        """
+        Args:
+            client: Exchange client for cancels and REST reconciles
+            account_state: AccountState whose user data stream reports the legs (None: reconcile() only)
+            max_closed: Closed exits kept until drained with pop_closed()
+        """
+        self.client = client
+        self.account_state = account_state
+        self._open: Dict[int, Dict[str, Any]] = {}
+        self._closed = deque(maxlen=max_closed)
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.stats = {'tracked': 0, 'take_profits': 0, 'stop_losses': 0, 'canceled': 0, 'reconciles': 0}
+
+        if account_state is not None:
+            account_state.add_listener(self.on_event)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """Register callback(position), called (from the stream thread) when an exit closes a position"""
+        self._listeners.append(callback)
+
+    def track(self, oco: Dict[str, Any], position: Dict[str, Any]):
+        """
+        Follow an OCO placed to close a position
+
+        Args:
+            oco: create_oco_order response (orderListId, orders, orderReports)
+            position: Open position (symbol, type 'LONG'/'SHORT', entry_price, position_size, strategy, ...)
+        """
+        legs = {int(report['orderId']): report['type'] for report in oco.get('orderReports', [])}
+        with self._lock:
+            self._open[int(oco['orderListId'])] = {
+                **position,
+                'order_list_id': int(oco['orderListId']),
+                'legs': legs,
+                'exit_price': None,
+                'exit_time': None,
+                'profit': None,
+                'exit_reason': None
+            }
+        self.stats['tracked'] += 1
+
+    def open_exits(self, symbol: Optional[str] = None, strategy: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Positions whose OCO is still working"""
+        with self._lock:
+            return [dict(p) for p in self._open.values()
+                    if (symbol is None or p['symbol'] == symbol) and (strategy is None or p.get('strategy') == strategy)]
+
+    def pop_closed(self) -> List[Dict[str, Any]]:
+        """Positions closed (or canceled) since the last call, oldest first"""
+        with self._lock:
+            closed = list(self._closed)
+            self._closed.clear()
+        return closed
+
+    def cancel(self, symbol: str, strategy: Optional[str] = None) -> int:
+        """Cancel the working OCOs of a symbol (e.g. before a signal exit), returns the number canceled"""
+        canceled = 0
+        for position in self.open_exits(symbol, strategy):
+            try:
+                # Canceling one leg cancels the whole list
+                self.client.cancel_order(symbol=symbol, orderId=next(iter(position['legs'])))
+            except Exception as e:
+                logger.error(f"Error canceling OCO {position['order_list_id']} for {symbol}: {e}")
+                continue
+            self._close(position['order_list_id'], None, None, None)
+            canceled += 1
+        return canceled
+
+    def reconcile(self) -> int:
+        """Query the legs of every open OCO over REST (for when the stream is down), returns exits found"""
+        self.stats['reconciles'] += 1
+        closed = 0
+        for position in self.open_exits():
+            legs = []
+            try:
+                for order_id in position['legs']:
+                    legs.append(self.client.get_order(symbol=position['symbol'], orderId=order_id))
+            except Exception as e:
+                logger.error(f"Error reconciling OCO {position['order_list_id']}: {e}")
+                continue
+            if self._close_from_orders(position['order_list_id'], legs):
+                closed += 1
+        return closed
+
+    # ------------------------------------------------------------------
+    # Event handling
+    # ------------------------------------------------------------------
+
+    def on_event(self, event: Dict[str, Any]):
+        """Apply one user data stream event (registered as an AccountState listener)"""
+        event_type = event.get('e')
+        if event_type == 'executionReport':
+            order_list_id = int(event.get('g', -1))
+            if order_list_id not in self._open:
+                return
+            status = event['X']
+            if status == 'FILLED':
+                executed = float(event['z'])
+                price = float(event['Z']) / executed if executed else float(event['L'])
+                self._close(order_list_id, event['o'], price, int(event['T']))
+            elif status == 'CANCELED':
+                self._close(order_list_id, None, None, None)
+        elif event_type == 'listStatus' and event.get('L') == 'ALL_DONE' and int(event['g']) in self._open:
+            # Done without a fill we saw (report dropped or list canceled elsewhere): ask the exchange
+            self._reconcile_list(int(event['g']))
+
+    def _reconcile_list(self, order_list_id: int):
+        with self._lock:
+            position = self._open.get(order_list_id)
+        if position is None:
+            return
+        try:
+            legs = [self.client.get_order(symbol=position['symbol'], orderId=order_id) for order_id in position['legs']]
+        except Exception as e:
+            logger.error(f"Error querying OCO {order_list_id}: {e}")
+            return
+        self._close_from_orders(order_list_id, legs)
+
+    def _close_from_orders(self, order_list_id: int, legs: List[Dict[str, Any]]) -> bool:
+        for leg in legs:
+            if leg['status'] == 'FILLED':
+                executed = float(leg['executedQty'])
+                price = float(leg['cummulativeQuoteQty']) / executed if executed else float(leg['price'])
+                self._close(order_list_id, leg['type'], price, int(leg.get('updateTime', 0)) or None)
+                return True
+        if legs and all(leg['status'] in ('CANCELED', 'EXPIRED', 'REJECTED') for leg in legs):
+            self._close(order_list_id, None, None, None)
+            return True
+        return False
+
+    def _close(self, order_list_id: int, leg_type: Optional[str], price: Optional[float], time_ms: Optional[int]):
+        with self._lock:
+            position = self._open.pop(order_list_id, None)
+            if position is None:
+                return
+            if leg_type is None:
+                position['exit_reason'] = 'canceled'
+            else:
+                position['exit_reason'] = 'stop_loss' if leg_type in STOP_LOSS_TYPES else 'take_profit'
+                position['exit_price'] = price
+                position['exit_time'] = datetime.fromtimestamp((time_ms or time.time() * 1000) / 1000)
+                direction = 1 if position.get('type') == 'LONG' else -1
+                position['profit'] = direction * (price - position['entry_price']) * position['position_size']
+            self._closed.append(position)
+
+        if position['exit_reason'] == 'canceled':
+            self.stats['canceled'] += 1
+            logger.info(f"OCO exit {order_list_id} for {position['symbol']} canceled")
+            return
+        self.stats['take_profits' if position['exit_reason'] == 'take_profit' else 'stop_losses'] += 1
+        logger.info(f"⚡ {position['symbol']} {position.get('strategy') or ''} {position['exit_reason']} "
+                    f"at {price:.8g} (entry {position['entry_price']:.8g}) - PnL ${position['profit']:.2f}")
+        for callback in list(self._listeners):
+            try:
+                callback(dict(position))
+            except Exception as e:
+                logger.error(f"Error in OCO exit listener: {e}")
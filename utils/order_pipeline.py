@@ -0,0 +1,222 @@
+"""
+Order submission queue with a worker pool and idempotent client order IDs
+
+The signal loop queues orders and moves on; a pool of workers sends them
+concurrently. Every order carries a newClientOrderId derived from
+(run_name, symbol, strategy, candle time, side), so the same signal always
+maps to the same ID. When a send times out or fails without a definite
+answer, the worker looks the ID up with get_order before resending: an order
+the exchange already accepted is picked up instead of placed twice. Results
+go to a per-order callback and a Future; submit-to-ack latency is measured.
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Dict, List, Any, Optional, Callable
+
+import numpy as np
+import pandas as pd
+from requests.exceptions import RequestException
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+
+from config.exchange_config import ORDER_WORKERS, ORDER_MAX_RETRIES, ORDER_RETRY_DELAY
+
+logger = logging.getLogger(__name__)
+
+# Binance accepts client order IDs matching ^[a-zA-Z0-9-_]{1,36}$
+CLIENT_ORDER_ID_PREFIX = 'tb-'
+CLIENT_ORDER_ID_LENGTH = 36
+
+
+def candle_time_ms(candle_time) -> int:
+    """Candle open time (Timestamp, datetime, seconds or milliseconds) in milliseconds"""
+    if isinstance(candle_time, (int, np.integer)) and candle_time > 10 ** 11:
+        return int(candle_time)
+    if isinstance(candle_time, (int, float, np.integer, np.floating)):
+        return int(candle_time * 1000)
+    return int(pd.Timestamp(candle_time).value // 1_000_000)
+
+
+def client_order_id(run_name: str, symbol: str, strategy: str, candle_time, side: str) -> str:
+    """Deterministic newClientOrderId of a signal: the same inputs always give the same 36-character ID"""
+    key = f"{run_name}|{symbol}|{strategy}|{candle_time_ms(candle_time)}|{side}"
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return CLIENT_ORDER_ID_PREFIX + digest[:CLIENT_ORDER_ID_LENGTH - len(CLIENT_ORDER_ID_PREFIX)]
+
+
+def _retryable(error: Exception) -> bool:
+    """True when the order may or may not have reached the exchange, or was throttled"""
+    if isinstance(error, BinanceAPIException):
+        # 5xx: unknown execution status; -1007: backend timeout; 429/418: throttled, not executed
+        return error.status_code >= 500 or error.status_code in (418, 429) or error.code == -1007
+    return isinstance(error, (RequestException, BinanceRequestException, ConnectionError, TimeoutError))
+
+
+class OrderPipeline:
+    """Queue orders from the signal loop and send them from a worker pool"""
+
+    def __init__(self, client, run_name: str, workers: int = ORDER_WORKERS, max_retries: int = ORDER_MAX_RETRIES,
+                 retry_delay: float = ORDER_RETRY_DELAY, max_recent: int = 1000):
+        """
+        Args:
+            client: Exchange client (binance Client or FakeBinanceClient)
+            run_name: Bot run name, part of every client order ID (e.g. 'testBot')
+            workers: Orders sent concurrently
+            max_retries: Resends after timeouts, 5xx responses or throttling
+            retry_delay: First retry delay in seconds (doubles per retry)
+            max_recent: Client order IDs (and latencies) remembered to drop repeated signals
+        """
+        self.client = client
+        self.run_name = run_name
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='order')
+        self.max_recent = max_recent
+        self._orders: 'OrderedDict[str, Future]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=max_recent)
+        self.stats = {'submitted': 0, 'acked': 0, 'failed': 0, 'retries': 0, 'recovered': 0, 'duplicates': 0}
+
+    def submit(self, symbol: str, side: str, quantity: str, strategy: str, candle_time,
+               callback: Optional[Callable[[Dict[str, Any]], None]] = None, order_type: str = 'MARKET',
+               test: bool = False, **params) -> Future:
+        """
+        Queue an order for a strategy's signal on a candle
+
+        Args:
+            symbol: Trading pair
+            side: 'BUY' or 'SELL'
+            quantity: Quantity formatted to the symbol's lot size
+            strategy: Strategy name
+            candle_time: Open time of the candle that produced the signal
+            callback: callback(result), called from a worker thread once the order is acked or failed
+            order_type: Binance order type
+            test: Send to the test endpoint (nothing is executed)
+            **params: Extra create_order parameters (price, timeInForce, ...)
+
+        Returns:
+            Future of the result dict (client_order_id, order, error, attempts, latency, ...)
+        """
+        order_id = client_order_id(self.run_name, symbol, strategy, candle_time, side)
+        with self._lock:
+            known = self._orders.get(order_id)
+            if known is not None:
+                # The same signal submitted again (e.g. a cycle re-run): one order only
+                self.stats['duplicates'] += 1
+                return known
+            self.stats['submitted'] += 1
+            request = {'symbol': symbol, 'side': side, 'type': order_type, 'quantity': quantity,
+                       'newClientOrderId': order_id, **params}
+            future = self.executor.submit(self._send, request, strategy, time.perf_counter(), callback, test)
+            self._orders[order_id] = future
+            while len(self._orders) > self.max_recent and next(iter(self._orders.values())).done():
+                self._orders.popitem(last=False)
+        return future
+
+    def wait(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Wait for the orders in flight, returns the results of those finished in time"""
+        with self._lock:
+            futures = [future for future in self._orders.values() if not future.done()]
+        done, _ = wait(futures, timeout)
+        return [future.result() for future in done]
+
+    def latency_summary(self) -> Dict[str, float]:
+        """Submit-to-ack latency percentiles in milliseconds (queue wait, retries and round trips)"""
+        if not self._latencies:
+            return {}
+        latencies = np.array(self._latencies) * 1000
+        return {
+            'count': len(latencies),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'max_ms': float(latencies.max())
+        }
+
+    def stop(self, timeout: Optional[float] = 30.0):
+        """Wait for queued orders, then shut the workers down"""
+        self.wait(timeout)
+        self.executor.shutdown(wait=False)
+        summary = self.latency_summary()
+        if summary:
+            logger.info(f"Order pipeline: {self.stats['acked']} acked, {self.stats['failed']} failed, "
+                        f"{self.stats['retries']} retries, submit-to-ack p50 {summary['p50_ms']:.0f}ms "
+                        f"p95 {summary['p95_ms']:.0f}ms")
+
+    def _send(self, request: Dict[str, Any], strategy: str, submitted: float,
+              callback: Optional[Callable[[Dict[str, Any]], None]], test: bool) -> Dict[str, Any]:
+        order_id = request['newClientOrderId']
+        result = {
+            'client_order_id': order_id,
+            'symbol': request['symbol'],
+            'side': request['side'],
+            'quantity': request['quantity'],
+            'strategy': strategy,
+            'order': None,
+            'error': None,
+            'attempts': 0,
+            'latency': None
+        }
+
+        delay = self.retry_delay
+        uncertain = False
+        while True:
+            result['attempts'] += 1
+            try:
+                if uncertain:
+                    # The previous send may have reached the exchange: look the ID up before resending
+                    existing = self._lookup(request['symbol'], order_id)
+                    if existing is not None:
+                        self.stats['recovered'] += 1
+                        logger.info(f"Order {order_id} was accepted before the timeout, not resending")
+                        result['order'] = existing
+                        break
+                if test:
+                    self.client.create_test_order(**request)
+                    result['order'] = {'status': 'TEST', 'clientOrderId': order_id, **request}
+                else:
+                    result['order'] = self.client.create_order(**request)
+                break
+            except Exception as e:
+                # Duplicate: an earlier attempt is open on the exchange, pick it up with the lookup
+                duplicate = isinstance(e, BinanceAPIException) and e.code == -2010 and 'Duplicate' in e.message
+                if not (duplicate or _retryable(e)) or result['attempts'] > self.max_retries:
+                    result['error'] = str(e)
+                    break
+                throttled = isinstance(e, BinanceAPIException) and e.status_code in (418, 429)
+                uncertain = uncertain or not throttled
+                self.stats['retries'] += 1
+                if duplicate:
+                    continue
+                logger.warning(f"⚠️ Order {order_id} ({request['symbol']} {request['side']}) attempt "
+                               f"{result['attempts']} failed: {e}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay *= 2
+
+        result['latency'] = time.perf_counter() - submitted
+        if result['order'] is not None:
+            self.stats['acked'] += 1
+            self._latencies.append(result['latency'])
+        else:
+            self.stats['failed'] += 1
+            logger.error(f"❌ Order {order_id} ({request['symbol']} {request['side']} {strategy}) failed: "
+                         f"{result['error']}")
+
+        if callback is not None:
+            try:
+                callback(result)
+            except Exception as e:
+                logger.error(f"Error in order callback for {order_id}: {e}")
+        return result
+
+    def _lookup(self, symbol: str, order_id: str) -> Optional[Dict[str, Any]]:
+        """The exchange's record of a client order ID (None if it never arrived)"""
+        try:
+            return self.client.get_order(symbol=symbol, origClientOrderId=order_id)
+        except BinanceAPIException as e:
+            if e.code == -2013:
+                return None
+            raise
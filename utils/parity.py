@@ -0,0 +1,203 @@
+"""
+Parity checks between legacy and optimized strategy/simulator implementations
+"""
+
+import importlib
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_COLUMNS = ('signal', 'position')
+LEDGER_FIELDS = ('symbol', 'type', 'entry_time', 'exit_time', 'entry_price', 'exit_price',
+                 'position_size', 'profit', 'fees', 'exit_reason')
+
+
+def load_object(spec: str):
+    """Load a class or function from a 'package.module:Name' spec"""
+    module_name, _, attr = spec.partition(':')
+    if not attr:
+        raise ValueError(f"Expected 'module:Name', got '{spec}'")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _values_match(a, b, atol: float, rtol: float) -> bool:
+    """Compare two scalars, treating NaN/None as equal to each other"""
+    a_missing = a is None or (isinstance(a, float) and np.isnan(a))
+    b_missing = b is None or (isinstance(b, float) and np.isnan(b))
+    if a_missing or b_missing:
+        return a_missing and b_missing
+    if isinstance(a, (int, float, np.number)) and isinstance(b, (int, float, np.number)):
+        return bool(np.isclose(float(a), float(b), atol=atol, rtol=rtol))
+    return a == b
+
+
+def compare_series(legacy: pd.Series, candidate: pd.Series, atol: float = 1e-9,
+                   rtol: float = 1e-9) -> Dict[str, Any]:
+    """
+    Compare two aligned series bar by bar.
+
+    Returns:
+        dict: 'match', 'mismatches' and, on divergence, the first divergent
+        bar with both values
+    """
+    result = {'match': True, 'mismatches': 0, 'first_divergence': None}
+
+    if len(legacy) != len(candidate) or not legacy.index.equals(candidate.index):
+        result['match'] = False
+        common = legacy.index.intersection(candidate.index)
+        result['length'] = {'legacy': len(legacy), 'candidate': len(candidate), 'common': len(common)}
+        legacy = legacy.loc[common]
+        candidate = candidate.loc[common]
+
+    a = pd.to_numeric(legacy, errors='coerce').to_numpy(dtype=float)
+    b = pd.to_numeric(candidate, errors='coerce').to_numpy(dtype=float)
+    equal = np.isclose(a, b, atol=atol, rtol=rtol) | (np.isnan(a) & np.isnan(b))
+    diverged = np.flatnonzero(~equal)
+
+    if len(diverged):
+        first = diverged[0]
+        result['match'] = False
+        result['mismatches'] = int(len(diverged))
+        result['first_divergence'] = {
+            'position': int(first),
+            'bar': str(legacy.index[first]),
+            'legacy': None if np.isnan(a[first]) else float(a[first]),
+            'candidate': None if np.isnan(b[first]) else float(b[first])
+        }
+    return result
+
+
+def compare_signals(legacy: pd.DataFrame, candidate: pd.DataFrame, columns: Sequence[str] = SIGNAL_COLUMNS,
+                    atol: float = 1e-9, rtol: float = 1e-9) -> Dict[str, Any]:
+    """Compare the signal/position columns of two generate_signals results"""
+    report = {'match': True, 'columns': {}}
+    for column in columns:
+        if column not in legacy.columns or column not in candidate.columns:
+            report['match'] = False
+            report['columns'][column] = {
+                'match': False,
+                'error': f"missing column (legacy: {column in legacy.columns}, candidate: {column in candidate.columns})"
+            }
+            continue
+        column_report = compare_series(legacy[column], candidate[column], atol, rtol)
+        report['columns'][column] = column_report
+        report['match'] = report['match'] and column_report['match']
+    return report
+
+
+def compare_latest(strategy, data: pd.DataFrame, bars: int = 200, columns: Sequence[str] = SIGNAL_COLUMNS,
+                   atol: float = 1e-9, rtol: float = 1e-9) -> Dict[str, Any]:
+    """
+    Check a strategy's generate_latest_signal against the last row of its batch
+    generate_signals on each of the last `bars` prefixes of the data.
+
+    Returns:
+        dict: 'match', bars checked, mismatches and, on divergence, the first
+        divergent bar with both rows
+    """
+    report = {'match': True, 'bars': 0, 'mismatches': 0, 'first_divergence': None}
+    for end in range(max(1, len(data) - bars + 1), len(data) + 1):
+        prefix = data.iloc[:end]
+        batch = strategy.generate_signals(prefix.copy())
+        latest = strategy.generate_latest_signal(prefix.copy())
+        report['bars'] += 1
+
+        if batch.empty or latest.empty:
+            matched = batch.empty and latest.empty
+        else:
+            matched = latest.index[-1] == batch.index[-1] and all(
+                _values_match(_scalar(batch[column].iloc[-1]), _scalar(latest[column].iloc[-1]), atol, rtol)
+                for column in columns)
+        if not matched:
+            report['match'] = False
+            report['mismatches'] += 1
+            if report['first_divergence'] is None:
+                report['first_divergence'] = {
+                    'bar': str(prefix.index[-1]),
+                    'batch': {} if batch.empty else {c: _scalar(batch[c].iloc[-1]) for c in columns if c in batch},
+                    'latest': {} if latest.empty else {c: _scalar(latest[c].iloc[-1]) for c in columns if c in latest}
+                }
+    return report
+
+
+def _scalar(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def compare_ledgers(legacy: List[Dict[str, Any]], candidate: List[Dict[str, Any]],
+                    fields: Sequence[str] = LEDGER_FIELDS, atol: float = 1e-9,
+                    rtol: float = 1e-9) -> Dict[str, Any]:
+    """
+    Compare two trade ledgers trade by trade.
+
+    Returns:
+        dict: 'match', trade counts and, on divergence, the first divergent
+        trade with its entry bar and the differing fields
+    """
+    report = {
+        'match': len(legacy) == len(candidate),
+        'legacy_trades': len(legacy),
+        'candidate_trades': len(candidate),
+        'first_divergence': None
+    }
+
+    for i in range(max(len(legacy), len(candidate))):
+        if i >= len(legacy) or i >= len(candidate):
+            trade = legacy[i] if i < len(legacy) else candidate[i]
+            report['first_divergence'] = {
+                'trade': i,
+                'bar': str(trade.get('entry_time')),
+                'fields': {'missing_in': 'candidate' if i < len(legacy) else 'legacy'}
+            }
+            break
+
+        differing = {
+            field: {'legacy': str(legacy[i].get(field)), 'candidate': str(candidate[i].get(field))}
+            for field in fields
+            if not _values_match(legacy[i].get(field), candidate[i].get(field), atol, rtol)
+        }
+        if differing:
+            report['match'] = False
+            report['first_divergence'] = {
+                'trade': i,
+                'bar': str(legacy[i].get('entry_time')),
+                'fields': differing
+            }
+            break
+
+    return report
+
+
+def simulate_ledger(strategy, data: pd.DataFrame, symbol: str, timeframe: str,
+                    backtester_class=None, strategy_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Run one combination through a Backtester simulator and return its closed trades.
+
+    Args:
+        strategy: Strategy instance to simulate
+        data: Prepared OHLCV data indexed by timestamp
+        symbol: Trading pair
+        timeframe: Candle interval
+        backtester_class: Simulator class (defaults to backTestBot.Backtester)
+        strategy_name: Name recorded on trades (defaults to the class name)
+    """
+    if backtester_class is None:
+        from scripts.bots.backTestBot import Backtester
+        backtester_class = Backtester
+
+    strategy_name = strategy_name or type(strategy).__name__
+    backtester = backtester_class(client=None, trading_pairs=[(symbol, strategy_name, timeframe)],
+                                  start_date=None, end_date=None, db=_NullDatabase(), chunk_delay=0)
+    backtester.strategies[strategy_name] = strategy
+    backtester._process_combination(symbol, strategy_name, timeframe, data.copy(), backtester.db)
+    return backtester.trades
+
+
+class _NullDatabase:
+    """Discards interim uploads made during a parity simulation"""
+
+    def batch_upload_trades(self, trades, batch_size=1000, streaming=None):
+        return len(trades)
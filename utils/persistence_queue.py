@@ -0,0 +1,323 @@
+"""
+Write-behind persistence queue for trade database writes
+
+The trading loop hands records to a bounded queue and moves on; a background
+thread writes them in batches of up to max_batch records, or whatever has
+arrived max_delay seconds after the first one. A failed batch is retried with
+exponential backoff. If it still fails (database unreachable), or the
+queue is full, its records are appended to a local spill file. They are
+written again once the database accepts a batch. Records the database
+rejects (schema or constraint errors) are not retried: they are written once
+to a dead-letter file. flush() drains the queue and is called when the bots
+shut down, so a stopped bot loses nothing it has queued.
+
+Record kinds:
+    trade:         db.batch_upload_trades(records)
+    daily_summary: db.save_daily_summary(records)
+"""
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from datetime import datetime, date
+from typing import Dict, List, Any, Optional
+
+from config.storage_config import (PERSISTENCE_BATCH_SIZE, PERSISTENCE_MAX_DELAY, PERSISTENCE_QUEUE_SIZE,
+                                   PERSISTENCE_MAX_RETRIES, PERSISTENCE_RETRY_DELAY, PERSISTENCE_SPILL_PATH,
+                                   PERSISTENCE_DEAD_LETTER_PATH)
+
+logger = logging.getLogger(__name__)
+
+# Errors of the records themselves: writing them again fails again
+REJECTED_ERRORS = (ValueError, TypeError, KeyError, sqlite3.IntegrityError, sqlite3.InterfaceError)
+try:
+    from google.api_core.exceptions import BadRequest
+    REJECTED_ERRORS += (BadRequest,)
+except ImportError:
+    pass
+try:
+    import psycopg2
+    REJECTED_ERRORS += (psycopg2.IntegrityError, psycopg2.DataError)
+except ImportError:
+    pass
+
+KINDS = ('trade', 'daily_summary')
+
+# Seconds between replays of the spill file
+SPILL_REPLAY_INTERVAL = 60.0
+
+
+def _encode(value):
+    # Datetimes keep their type through the spill file (the database writers expect them)
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'$date': value.isoformat()}
+    if hasattr(value, 'item'):  # numpy scalars
+        return value.item()
+    return str(value)
+
+
+def _decode(obj: Dict[str, Any]):
+    if len(obj) == 1:
+        if '$datetime' in obj:
+            return datetime.fromisoformat(obj['$datetime'])
+        if '$date' in obj:
+            return date.fromisoformat(obj['$date'])
+    return obj
+
+
+class PersistenceQueue:
+    """Bounded queue of database records written in batches by a background thread"""
+
+    def __init__(self, db, max_batch: int = PERSISTENCE_BATCH_SIZE, max_delay: float = PERSISTENCE_MAX_DELAY,
+                 max_queue: int = PERSISTENCE_QUEUE_SIZE, max_retries: int = PERSISTENCE_MAX_RETRIES,
+                 retry_delay: float = PERSISTENCE_RETRY_DELAY, spill_path: str = PERSISTENCE_SPILL_PATH,
+                 dead_letter_path: str = PERSISTENCE_DEAD_LETTER_PATH):
+        """
+        Args:
+            db: Trade database (BigQueryDatabase or LocalDatabase)
+            max_batch: Records written per batch at most
+            max_delay: Seconds a record waits for its batch to fill
+            max_queue: Records queued at most (the rest go straight to the spill file)
+            max_retries: Retries of a failed batch before it is spilled
+            retry_delay: First retry delay in seconds (doubles per retry)
+            spill_path: JSONL file holding records the database could not be reached for
+            dead_letter_path: JSONL file holding records the database rejected
+        """
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.spill_path = spill_path
+        self.dead_letter_path = dead_letter_path
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=max_queue)
+        self._spill_lock = threading.Lock()
+        self._stop_requested = threading.Event()
+        self._flushing = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_replay = 0.0
+        self.stats = {'queued': 0, 'written': 0, 'batches': 0, 'retries': 0, 'spilled': 0, 'replayed': 0,
+                      'dead_lettered': 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self) -> 'PersistenceQueue':
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_requested.clear()
+            self._thread = threading.Thread(target=self._run, name='persistence-queue', daemon=True)
+            self._thread.start()
+        return self
+
+    def put(self, kind: str, record: Dict[str, Any]):
+        """Queue one record for the database (never blocks: a full queue spills it to disk)"""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown record kind '{kind}', expected one of {KINDS}")
+        try:
+            self._queue.put_nowait((kind, record))
+            self.stats['queued'] += 1
+        except queue.Full:
+            logger.warning("⚠️ Persistence queue full, spilling record to disk")
+            self._spill(kind, [record])
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until every queued record is written (or spilled), returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        self._flushing.set()
+        try:
+            with self._queue.all_tasks_done:
+                while self._queue.unfinished_tasks:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._thread is None or not self._thread.is_alive():
+                        logger.warning(f"⚠️ Persistence queue not drained: {self._queue.unfinished_tasks} records pending")
+                        return False
+                    self._queue.all_tasks_done.wait(min(remaining, 0.5))
+            return True
+        finally:
+            self._flushing.clear()
+
+    def stop(self, timeout: float = 30.0):
+        """Write what is queued, then end the writer thread"""
+        self.flush(timeout)
+        self._stop_requested.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        logger.info(f"Persistence queue: {self.stats['written']} records written in {self.stats['batches']} batches, "
+                    f"{self.stats['retries']} retries, {self.stats['spilled']} spilled, "
+                    f"{self.stats['dead_lettered']} dead-lettered")
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        # Records spilled by an earlier run
+        if self._has_spill():
+            self._replay_spill()
+        while not self._stop_requested.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                written = self._write(batch)
+                if written and self._has_spill() and time.monotonic() >= self._next_replay:
+                    self._replay_spill()
+            except Exception as e:
+                logger.error(f"Error in persistence queue: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _next_batch(self) -> List[Any]:
+        """Up to max_batch records, waiting at most max_delay after the first one"""
+        try:
+            batch = [self._queue.get(timeout=1.0)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=max(0.0, min(remaining, 0.05))))
+            except queue.Empty:
+                # Flushes and shutdown don't wait for the batch to fill
+                if remaining <= 0 or self._flushing.is_set() or self._stop_requested.is_set():
+                    break
+        return batch
+
+    def _write(self, batch: List[Any]) -> bool:
+        """Write a batch by kind, spilling what the database could not be reached for; True if nothing was spilled"""
+        by_kind: Dict[str, List[Dict[str, Any]]] = {}
+        for kind, record in batch:
+            by_kind.setdefault(kind, []).append(record)
+        written = True
+        for kind, records in by_kind.items():
+            failed = self._write_records(kind, records)
+            if failed:
+                self._spill(kind, failed)
+                written = False
+        return written
+
+    def _write_records(self, kind: str, records: List[Dict[str, Any]],
+                       retries: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Write records, dead-lettering the ones the database rejects; returns the records to spill"""
+        retries = self.max_retries if retries is None else retries
+        delay = self.retry_delay
+        for attempt in range(retries + 1):
+            try:
+                if kind == 'trade':
+                    saved = self.db.batch_upload_trades(records, batch_size=len(records))
+                    if saved < len(records):
+                        raise RuntimeError(f"{saved}/{len(records)} trades saved")
+                else:
+                    self.db.save_daily_summary(records)
+                self.stats['written'] += len(records)
+                self.stats['batches'] += 1
+                return []
+            except REJECTED_ERRORS as e:
+                if len(records) == 1:
+                    self._dead_letter(kind, records, e)
+                    return []
+                # One bad record fails the whole batch: write them one by one to find it
+                for i, record in enumerate(records):
+                    failed = self._write_records(kind, [record], retries)
+                    if failed:
+                        return failed + records[i + 1:]
+                return []
+            except Exception as e:
+                if attempt == retries or self._stop_requested.is_set():
+                    logger.error(f"❌ Writing {len(records)} {kind} records failed: {e}")
+                    return records
+                self.stats['retries'] += 1
+                logger.warning(f"⚠️ Writing {len(records)} {kind} records failed: {e}, retrying in {delay:.1f}s")
+                self._stop_requested.wait(delay)
+                delay *= 2
+        return records
+
+    # ------------------------------------------------------------------
+    # Spill file
+    # ------------------------------------------------------------------
+
+    def _spill(self, kind: str, records: List[Dict[str, Any]]):
+        with self._spill_lock:
+            os.makedirs(os.path.dirname(self.spill_path) or '.', exist_ok=True)
+            with open(self.spill_path, 'a') as f:
+                for record in records:
+                    f.write(json.dumps({'kind': kind, 'record': record}, default=_encode) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        self.stats['spilled'] += len(records)
+        logger.warning(f"⚠️ Spilled {len(records)} {kind} records to {self.spill_path}")
+
+    def _dead_letter(self, kind: str, records: List[Dict[str, Any]], error: Exception):
+        with self._spill_lock:
+            os.makedirs(os.path.dirname(self.dead_letter_path) or '.', exist_ok=True)
+            with open(self.dead_letter_path, 'a') as f:
+                for record in records:
+                    f.write(json.dumps({'kind': kind, 'record': record, 'error': str(error)}, default=_encode) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        self.stats['dead_lettered'] += len(records)
+        logger.error(f"❌ Database rejected {len(records)} {kind} records ({error}), moved to {self.dead_letter_path}")
+
+    def _has_spill(self) -> bool:
+        return os.path.exists(self.spill_path) or os.path.exists(self.spill_path + '.replaying')
+
+    def _replay_spill(self):
+        """Write the spilled records now that the database accepts batches again"""
+        self._next_replay = time.monotonic() + SPILL_REPLAY_INTERVAL
+        replaying = self.spill_path + '.replaying'
+        with self._spill_lock:
+            # A replay cut short by a crash is picked up first; records spilled since wait for the next one
+            if not os.path.exists(replaying):
+                os.replace(self.spill_path, replaying)
+        by_kind: Dict[str, List[Dict[str, Any]]] = {}
+        with open(replaying, 'r') as f:
+            for line in f:
+                try:
+                    item = json.loads(line, object_hook=_decode)
+                except json.JSONDecodeError:
+                    continue  # Cut short by a crash mid-write
+                by_kind.setdefault(item['kind'], []).append(item['record'])
+        for kind, records in by_kind.items():
+            for i in range(0, len(records), self.max_batch):
+                chunk = records[i:i + self.max_batch]
+                # One attempt each: records the database cannot be reached for wait for the next replay
+                written = self.stats['written']
+                failed = self._write_records(kind, chunk, retries=0)
+                self.stats['replayed'] += self.stats['written'] - written
+                if failed:
+                    self._spill(kind, failed)
+        os.remove(replaying)
+        logger.info(f"✓ Replayed spilled records from {self.spill_path}")
+
+
+_queues: Dict[int, PersistenceQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_persistence_queue(db) -> PersistenceQueue:
+    """The process-wide queue of a database (bots sharing a database share its writer thread)"""
+    with _queues_lock:
+        persistence = _queues.get(id(db))
+        if persistence is None:
+            persistence = _queues[id(db)] = PersistenceQueue(db).start()
+        return persistence
+
+
+def flush_persistence_queues(timeout: float = 30.0):
+    """Write every queued record (bot shutdown)"""
+    with _queues_lock:
+        queues = list(_queues.values())
+    for persistence in queues:
+        persistence.flush(timeout)
@@ -0,0 +1,68 @@
+"""
+Per-cycle price snapshot from a single ticker request
+
+Execution and position-update paths of a cycle read prices from one
+snapshot instead of calling get_symbol_ticker per combination, so every
+strategy trading a symbol in the cycle sees the same price and the cycle
+costs one request (weight 4) instead of one per combination (weight 2 each).
+"""
+
+import json
+import time
+import logging
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PriceSnapshot:
+    """Last prices of a set of symbols taken at one point in time"""
+
+    def __init__(self, client, prices: Dict[str, float], taken_at: Optional[float] = None):
+        """
+        Args:
+            client: Exchange client used for symbols missing from the snapshot
+            prices: {symbol: price}
+            taken_at: Snapshot time in seconds (default now)
+        """
+        self.client = client
+        self.prices = dict(prices)
+        self.taken_at = taken_at if taken_at is not None else time.time()
+        self.stats = {'lookups': 0, 'misses': 0}
+
+    @classmethod
+    def take(cls, client, symbols: Optional[Iterable[str]] = None) -> 'PriceSnapshot':
+        """
+        Snapshot the prices of symbols (all listed symbols if None) with one ticker request
+
+        Returns:
+            PriceSnapshot (empty if the request failed; prices are then fetched per symbol)
+        """
+        symbols = sorted(set(symbols)) if symbols is not None else None
+        try:
+            if symbols is not None and len(symbols) == 1:
+                tickers = [client.get_symbol_ticker(symbol=symbols[0])]
+            elif symbols is not None:
+                tickers = client.get_symbol_ticker(symbols=json.dumps(symbols, separators=(',', ':')))
+            else:
+                tickers = client.get_symbol_ticker()
+        except Exception as e:
+            logger.error(f"Error taking price snapshot: {e}")
+            tickers = []
+
+        wanted = set(symbols) if symbols is not None else None
+        prices = {t['symbol']: float(t['price']) for t in tickers if wanted is None or t['symbol'] in wanted}
+        return cls(client, prices)
+
+    def price(self, symbol: str) -> float:
+        """Snapshot price of a symbol (fetched once and kept if the snapshot lacks it)"""
+        self.stats['lookups'] += 1
+        price = self.prices.get(symbol)
+        if price is None:
+            self.stats['misses'] += 1
+            price = float(self.client.get_symbol_ticker(symbol=symbol)['price'])
+            self.prices[symbol] = price
+        return price
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.prices
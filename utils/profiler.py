@@ -0,0 +1,219 @@
+"""
+Per-phase profiling for backtest runs
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import logging
+import cProfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Set to 'cprofile' or 'pyinstrument' to dump a profile for every phase
+PROFILE_ENV_VAR = 'BACKTEST_PROFILE'
+
+PHASES = ['data_fetch', 'prepare_data', 'generate_signals', 'simulation', 'export', 'upload']
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+        if sys.platform == 'darwin':
+            return peak / (1024 * 1024)
+        return peak / 1024
+    try:
+        import psutil
+        memory_info = psutil.Process().memory_info()
+        return getattr(memory_info, 'peak_wset', memory_info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+class PhaseProfiler:
+    """Records wall time, CPU time, peak RSS and candle counts per phase and combination"""
+
+    def __init__(self, run_name: str, output_dir: str = 'output/profiles', profile_mode: Optional[str] = None):
+        """
+        Initialize the profiler
+
+        Args:
+            run_name: Name used for report files (e.g., 'backTestBot')
+            output_dir: Directory for reports and per-phase profile dumps
+            profile_mode: 'cprofile', 'pyinstrument' or None (defaults to the BACKTEST_PROFILE env var)
+        """
+        self.run_name = run_name
+        self.output_dir = output_dir
+        self.profile_mode = (profile_mode or os.getenv(PROFILE_ENV_VAR, '')).lower() or None
+        self.records: List[Dict[str, Any]] = []
+        self._stack: List[Dict[str, Any]] = []
+
+        if self.profile_mode not in (None, 'cprofile', 'pyinstrument'):
+            logger.warning(f"Unknown profile mode '{self.profile_mode}', per-phase dumps disabled")
+            self.profile_mode = None
+
+        if self.profile_mode == 'pyinstrument':
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                logger.warning("pyinstrument is not installed, falling back to cProfile")
+                self.profile_mode = 'cprofile'
+
+    def _start_dump_profiler(self):
+        """Start a profiler for the current phase if dumps are enabled"""
+        if self.profile_mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        if self.profile_mode == 'pyinstrument':
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+        return None
+
+    def _stop_dump_profiler(self, profiler, combo: str, phase: str):
+        """Stop the phase profiler and write its dump to the output directory"""
+        if profiler is None:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        # Several records can share a combo/phase (e.g. interim uploads), so number the dumps
+        dump_index = sum(1 for r in self.records if r['combo'] == combo and r['phase'] == phase)
+        base_path = os.path.join(self.output_dir, f"{combo}_{phase}_{dump_index}")
+        try:
+            if self.profile_mode == 'cprofile':
+                profiler.disable()
+                profiler.dump_stats(f"{base_path}.prof")
+            else:
+                profiler.stop()
+                with open(f"{base_path}.html", 'w') as f:
+                    f.write(profiler.output_html())
+        except Exception as e:
+            logger.warning(f"Failed to write profile dump for {combo} {phase}: {e}")
+
+    @contextmanager
+    def phase(self, phase: str, combo: str, candles: int = 0):
+        """
+        Time a phase of work for a combination.
+
+        Phases may nest (e.g. interim uploads during a simulation); the
+        ``self_wall_time``/``self_cpu_time`` fields exclude nested phases.
+        The yielded record can be updated, e.g. ``record['candles'] = len(df)``.
+        """
+        record = {
+            'run_name': self.run_name,
+            'combo': combo,
+            'phase': phase,
+            'candles': candles,
+            'started_at': datetime.now().isoformat(),
+            'wall_time': 0.0,
+            'cpu_time': 0.0,
+            'self_wall_time': 0.0,
+            'self_cpu_time': 0.0,
+            'peak_rss_mb': None
+        }
+        frame = {'child_wall': 0.0, 'child_cpu': 0.0}
+        self._stack.append(frame)
+        dump_profiler = self._start_dump_profiler() if len(self._stack) == 1 else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            self._stack.pop()
+            self._stop_dump_profiler(dump_profiler, combo, phase)
+
+            record['wall_time'] = wall_time
+            record['cpu_time'] = cpu_time
+            record['self_wall_time'] = wall_time - frame['child_wall']
+            record['self_cpu_time'] = cpu_time - frame['child_cpu']
+            record['peak_rss_mb'] = get_peak_rss_mb()
+            self.records.append(record)
+
+            if self._stack:
+                self._stack[-1]['child_wall'] += wall_time
+                self._stack[-1]['child_cpu'] += cpu_time
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Aggregate exclusive time and candle counts per phase"""
+        summary = {}
+        for record in self.records:
+            phase_summary = summary.setdefault(record['phase'], {
+                'calls': 0,
+                'wall_time': 0.0,
+                'cpu_time': 0.0,
+                'candles': 0
+            })
+            phase_summary['calls'] += 1
+            phase_summary['wall_time'] += record['self_wall_time']
+            phase_summary['cpu_time'] += record['self_cpu_time']
+            phase_summary['candles'] += record['candles']
+
+        for phase_summary in summary.values():
+            wall_time = phase_summary['wall_time']
+            phase_summary['candles_per_sec'] = phase_summary['candles'] / wall_time if wall_time > 0 else 0.0
+        return summary
+
+    def write_report(self, filename: Optional[str] = None) -> Dict[str, str]:
+        """
+        Write the phase records to JSON and CSV.
+
+        Args:
+            filename: Base path without extension (defaults to <output_dir>/<run_name>_profile)
+
+        Returns:
+            dict: Paths of the written 'json' and 'csv' reports
+        """
+        base_path = filename or os.path.join(self.output_dir, f"{self.run_name}_profile")
+        os.makedirs(os.path.dirname(base_path) or '.', exist_ok=True)
+
+        json_path = f"{base_path}.json"
+        csv_path = f"{base_path}.csv"
+
+        with open(json_path, 'w') as f:
+            json.dump({
+                'run_name': self.run_name,
+                'generated_at': datetime.now().isoformat(),
+                'peak_rss_mb': get_peak_rss_mb(),
+                'summary': self.summary(),
+                'records': self.records
+            }, f, indent=2)
+
+        fieldnames = ['run_name', 'combo', 'phase', 'candles', 'started_at', 'wall_time', 'cpu_time',
+                      'self_wall_time', 'self_cpu_time', 'peak_rss_mb']
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(self.records)
+
+        logger.info(f"Wrote phase profile to {json_path} and {csv_path}")
+        return {'json': json_path, 'csv': csv_path}
+
+    def log_summary(self):
+        """Log a per-phase timing table"""
+        summary = self.summary()
+        logger.info("\n=== PHASE TIMINGS ===")
+        logger.info(f"{'Phase':<18} {'Calls':<8} {'Wall (s)':<12} {'CPU (s)':<12} {'Candles':<12}")
+        for phase in PHASES + [p for p in summary if p not in PHASES]:
+            if phase not in summary:
+                continue
+            s = summary[phase]
+            logger.info(f"{phase:<18} {s['calls']:<8} {s['wall_time']:<12.3f} {s['cpu_time']:<12.3f} {s['candles']:<12}")
+        peak_rss = get_peak_rss_mb()
+        if peak_rss is not None:
+            logger.info(f"Peak RSS: {peak_rss:.1f} MB")
+        logger.info("=====================\n")
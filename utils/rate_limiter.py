@@ -0,0 +1,326 @@
+"""
+Host-wide request-weight limiter shared by every bot process
+
+Binance counts request weight per IP in one-minute windows, so bots on the
+same host share one budget. The limiter keeps the current window's used
+weight and any ban deadline in a small memory-mapped file (under /dev/shm
+when available) guarded by an fcntl lock: each request reserves its
+endpoint weight before it is sent and waits for the next window when the
+budget is spent. The X-MBX-USED-WEIGHT-1M header of every response pulls
+the shared count up to the exchange's view (requests from other tools on
+the IP included), and a 429/418 Retry-After pauses every process.
+
+RateLimitedClient and RateLimitedAsyncClient route all python-binance REST
+calls through the limiter; FakeBinanceClient accepts one directly. Without
+fcntl (Windows) the limiter only coordinates threads of one process.
+"""
+
+import os
+import time
+import mmap
+import asyncio
+import struct
+import logging
+import tempfile
+import threading
+from typing import Dict, Any, Optional, Callable
+from urllib.parse import urlparse
+
+from binance.client import Client
+from binance.async_client import AsyncClient
+from binance.exceptions import BinanceAPIException
+
+from config.exchange_config import RATE_LIMIT_WEIGHT, RATE_LIMIT_HEADROOM, RATE_LIMIT_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Shared state: window index, weight used in it, ban deadline (epoch seconds)
+STATE_FORMAT = '<qqd'
+STATE_SIZE = struct.calcsize(STATE_FORMAT)
+
+# Request weights per REST path (Binance spot); unknown paths count 1
+REQUEST_WEIGHTS = {
+    '/api/v3/ping': 1,
+    '/api/v3/time': 1,
+    '/api/v3/exchangeInfo': 20,
+    '/api/v3/depth': 5,
+    '/api/v3/trades': 25,
+    '/api/v3/historicalTrades': 25,
+    '/api/v3/aggTrades': 2,
+    '/api/v3/avgPrice': 2,
+    '/api/v3/ticker/24hr': 2,
+    '/api/v3/ticker/price': 2,
+    '/api/v3/ticker/bookTicker': 2,
+    '/api/v3/account': 20,
+    '/api/v3/myTrades': 20,
+    '/api/v3/order': 4,
+    '/api/v3/openOrders': 6,
+    '/api/v3/allOrders': 20,
+    '/api/v3/orderList/oco': 1,
+    '/api/v3/order/oco': 1,
+    '/api/v3/userDataStream': 2
+}
+
+# Weights of the same paths without a symbol (all markets)
+ALL_SYMBOLS_WEIGHTS = {
+    '/api/v3/ticker/24hr': 80,
+    '/api/v3/ticker/price': 4,
+    '/api/v3/ticker/bookTicker': 4,
+    '/api/v3/openOrders': 80
+}
+
+
+def kline_weight(limit: int) -> int:
+    """Weight of a klines request for a given limit"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def request_weight(method: str, path: str, params: Optional[Dict[str, Any]] = None) -> int:
+    """Request weight of a REST call (path as in REQUEST_WEIGHTS, params as sent)"""
+    params = params or {}
+    if path.endswith('/klines') or path.endswith('/uiKlines'):
+        return kline_weight(int(params.get('limit', 500)))
+    if path in ALL_SYMBOLS_WEIGHTS and 'symbol' not in params:
+        # A symbols=[...] list is counted like all markets
+        return ALL_SYMBOLS_WEIGHTS[path]
+    if path == '/api/v3/order' and method in ('post', 'delete'):
+        return 1  # Placing and canceling cost 1; querying costs 4
+    return REQUEST_WEIGHTS.get(path, 1)
+
+
+def used_weight_header(headers) -> Optional[int]:
+    """Exchange-side used weight of the current minute from response headers"""
+    if not headers:
+        return None
+    for name in ('x-mbx-used-weight-1m', 'X-MBX-USED-WEIGHT-1M', 'x-mbx-used-weight', 'X-MBX-USED-WEIGHT'):
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class RateLimiter:
+    """Request-weight budget per window, shared by all processes using the same state file"""
+
+    def __init__(self, path: Optional[str] = None, limit: int = RATE_LIMIT_WEIGHT,
+                 headroom: float = RATE_LIMIT_HEADROOM, window: float = 60.0):
+        """
+        Args:
+            path: Shared state file (None: this process only)
+            limit: Exchange weight limit per window
+            headroom: Fraction of the limit the bots may use (the rest absorbs header lag and other tools)
+            window: Window length in seconds
+        """
+        self.path = path
+        self.limit = limit
+        self.budget = max(1, int(limit * headroom))
+        self.window = window
+        self._thread_lock = threading.Lock()
+        self._fd = None
+        self._map = None
+        self._local = [0, 0, 0.0]
+        self.stats = {'requests': 0, 'weight': 0, 'waits': 0, 'wait_seconds': 0.0, 'header_syncs': 0, 'bans': 0}
+
+        if path is not None and fcntl is not None:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._fd).st_size < STATE_SIZE:
+                    os.ftruncate(self._fd, STATE_SIZE)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._map = mmap.mmap(self._fd, STATE_SIZE)
+        elif path is not None:
+            logger.warning("⚠️ fcntl unavailable: request weight is only limited within this process")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def acquire(self, weight: int):
+        """Reserve weight in the current window, waiting for the next window or a ban to end if needed"""
+        while True:
+            now = time.time()
+            window_id = int(now // self.window)
+            with self._locked() as state:
+                if state[0] != window_id:
+                    state[0], state[1] = window_id, 0
+                if state[2] > now:
+                    wait = state[2] - now
+                elif state[1] == 0 or state[1] + weight <= self.budget:
+                    # An oversized request still goes through in an empty window
+                    state[1] += weight
+                    self.stats['requests'] += 1
+                    self.stats['weight'] += weight
+                    return
+                else:
+                    wait = (window_id + 1) * self.window - now
+            self.stats['waits'] += 1
+            self.stats['wait_seconds'] += wait
+            logger.debug(f"Request weight budget spent ({self.budget}/{self.window:.0f}s), waiting {wait:.2f}s")
+            time.sleep(wait + 0.01)
+
+    def sync(self, headers):
+        """Raise the shared count to the exchange's used weight from a response's headers"""
+        used = used_weight_header(headers)
+        if used is None:
+            return
+        window_id = int(time.time() // self.window)
+        with self._locked() as state:
+            if state[0] != window_id:
+                state[0], state[1] = window_id, 0
+            if used > state[1]:
+                state[1] = used
+                self.stats['header_syncs'] += 1
+
+    def run(self, weight: int, send: Callable[[], Any], last_response: Callable[[], Any]):
+        """
+        Send one request within the budget
+
+        Args:
+            weight: Request weight
+            send: Performs the request
+            last_response: Returns the client's latest response (headers are synced from it)
+        """
+        self.acquire(weight)
+        try:
+            return send()
+        except BinanceAPIException as e:
+            if e.status_code in (418, 429):
+                headers = e.response.headers if e.response is not None else {}
+                self.penalize(float(headers.get('Retry-After') or headers.get('retry-after') or 60))
+            raise
+        finally:
+            response = last_response()
+            if response is not None:
+                self.sync(response.headers)
+
+    def penalize(self, retry_after: float):
+        """Pause every process for retry_after seconds (429/418 Retry-After)"""
+        until = time.time() + retry_after
+        with self._locked() as state:
+            state[2] = max(state[2], until)
+        self.stats['bans'] += 1
+        logger.warning(f"⚠️ Exchange rate limit hit: all bots pause requests for {retry_after:.0f}s")
+
+    def used_weight(self) -> int:
+        """Weight used in the current window by all processes"""
+        with self._locked() as state:
+            return state[1] if state[0] == int(time.time() // self.window) else 0
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+            self._map = self._fd = None
+
+    # ------------------------------------------------------------------
+    # Shared state
+    # ------------------------------------------------------------------
+
+    def _locked(self):
+        return _LockedState(self)
+
+
+class _LockedState:
+    """Context manager: thread and file lock held, state read on enter and written back on exit"""
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+        self.state = None
+
+    def __enter__(self):
+        limiter = self.limiter
+        limiter._thread_lock.acquire()
+        if limiter._map is None:
+            self.state = limiter._local
+            return self.state
+        fcntl.flock(limiter._fd, fcntl.LOCK_EX)
+        self.state = list(struct.unpack_from(STATE_FORMAT, limiter._map))
+        return self.state
+
+    def __exit__(self, *exc):
+        limiter = self.limiter
+        try:
+            if limiter._map is not None:
+                struct.pack_into(STATE_FORMAT, limiter._map, 0, *self.state)
+                fcntl.flock(limiter._fd, fcntl.LOCK_UN)
+        finally:
+            limiter._thread_lock.release()
+        return False
+
+
+class RateLimitedClient(Client):
+    """python-binance Client whose REST calls all go through a RateLimiter"""
+
+    def __init__(self, *args, rate_limiter: Optional[RateLimiter] = None, **kwargs):
+        # Set before Client.__init__, which already pings the API
+        self.rate_limiter = rate_limiter
+        super().__init__(*args, **kwargs)
+
+    def _request(self, method, uri: str, signed: bool, force_params: bool = False, **kwargs):
+        if self.rate_limiter is None:
+            return super()._request(method, uri, signed, force_params, **kwargs)
+        weight = request_weight(method, urlparse(uri).path, _request_params(kwargs))
+        return self.rate_limiter.run(weight, lambda: super(RateLimitedClient, self)._request(
+            method, uri, signed, force_params, **kwargs), lambda: getattr(self, 'response', None))
+
+
+class RateLimitedAsyncClient(AsyncClient):
+    """python-binance AsyncClient whose REST calls all go through a RateLimiter (set after create())"""
+
+    rate_limiter: Optional[RateLimiter] = None
+
+    async def _request(self, method, uri: str, signed: bool, force_params: bool = False, **kwargs):
+        limiter = self.rate_limiter
+        if limiter is None:
+            return await super()._request(method, uri, signed, force_params, **kwargs)
+        # Waiting for the budget must not block the event loop
+        await asyncio.get_running_loop().run_in_executor(
+            None, limiter.acquire, request_weight(method, urlparse(uri).path, _request_params(kwargs)))
+        try:
+            return await super()._request(method, uri, signed, force_params, **kwargs)
+        except BinanceAPIException as e:
+            if e.status_code in (418, 429):
+                headers = e.response.headers if e.response is not None else {}
+                limiter.penalize(float(headers.get('Retry-After') or 60))
+            raise
+        finally:
+            response = getattr(self, 'response', None)
+            if response is not None:
+                limiter.sync(response.headers)
+
+
+def _request_params(kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # python-binance passes the parameters as 'data' until it builds the request
+    params = kwargs.get('data', kwargs.get('params'))
+    return params if isinstance(params, dict) else None
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(source: str = 'binance') -> RateLimiter:
+    """The process-wide limiter of an exchange, sharing its state file with every other bot on the host"""
+    with _limiters_lock:
+        limiter = _limiters.get(source)
+        if limiter is None:
+            directory = RATE_LIMIT_DIR or ('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir())
+            limiter = _limiters[source] = RateLimiter(os.path.join(directory, f"tradingbot_weight_{source}"))
+        return limiter
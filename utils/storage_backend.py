@@ -0,0 +1,30 @@
+"""
+Factory for the trade storage backend used by the bots
+"""
+
+import logging
+
+from config.storage_config import STORAGE_BACKEND, LOCAL_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def create_database(backend: str = None):
+    """
+    Create the trade database
+
+    Args:
+        backend: 'bigquery' or 'local' (default: STORAGE_BACKEND)
+
+    Returns:
+        BigQueryDatabase or LocalDatabase (same methods)
+    """
+    backend = backend or STORAGE_BACKEND
+    if backend == 'local':
+        from utils.local_database import LocalDatabase
+        return LocalDatabase(LOCAL_DB_PATH)
+    if backend != 'bigquery':
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    from utils.bigquery_database import BigQueryDatabase
+    return BigQueryDatabase()
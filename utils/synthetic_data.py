@@ -0,0 +1,342 @@
+"""
+Deterministic synthetic OHLCV data for benchmarks, stress and offline testing
+
+Series are generated in vectorized form and support geometric Brownian
+motion, Markov regime switching, volatility clustering (log-AR(1)
+stochastic volatility, a GARCH-like process that can be generated without
+a per-bar loop) and compound Poisson jumps.
+"""
+
+import zlib
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Candle length per timeframe in milliseconds
+TIMEFRAME_MS = {
+    '1m': 60_000,
+    '3m': 180_000,
+    '5m': 300_000,
+    '15m': 900_000,
+    '30m': 1_800_000,
+    '1h': 3_600_000,
+    '2h': 7_200_000,
+    '4h': 14_400_000,
+    '6h': 21_600_000,
+    '8h': 28_800_000,
+    '12h': 43_200_000,
+    '1d': 86_400_000
+}
+
+DEFAULT_START = datetime(2024, 1, 1)
+
+# Column layout of Backtester.fetch_historical_data (timestamp is the index)
+KLINE_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'close_time', 'quote_asset_volume',
+                 'trades', 'taker_buy_base', 'taker_buy_quote', 'ignored']
+
+# Bull / sideways / bear regimes as (drift, volatility multiplier)
+DEFAULT_REGIMES = [(0.0003, 0.8), (0.0, 1.0), (-0.0004, 1.6)]
+
+# Block length for the AR(1) volatility recursion (keeps phi**-k well conditioned)
+_AR_BLOCK = 256
+
+
+def symbol_seed(symbol: str, seed: int = 42) -> int:
+    """Stable per-symbol seed (independent of PYTHONHASHSEED)"""
+    return (seed + zlib.crc32(symbol.encode())) % (2 ** 32)
+
+
+def _ar1(innovations: np.ndarray, phi: float) -> np.ndarray:
+    """
+    x[t] = phi * x[t-1] + innovations[t], computed block-wise with cumulative sums.
+
+    Within a block x[t] = phi**t * (x0 + cumsum(e[k] * phi**-k)), so only one
+    Python iteration per block is needed.
+    """
+    n = len(innovations)
+    if phi == 0:
+        return innovations.copy()
+    out = np.empty(n)
+    # Small |phi| underflows phi**block to 0 (and block / p to inf): shorten the block to keep it above ~1e-300
+    size = _AR_BLOCK
+    if abs(phi) < 1:
+        size = int(min(_AR_BLOCK, max(1, np.log(1e-300) // np.log(abs(phi)))))
+    powers = phi ** np.arange(1, size + 1)
+    state = 0.0
+    for start in range(0, n, size):
+        block = innovations[start:start + size]
+        p = powers[:len(block)]
+        out[start:start + len(block)] = p * (state + np.cumsum(block / p))
+        state = out[start + len(block) - 1]
+    return out
+
+
+def regime_path(n_bars: int, rng: np.random.Generator, n_regimes: int,
+                mean_duration: float = 500.0) -> np.ndarray:
+    """
+    Regime index per bar from a Markov chain with geometric regime durations.
+
+    Durations are drawn up front and expanded with np.repeat, so no per-bar loop
+    is required.
+    """
+    if n_regimes <= 1:
+        return np.zeros(n_bars, dtype=np.int64)
+    p_switch = 1.0 / max(mean_duration, 1.0)
+    n_draws = int(n_bars * p_switch * 2) + 16
+    durations = rng.geometric(p_switch, n_draws)
+    while durations.sum() < n_bars:
+        durations = np.concatenate([durations, rng.geometric(p_switch, n_draws)])
+    # Each switch moves to one of the other regimes
+    steps = rng.integers(1, n_regimes, len(durations))
+    states = (rng.integers(0, n_regimes) + np.cumsum(steps) - steps[0]) % n_regimes
+    return np.repeat(states, durations)[:n_bars]
+
+
+def generate_log_returns(n_bars: int, rng: np.random.Generator, drift: float = 0.0, volatility: float = 0.01,
+                         regimes: Optional[Sequence] = None, regime_duration: float = 500.0,
+                         vol_persistence: float = 0.0, vol_of_vol: float = 0.0,
+                         jump_intensity: float = 0.0, jump_mean: float = 0.0, jump_std: float = 0.05,
+                         shocks: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Generate per-bar log returns.
+
+    Args:
+        n_bars: Number of bars
+        rng: Random generator
+        drift: Expected return per bar (GBM drift)
+        volatility: Base standard deviation of log returns per bar
+        regimes: Sequence of (drift, volatility multiplier) tuples for regime switching
+        regime_duration: Mean bars spent in a regime
+        vol_persistence: AR(1) coefficient of log volatility (0 disables clustering, ~0.98 is typical)
+        vol_of_vol: Standard deviation of log volatility innovations
+        jump_intensity: Expected jumps per bar (Poisson rate)
+        jump_mean: Mean log jump size
+        jump_std: Standard deviation of log jump size
+        shocks: Pre-drawn standard normal shocks (e.g. correlated across symbols)
+
+    Returns:
+        dict: 'returns', per-bar 'sigma' and 'regime' arrays
+    """
+    z = shocks if shocks is not None else rng.standard_normal(n_bars)
+
+    if regimes:
+        regime = regime_path(n_bars, rng, len(regimes), regime_duration)
+        regime_drift = np.array([r[0] for r in regimes])[regime]
+        regime_vol = np.array([r[1] for r in regimes])[regime]
+    else:
+        regime = np.zeros(n_bars, dtype=np.int64)
+        regime_drift = np.full(n_bars, drift)
+        regime_vol = np.ones(n_bars)
+
+    sigma = volatility * regime_vol
+    if vol_persistence > 0 and vol_of_vol > 0:
+        log_vol = _ar1(rng.normal(0, vol_of_vol, n_bars), vol_persistence)
+        # Normalise so the long-run mean variance matches the base volatility
+        stationary_var = vol_of_vol ** 2 / (1 - vol_persistence ** 2)
+        sigma = sigma * np.exp(log_vol - stationary_var)
+
+    # GBM log returns with the Ito correction so E[price] grows at the drift rate
+    returns = regime_drift - 0.5 * sigma ** 2 + sigma * z
+
+    if jump_intensity > 0:
+        jump_counts = rng.poisson(jump_intensity, n_bars)
+        has_jump = jump_counts > 0
+        jumps = np.zeros(n_bars)
+        jumps[has_jump] = rng.normal(jump_mean * jump_counts[has_jump],
+                                     jump_std * np.sqrt(jump_counts[has_jump]))
+        returns = returns + jumps
+
+    return {'returns': returns, 'sigma': sigma, 'regime': regime}
+
+
+def build_candles(log_returns: np.ndarray, sigma: np.ndarray, rng: np.random.Generator,
+                  timeframe: str = '15m', start: Optional[datetime] = None, start_price: float = 100.0,
+                  base_volume: float = 1000.0) -> pd.DataFrame:
+    """Turn log returns into OHLCV candles in the fetch_historical_data layout"""
+    n_bars = len(log_returns)
+    start = start or DEFAULT_START
+    interval_ms = TIMEFRAME_MS[timeframe]
+
+    close = start_price * np.exp(np.cumsum(log_returns))
+    open_ = np.empty(n_bars)
+    open_[0] = start_price
+    open_[1:] = close[:-1]
+
+    # Wicks extend beyond the body by a fraction of the bar volatility
+    wick = np.abs(rng.standard_normal((2, n_bars))) * (sigma / 2)
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+
+    # Volume scales with the size of the move so volume filters fire
+    move = np.abs(log_returns) / np.maximum(sigma, 1e-12)
+    volume = base_volume * rng.lognormal(0, 0.5, n_bars) * (1 + move)
+    taker_share = rng.uniform(0.3, 0.7, n_bars)
+    typical_price = (high + low + close) / 3
+
+    start_ms = int(pd.Timestamp(start).value // 1_000_000)
+    open_times = start_ms + np.arange(n_bars, dtype=np.int64) * interval_ms
+
+    return pd.DataFrame({
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+        'close_time': open_times + interval_ms - 1,
+        'quote_asset_volume': volume * typical_price,
+        'trades': np.maximum(1, (volume / base_volume * 100).astype(np.int64)),
+        'taker_buy_base': volume * taker_share,
+        'taker_buy_quote': volume * taker_share * typical_price,
+        'ignored': 0
+    }, index=pd.DatetimeIndex(pd.to_datetime(open_times, unit='ms'), name='timestamp'))
+
+
+def generate_ohlcv(n_bars: int, timeframe: str = '15m', start: Optional[datetime] = None,
+                   start_price: float = 100.0, drift: float = 0.0, volatility: float = 0.01,
+                   base_volume: float = 1000.0, seed: int = 42, **model) -> pd.DataFrame:
+    """
+    Generate a synthetic OHLCV series.
+
+    Plain geometric Brownian motion by default; pass any of the
+    generate_log_returns options (regimes, vol_persistence/vol_of_vol,
+    jump_intensity/jump_mean/jump_std) to layer in other dynamics.
+
+    Args:
+        n_bars: Number of candles
+        timeframe: Candle interval (e.g., '15m', '1h')
+        start: Open time of the first candle
+        start_price: First open price
+        drift: Expected return per bar
+        volatility: Standard deviation of log returns per bar
+        base_volume: Median volume per bar
+        seed: Random seed, the same seed always yields the same series
+
+    Returns:
+        DataFrame indexed by 'timestamp' with the same columns as
+        Backtester.fetch_historical_data (before prepare_data)
+    """
+    rng = np.random.default_rng(seed)
+    path = generate_log_returns(n_bars, rng, drift=drift, volatility=volatility, **model)
+    return build_candles(path['returns'], path['sigma'], rng, timeframe=timeframe, start=start,
+                         start_price=start_price, base_volume=base_volume)
+
+
+def generate_market(symbols: List[str], n_bars: int, timeframe: str = '15m', seed: int = 42,
+                    correlation: float = 0.0, start_prices: Optional[Dict[str, float]] = None,
+                    **kwargs) -> Dict[str, pd.DataFrame]:
+    """
+    Generate a reproducible series per symbol.
+
+    Args:
+        symbols: Trading pairs to generate
+        n_bars: Candles per symbol
+        timeframe: Candle interval
+        seed: Market seed, each symbol derives its own seed from it
+        correlation: Pairwise correlation of return shocks via a shared market factor
+        start_prices: Optional first price per symbol
+        **kwargs: Passed to generate_ohlcv (drift, volatility, regimes, jumps, ...)
+    """
+    start_prices = start_prices or {}
+    market_shocks = np.random.default_rng(seed).standard_normal(n_bars) if correlation > 0 else None
+
+    frames = {}
+    for symbol in symbols:
+        symbol_kwargs = dict(kwargs)
+        symbol_kwargs.setdefault('start_price', start_prices.get(symbol, 100.0))
+        if market_shocks is not None:
+            own = np.random.default_rng(symbol_seed(symbol, seed) + 1).standard_normal(n_bars)
+            symbol_kwargs['shocks'] = np.sqrt(correlation) * market_shocks + np.sqrt(1 - correlation) * own
+        frames[symbol] = generate_ohlcv(n_bars, timeframe=timeframe, seed=symbol_seed(symbol, seed), **symbol_kwargs)
+    return frames
+
+
+def generate_symbols(symbols: List[str], n_bars: int, timeframe: str = '15m', seed: int = 42,
+                     **kwargs) -> Dict[str, pd.DataFrame]:
+    """Generate an independent, reproducible series for each symbol"""
+    return generate_market(symbols, n_bars, timeframe=timeframe, seed=seed, **kwargs)
+
+
+def resample_candles(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Aggregate candles to a longer timeframe (e.g. 15m -> 1h) keeping the kline layout"""
+    interval_ms = TIMEFRAME_MS[timeframe]
+    rule = f"{interval_ms // 60_000}min"
+    resampled = df.resample(rule, label='left', closed='left').agg({
+        'open': 'first',
+        'high': 'max',
+        'low': 'min',
+        'close': 'last',
+        'volume': 'sum',
+        'quote_asset_volume': 'sum',
+        'trades': 'sum',
+        'taker_buy_base': 'sum',
+        'taker_buy_quote': 'sum'
+    }).dropna(subset=['open'])
+    open_times = resampled.index.values.astype('datetime64[ms]').astype(np.int64)
+    resampled['close_time'] = open_times + interval_ms - 1
+    resampled['ignored'] = 0
+    resampled.index.name = 'timestamp'
+    return resampled[KLINE_COLUMNS]
+
+
+def to_klines(df: pd.DataFrame, timeframe: str = '15m') -> List[list]:
+    """
+    Convert an OHLCV DataFrame to Binance kline rows.
+
+    Rows use the same 12-field layout and string prices as
+    ``client.get_klines``/``client.get_historical_klines``.
+    """
+    interval_ms = TIMEFRAME_MS[timeframe]
+    open_times = (df.index.values.astype('datetime64[ms]').astype(np.int64)).tolist()
+    opens = df['open'].map('{:.8f}'.format).tolist()
+    highs = df['high'].map('{:.8f}'.format).tolist()
+    lows = df['low'].map('{:.8f}'.format).tolist()
+    closes = df['close'].map('{:.8f}'.format).tolist()
+    volumes = df['volume'].map('{:.8f}'.format).tolist()
+    if 'quote_asset_volume' in df.columns:
+        quote_volumes = df['quote_asset_volume'].map('{:.8f}'.format).tolist()
+        trades = df['trades'].astype(int).tolist()
+        taker_base = df['taker_buy_base'].map('{:.8f}'.format).tolist()
+        taker_quote = df['taker_buy_quote'].map('{:.8f}'.format).tolist()
+    else:
+        quote_volumes = (df['volume'] * df['close']).map('{:.8f}'.format).tolist()
+        trades = [100] * len(df)
+        taker_base = taker_quote = ['0'] * len(df)
+
+    return [
+        [open_time, o, h, l, c, v, open_time + interval_ms - 1, qv, n, tb, tq, '0']
+        for open_time, o, h, l, c, v, qv, n, tb, tq
+        in zip(open_times, opens, highs, lows, closes, volumes, quote_volumes, trades, taker_base, taker_quote)
+    ]
+
+
+def emit_to_store(store, frames: Dict[str, pd.DataFrame], timeframe: str, append: bool = False) -> int:
+    """
+    Write generated frames into a CandleStore.
+
+    Returns:
+        int: Number of candles written
+    """
+    written = 0
+    for symbol, df in frames.items():
+        store.write(symbol, timeframe, df, append=append)
+        written += len(df)
+    logger.info(f"Wrote {written} synthetic {timeframe} candles for {len(frames)} symbols to {store.base_dir}")
+    return written
+
+
+def emit_to_client(client, frames: Dict[str, pd.DataFrame], timeframe: str) -> int:
+    """
+    Load generated frames into an offline client exposing add_candles(symbol, timeframe, df).
+
+    Returns:
+        int: Number of candles loaded
+    """
+    loaded = 0
+    for symbol, df in frames.items():
+        client.add_candles(symbol, timeframe, df)
+        loaded += len(df)
+    return loaded
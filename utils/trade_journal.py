@@ -0,0 +1,254 @@
+"""
+Append-only trade journal with periodic snapshots
+
+Each trade event is written once, as one JSON line, instead of rewriting the
+whole trade history after every trade. Lines are flushed to the OS as they
+are written (a crashed process loses nothing) and fsynced at most once per
+fsync_interval (a crashed host loses at most that window). Every
+snapshot_every events the full history is written atomically to the
+snapshot file together with the last journal sequence number it contains,
+and the journal is truncated. At startup the history is rebuilt from the
+snapshot plus the journal lines after it, so the cost of persisting a trade
+stays constant however long the history grows.
+
+Events:
+    trade: a trade appended to history[symbol][strategy]['trades'], its profit added to profit_usd
+    open:  a position appended to history[symbol]['open_positions']
+    close: an open position removed and recorded as a trade of its strategy
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime, date
+from typing import Dict, List, Any, Optional, Tuple
+
+from config.storage_config import TRADE_JOURNAL_FSYNC_INTERVAL, TRADE_JOURNAL_SNAPSHOT_EVERY
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, 'item'):  # numpy scalars
+        return value.item()
+    return str(value)
+
+
+def apply_event(history: Dict[str, Any], event: Dict[str, Any]):
+    """Apply one journal event to a trade history dict"""
+    kind = event.get('kind', 'trade')
+    strategies = history.setdefault(event['symbol'], {})
+    if kind == 'open':
+        strategies.setdefault('open_positions', []).append(event['trade'])
+        return
+    if kind == 'close':
+        positions = strategies.get('open_positions', [])
+        trade = event['trade']
+        for i, position in enumerate(positions):
+            if position.get('strategy') == trade.get('strategy') and \
+                    _encode(position.get('entry_time')) == _encode(trade.get('entry_time')):
+                del positions[i]
+                break
+    data = strategies.setdefault(event['strategy'], {'trades': [], 'profit_usd': 0.0})
+    data['trades'].append(event['trade'])
+    data['profit_usd'] = data.get('profit_usd', 0.0) + event.get('profit', 0.0)
+
+
+class TradeJournal:
+    """Trade history persisted as a snapshot plus an append-only JSONL journal"""
+
+    def __init__(self, snapshot_path: str, journal_path: Optional[str] = None,
+                 fsync_interval: float = TRADE_JOURNAL_FSYNC_INTERVAL,
+                 snapshot_every: int = TRADE_JOURNAL_SNAPSHOT_EVERY):
+        """
+        Args:
+            snapshot_path: Full history JSON, rewritten every snapshot_every events (e.g. data/history/trade_history.json)
+            journal_path: Journal of the events since the snapshot (default: snapshot_path with a .journal.jsonl suffix)
+            fsync_interval: Seconds between fsyncs of the journal (0: fsync every event)
+            snapshot_every: Events between snapshots
+        """
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or os.path.splitext(snapshot_path)[0] + '.journal.jsonl'
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self.seq = 0
+        self.snapshot_seq = 0
+        self.uploaded_seq = 0
+        self._completed: List[Dict[str, Any]] = []
+        self._file = None
+        self._last_fsync = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {'events': 0, 'fsyncs': 0, 'snapshots': 0, 'replayed': 0}
+
+    # ------------------------------------------------------------------
+    # Startup
+    # ------------------------------------------------------------------
+
+    def load(self, empty_history: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Rebuild the history from the snapshot and the journal lines after it
+
+        Args:
+            empty_history: History to replay onto when there is no snapshot yet
+
+        Returns:
+            (history, snapshot) - the rebuilt history and the snapshot's other keys ({} without a snapshot)
+        """
+        history, snapshot = empty_history if empty_history is not None else {}, {}
+        self._completed = []
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+            history = snapshot.pop('trade_history', history)
+            self.snapshot_seq = snapshot.get('journal_seq', 0)
+            self.uploaded_seq = snapshot.get('uploaded_seq', 0)
+            self._completed = snapshot.pop('pending_uploads', [])
+        self.seq = self.snapshot_seq
+
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r') as f:
+                for line_number, line in enumerate(f, 1):
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash mid-write: nothing after it was acknowledged
+                        logger.warning(f"⚠️ Ignoring incomplete journal line {line_number} in {self.journal_path}")
+                        break
+                    if 'uploaded_through' in event:
+                        self.uploaded_seq = max(self.uploaded_seq, event['uploaded_through'])
+                        continue
+                    if event['seq'] <= self.snapshot_seq:
+                        continue  # Already in the snapshot (crash between snapshot and truncate)
+                    apply_event(history, event)
+                    self.seq = event['seq']
+                    replayed += 1
+                    if event.get('entry') is not None:
+                        self._completed.append(event)
+        self._completed = [event for event in self._completed if event['seq'] > self.uploaded_seq]
+        self.stats['replayed'] = replayed
+        logger.info(f"✓ Trade history loaded: snapshot at event {self.snapshot_seq} + {replayed} journaled events")
+        return history, snapshot
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(self, symbol: str, strategy: str, trade: Dict[str, Any], profit: float = 0.0,
+               kind: str = 'trade', entry: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Journal one trade event (after it was applied to the in-memory history)
+
+        Args:
+            symbol: Trading pair
+            strategy: Strategy name
+            trade: Trade or position dict as stored in the history
+            profit: Realized profit the event adds to the strategy's profit_usd
+            kind: 'trade', 'open' or 'close'
+            entry: Entry trade of a completed round trip (listed by completed_trades() until marked uploaded)
+
+        Returns:
+            The journaled event
+        """
+        with self._lock:
+            self.seq += 1
+            event = {'seq': self.seq, 'kind': kind, 'symbol': symbol, 'strategy': strategy, 'trade': trade,
+                     'profit': profit}
+            if entry is not None:
+                event['entry'] = entry
+            self._append(event)
+            if entry is not None:
+                self._completed.append(event)
+            self.stats['events'] += 1
+        return event
+
+    def completed_trades(self) -> List[Dict[str, Any]]:
+        """Events of completed round trips not yet marked uploaded, oldest first"""
+        with self._lock:
+            return list(self._completed)
+
+    def mark_uploaded(self, seq: int):
+        """Record that the completed trades up to event seq were uploaded"""
+        with self._lock:
+            if seq <= self.uploaded_seq:
+                return
+            self.uploaded_seq = seq
+            self._completed = [event for event in self._completed if event['seq'] > seq]
+            self._append({'uploaded_through': seq})
+
+    def flush(self):
+        """fsync the journal (e.g. at the end of a cycle and on shutdown)"""
+        with self._lock:
+            self._fsync()
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def snapshot_due(self) -> bool:
+        return self.seq - self.snapshot_seq >= self.snapshot_every
+
+    def snapshot(self, history: Dict[str, Any], extra: Optional[Dict[str, Any]] = None):
+        """
+        Write the full history atomically and truncate the journal (hold the history's lock)
+
+        Args:
+            history: The in-memory history, including every journaled event
+            extra: Other keys stored with it (performance summaries, ...)
+        """
+        with self._lock:
+            data = dict(extra or {})
+            data.update({
+                'trade_history': history,
+                'journal_seq': self.seq,
+                'uploaded_seq': self.uploaded_seq,
+                'pending_uploads': self._completed,
+                'last_updated': datetime.now().isoformat()
+            })
+            os.makedirs(os.path.dirname(self.snapshot_path) or '.', exist_ok=True)
+            temp_file = self.snapshot_path + '.tmp'
+            with open(temp_file, 'w') as f:
+                json.dump(data, f, default=_encode)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.snapshot_path)
+            self.snapshot_seq = self.seq
+
+            # Events up to journal_seq are in the snapshot; replay skips them if the truncate is lost
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            open(self.journal_path, 'w').close()
+            self.stats['snapshots'] += 1
+        logger.info(f"📸 Trade history snapshot at event {self.snapshot_seq}")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._fsync()
+                self._file.close()
+                self._file = None
+
+    # ------------------------------------------------------------------
+    # Journal file
+    # ------------------------------------------------------------------
+
+    def _append(self, event: Dict[str, Any]):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.journal_path) or '.', exist_ok=True)
+            self._file = open(self.journal_path, 'a')
+        self._file.write(json.dumps(event, default=_encode) + '\n')
+        # In the OS page cache now: survives a crash of this process
+        self._file.flush()
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._fsync()
+
+    def _fsync(self):
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self.stats['fsyncs'] += 1
+        self._last_fsync = time.monotonic()